@@ -1,12 +1,15 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 import os
 import json
-import subprocess
-import docker
+import shutil
+import math
+import asyncio
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.core.config import settings
 from app.models.user import User
 from app.models.experiment import Experiment, ExperimentStatus
@@ -19,7 +22,39 @@ from app.schemas.experiment import (
     ExperimentWithDetails,
     ExperimentStatusUpdate,
 )
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user, get_current_user_from_query
+from app.services.event_log import EventLogReader
+from app.services.dispatcher import dispatcher
+from app.services.executors import ExecutorError
+from app.services.experiment_runner import (
+    paused_duration,
+    prepare_simulation,
+    resource_limits,
+    run_seconds,
+    supervisor,
+)
+from app.services.executors.base import BATSIM_LOG, SCHEDULER_LOG
+from app.services.log_store import (
+    EXPERIMENT_STREAMS,
+    LogStore,
+    RawLog,
+    delete_experiment_logs,
+    query_log,
+)
+from app.services.job_store import delete_result_jobs
+from app.services.progress import Subscriber, stream_progress
+from app.services.storage_manager import (
+    ACTIVE_STATUSES,
+    StorageQuotaError,
+    storage_manager,
+)
+from app.services.duration_estimator import duration_estimator, refine_remaining
+from app.services.fingerprint import (
+    cache_stats,
+    complete_from_cache,
+    experiment_fingerprint,
+    find_cached_result,
+)
 
 router = APIRouter()
 
@@ -45,6 +80,160 @@ def get_experiments(
     return result
 
 
+# Columns of the compact tuples returned by the bulk status endpoint
+STATUS_FIELDS = (
+    "id",
+    "status",
+    "progress_percentage",
+    "completed_jobs",
+    "total_jobs",
+    "revision",
+)
+
+
+def filter_statuses(query, ids, sweep_id, statuses):
+    if ids is not None:
+        query = query.filter(Experiment.id.in_(ids))
+    if sweep_id is not None:
+        query = query.filter(Experiment.sweep_id == sweep_id)
+    if statuses:
+        query = query.filter(Experiment.status.in_(statuses))
+    return query
+
+
+def format_etag(count: int, id_sum: int, revision_sum: int) -> str:
+    # Any update bumps a revision, and inserts and deletes change the
+    # count or the id sum, so the triple changes with the set
+    return f'W/"{count}-{id_sum}-{revision_sum}"'
+
+
+def read_status_etag(ids, sweep_id, statuses) -> str:
+    """ETag of the selected experiments, from one aggregate query"""
+    db = SessionLocal()
+    try:
+        count, id_sum, revision_sum = filter_statuses(
+            db.query(
+                func.count(Experiment.id),
+                func.coalesce(func.sum(Experiment.id), 0),
+                func.coalesce(func.sum(Experiment.revision), 0),
+            ),
+            ids,
+            sweep_id,
+            statuses,
+        ).one()
+    finally:
+        db.close()
+    return format_etag(count, id_sum, revision_sum)
+
+
+def read_statuses(ids, sweep_id, statuses):
+    """Status tuples of the selected experiments and their ETag"""
+    db = SessionLocal()
+    try:
+        rows = (
+            filter_statuses(
+                db.query(*(getattr(Experiment, name) for name in STATUS_FIELDS)),
+                ids,
+                sweep_id,
+                statuses,
+            )
+            .order_by(Experiment.id)
+            .all()
+        )
+    finally:
+        db.close()
+    tuples = [
+        [row.id, row.status.value if row.status else None, *row[2:]] for row in rows
+    ]
+    etag = format_etag(
+        len(rows), sum(row.id for row in rows), sum(row.revision for row in rows)
+    )
+    return tuples, etag
+
+
+@router.get("/status")
+async def get_experiment_statuses(
+    request: Request,
+    ids: Optional[str] = Query(None, description="Comma-separated experiment ids"),
+    sweep_id: Optional[int] = Query(None),
+    status: Optional[List[ExperimentStatus]] = Query(None),
+    wait: float = Query(
+        0, ge=0, description="Seconds to hold the request until something changes"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Compact status of many experiments, selected by ids, sweep and/or
+    status. Send the last ETag as If-None-Match to get 304 while nothing
+    changed; with `wait` the request is held until a change or the timeout.
+    """
+    # Authentication is done; do not hold a connection while waiting
+    db.close()
+
+    experiment_ids = None
+    if ids is not None:
+        try:
+            experiment_ids = sorted(
+                {int(part) for part in ids.split(",") if part.strip()}
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be integers")
+        if len(experiment_ids) > settings.STATUS_MAX_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.STATUS_MAX_IDS} ids per request",
+            )
+    if experiment_ids is None and sweep_id is None and not status:
+        raise HTTPException(
+            status_code=400, detail="Select experiments by ids, sweep_id or status"
+        )
+
+    selection = (experiment_ids, sweep_id, status)
+    client_etag = request.headers.get("if-none-match")
+    if client_etag:
+        etag = await asyncio.to_thread(read_status_etag, *selection)
+        if etag == client_etag and wait > 0:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + min(wait, settings.STATUS_LONG_POLL_MAX)
+            while etag == client_etag and loop.time() < deadline:
+                await asyncio.sleep(
+                    min(settings.STATUS_POLL_INTERVAL, deadline - loop.time())
+                )
+                if await request.is_disconnected():
+                    break
+                etag = await asyncio.to_thread(read_status_etag, *selection)
+        if etag == client_etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+    tuples, etag = await asyncio.to_thread(read_statuses, *selection)
+    return JSONResponse(
+        {"etag": etag, "fields": STATUS_FIELDS, "experiments": tuples},
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+# Disables proxy buffering (nginx) so events are delivered immediately
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@router.get("/progress/stream")
+def stream_all_progress(
+    request: Request,
+    all_users: bool = Query(False, description="Every user's experiments (admin)"),
+    current_user: User = Depends(get_current_user_from_query),
+):
+    """Server-Sent Events with the progress of the caller's active experiments"""
+    if all_users and current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    subscriber = Subscriber(user_id=None if all_users else current_user.id)
+    return StreamingResponse(
+        stream_progress(subscriber, request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @router.get("/{experiment_id}", response_model=ExperimentWithDetails)
 def get_experiment(
     experiment_id: int,
@@ -79,16 +268,22 @@ def create_experiment(
     )
     if not scenario or not strategy:
         raise HTTPException(status_code=400, detail="Invalid scenario or strategy")
+    try:
+        resource_limits(experiment_create.config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     exp = Experiment(
         name=experiment_create.name,
         description=experiment_create.description,
         scenario_id=experiment_create.scenario_id,
         strategy_id=experiment_create.strategy_id,
         status=ExperimentStatus.PENDING,
+        priority=experiment_create.priority,
         config=(
             json.dumps(experiment_create.config) if experiment_create.config else None
         ),
         created_by=current_user.id,
+        estimated_duration=duration_estimator.estimate(scenario, strategy.id),
     )
     db.add(exp)
     db.commit()
@@ -109,6 +304,10 @@ def update_experiment(
     # Check permissions (only creator or admin can update)
     if exp.created_by != current_user.id and current_user.role.value != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    try:
+        resource_limits(experiment_update.config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     for field, value in experiment_update.dict(exclude_unset=True).items():
         setattr(exp, field, value)
     db.commit()
@@ -128,18 +327,37 @@ def delete_experiment(
     # Check permissions (only creator or admin can delete)
     if exp.created_by != current_user.id and current_user.role.value != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    # A live run still writes there; the storage manager collects it later
+    simulation_dir = exp.simulation_dir if exp.status not in ACTIVE_STATUSES else None
+    # Its results go with it; experiments finished from their cache only
+    # lose the link
+    result_ids = [res.id for res in exp.results]
+    if result_ids:
+        db.query(Experiment).filter(Experiment.cached_result_id.in_(result_ids)).update(
+            {Experiment.cached_result_id: None}, synchronize_session=False
+        )
     db.delete(exp)
     db.commit()
+    delete_experiment_logs(experiment_id)
+    for result_id in result_ids:
+        LogStore.for_result(result_id).delete()
+        delete_result_jobs(result_id)
+    if simulation_dir:
+        shutil.rmtree(simulation_dir, ignore_errors=True)
     return {"message": "Experiment deleted successfully"}
 
 
 @router.post("/{experiment_id}/start")
 def start_experiment(
     experiment_id: int,
+    force_rerun: bool = Query(False, description="Run even if a cached result exists"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Start an experiment by running batsim and pybatsim"""
+    """
+    Queue an experiment; the dispatcher runs batsim and pybatsim. If a
+    completed experiment had identical inputs, link to its result instead.
+    """
     exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
     if exp is None:
         raise HTTPException(status_code=404, detail="Experiment not found")
@@ -150,58 +368,54 @@ def start_experiment(
         )
 
     try:
-        # Create simulation directory
-        simulation_dir = os.path.join(
-            settings.STORAGE_PATH, "experiments", f"exp_{exp.id}"
+        storage_manager.check_quota(exp.created_by)
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+
+    exp.fingerprint = experiment_fingerprint(exp)
+    if exp.fingerprint and force_rerun:
+        cache_stats.record(hit=False, forced=True)
+    elif exp.fingerprint:
+        cached = find_cached_result(db, exp.fingerprint)
+        cache_stats.record(hit=cached is not None)
+        if cached is not None:
+            complete_from_cache(exp, cached)
+            db.commit()
+            return {
+                "message": "Experiment completed from a cached result",
+                "cache_hit": True,
+                "cached_result_id": cached.id,
+                "cached_experiment_id": cached.experiment_id,
+            }
+
+    if exp.estimated_duration is None:
+        # Created before the estimator had enough history
+        exp.estimated_duration = duration_estimator.estimate(
+            exp.scenario, exp.strategy_id
         )
-        os.makedirs(simulation_dir, exist_ok=True)
 
-        # Get platform and workload from scenario
-        if not exp.scenario or not exp.scenario.platform or not exp.scenario.workload:
-            raise HTTPException(
-                status_code=400, detail="Invalid scenario configuration"
-            )
+    # Copy platform, workload and strategy files to the simulation directory
+    try:
+        spec = prepare_simulation(exp)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        platform = exp.scenario.platform
-        workload = exp.scenario.workload
-
-        # Copy platform and workload files to simulation directory
-        platform_file = os.path.join(simulation_dir, "platform.xml")
-        workload_file = os.path.join(simulation_dir, "workload.json")
-        strategy_file = os.path.join(simulation_dir, "strategy.py")
-
-        # Copy files (simplified - in real implementation, you'd copy the actual files)
-        # For now, we'll just create placeholder files
-        with open(platform_file, "w") as f:
-            f.write(f"# Platform file for experiment {exp.id} - {platform.name}")
-        with open(workload_file, "w") as f:
-            f.write(f"# Workload file for experiment {exp.id} - {workload.name}")
-        with open(strategy_file, "w") as f:
-            f.write(f"# Strategy file for experiment {exp.id} - {exp.strategy.name}")
-
-        # Update experiment status
-        exp.status = ExperimentStatus.RUNNING
-        exp.start_time = datetime.now()
-        exp.simulation_dir = simulation_dir
-        db.commit()
-
-        # TODO: In a real implementation, you would:
-        # 1. Start batsim container with platform and workload
-        # 2. Start pybatsim container with strategy
-        # 3. Monitor the execution
-        # 4. Update progress and logs
-
-        return {
-            "message": "Experiment started successfully",
-            "simulation_dir": simulation_dir,
-        }
+    exp.status = ExperimentStatus.QUEUED
+    exp.queued_at = datetime.now()
+    exp.end_time = None
+    exp.simulation_dir = spec.simulation_dir
+    db.commit()
 
-    except Exception as e:
-        exp.status = ExperimentStatus.FAILED
-        db.commit()
-        raise HTTPException(
-            status_code=500, detail=f"Failed to start experiment: {str(e)}"
-        )
+    # Launching and monitoring happen on the dispatcher and supervisor threads
+    dispatcher.wake()
+
+    return {
+        "message": "Experiment queued successfully",
+        "cache_hit": False,
+        "simulation_dir": spec.simulation_dir,
+        "executor": settings.EXECUTOR_BACKEND,
+        **dispatcher.queue_estimates(db).get(exp.id, {}),
+    }
 
 
 @router.post("/{experiment_id}/stop")
@@ -215,17 +429,118 @@ def stop_experiment(
     if exp is None:
         raise HTTPException(status_code=404, detail="Experiment not found")
 
-    if exp.status != ExperimentStatus.RUNNING:
+    if exp.status not in (
+        ExperimentStatus.RUNNING,
+        ExperimentStatus.PAUSED,
+        ExperimentStatus.QUEUED,
+    ):
         raise HTTPException(status_code=400, detail="Experiment is not running")
 
-    # TODO: Stop containers and cleanup
+    was_queued = exp.status == ExperimentStatus.QUEUED
     exp.status = ExperimentStatus.CANCELLED
     exp.end_time = datetime.now()
     db.commit()
+    if was_queued:
+        return {"message": "Experiment removed from the queue"}
+    # The supervisor terminates the processes and keeps the CANCELLED status
+    try:
+        supervisor.stop(exp.id)
+    except ExecutorError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to stop experiment: {str(e)}"
+        )
 
     return {"message": "Experiment stopped successfully"}
 
 
+@router.post("/{experiment_id}/pause")
+def pause_experiment(
+    experiment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Suspend a running experiment and hand its slot to the queue"""
+    exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if exp is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+
+    if exp.status != ExperimentStatus.RUNNING:
+        raise HTTPException(status_code=400, detail="Experiment is not running")
+
+    # A worker's run is suspended by its worker on its next heartbeat
+    if exp.worker_id is None:
+        try:
+            if not supervisor.pause(exp.id):
+                raise HTTPException(
+                    status_code=409, detail="Experiment is not running on this server"
+                )
+        except ExecutorError as e:
+            raise HTTPException(
+                status_code=409, detail=f"Failed to pause experiment: {str(e)}"
+            )
+
+    # Conditional, so a run finishing meanwhile keeps its final status
+    paused = db.execute(
+        update(Experiment)
+        .where(Experiment.id == exp.id)
+        .where(Experiment.status == ExperimentStatus.RUNNING)
+        .values(status=ExperimentStatus.PAUSED, paused_at=datetime.now())
+    ).rowcount
+    db.commit()
+    if not paused:
+        raise HTTPException(status_code=409, detail="Experiment is no longer running")
+
+    # The slot is free for the next queued experiment
+    dispatcher.wake()
+
+    return {"message": "Experiment paused successfully"}
+
+
+@router.post("/{experiment_id}/resume")
+def resume_experiment(
+    experiment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Continue a paused experiment. It takes a slot back even if the queue
+    filled them meanwhile; new experiments wait until one frees up.
+    """
+    exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if exp is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+
+    if exp.status != ExperimentStatus.PAUSED:
+        raise HTTPException(status_code=400, detail="Experiment is not paused")
+
+    if exp.worker_id is None:
+        try:
+            if not supervisor.resume(exp.id):
+                raise HTTPException(
+                    status_code=409, detail="Experiment is not running on this server"
+                )
+        except ExecutorError as e:
+            raise HTTPException(
+                status_code=409, detail=f"Failed to resume experiment: {str(e)}"
+            )
+
+    resumed = db.execute(
+        update(Experiment)
+        .where(Experiment.id == exp.id)
+        .where(Experiment.status == ExperimentStatus.PAUSED)
+        .values(
+            status=ExperimentStatus.RUNNING,
+            paused_at=None,
+            paused_seconds=(exp.paused_seconds or 0) + paused_duration(exp),
+        )
+    ).rowcount
+    db.commit()
+    if not resumed:
+        raise HTTPException(status_code=409, detail="Experiment is no longer paused")
+
+    return {"message": "Experiment resumed successfully"}
+
+
 @router.get("/{experiment_id}/status")
 def get_experiment_status(
     experiment_id: int,
@@ -237,11 +552,212 @@ def get_experiment_status(
     if exp is None:
         raise HTTPException(status_code=404, detail="Experiment not found")
 
-    return {
+    status = {
         "status": exp.status,
         "progress_percentage": exp.progress_percentage,
         "completed_jobs": exp.completed_jobs,
         "total_jobs": exp.total_jobs,
         "start_time": exp.start_time,
         "end_time": exp.end_time,
+        "run_seconds": run_seconds(exp),
+        "paused_at": exp.paused_at,
+        "paused_seconds": (exp.paused_seconds or 0) + paused_duration(exp),
+        "estimated_duration": exp.estimated_duration,
+        "priority": exp.priority,
+        "failure_reason": exp.failure_reason,
+        "peak_memory_mb": exp.peak_memory_mb,
+        "cpu_time_seconds": exp.cpu_time_seconds,
     }
+    run = supervisor.get_run(exp.id)
+    if run is not None and run.checked_at is not None:
+        # Live usage of a run supervised by this process
+        status["peak_memory_mb"] = round(run.peak_memory_mb, 1)
+        status["cpu_time_seconds"] = round(run.cpu_seconds, 3)
+    if exp.status in (ExperimentStatus.RUNNING, ExperimentStatus.PAUSED):
+        remaining = refine_remaining(
+            exp.estimated_duration,
+            run_seconds(exp) or 0.0,
+            exp.completed_jobs / exp.total_jobs if exp.total_jobs else None,
+        )
+        status["remaining_seconds"] = (
+            math.ceil(remaining) if remaining is not None else None
+        )
+    if exp.status == ExperimentStatus.QUEUED:
+        status.update(
+            {
+                "queued_at": exp.queued_at,
+                "queue_position": None,
+                "queue_length": None,
+                "eta_seconds": None,
+                **dispatcher.queue_estimates(db).get(exp.id, {}),
+                "queue_blocked_reason": dispatcher.blocked_reason or None,
+            }
+        )
+    return status
+
+
+@router.get("/{experiment_id}/progress/stream")
+def stream_experiment_progress(
+    experiment_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_from_query),
+):
+    """Server-Sent Events with the progress of one experiment"""
+    exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if exp is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    # Experiments the monitor no longer tracks start from their stored state
+    initial = [
+        {
+            "experiment_id": exp.id,
+            "status": exp.status.value if exp.status else None,
+            "total_jobs": exp.total_jobs,
+            "submitted_jobs": None,
+            "completed_jobs": exp.completed_jobs,
+            "progress_percentage": exp.progress_percentage,
+        }
+    ]
+    return StreamingResponse(
+        stream_progress(Subscriber(experiment_ids={exp.id}), request, initial),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+# Plain log files of a run that has not been archived yet
+RAW_LOG_FILES = {"batsim": BATSIM_LOG, "scheduler": SCHEDULER_LOG}
+
+
+def get_experiment_log(exp: Experiment, stream: str):
+    """The archived log of a stream, or its plain file while running"""
+    if stream not in EXPERIMENT_STREAMS:
+        raise HTTPException(status_code=404, detail="Unknown log stream")
+    store = LogStore.for_experiment(exp.id, stream)
+    if store.exists():
+        return store
+    if exp.simulation_dir:
+        raw = RawLog(os.path.join(exp.simulation_dir, RAW_LOG_FILES[stream]))
+        if raw.exists():
+            return raw
+    return None
+
+
+@router.get("/{experiment_id}/logs")
+def list_experiment_logs(
+    experiment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Available log streams of an experiment and their sizes"""
+    exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if exp is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    streams = []
+    for stream in EXPERIMENT_STREAMS:
+        log = get_experiment_log(exp, stream)
+        if log is None:
+            continue
+        streams.append(
+            {
+                "stream": stream,
+                "live": isinstance(log, RawLog),
+                "total_lines": log.total_lines,
+                "total_bytes": log.total_bytes,
+                "compressed_bytes": log.compressed_bytes(),
+            }
+        )
+    return {"streams": streams}
+
+
+@router.get("/{experiment_id}/logs/{stream}")
+def get_experiment_log_range(
+    experiment_id: int,
+    stream: str,
+    tail: Optional[int] = Query(None, description="Last N lines"),
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    start_byte: Optional[int] = None,
+    end_byte: Optional[int] = None,
+    grep: Optional[str] = Query(None, description="Regular expression"),
+    ignore_case: bool = False,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Tail, line or byte range, or grep of the batsim or scheduler log"""
+    exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if exp is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    log = get_experiment_log(exp, stream)
+    if log is None:
+        raise HTTPException(status_code=404, detail="Log not found")
+    try:
+        response = query_log(
+            log,
+            tail=tail,
+            start_line=start_line,
+            end_line=end_line,
+            start_byte=start_byte,
+            end_byte=end_byte,
+            grep=grep,
+            ignore_case=ignore_case,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"stream": stream, "live": isinstance(log, RawLog), **response}
+
+
+def get_event_log_reader(exp: Experiment) -> EventLogReader:
+    reader = (
+        EventLogReader.for_directory(exp.simulation_dir) if exp.simulation_dir else None
+    )
+    if reader is None:
+        raise HTTPException(status_code=404, detail="Scheduler event log not found")
+    return reader
+
+
+@router.get("/{experiment_id}/events")
+def get_experiment_events(
+    experiment_id: int,
+    event: Optional[str] = Query(None, description="Event name, e.g. job_scheduled"),
+    job_id: Optional[str] = None,
+    level: Optional[str] = Query(None, description="Minimum level (DEBUG, INFO, ...)"),
+    start_time: Optional[float] = Query(None, description="Simulation time lower bound"),
+    end_time: Optional[float] = Query(None, description="Simulation time upper bound"),
+    skip: int = 0,
+    limit: int = Query(1000, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Filter the scheduler event log of an experiment"""
+    exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if exp is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    reader = get_event_log_reader(exp)
+    events = reader.query(
+        limit=limit,
+        offset=skip,
+        event=event,
+        job_id=job_id,
+        min_level=level,
+        start_time=start_time,
+        end_time=end_time,
+    )
+    return {"events": events, "skip": skip, "limit": limit}
+
+
+@router.get("/{experiment_id}/jobs/{job_id}/timeline")
+def get_job_timeline(
+    experiment_id: int,
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Scheduler events of a single job, ordered by simulation time"""
+    exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+    if exp is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    reader = get_event_log_reader(exp)
+    return {"job_id": job_id, "events": reader.timeline(job_id)}
@@ -15,6 +15,7 @@ from app.schemas.platform import (
     PlatformWithCreator,
 )
 from app.api.auth import get_current_user
+from app.services.storage_manager import StorageQuotaError, storage_manager
 
 router = APIRouter()
 
@@ -64,6 +65,10 @@ async def create_platform(
     current_user: User = Depends(get_current_user),
 ):
     ensure_storage_directory()
+    try:
+        storage_manager.check_quota(current_user.id)
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=507, detail=str(e))
     # Check if platform with same name exists
     existing_platform = db.query(Platform).filter(Platform.name == name).first()
     if existing_platform:
@@ -1,25 +1,48 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy import distinct, func, desc
 from datetime import datetime, timedelta
-import csv
+import io
 import json
+import math
 import os
 from app.core.database import get_db
 from app.models.user import User
 from app.models.result import Result
+from app.models.result_rollup import ROLLUP_METRICS, ROLLUP_SUMS, ResultRollup
 from app.models.experiment import Experiment
+from app.models.scenario import Scenario
+from app.models.strategy import Strategy
 from app.schemas.result import (
     Result as ResultSchema,
     ResultCreate,
+    ResultImport,
     ResultUpdate,
     ResultWithExperiment,
 )
 from app.api.auth import get_current_user
+from app.services.job_store import JobTable, delete_result_jobs
+from app.services.log_store import LogStore, query_log
+from app.services.result_importer import ResultImportError, result_imports
+from app.services.result_pipeline import ResultParseError, parse_outputs, store_result
 
 router = APIRouter()
 
+# Rows of a JSON page of per-job data: default and maximum
+JOB_ROWS = 1000
+MAX_JOB_ROWS = 10000
+# Rows per chunk of a CSV download
+CSV_CHUNK_ROWS = 10000
+
+# Analytics response key -> rolled-up Result column
+ANALYTICS_METRICS = {
+    "makespan": "makespan",
+    "waiting_time": "average_waiting_time",
+    "turnaround_time": "average_turnaround_time",
+    "resource_utilization": "resource_utilization",
+}
 
 @router.get("/", response_model=List[ResultWithExperiment])
 def get_results(
@@ -49,31 +72,34 @@ def get_analytics(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get analytics data for results"""
-    query = db.query(Result).options(
-        joinedload(Result.experiment).joinedload(Experiment.scenario),
-        joinedload(Result.experiment).joinedload(Experiment.strategy),
-    )
-
-    # Apply date filters if provided
+    """Get analytics data for results, from the daily rollups"""
+    filters = []
+    result_filters = []
     if start_date:
         try:
             start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            query = query.filter(Result.created_at >= start_dt)
+            filters.append(ResultRollup.day >= start_dt.strftime("%Y-%m-%d"))
+            result_filters.append(Result.created_at >= start_dt)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid start_date format")
 
     if end_date:
         try:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-            query = query.filter(Result.created_at < end_dt)
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+            filters.append(ResultRollup.day <= end_dt.strftime("%Y-%m-%d"))
+            result_filters.append(Result.created_at < end_dt + timedelta(days=1))
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid end_date format")
 
-    # Get all results for analytics
-    results = query.all()
+    sums = [func.sum(ResultRollup.results).label("results")]
+    columns = [
+        f"{name}_{part}" for name in ROLLUP_METRICS for part in ("count", "sum", "sumsq")
+    ]
+    for column in columns + list(ROLLUP_SUMS):
+        sums.append(func.sum(getattr(ResultRollup, column)).label(column))
+    totals = db.query(*sums).filter(*filters).one()
 
-    if not results:
+    if not totals.results:
         return {
             "total_results": 0,
             "total_experiments": 0,
@@ -90,95 +116,94 @@ def get_analytics(
             "top_scenarios": [],
         }
 
-    # Calculate basic statistics
-    total_results = len(results)
-    total_experiments = len(set(r.experiment_id for r in results))
-
-    # Calculate averages (excluding None values)
-    makespans = [r.makespan for r in results if r.makespan is not None]
-    waiting_times = [
-        r.average_waiting_time for r in results if r.average_waiting_time is not None
-    ]
-    turnaround_times = [
-        r.average_turnaround_time
-        for r in results
-        if r.average_turnaround_time is not None
-    ]
-    utilizations = [
-        r.resource_utilization for r in results if r.resource_utilization is not None
-    ]
-
-    avg_makespan = sum(makespans) / len(makespans) if makespans else 0
-    avg_waiting_time = sum(waiting_times) / len(waiting_times) if waiting_times else 0
-    avg_turnaround_time = (
-        sum(turnaround_times) / len(turnaround_times) if turnaround_times else 0
-    )
-    avg_resource_utilization = (
-        sum(utilizations) / len(utilizations) if utilizations else 0
-    )
-
-    # Job statistics
-    total_jobs = sum(r.total_jobs or 0 for r in results)
-    completed_jobs = sum(r.completed_jobs or 0 for r in results)
-    failed_jobs = sum(r.failed_jobs or 0 for r in results)
+    # Mean and standard deviation over the results that have the metric
+    statistics = {}
+    for key, name in ANALYTICS_METRICS.items():
+        count = getattr(totals, f"{name}_count") or 0
+        mean = getattr(totals, f"{name}_sum") / count if count else 0
+        variance = getattr(totals, f"{name}_sumsq") / count - mean**2 if count else 0
+        statistics[f"avg_{key}"] = round(mean, 2)
+        statistics[f"stddev_{key}"] = round(math.sqrt(max(variance, 0)), 2)
+
+    total_jobs = totals.total_jobs or 0
+    completed_jobs = totals.completed_jobs or 0
     success_rate = (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0
 
     # Results by date
-    results_by_date = {}
-    for result in results:
-        date = result.created_at.strftime("%Y-%m-%d")
-        results_by_date[date] = results_by_date.get(date, 0) + 1
-
-    results_by_date_list = [
-        {"date": date, "count": count}
-        for date, count in sorted(results_by_date.items())
-    ]
-
-    # Top strategies (by number of results)
-    strategy_counts = {}
-    for result in results:
-        if result.experiment and result.experiment.strategy:
-            strategy_name = result.experiment.strategy.name
-            strategy_counts[strategy_name] = strategy_counts.get(strategy_name, 0) + 1
-
-    top_strategies = [
-        {"name": name, "count": count}
-        for name, count in sorted(
-            strategy_counts.items(), key=lambda x: x[1], reverse=True
-        )[:5]
-    ]
+    count = func.sum(ResultRollup.results)
+    results_by_date = (
+        db.query(ResultRollup.day, count)
+        .filter(*filters)
+        .group_by(ResultRollup.day)
+        .having(count > 0)
+        .order_by(ResultRollup.day)
+        .all()
+    )
 
-    # Top scenarios (by number of results)
-    scenario_counts = {}
-    for result in results:
-        if result.experiment and result.experiment.scenario:
-            scenario_name = result.experiment.scenario.name
-            scenario_counts[scenario_name] = scenario_counts.get(scenario_name, 0) + 1
-
-    top_scenarios = [
-        {"name": name, "count": count}
-        for name, count in sorted(
-            scenario_counts.items(), key=lambda x: x[1], reverse=True
-        )[:5]
-    ]
+    # Top strategies and scenarios (by number of results)
+    def top(model, rollup_column, limit=5):
+        return [
+            {"name": name, "count": n}
+            for name, n in db.query(model.name, count)
+            .select_from(ResultRollup)
+            .join(model, model.id == rollup_column)
+            .filter(*filters)
+            .group_by(model.id, model.name)
+            .order_by(count.desc(), model.name)
+            .limit(limit)
+        ]
+
+    # Not additive over days: one indexed count on the results
+    total_experiments = (
+        db.query(func.count(distinct(Result.experiment_id)))
+        .filter(*result_filters)
+        .scalar()
+    )
 
     return {
-        "total_results": total_results,
+        "total_results": totals.results,
         "total_experiments": total_experiments,
-        "avg_makespan": round(avg_makespan, 2),
-        "avg_waiting_time": round(avg_waiting_time, 2),
-        "avg_turnaround_time": round(avg_turnaround_time, 2),
-        "avg_resource_utilization": round(avg_resource_utilization, 2),
+        **statistics,
         "total_jobs": total_jobs,
         "completed_jobs": completed_jobs,
-        "failed_jobs": failed_jobs,
+        "failed_jobs": totals.failed_jobs or 0,
         "success_rate": round(success_rate, 2),
-        "results_by_date": results_by_date_list,
-        "top_strategies": top_strategies,
-        "top_scenarios": top_scenarios,
+        "results_by_date": [
+            {"date": day, "count": n} for day, n in results_by_date
+        ],
+        "top_strategies": top(Strategy, ResultRollup.strategy_id),
+        "top_scenarios": top(Scenario, ResultRollup.scenario_id),
     }
 
 
+@router.post("/import", status_code=202)
+def start_result_import(
+    result_import: ResultImport,
+    current_user: User = Depends(get_current_user),
+):
+    """Import the BatSim output directories under a server path"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not os.path.isdir(result_import.path):
+        raise HTTPException(status_code=400, detail="Not a directory on the server")
+    try:
+        result_imports.start(result_import.path, current_user.id)
+    except ResultImportError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return result_imports.status()
+
+
+@router.get("/import")
+def get_result_import(current_user: User = Depends(get_current_user)):
+    """Progress of the latest import"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    status = result_imports.status()
+    if status is None:
+        raise HTTPException(status_code=404, detail="No import has run")
+    return status
+
+
 @router.get("/{result_id}", response_model=ResultWithExperiment)
 def get_result(
     result_id: int,
@@ -198,6 +223,98 @@ def get_result(
     return res_dict
 
 
+@router.get("/{result_id}/logs")
+def get_result_logs(
+    result_id: int,
+    tail: Optional[int] = Query(None, description="Last N lines"),
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    start_byte: Optional[int] = None,
+    end_byte: Optional[int] = None,
+    grep: Optional[str] = Query(None, description="Regular expression"),
+    ignore_case: bool = False,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Tail, line or byte range, or grep of a result's log"""
+    if db.query(Result.id).filter(Result.id == result_id).first() is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    store = LogStore.for_result(result_id)
+    if not store.exists():
+        raise HTTPException(status_code=404, detail="Log not found")
+    try:
+        return query_log(
+            store,
+            tail=tail,
+            start_line=start_line,
+            end_line=end_line,
+            start_byte=start_byte,
+            end_byte=end_byte,
+            grep=grep,
+            ignore_case=ignore_case,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{result_id}/jobs")
+def get_result_jobs(
+    result_id: int,
+    columns: Optional[str] = Query(None, description="Comma-separated, default all"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=0, description="Rows; default all for CSV"),
+    format: str = Query("json", description="json (by column) or csv"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Per-job rows of a result, read from its columnar jobs table"""
+    if db.query(Result.id).filter(Result.id == result_id).first() is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    if format not in ("json", "csv"):
+        raise HTTPException(status_code=400, detail="format must be json or csv")
+    table = JobTable.for_result(result_id)
+    if table is None:
+        raise HTTPException(status_code=404, detail="Job data not found")
+    names = [c for c in columns.split(",") if c] if columns else table.names
+    unknown = [name for name in names if name not in table.columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown columns: {', '.join(unknown)}"
+        )
+
+    if format == "json":
+        stop = offset + min(JOB_ROWS if limit is None else limit, MAX_JOB_ROWS)
+        return {
+            "total": table.rows,
+            "offset": offset,
+            "columns": {name: table.values(name, offset, stop) for name in names},
+        }
+
+    stop = table.rows if limit is None else min(offset + limit, table.rows)
+
+    def chunks():
+        for start in range(offset, max(stop, offset + 1), CSV_CHUNK_ROWS):
+            buffer = io.StringIO()
+            table.write_csv(
+                buffer,
+                names,
+                start,
+                min(start + CSV_CHUNK_ROWS, stop),
+                header=start == offset,
+            )
+            yield buffer.getvalue()
+
+    return StreamingResponse(
+        chunks(),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="result_{result_id}_jobs.csv"'
+        },
+    )
+
+
 @router.post("/", response_model=ResultSchema)
 def create_result(
     result_create: ResultCreate,
@@ -213,75 +330,44 @@ def create_result(
     if experiment is None:
         raise HTTPException(status_code=404, detail="Experiment not found")
 
-    # Parse result files if they exist
-    jobs_data = None
-    schedule_data = None
-    computed_metrics = None
-
     if result_create.result_file_path and os.path.exists(
         result_create.result_file_path
     ):
+        # The metrics come from the outputs, not from the client
         try:
-            # Parse jobs CSV
-            jobs_file = os.path.join(result_create.result_file_path, "out_jobs.csv")
-            if os.path.exists(jobs_file):
-                with open(jobs_file, "r") as f:
-                    jobs_data = f.read()
-
-            # Parse schedule CSV
-            schedule_file = os.path.join(
-                result_create.result_file_path, "out_schedule.csv"
-            )
-            if os.path.exists(schedule_file):
-                with open(schedule_file, "r") as f:
-                    schedule_data = f.read()
-
-                # Compute additional metrics from schedule data
-                f.seek(0)
-                reader = csv.DictReader(f)
-                for row in reader:
-                    computed_metrics = {
-                        "batsim_version": row.get("batsim_version"),
-                        "consumed_joules": float(row.get("consumed_joules", 0)),
-                        "nb_jobs": int(row.get("nb_jobs", 0)),
-                        "nb_jobs_success": int(row.get("nb_jobs_success", 0)),
-                        "nb_jobs_killed": int(row.get("nb_jobs_killed", 0)),
-                        "nb_jobs_rejected": int(row.get("nb_jobs_rejected", 0)),
-                        "success_rate": float(row.get("success_rate", 0)),
-                        "scheduling_time": float(row.get("scheduling_time", 0)),
-                        "time_computing": float(row.get("time_computing", 0)),
-                        "time_idle": float(row.get("time_idle", 0)),
-                        "nb_computing_machines": int(
-                            row.get("nb_computing_machines", 0)
-                        ),
-                    }
-                    break
-        except Exception:
-            pass
-
-    # Create result record
-    result = Result(
-        experiment_id=result_create.experiment_id,
-        simulation_time=result_create.simulation_time,
-        total_jobs=result_create.total_jobs,
-        completed_jobs=result_create.completed_jobs,
-        failed_jobs=result_create.failed_jobs,
-        makespan=result_create.makespan,
-        average_waiting_time=result_create.average_waiting_time,
-        average_turnaround_time=result_create.average_turnaround_time,
-        resource_utilization=result_create.resource_utilization,
-        config=json.dumps(result_create.config) if result_create.config else None,
-        metrics=json.dumps(result_create.metrics) if result_create.metrics else None,
-        logs=result_create.logs,
-        result_file_path=result_create.result_file_path,
-        log_file_path=result_create.log_file_path,
-        jobs_data=jobs_data,
-        schedule_data=schedule_data,
-        computed_metrics=json.dumps(computed_metrics) if computed_metrics else None,
-    )
+            outputs = parse_outputs(result_create.result_file_path)
+        except ResultParseError as e:
+            raise HTTPException(status_code=400, detail=f"Unreadable results: {e}")
+        result = store_result(db, experiment, outputs)
+        if result_create.metrics:
+            result.metrics = json.dumps(result_create.metrics)
+        if result_create.config:
+            result.config = json.dumps(result_create.config)
+        result.log_file_path = result_create.log_file_path
+    else:
+        result = Result(
+            experiment_id=result_create.experiment_id,
+            fingerprint=experiment.fingerprint,
+            simulation_time=result_create.simulation_time,
+            total_jobs=result_create.total_jobs,
+            completed_jobs=result_create.completed_jobs,
+            failed_jobs=result_create.failed_jobs,
+            makespan=result_create.makespan,
+            average_waiting_time=result_create.average_waiting_time,
+            average_turnaround_time=result_create.average_turnaround_time,
+            resource_utilization=result_create.resource_utilization,
+            config=json.dumps(result_create.config) if result_create.config else None,
+            metrics=(
+                json.dumps(result_create.metrics) if result_create.metrics else None
+            ),
+            result_file_path=result_create.result_file_path,
+            log_file_path=result_create.log_file_path,
+        )
     db.add(result)
     db.commit()
     db.refresh(result)
+    if result_create.logs:
+        LogStore.for_result(result.id).append_text(result_create.logs)
     return result
 
 
@@ -295,9 +381,15 @@ def update_result(
     res = db.query(Result).filter(Result.id == result_id).first()
     if res is None:
         raise HTTPException(status_code=404, detail="Result not found")
-    for field, value in result_update.dict(exclude_unset=True).items():
+    updates = result_update.dict(exclude_unset=True)
+    logs = updates.pop("logs", None)
+    for field, value in updates.items():
         setattr(res, field, value)
     db.commit()
+    if logs is not None:
+        store = LogStore.for_result(res.id)
+        store.delete()
+        store.append_text(logs)
     db.refresh(res)
     return res
 
@@ -311,6 +403,12 @@ def delete_result(
     res = db.query(Result).filter(Result.id == result_id).first()
     if res is None:
         raise HTTPException(status_code=404, detail="Result not found")
+    # Experiments finished from the cache lose their link, not their status
+    db.query(Experiment).filter(Experiment.cached_result_id == res.id).update(
+        {Experiment.cached_result_id: None}, synchronize_session=False
+    )
     db.delete(res)
     db.commit()
+    LogStore.for_result(result_id).delete()
+    delete_result_jobs(result_id)
     return {"message": "Result deleted successfully"}
@@ -1,11 +1,20 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    UploadFile,
+    File,
+    Form,
+)
 from sqlalchemy.orm import Session
 import os
 import shutil
 import json
 import ast
-from app.core.database import get_db
+import tempfile
+import threading
+from app.core.database import get_db, SessionLocal
 from app.core.config import settings
 from app.models.user import User
 from app.models.strategy import Strategy
@@ -16,6 +25,16 @@ from app.schemas.strategy import (
     StrategyWithCreator,
 )
 from app.api.auth import get_current_user
+from app.services.dispatcher import dispatcher
+from app.services.experiment_runner import copy_strategy_helpers
+from app.services.storage_manager import StorageQuotaError, storage_manager
+from app.services.strategy_benchmark import (
+    append_history,
+    benchmark_strategy,
+    compare_results,
+    file_sha256,
+    validate_results,
+)
 
 router = APIRouter()
 
@@ -65,6 +84,10 @@ async def create_strategy(
     current_user: User = Depends(get_current_user),
 ):
     ensure_storage_directory()
+    try:
+        storage_manager.check_quota(current_user.id)
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=507, detail=str(e))
     # Check if strategy with same name exists
     existing_strategy = db.query(Strategy).filter(Strategy.name == name).first()
     if existing_strategy:
@@ -285,3 +308,132 @@ def download_strategy(
         "file_path": strategy.file_path,
         "file_name": os.path.basename(strategy.file_path),
     }
+
+
+# Strategies with a benchmark queued or running on the dispatcher
+_running_benchmarks = set()
+_running_benchmarks_lock = threading.Lock()
+
+
+def run_strategy_benchmark(strategy_id: int, file_path: str):
+    try:
+        # Next to the helper modules it imports, as for an experiment
+        with tempfile.TemporaryDirectory(prefix="strategy-benchmark-") as directory:
+            copy_strategy_helpers(directory)
+            staged = os.path.join(directory, os.path.basename(file_path))
+            shutil.copyfile(file_path, staged)
+            results = benchmark_strategy(
+                staged,
+                settings.BENCHMARK_JOB_COUNTS,
+                settings.BENCHMARK_PLATFORM_SIZES,
+                timeout=settings.BENCHMARK_TIMEOUT,
+            )
+        db: Session = SessionLocal()
+        try:
+            strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+            if strategy is not None:
+                strategy.benchmark_results = append_history(
+                    strategy.benchmark_results, results
+                )
+                db.commit()
+        finally:
+            db.close()
+    finally:
+        with _running_benchmarks_lock:
+            _running_benchmarks.discard(strategy_id)
+
+
+@router.get("/{strategy_id}/benchmarks")
+def get_strategy_benchmarks(
+    strategy_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+    if strategy is None:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    runs = json.loads(strategy.benchmark_results) if strategy.benchmark_results else []
+
+    # Compare the latest run with the latest run of a different file version
+    comparison = []
+    if runs:
+        latest = runs[-1]
+        for previous in reversed(runs[:-1]):
+            if previous.get("sha256") != latest.get("sha256"):
+                comparison = compare_results(previous, latest)
+                break
+    return {
+        "strategy_id": strategy.id,
+        "running": strategy.id in _running_benchmarks,
+        "runs": runs,
+        "comparison": comparison,
+    }
+
+
+@router.post("/{strategy_id}/benchmarks")
+async def upload_strategy_benchmark(
+    strategy_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+    if strategy is None:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    if strategy.created_by != current_user.id and current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    try:
+        document = json.loads(await file.read())
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Benchmark results must be JSON")
+
+    # A multi-strategy CLI run holds one entry per strategy file
+    if isinstance(document, dict) and "runs" in document:
+        sha256 = (
+            file_sha256(strategy.file_path)
+            if os.path.exists(strategy.file_path)
+            else None
+        )
+        matches = [run for run in document["runs"] if run.get("sha256") == sha256]
+        if not matches:
+            raise HTTPException(
+                status_code=400, detail="No benchmark run matches this strategy file"
+            )
+        document = matches[0]
+    try:
+        results = validate_results(document)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    strategy.benchmark_results = append_history(strategy.benchmark_results, results)
+    db.commit()
+    return {"message": "Benchmark results attached", "cases": len(results["cases"])}
+
+
+@router.post("/{strategy_id}/benchmarks/run")
+def start_strategy_benchmark(
+    strategy_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+    if strategy is None:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    if strategy.created_by != current_user.id and current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not os.path.exists(strategy.file_path):
+        raise HTTPException(status_code=404, detail="Strategy file not found")
+    with _running_benchmarks_lock:
+        if strategy.id in _running_benchmarks:
+            raise HTTPException(
+                status_code=409, detail="Benchmark already running for this strategy"
+            )
+        _running_benchmarks.add(strategy.id)
+    # Takes an experiment slot for the minutes the suite runs
+    dispatcher.submit_task(
+        f"strategy-benchmark-{strategy.id}",
+        run_strategy_benchmark,
+        strategy.id,
+        strategy.file_path,
+    )
+    return {"message": "Benchmark queued"}
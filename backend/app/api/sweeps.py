@@ -0,0 +1,369 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+import itertools
+import json
+from datetime import datetime
+from app.core.database import get_db
+from app.core.config import settings
+from app.models.user import User
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.result import Result
+from app.models.scenario import Scenario
+from app.models.strategy import Strategy
+from app.models.sweep import Sweep
+from app.schemas.sweep import (
+    Sweep as SweepSchema,
+    SweepCreate,
+    SweepWithCreator,
+)
+from app.api.auth import get_current_user
+from app.services.dispatcher import dispatcher
+from app.services.storage_manager import StorageQuotaError, storage_manager
+from app.services.duration_estimator import duration_estimator
+from app.services.experiment_runner import resource_limits
+from app.services.fingerprint import (
+    cache_stats,
+    fingerprint,
+    input_digests,
+    simulator_versions,
+)
+
+router = APIRouter()
+
+# Keeps IN (...) lists below SQLite's bound parameter limit
+IN_CHUNK_SIZE = 500
+
+
+def expand_grid(sweep_create: SweepCreate) -> List[dict]:
+    """(scenario_id, strategy_id, config) of every run in the sweep"""
+    if sweep_create.runs is not None:
+        return [
+            {
+                "scenario_id": run.scenario_id,
+                "strategy_id": run.strategy_id,
+                "config": run.config or None,
+            }
+            for run in sweep_create.runs
+        ]
+    keys = sorted(sweep_create.parameters)
+    configs = [
+        dict(zip(keys, values))
+        for values in itertools.product(*(sweep_create.parameters[k] for k in keys))
+    ]
+    return [
+        {"scenario_id": scenario_id, "strategy_id": strategy_id, "config": config or None}
+        for scenario_id in sweep_create.scenario_ids
+        for strategy_id in sweep_create.strategy_ids
+        for config in configs
+    ]
+
+
+@router.get("/", response_model=List[SweepWithCreator])
+def get_sweeps(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    sweeps = db.query(Sweep).offset(skip).limit(limit).all()
+    result = []
+    for sweep in sweeps:
+        sweep_dict = SweepWithCreator.from_orm(sweep)
+        if sweep.creator:
+            sweep_dict.creator_username = sweep.creator.username
+        result.append(sweep_dict)
+    return result
+
+
+@router.post("/", response_model=SweepSchema)
+def create_sweep(
+    sweep_create: SweepCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create every experiment of a grid in one transaction"""
+    if db.query(Sweep).filter(Sweep.name == sweep_create.name).first():
+        raise HTTPException(status_code=400, detail="Sweep with this name already exists")
+
+    runs = expand_grid(sweep_create)
+    if not runs:
+        raise HTTPException(status_code=400, detail="Sweep grid is empty")
+    if len(runs) > settings.SWEEP_MAX_EXPERIMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {len(runs)} experiments, the limit is "
+            f"{settings.SWEEP_MAX_EXPERIMENTS}",
+        )
+
+    # Validate all referenced scenarios and strategies with two queries
+    scenario_ids = {run["scenario_id"] for run in runs}
+    strategy_ids = {run["strategy_id"] for run in runs}
+    scenarios = {
+        scenario.id: scenario
+        for scenario in db.query(Scenario).filter(Scenario.id.in_(scenario_ids))
+    }
+    strategies = {
+        strategy.id: strategy
+        for strategy in db.query(Strategy).filter(Strategy.id.in_(strategy_ids))
+    }
+    if set(scenarios) != scenario_ids or set(strategies) != strategy_ids:
+        raise HTTPException(status_code=400, detail="Invalid scenario or strategy")
+    try:
+        for run in runs:
+            resource_limits(run["config"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if sweep_create.submit:
+        try:
+            storage_manager.check_quota(current_user.id)
+        except StorageQuotaError as e:
+            raise HTTPException(status_code=507, detail=str(e))
+
+    # Fingerprint every run; inputs are hashed once per scenario/strategy pair
+    simulator = simulator_versions()
+    digests = {}
+    for run in runs:
+        pair = (run["scenario_id"], run["strategy_id"])
+        if pair not in digests:
+            digests[pair] = input_digests(scenarios[pair[0]], strategies[pair[1]])
+        config = json.dumps(run["config"]) if run["config"] else None
+        run["config"] = config
+        run["fingerprint"] = (
+            fingerprint(digests[pair], config, simulator)
+            if digests[pair] and simulator is not None
+            else None
+        )
+    # One duration estimate per scenario/strategy pair as well
+    estimates = {
+        pair: duration_estimator.estimate(scenarios[pair[0]], pair[1])
+        for pair in digests
+    }
+    cached = {} if sweep_create.force_rerun else cached_results(db, runs)
+    if sweep_create.force_rerun:
+        cache_stats.record(hit=False, forced=True, count=len(runs))
+    else:
+        hits = sum(1 for run in runs if run["fingerprint"] in cached)
+        cache_stats.record(hit=True, count=hits)
+        cache_stats.record(hit=False, count=len(runs) - hits)
+
+    width = len(str(len(runs)))
+    names = [f"{sweep_create.name}-{index:0{width}d}" for index in range(1, len(runs) + 1)]
+    for start in range(0, len(names), IN_CHUNK_SIZE):
+        chunk = names[start : start + IN_CHUNK_SIZE]
+        if db.query(Experiment.id).filter(Experiment.name.in_(chunk)).first():
+            raise HTTPException(
+                status_code=400, detail="Experiment names of this sweep are already taken"
+            )
+
+    sweep = Sweep(
+        name=sweep_create.name,
+        description=sweep_create.description,
+        grid=json.dumps(sweep_create.dict(exclude={"name", "description", "submit"})),
+        nb_experiments=len(runs),
+        created_by=current_user.id,
+    )
+    db.add(sweep)
+    db.flush()
+
+    # One executemany INSERT for the whole grid; queued experiments are
+    # prepared by the dispatcher when they start, cache hits are finished
+    now = datetime.now()
+    status = ExperimentStatus.QUEUED if sweep_create.submit else ExperimentStatus.PENDING
+    rows = []
+    for index, (name, run) in enumerate(zip(names, runs), start=1):
+        row = {
+            "name": name,
+            "description": f"Sweep {sweep_create.name}, run {index}",
+            "scenario_id": run["scenario_id"],
+            "strategy_id": run["strategy_id"],
+            "sweep_id": sweep.id,
+            "status": status,
+            "priority": sweep_create.priority,
+            "queued_at": now if sweep_create.submit else None,
+            "config": run["config"],
+            "fingerprint": run["fingerprint"],
+            "estimated_duration": estimates[(run["scenario_id"], run["strategy_id"])],
+            "cached_result_id": None,
+            "start_time": None,
+            "end_time": None,
+            "total_jobs": None,
+            "completed_jobs": 0,
+            "progress_percentage": 0,
+            "created_by": current_user.id,
+        }
+        hit = cached.get(run["fingerprint"])
+        if hit is not None:
+            row.update(
+                {
+                    "status": ExperimentStatus.COMPLETED,
+                    "queued_at": None,
+                    "cached_result_id": hit.result_id,
+                    "start_time": now,
+                    "end_time": now,
+                    "total_jobs": hit.total_jobs,
+                    "completed_jobs": hit.completed_jobs or 0,
+                    "progress_percentage": 100,
+                }
+            )
+        rows.append(row)
+    db.execute(insert(Experiment), rows)
+    db.commit()
+    db.refresh(sweep)
+    if sweep_create.submit:
+        dispatcher.wake()
+    return sweep
+
+
+def cached_results(db: Session, runs: List[dict]) -> dict:
+    """fingerprint -> latest completed result row, looked up in chunks"""
+    fingerprints = sorted({run["fingerprint"] for run in runs if run["fingerprint"]})
+    cached = {}
+    for start in range(0, len(fingerprints), IN_CHUNK_SIZE):
+        chunk = fingerprints[start : start + IN_CHUNK_SIZE]
+        rows = (
+            db.query(
+                Result.fingerprint,
+                Result.id.label("result_id"),
+                Experiment.total_jobs,
+                Experiment.completed_jobs,
+            )
+            .join(Experiment, Experiment.id == Result.experiment_id)
+            .filter(Result.fingerprint.in_(chunk))
+            .filter(Experiment.status == ExperimentStatus.COMPLETED)
+            .order_by(Result.id)
+        )
+        for row in rows:
+            cached[row.fingerprint] = row
+    return cached
+
+
+@router.post("/{sweep_id}/submit")
+def submit_sweep(
+    sweep_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Queue every PENDING experiment of a sweep"""
+    sweep = db.query(Sweep).filter(Sweep.id == sweep_id).first()
+    if sweep is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    if sweep.created_by != current_user.id and current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    try:
+        storage_manager.check_quota(sweep.created_by)
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    queued = db.execute(
+        update(Experiment)
+        .where(Experiment.sweep_id == sweep.id)
+        .where(Experiment.status == ExperimentStatus.PENDING)
+        .values(status=ExperimentStatus.QUEUED, queued_at=datetime.now())
+    ).rowcount
+    db.commit()
+    dispatcher.wake()
+    return {"message": "Sweep submitted successfully", "queued": queued}
+
+
+@router.get("/{sweep_id}")
+def get_sweep(
+    sweep_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Sweep details, aggregate progress and one result row per experiment"""
+    sweep = db.query(Sweep).filter(Sweep.id == sweep_id).first()
+    if sweep is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    sweep_dict = SweepWithCreator.from_orm(sweep)
+    if sweep.creator:
+        sweep_dict.creator_username = sweep.creator.username
+
+    # Aggregate progress in one GROUP BY
+    by_status = {
+        (status.value if status else "unknown"): count
+        for status, count in db.query(Experiment.status, func.count(Experiment.id))
+        .filter(Experiment.sweep_id == sweep.id)
+        .group_by(Experiment.status)
+    }
+    total = sum(by_status.values())
+    finished = sum(
+        by_status.get(status.value, 0)
+        for status in (
+            ExperimentStatus.COMPLETED,
+            ExperimentStatus.FAILED,
+            ExperimentStatus.CANCELLED,
+        )
+    )
+    mean_progress = (
+        db.query(func.avg(Experiment.progress_percentage))
+        .filter(Experiment.sweep_id == sweep.id)
+        .scalar()
+    )
+
+    # Latest (or reused) result of each experiment, joined in a single query
+    latest = (
+        db.query(Result.experiment_id, func.max(Result.id).label("result_id"))
+        .join(Experiment, Experiment.id == Result.experiment_id)
+        .filter(Experiment.sweep_id == sweep.id)
+        .group_by(Result.experiment_id)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            Experiment.id,
+            Experiment.name,
+            Experiment.status,
+            Experiment.config,
+            Experiment.cached_result_id,
+            Scenario.name.label("scenario_name"),
+            Strategy.name.label("strategy_name"),
+            Result.makespan,
+            Result.average_waiting_time,
+            Result.average_turnaround_time,
+            Result.resource_utilization,
+            Result.completed_jobs,
+            Result.failed_jobs,
+        )
+        .join(Scenario, Scenario.id == Experiment.scenario_id)
+        .join(Strategy, Strategy.id == Experiment.strategy_id)
+        .outerjoin(latest, latest.c.experiment_id == Experiment.id)
+        .outerjoin(
+            Result,
+            Result.id == func.coalesce(Experiment.cached_result_id, latest.c.result_id),
+        )
+        .filter(Experiment.sweep_id == sweep.id)
+        .order_by(Experiment.id)
+        .all()
+    )
+    results = [
+        {
+            "experiment_id": row.id,
+            "experiment_name": row.name,
+            "status": row.status,
+            "scenario_name": row.scenario_name,
+            "strategy_name": row.strategy_name,
+            "config": json.loads(row.config) if row.config else None,
+            "cached_result_id": row.cached_result_id,
+            "makespan": row.makespan,
+            "average_waiting_time": row.average_waiting_time,
+            "average_turnaround_time": row.average_turnaround_time,
+            "resource_utilization": row.resource_utilization,
+            "completed_jobs": row.completed_jobs,
+            "failed_jobs": row.failed_jobs,
+        }
+        for row in rows
+    ]
+
+    return {
+        "sweep": sweep_dict,
+        "progress": {
+            "total": total,
+            "finished": finished,
+            "by_status": by_status,
+            "progress_percentage": round(100 * finished / total) if total else 0,
+            "mean_experiment_progress": float(mean_progress or 0),
+        },
+        "results": results,
+    }
@@ -1,4 +1,14 @@
-from fastapi import APIRouter
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.user import User
+from app.models.worker import Worker
+from app.api.auth import get_current_user
+from app.services.duration_estimator import duration_estimator
+from app.services.fingerprint import cache_stats
+from app.services.storage_manager import storage_manager
 
 router = APIRouter()
 
@@ -6,3 +16,64 @@ router = APIRouter()
 @router.get("/")
 def get_system_status():
     return {"message": "System API - To be implemented"}
+
+
+@router.get("/cache")
+def get_result_cache_stats(current_user: User = Depends(get_current_user)):
+    """Result memoization counters since the server started"""
+    return cache_stats.as_dict()
+
+
+@router.get("/estimator")
+def get_duration_estimator(current_user: User = Depends(get_current_user)):
+    """Training state and feature weights of the duration estimator"""
+    return duration_estimator.as_dict()
+
+
+@router.get("/workers")
+def get_workers(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Worker processes and whether they are still heartbeating"""
+    alive_since = datetime.now() - timedelta(seconds=settings.WORKER_LEASE_SECONDS)
+    return [
+        {
+            "id": worker.id,
+            "hostname": worker.hostname,
+            "pid": worker.pid,
+            "slots": worker.slots,
+            "running": worker.running,
+            "status": worker.status,
+            "started_at": worker.started_at,
+            "heartbeat_at": worker.heartbeat_at,
+            "alive": worker.status != "stopped"
+            and worker.heartbeat_at is not None
+            and worker.heartbeat_at.replace(tzinfo=None) >= alive_since,
+        }
+        for worker in db.query(Worker).order_by(Worker.started_at.desc())
+    ]
+
+
+@router.get("/storage")
+def get_storage_usage(
+    refresh: bool = Query(False, description="Rescan instead of the last scan"),
+    current_user: User = Depends(get_current_user),
+):
+    """Disk usage by kind and user, and what garbage collection would free"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if refresh or storage_manager.scanned_at is None:
+        storage_manager.scan()
+    return storage_manager.report()
+
+
+@router.post("/storage/gc")
+def collect_storage(
+    dry_run: bool = Query(False, description="Only report what would be deleted"),
+    current_user: User = Depends(get_current_user),
+):
+    """Delete orphaned files and raw outputs past retention or quota now"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return storage_manager.collect(dry_run=dry_run)
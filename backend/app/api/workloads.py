@@ -14,6 +14,7 @@ from app.schemas.workload import (
     WorkloadWithCreator,
 )
 from app.api.auth import get_current_user
+from app.services.storage_manager import StorageQuotaError, storage_manager
 import json
 
 router = APIRouter()
@@ -65,6 +66,10 @@ async def create_workload(
     current_user: User = Depends(get_current_user),
 ):
     ensure_storage_directory()
+    try:
+        storage_manager.check_quota(current_user.id)
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=507, detail=str(e))
 
     # Check if workload with same name exists
     existing_workload = db.query(Workload).filter(Workload.name == name).first()
@@ -20,6 +20,100 @@ class Settings(BaseSettings):
     BATSIM_IMAGE: str = "batsim/batsim:latest"
     PYBATSIM_IMAGE: str = "batsim/pybatsim:latest"
 
+    # Experiment execution: "local" subprocesses or "docker" containers.
+    # Commands are templates over {platform}, {workload}, {strategy},
+    # {export_prefix}, {simulation_dir}, {port}, {socket} and {python}; the
+    # docker backend drops the first word and relies on the image entrypoint.
+    EXECUTOR_BACKEND: str = "local"
+    BATSIM_COMMAND: str = (
+        "batsim -p {platform} -w {workload} -e {export_prefix} -s {socket}"
+    )
+    SCHEDULER_COMMAND: str = "pybatsim {strategy} -s {socket}"
+    # Replace BatSim and the scheduler with the in-process replay engine
+    FAKE_BATSIM: bool = False
+    SCHEDULER_EXIT_GRACE: float = 10.0  # seconds
+    # Local executor: idle Python processes kept with these modules already
+    # imported, each taking one run's scheduler (or fake BatSim); 0 is off
+    WARM_POOL_SIZE: int = 0
+    WARM_POOL_PRELOAD: list = ["pybatsim", "app.services.replay"]
+
+    # Log storage (services/log_store.py): segment size before compression,
+    # line checkpoint interval, gzip level and per-request limits
+    LOG_SEGMENT_BYTES: int = 4 * 1024 * 1024
+    LOG_INDEX_INTERVAL: int = 1000
+    LOG_COMPRESSION_LEVEL: int = 6
+    LOG_MAX_LINES: int = 10000
+    LOG_MAX_RANGE_BYTES: int = 1024 * 1024
+
+    # Experiment queue: concurrent runs and the host headroom required to
+    # start one more
+    EXPERIMENT_SLOTS: int = max(1, os.cpu_count() or 1)
+    QUEUE_MAX_CPU_PERCENT: float = 90.0
+    QUEUE_MIN_FREE_MEMORY_MB: int = 512
+    QUEUE_MIN_FREE_DISK_MB: int = 1024
+    QUEUE_DISPATCH_INTERVAL: float = 2.0  # seconds
+    QUEUE_DEFAULT_DURATION: float = 600.0  # seconds, until runs have history
+
+    # Worker processes (python -m app.worker) claim queued experiments
+    # from the shared database under a lease renewed on every heartbeat;
+    # runs whose lease expires are re-queued. With EMBEDDED_WORKER off the
+    # portal only queues and the workers run everything.
+    EMBEDDED_WORKER: bool = True
+    WORKER_SLOTS: int = max(1, os.cpu_count() or 1)
+    WORKER_LEASE_SECONDS: float = 60.0
+    WORKER_HEARTBEAT_INTERVAL: float = 10.0
+
+    # Per-experiment resource limits of both sides together, overridable
+    # by the experiment config: {"limits": {"cpu_seconds": ...,
+    # "memory_mb": ..., "wall_clock_seconds": ...}}. 0 is unlimited; wall
+    # clock excludes pauses.
+    EXPERIMENT_CPU_SECONDS: float = 0.0
+    EXPERIMENT_MEMORY_MB: float = 8192.0
+    EXPERIMENT_WALL_CLOCK_SECONDS: float = 48 * 3600.0
+    EXPERIMENT_LIMIT_CHECK_INTERVAL: float = 1.0
+
+    # Live progress: output tailing period, coalesced DB write period and
+    # SSE keepalive period, in seconds
+    PROGRESS_POLL_INTERVAL: float = 0.5
+    PROGRESS_FLUSH_INTERVAL: float = 1.0
+    PROGRESS_KEEPALIVE_INTERVAL: float = 15.0
+
+    # Bulk status endpoint: ids per request, longest long-poll and how
+    # often a held request re-checks, in seconds
+    STATUS_MAX_IDS: int = 1000
+    STATUS_LONG_POLL_MAX: float = 60.0
+    STATUS_POLL_INTERVAL: float = 1.0
+
+    # Processes parsing the outputs of completed experiments into Results
+    RESULT_PIPELINE_WORKERS: int = 2
+
+    # Upper bound on the experiments one sweep may create
+    SWEEP_MAX_EXPERIMENTS: int = 10000
+
+    # Duration estimator (least squares on completed experiments)
+    ESTIMATOR_MIN_SAMPLES: int = 5  # Estimates start after this many runs
+    ESTIMATOR_HISTORY: int = 1000  # Completed runs read on first use
+    # Seconds between looks for runs completed by other processes
+    ESTIMATOR_REFRESH_INTERVAL: float = 10.0
+    ESTIMATOR_RIDGE: float = 0.1
+    ESTIMATOR_MAX_SECONDS: float = 7 * 24 * 3600.0
+
+    # Storage manager: scans STORAGE_PATH every STORAGE_SCAN_INTERVAL
+    # seconds and, when enabled, deletes orphaned files and raw outputs
+    # past their retention. Quotas of 0 are unlimited.
+    STORAGE_GC_ENABLED: bool = True
+    STORAGE_SCAN_INTERVAL: float = 3600.0
+    STORAGE_RAW_RETENTION_DAYS: float = 14.0  # After the result is ingested
+    STORAGE_FINISHED_RETENTION_DAYS: float = 30.0  # Failed or cancelled runs
+    STORAGE_ORPHAN_GRACE_HOURS: float = 24.0
+    STORAGE_RAW_QUOTA_MB: int = 0  # All simulation directories together
+    STORAGE_USER_QUOTA_MB: int = 0
+
+    # Strategy benchmarks run from the portal (the CLI defaults are larger)
+    BENCHMARK_JOB_COUNTS: list = [10_000]
+    BENCHMARK_PLATFORM_SIZES: list = [288, 10_000]
+    BENCHMARK_TIMEOUT: float = 600.0
+
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:5173"]
 
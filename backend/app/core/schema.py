@@ -0,0 +1,86 @@
+"""
+Schema upgrades for existing databases
+
+create_all() creates missing tables but never alters existing ones, so a
+database created by an older portal lacks the columns added since.
+create_schema() runs create_all() and then adds every model column and
+index the database does not have yet. It is idempotent and runs on every
+startup. Columns are only ever added; those the models dropped are left
+to the migrate_* commands, which move their data out first.
+
+Added columns get the model's scalar default (so NOT NULL columns can be
+added too); defaults that are SQL expressions, foreign keys and unique
+constraints only apply to databases created from scratch.
+"""
+
+from typing import List
+
+from sqlalchemy import inspect, literal, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import Column
+
+from app.core.database import Base
+
+# Registers every model on Base.metadata
+import app.models  # noqa: F401
+
+
+def _default_sql(column: Column, dialect) -> str:
+    """The column's default as a SQL literal, or "" if it has none"""
+    value = None
+    if column.server_default is not None and isinstance(
+        getattr(column.server_default, "arg", None), str
+    ):
+        value = column.server_default.arg
+    elif column.default is not None and column.default.is_scalar:
+        value = column.default.arg
+    if value is None:
+        return ""
+    compiled = literal(value, column.type).compile(
+        dialect=dialect, compile_kwargs={"literal_binds": True}
+    )
+    return str(compiled)
+
+
+def _add_column_sql(table_name: str, column: Column, dialect) -> str:
+    preparer = dialect.identifier_preparer
+    ddl = (
+        f"ALTER TABLE {preparer.quote(table_name)} ADD COLUMN "
+        f"{preparer.quote(column.name)} {column.type.compile(dialect=dialect)}"
+    )
+    default = _default_sql(column, dialect)
+    if default:
+        ddl += f" DEFAULT {default}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+    return ddl
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """Add missing columns and indexes; returns what was added"""
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    conn.execute(text(_add_column_sql(table.name, column, engine.dialect)))
+                    added.append(f"{table.name}.{column.name}")
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+                    added.append(index.name)
+    return added
+
+
+def create_schema(engine: Engine):
+    """Create missing tables, then bring existing ones up to date"""
+    Base.metadata.create_all(bind=engine)
+    added = upgrade_schema(engine)
+    if added:
+        print(f"[INFO] Database schema upgraded: added {', '.join(added)}")
@@ -0,0 +1,80 @@
+"""
+Import existing BatSim outputs into the portal
+
+Walks ROOT for directories holding `<prefix>_schedule.csv` and
+`<prefix>_jobs.csv`, and adds a completed placeholder Experiment and its
+Result for each (see services/result_importer.py). Re-running skips the
+directories already imported, so an interrupted import picks up where it
+stopped.
+
+Usage:
+    python -m app.import_results ROOT [--workers N] [--batch N]
+                                      [--user NAME] [--skip-jobs-data]
+"""
+
+import argparse
+import time
+
+from app.core.database import SessionLocal, engine
+from app.core.schema import create_schema
+from app.models.user import User
+from app.services.result_importer import (
+    BATCH_SIZE,
+    ResultImportError,
+    import_results,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import BatSim output directories")
+    parser.add_argument("root", help="Directory tree to import")
+    parser.add_argument(
+        "--workers", type=int, help="Parsing processes (default: RESULT_PIPELINE_WORKERS)"
+    )
+    parser.add_argument(
+        "--batch", type=int, default=BATCH_SIZE, help="Runs per transaction"
+    )
+    parser.add_argument("--user", help="Owner of the imported experiments")
+    parser.add_argument(
+        "--skip-jobs-data",
+        action="store_true",
+        help="Do not keep the per-job rows as a jobs table",
+    )
+    args = parser.parse_args(argv)
+
+    create_schema(engine)
+    user_id = None
+    if args.user:
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.username == args.user).first()
+        finally:
+            db.close()
+        if user is None:
+            parser.error(f"No user {args.user}")
+        user_id = user.id
+
+    started = time.monotonic()
+
+    def report(progress):
+        print(
+            f"[INFO] {progress.imported} imported, {progress.skipped} skipped, "
+            f"{progress.failed} failed ({time.monotonic() - started:.0f}s)"
+        )
+
+    try:
+        progress = import_results(
+            args.root,
+            user_id=user_id,
+            workers=args.workers,
+            batch_size=max(args.batch, 1),
+            keep_jobs_data=not args.skip_jobs_data,
+            on_batch=report,
+        )
+    except ResultImportError as e:
+        parser.error(str(e))
+    report(progress)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base, SessionLocal
+from app.core.database import engine, SessionLocal
+from app.core.schema import create_schema
 from sqlalchemy.orm import Session
 from app.core.security import get_password_hash
 from app.models.user import UserRole
+from app.services.log_store import LogStore
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables, add columns missing from older databases
+create_schema(engine)
 
 app = FastAPI(
     title="BatSim Web Portal API",
@@ -25,7 +29,17 @@ app.add_middleware(
 )
 
 # Import models to register them with SQLAlchemy
-from app.models import User, Workload, Platform, Scenario, Strategy, Experiment, Result
+from app.models import (
+    User,
+    Workload,
+    Platform,
+    Scenario,
+    Strategy,
+    Experiment,
+    Result,
+    Sweep,
+    Worker,
+)
 
 # Import and include routers
 from app.api import (
@@ -37,6 +51,7 @@ from app.api import (
     experiments,
     results,
     system,
+    sweeps,
 )
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -46,8 +61,27 @@ app.include_router(scenarios.router, prefix="/api/scenarios", tags=["Scenarios"]
 app.include_router(strategies.router, prefix="/api/strategies", tags=["Strategies"])
 app.include_router(experiments.router, prefix="/api/experiments", tags=["Experiments"])
 app.include_router(results.router, prefix="/api/results", tags=["Results"])
+app.include_router(sweeps.router, prefix="/api/sweeps", tags=["Sweeps"])
 app.include_router(system.router, prefix="/api/system", tags=["System"])
 
+# Starts queued experiments in the background
+from app.services.dispatcher import dispatcher
+
+# Fills estimated_duration; trained from past runs in the background
+from app.services.duration_estimator import duration_estimator
+
+# Turns the outputs of completed experiments into Results
+from app.services.result_pipeline import result_pipeline
+
+# Keeps the analytics rollups in step with the results
+from app.services.result_rollups import ensure_built
+
+# Measures and garbage-collects STORAGE_PATH
+from app.services.storage_manager import storage_manager
+
+# Tails running experiments for live progress
+from app.services.progress import monitor as progress_monitor
+
 
 def seed_admin_user():
     db: Session = SessionLocal()
@@ -132,6 +166,7 @@ def seed_demo_data():
         scenarios = db.query(Scenario).all()
         strategies = db.query(Strategy).all()
         if not db.query(Experiment).first() and scenarios and strategies:
+            demo_logs = []
             for i, (sc, st) in enumerate(zip(scenarios, strategies)):
                 exp = Experiment(
                     name=f"Demo Experiment {i+1}",
@@ -142,19 +177,26 @@ def seed_demo_data():
                     batsim_container_id=f"batsim_{i+1}",
                     pybatsim_container_id=f"pybatsim_{i+1}",
                     simulation_dir=f"/storage/experiments/exp_{i+1}",
-                    batsim_logs=f"Batsim started at {i+1}:00:00\nPlatform loaded: {sc.platform.name}\nWorkload loaded: {sc.workload.name}\nSimulation completed successfully.",
-                    pybatsim_logs=f"Pybatsim started at {i+1}:00:05\nStrategy loaded: {st.name}\nScheduler initialized\nAll jobs processed.",
                     total_jobs=100 + i * 10,
                     completed_jobs=100 + i * 10 if i % 2 == 0 else 50 + i * 10,
                     progress_percentage=100 if i % 2 == 0 else 50,
                     created_by=demo_user.id,
                 )
                 db.add(exp)
+                demo_logs.append((exp, sc, st, i))
             db.commit()
+            for exp, sc, st, i in demo_logs:
+                LogStore.for_experiment(exp.id, "batsim").append_text(
+                    f"Batsim started at {i+1}:00:00\nPlatform loaded: {sc.platform.name}\nWorkload loaded: {sc.workload.name}\nSimulation completed successfully."
+                )
+                LogStore.for_experiment(exp.id, "scheduler").append_text(
+                    f"Pybatsim started at {i+1}:00:05\nStrategy loaded: {st.name}\nScheduler initialized\nAll jobs processed."
+                )
 
         # --- Results ---
         experiments = db.query(Experiment).all()
         if not db.query(Result).first() and experiments:
+            demo_results = []
             for i, exp in enumerate(experiments):
                 res = Result(
                     experiment_id=exp.id,
@@ -168,12 +210,14 @@ def seed_demo_data():
                     resource_utilization=0.85 - i * 0.05,
                     config="{}",
                     metrics="{}",
-                    logs="Demo log data...",
                     result_file_path=f"/storage/results/result_{i+1}.json",
                     log_file_path=f"/storage/results/log_{i+1}.txt",
                 )
                 db.add(res)
+                demo_results.append(res)
             db.commit()
+            for res in demo_results:
+                LogStore.for_result(res.id).append_text("Demo log data...")
         print("[INFO] Demo data seeded.")
     finally:
         db.close()
@@ -182,6 +226,62 @@ def seed_demo_data():
 seed_admin_user()
 
 
+@app.on_event("startup")
+def start_experiment_dispatcher():
+    # Without the embedded worker, app.worker processes run the queue; the
+    # dispatcher still finishes the runs the embedded worker started
+    # before, and runs the portal's tasks
+    dispatcher.start(experiments=settings.EMBEDDED_WORKER)
+
+
+@app.on_event("startup")
+def train_duration_estimator():
+    threading.Thread(
+        target=duration_estimator.ensure_trained, name="duration-estimator", daemon=True
+    ).start()
+
+
+@app.on_event("shutdown")
+def stop_experiment_dispatcher():
+    dispatcher.shutdown()
+
+
+@app.on_event("startup")
+def build_result_rollups():
+    # Databases whose results predate the rollups get them built once
+    ensure_built(engine)
+
+
+@app.on_event("startup")
+def start_result_pipeline():
+    result_pipeline.start()
+
+
+@app.on_event("shutdown")
+def stop_result_pipeline():
+    result_pipeline.shutdown()
+
+
+@app.on_event("startup")
+def start_storage_manager():
+    storage_manager.start()
+
+
+@app.on_event("shutdown")
+def stop_storage_manager():
+    storage_manager.shutdown()
+
+
+@app.on_event("startup")
+async def start_progress_monitor():
+    progress_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_progress_monitor():
+    await progress_monitor.shutdown()
+
+
 @app.get("/")
 async def root():
     return {
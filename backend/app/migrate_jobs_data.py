@@ -0,0 +1,134 @@
+"""
+Move per-job result data out of the database
+
+Converts results.jobs_data (out_jobs.csv as text) into each result's
+columnar jobs table, keeps the summary row of results.schedule_data as
+computed_metrics["schedule"], then drops both columns (and VACUUMs
+SQLite so the file actually shrinks). Safe to re-run: rows are cleared
+as they are converted, and missing columns are skipped. Rows that fail
+to convert keep their data, and the columns are then kept for a retry.
+
+Usage:
+    python -m app.migrate_jobs_data [--keep-columns] [--no-vacuum]
+"""
+
+import argparse
+import csv
+import io
+import json
+from typing import Tuple
+
+from sqlalchemy import bindparam, inspect, text
+
+from app.core.database import engine
+from app.services.job_store import JobTable, result_jobs_path
+
+COLUMNS = ("jobs_data", "schedule_data")
+BATCH_SIZE = 100
+
+
+def _schedule(computed_metrics, schedule_data):
+    """computed_metrics with the schedule summary row added"""
+    computed = json.loads(computed_metrics) if computed_metrics else {}
+    row = next(csv.DictReader(io.StringIO(schedule_data, newline="")), None)
+    if row is not None:
+        computed.setdefault("schedule", row)
+    return json.dumps(computed)
+
+
+def migrate_results(columns) -> Tuple[int, int]:
+    """
+    Convert the results' CSV columns in batches; returns the rows moved
+    and the rows left in place because they could not be converted
+    """
+    moved = failed = 0
+    last_id = 0
+    selected = ", ".join(columns)
+    pending = " OR ".join(f"{column} IS NOT NULL" for column in columns)
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    f"SELECT id, computed_metrics, {selected} FROM results "
+                    f"WHERE id > :last_id AND ({pending}) "
+                    f"ORDER BY id LIMIT :limit"
+                ),
+                {"last_id": last_id, "limit": BATCH_SIZE},
+            ).mappings().all()
+            if not rows:
+                return moved, failed
+            converted = []
+            for row in rows:
+                try:
+                    if row.get("jobs_data"):
+                        stream = io.StringIO(row["jobs_data"], newline="")
+                        JobTable.from_csv(stream).save(result_jobs_path(row["id"]))
+                    if row.get("schedule_data"):
+                        conn.execute(
+                            text(
+                                "UPDATE results SET computed_metrics = :computed "
+                                "WHERE id = :id"
+                            ),
+                            {
+                                "id": row["id"],
+                                "computed": _schedule(
+                                    row["computed_metrics"], row["schedule_data"]
+                                ),
+                            },
+                        )
+                    converted.append(row["id"])
+                except ValueError as e:
+                    print(f"[WARN] Result {row['id']}: not converted, left as is ({e})")
+                    failed += 1
+            if converted:
+                conn.execute(
+                    text(
+                        f"UPDATE results SET "
+                        f"{', '.join(f'{column} = NULL' for column in columns)} "
+                        f"WHERE id IN :ids"
+                    ).bindparams(bindparam("ids", expanding=True)),
+                    {"ids": converted},
+                )
+            moved += len(converted)
+            last_id = rows[-1]["id"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move per-job data into files")
+    parser.add_argument(
+        "--keep-columns", action="store_true", help="Do not drop the columns"
+    )
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip SQLite VACUUM")
+    args = parser.parse_args(argv)
+
+    inspector = inspect(engine)
+    if "results" not in inspector.get_table_names():
+        return
+    present = {c["name"] for c in inspector.get_columns("results")}
+    columns = [column for column in COLUMNS if column in present]
+    if not columns:
+        print("[INFO] results.jobs_data and schedule_data already migrated")
+        return
+    moved, failed = migrate_results(columns)
+    print(f"[INFO] Converted the CSV data of {moved} results")
+    if failed:
+        print(
+            f"[WARN] {failed} results could not be converted; keeping the "
+            f"columns so a later run can retry them"
+        )
+        return
+    if args.keep_columns:
+        return
+    with engine.begin() as conn:
+        for column in columns:
+            conn.execute(text(f"ALTER TABLE results DROP COLUMN {column}"))
+            print(f"[INFO] Dropped results.{column}")
+
+    if engine.dialect.name == "sqlite" and not args.no_vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        print("[INFO] Database vacuumed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Move logs out of the database
+
+Copies experiments.batsim_logs / pybatsim_logs and results.logs into the
+compressed log store, then drops the columns (and VACUUMs SQLite so the
+file actually shrinks). Safe to re-run: rows are cleared as they are
+copied, and missing columns are skipped.
+
+Usage:
+    python -m app.migrate_logs [--keep-columns] [--no-vacuum]
+"""
+
+import argparse
+
+from sqlalchemy import bindparam, inspect, text
+
+from app.core.database import engine
+from app.services.log_store import LogStore
+
+# (table, column, store for a row id)
+LOG_COLUMNS = (
+    ("experiments", "batsim_logs", lambda id: LogStore.for_experiment(id, "batsim")),
+    (
+        "experiments",
+        "pybatsim_logs",
+        lambda id: LogStore.for_experiment(id, "scheduler"),
+    ),
+    ("results", "logs", LogStore.for_result),
+)
+
+BATCH_SIZE = 100
+
+
+def migrate_column(table: str, column: str, store_for) -> int:
+    """Copy one column into the log store in batches; returns rows moved"""
+    moved = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    f"SELECT id, {column} FROM {table} "
+                    f"WHERE id > :last_id AND {column} IS NOT NULL "
+                    f"ORDER BY id LIMIT :limit"
+                ),
+                {"last_id": last_id, "limit": BATCH_SIZE},
+            ).all()
+            if not rows:
+                return moved
+            for row_id, log in rows:
+                if log:
+                    # The column stays the source of truth until it is
+                    # cleared, so an interrupted run starts the log over
+                    store = store_for(row_id)
+                    store.delete()
+                    store.append_text(log)
+                    moved += 1
+            conn.execute(
+                text(f"UPDATE {table} SET {column} = NULL WHERE id IN :ids").bindparams(
+                    bindparam("ids", expanding=True)
+                ),
+                {"ids": [row[0] for row in rows]},
+            )
+            last_id = rows[-1][0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move logs into the log store")
+    parser.add_argument(
+        "--keep-columns", action="store_true", help="Do not drop the columns"
+    )
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip SQLite VACUUM")
+    args = parser.parse_args(argv)
+
+    inspector = inspect(engine)
+    dropped = False
+    for table, column, store_for in LOG_COLUMNS:
+        if table not in inspector.get_table_names():
+            continue
+        if column not in {c["name"] for c in inspector.get_columns(table)}:
+            print(f"[INFO] {table}.{column} already migrated")
+            continue
+        moved = migrate_column(table, column, store_for)
+        print(f"[INFO] {table}.{column}: moved {moved} logs")
+        if not args.keep_columns:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+            dropped = True
+            print(f"[INFO] Dropped {table}.{column}")
+
+    if dropped and engine.dialect.name == "sqlite" and not args.no_vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        print("[INFO] Database vacuumed")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ from .scenario import Scenario
 from .strategy import Strategy
 from .experiment import Experiment, ExperimentStatus
 from .result import Result
+from .result_rollup import ResultRollup
+from .sweep import Sweep
+from .worker import Worker
 
 # Import all models to ensure they are registered with SQLAlchemy
 __all__ = [
@@ -17,4 +20,7 @@ __all__ = [
     "Experiment",
     "ExperimentStatus",
     "Result",
+    "ResultRollup",
+    "Sweep",
+    "Worker",
 ]
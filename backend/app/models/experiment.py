@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    String,
+    Text,
+    DateTime,
+    ForeignKey,
+    Enum,
+    literal_column,
+)
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -7,6 +17,7 @@ import enum
 
 class ExperimentStatus(str, enum.Enum):
     PENDING = "pending"
+    QUEUED = "queued"
     RUNNING = "running"
     PAUSED = "paused"
     COMPLETED = "completed"
@@ -22,16 +33,38 @@ class Experiment(Base):
     description = Column(Text)
     scenario_id = Column(Integer, ForeignKey("scenarios.id"), nullable=False)
     strategy_id = Column(Integer, ForeignKey("strategies.id"), nullable=False)
-    status = Column(Enum(ExperimentStatus), default=ExperimentStatus.PENDING)
+    sweep_id = Column(Integer, ForeignKey("sweeps.id"), nullable=True, index=True)
+    status = Column(
+        Enum(ExperimentStatus), default=ExperimentStatus.PENDING, index=True
+    )
+
+    # Queueing
+    priority = Column(Integer, default=0)  # Higher runs first
+    queued_at = Column(DateTime(timezone=True))
+    # Set when a worker process runs it; re-queued once the lease expires
+    worker_id = Column(String, index=True)
+    lease_expires_at = Column(DateTime(timezone=True), index=True)
 
     # Container information
     batsim_container_id = Column(String)
     pybatsim_container_id = Column(String)
+    batsim_exit_code = Column(Integer)
+    pybatsim_exit_code = Column(Integer)
+    # Set when a resource limit killed the run (cpu_time_limit,
+    # memory_limit or wall_clock_limit)
+    failure_reason = Column(String)
+
+    # Resource usage of both sides together, sampled while running
+    peak_memory_mb = Column(Float)
+    cpu_time_seconds = Column(Float)
 
     # Timing
     start_time = Column(DateTime(timezone=True))
     end_time = Column(DateTime(timezone=True))
     estimated_duration = Column(Integer)  # in seconds
+    # Pauses are not run time: end_time - start_time - paused_seconds
+    paused_at = Column(DateTime(timezone=True))  # Set while paused
+    paused_seconds = Column(Float, default=0)
 
     # Progress tracking
     total_jobs = Column(Integer)
@@ -42,15 +75,33 @@ class Experiment(Base):
     config = Column(Text)  # JSON string of experiment configuration
     # Execution details
     simulation_dir = Column(String)  # Directory where simulation files are stored
-    batsim_logs = Column(Text)  # Batsim execution logs
-    pybatsim_logs = Column(Text)  # Pybatsim execution logs
+    # Content hash of the inputs; an experiment finished from the result
+    # cache links to the result it reused
+    fingerprint = Column(String, index=True)
+    cached_result_id = Column(
+        Integer,
+        ForeignKey("results.id", use_alter=True, name="fk_experiments_cached_result"),
+        nullable=True,
+    )
 
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Incremented by every UPDATE that does not set it, ORM or Core; the
+    # bulk status ETag is derived from it
+    revision = Column(
+        Integer, default=0, nullable=False, onupdate=literal_column("revision") + 1
+    )
 
     # Relationships
     scenario = relationship("Scenario", back_populates="experiments")
     strategy = relationship("Strategy", back_populates="experiments")
     creator = relationship("User", back_populates="experiments")
-    results = relationship("Result", back_populates="experiment")
+    results = relationship(
+        "Result",
+        back_populates="experiment",
+        foreign_keys="Result.experiment_id",
+        cascade="all, delete-orphan",
+    )
+    cached_result = relationship("Result", foreign_keys=[cached_result_id])
+    sweep = relationship("Sweep", back_populates="experiments")
@@ -8,7 +8,11 @@ class Result(Base):
     __tablename__ = "results"
 
     id = Column(Integer, primary_key=True, index=True)
-    experiment_id = Column(Integer, ForeignKey("experiments.id"), nullable=False)
+    experiment_id = Column(
+        Integer, ForeignKey("experiments.id"), nullable=False, index=True
+    )
+    # Fingerprint of the experiment that produced it, see services/fingerprint.py
+    fingerprint = Column(String, index=True)
 
     # Simulation metrics
     simulation_time = Column(Float)  # Total simulation time in seconds
@@ -25,20 +29,23 @@ class Result(Base):
     # Detailed results
     config = Column(Text)  # JSON string of experiment configuration
     metrics = Column(Text)  # JSON string of detailed metrics
-    logs = Column(Text)  # Simulation logs
 
     # File paths
     result_file_path = Column(String)  # Path to result files
     log_file_path = Column(String)  # Path to log files
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
-    # Parsed result data
-    jobs_data = Column(Text, nullable=True)  # Store as CSV string
-    schedule_data = Column(Text, nullable=True)  # Store as CSV string
+    # Parsed result data; the per-job rows are a columnar file, see
+    # services/job_store.py
     computed_metrics = Column(
         Text, nullable=True
     )  # Store as JSON string with computed metrics
+    callback_stats = Column(
+        Text, nullable=True
+    )  # Store as JSON string with scheduler callback latency histograms
 
     # Relationships
-    experiment = relationship("Experiment", back_populates="results")
+    experiment = relationship(
+        "Experiment", back_populates="results", foreign_keys=[experiment_id]
+    )
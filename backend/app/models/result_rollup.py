@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Float, Integer, String, UniqueConstraint
+from app.core.database import Base
+
+# Result columns rolled up as count of non-NULL values, sum and sum of squares
+ROLLUP_METRICS = (
+    "makespan",
+    "average_waiting_time",
+    "average_turnaround_time",
+    "resource_utilization",
+)
+# Result columns rolled up as plain sums
+ROLLUP_SUMS = ("total_jobs", "completed_jobs", "failed_jobs")
+
+
+class ResultRollup(Base):
+    """
+    Results of one day, strategy and scenario, summed. Maintained with the
+    results by services/result_rollups.py; analytics read these rows.
+    """
+
+    __tablename__ = "result_rollups"
+    __table_args__ = (UniqueConstraint("day", "strategy_id", "scenario_id"),)
+
+    id = Column(Integer, primary_key=True)
+    day = Column(String(10), nullable=False, index=True)  # YYYY-MM-DD
+    strategy_id = Column(Integer, nullable=False, index=True)
+    scenario_id = Column(Integer, nullable=False, index=True)
+    results = Column(Integer, nullable=False, default=0)
+
+    makespan_count = Column(Integer, nullable=False, default=0)
+    makespan_sum = Column(Float, nullable=False, default=0)
+    makespan_sumsq = Column(Float, nullable=False, default=0)
+    average_waiting_time_count = Column(Integer, nullable=False, default=0)
+    average_waiting_time_sum = Column(Float, nullable=False, default=0)
+    average_waiting_time_sumsq = Column(Float, nullable=False, default=0)
+    average_turnaround_time_count = Column(Integer, nullable=False, default=0)
+    average_turnaround_time_sum = Column(Float, nullable=False, default=0)
+    average_turnaround_time_sumsq = Column(Float, nullable=False, default=0)
+    resource_utilization_count = Column(Integer, nullable=False, default=0)
+    resource_utilization_sum = Column(Float, nullable=False, default=0)
+    resource_utilization_sumsq = Column(Float, nullable=False, default=0)
+
+    total_jobs = Column(Integer, nullable=False, default=0)
+    completed_jobs = Column(Integer, nullable=False, default=0)
+    failed_jobs = Column(Integer, nullable=False, default=0)
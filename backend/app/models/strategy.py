@@ -20,6 +20,8 @@ class Strategy(Base):
     nb_files = Column(Integer, nullable=True)
     main_entry = Column(String, nullable=True)  # Main entry point file
     strategy_files = Column(Text, nullable=True)  # Store as JSON string
+    # Throughput benchmark runs, newest last, keyed by file sha256
+    benchmark_results = Column(Text, nullable=True)  # Store as JSON string
 
     # Relationships
     creator = relationship("User", back_populates="strategies")
@@ -28,3 +28,4 @@ class User(Base):
     scenarios = relationship("Scenario", back_populates="creator")
     strategies = relationship("Strategy", back_populates="creator")
     experiments = relationship("Experiment", back_populates="creator")
+    sweeps = relationship("Sweep", back_populates="creator")
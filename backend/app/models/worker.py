@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Worker(Base):
+    """A worker process (python -m app.worker) running experiments"""
+
+    __tablename__ = "workers"
+
+    id = Column(String, primary_key=True)  # hostname-pid unless named
+    hostname = Column(String)
+    pid = Column(Integer)
+    slots = Column(Integer, default=1)
+    running = Column(Integer, default=0)
+    status = Column(String, default="active")  # active, draining, stopped
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    heartbeat_at = Column(DateTime(timezone=True))
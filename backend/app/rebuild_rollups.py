@@ -0,0 +1,33 @@
+"""
+Rebuild the analytics rollups
+
+Recomputes result_rollups from the results table in one transaction.
+The portal keeps the rollups current for changes made through it; run
+this after writing results some other way (bulk SQL inserts, restoring
+a backup, manual fixes).
+
+Usage:
+    python -m app.rebuild_rollups
+"""
+
+import argparse
+import time
+
+from app.core.database import engine
+from app.core.schema import create_schema
+from app.services.result_rollups import rebuild
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Rebuild the analytics rollups").parse_args(
+        argv
+    )
+    create_schema(engine)
+    started = time.monotonic()
+    with engine.begin() as conn:
+        rows = rebuild(conn)
+    print(f"[INFO] Rebuilt {rows} rollup rows in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,14 @@ from .experiment import (
     ExperimentWithDetails,
     ExperimentStatusUpdate,
 )
-from .result import Result, ResultCreate, ResultUpdate, ResultWithExperiment
+from .result import (
+    Result,
+    ResultCreate,
+    ResultImport,
+    ResultUpdate,
+    ResultWithExperiment,
+)
+from .sweep import Sweep, SweepCreate, SweepRun, SweepWithCreator
 
 __all__ = [
     "User",
@@ -41,6 +48,11 @@ __all__ = [
     "ExperimentStatusUpdate",
     "Result",
     "ResultCreate",
+    "ResultImport",
     "ResultUpdate",
     "ResultWithExperiment",
+    "Sweep",
+    "SweepCreate",
+    "SweepRun",
+    "SweepWithCreator",
 ]
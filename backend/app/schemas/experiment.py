@@ -13,6 +13,7 @@ class ExperimentBase(BaseModel):
 
 class ExperimentCreate(ExperimentBase):
     config: Optional[Dict[str, Any]] = None
+    priority: int = 0
 
 
 class ExperimentUpdate(BaseModel):
@@ -20,26 +21,40 @@ class ExperimentUpdate(BaseModel):
     description: Optional[str] = None
     status: Optional[ExperimentStatus] = None
     config: Optional[Dict[str, Any]] = None
+    priority: Optional[int] = None
 
 
 class ExperimentInDB(ExperimentBase):
     id: int
     status: ExperimentStatus
+    sweep_id: Optional[int] = None
+    priority: int = 0
+    queued_at: Optional[datetime] = None
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
     batsim_container_id: Optional[str] = None
     pybatsim_container_id: Optional[str] = None
+    batsim_exit_code: Optional[int] = None
+    pybatsim_exit_code: Optional[int] = None
+    failure_reason: Optional[str] = None
+    peak_memory_mb: Optional[float] = None
+    cpu_time_seconds: Optional[float] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     estimated_duration: Optional[int] = None
+    paused_at: Optional[datetime] = None
+    paused_seconds: Optional[float] = None
     total_jobs: Optional[int] = None
     completed_jobs: int = 0
     progress_percentage: int = 0
     config: Optional[str] = None
     simulation_dir: Optional[str] = None
-    batsim_logs: Optional[str] = None
-    pybatsim_logs: Optional[str] = None
+    fingerprint: Optional[str] = None
+    cached_result_id: Optional[int] = None
     created_by: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    revision: int = 0
 
     class Config:
         from_attributes = True
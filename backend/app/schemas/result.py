@@ -23,6 +23,10 @@ class ResultCreate(ResultBase):
     log_file_path: Optional[str] = None
 
 
+class ResultImport(BaseModel):
+    path: str  # Directory tree on the server
+
+
 class ResultUpdate(BaseModel):
     simulation_time: Optional[float] = None
     total_jobs: Optional[int] = None
@@ -41,6 +45,7 @@ class ResultUpdate(BaseModel):
 
 class ResultInDB(ResultBase):
     id: int
+    fingerprint: Optional[str] = None
     simulation_time: Optional[float] = None
     total_jobs: Optional[int] = None
     completed_jobs: Optional[int] = None
@@ -51,13 +56,11 @@ class ResultInDB(ResultBase):
     resource_utilization: Optional[float] = None
     config: Optional[str] = None
     metrics: Optional[str] = None
-    logs: Optional[str] = None
     result_file_path: Optional[str] = None
     log_file_path: Optional[str] = None
     created_at: datetime
-    jobs_data: Optional[str] = None
-    schedule_data: Optional[str] = None
     computed_metrics: Optional[str] = None
+    callback_stats: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+
+
+class SweepRun(BaseModel):
+    scenario_id: int
+    strategy_id: int
+    config: Optional[Dict[str, Any]] = None
+
+
+class SweepBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+
+class SweepCreate(SweepBase):
+    # Cartesian grid: every scenario x strategy x combination of parameters
+    scenario_ids: List[int] = []
+    strategy_ids: List[int] = []
+    parameters: Dict[str, List[Any]] = {}
+    # Explicit grid, used instead of the cartesian one when given
+    runs: Optional[List[SweepRun]] = None
+    priority: int = 0
+    submit: bool = True
+    # Run every experiment even if an identical one already has a result
+    force_rerun: bool = False
+
+
+class SweepInDB(SweepBase):
+    id: int
+    grid: Optional[str] = None
+    nb_experiments: int = 0
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class Sweep(SweepInDB):
+    pass
+
+
+class SweepWithCreator(Sweep):
+    creator_username: Optional[str] = None
@@ -10,6 +10,7 @@ from app.models import (
     Result,
     UserRole,
 )
+from app.services.log_store import LogStore
 from sqlalchemy.orm import Session
 
 
@@ -92,6 +93,7 @@ def seed_demo_data():
         scenarios = db.query(Scenario).all()
         strategies = db.query(Strategy).all()
         if not db.query(Experiment).first() and scenarios and strategies:
+            demo_logs = []
             for i, (sc, st) in enumerate(zip(scenarios, strategies)):
                 exp = Experiment(
                     name=f"Demo Experiment {i+1}",
@@ -102,19 +104,26 @@ def seed_demo_data():
                     batsim_container_id=f"batsim_{i+1}",
                     pybatsim_container_id=f"pybatsim_{i+1}",
                     simulation_dir=f"/storage/experiments/exp_{i+1}",
-                    batsim_logs=f"Batsim started at {i+1}:00:00\nPlatform loaded: {sc.platform.name}\nWorkload loaded: {sc.workload.name}\nSimulation completed successfully.",
-                    pybatsim_logs=f"Pybatsim started at {i+1}:00:05\nStrategy loaded: {st.name}\nScheduler initialized\nAll jobs processed.",
                     total_jobs=100 + i * 10,
                     completed_jobs=100 + i * 10 if i % 2 == 0 else 50 + i * 10,
                     progress_percentage=100 if i % 2 == 0 else 50,
                     created_by=demo_user.id,
                 )
                 db.add(exp)
+                demo_logs.append((exp, sc, st, i))
             db.commit()
+            for exp, sc, st, i in demo_logs:
+                LogStore.for_experiment(exp.id, "batsim").append_text(
+                    f"Batsim started at {i+1}:00:00\nPlatform loaded: {sc.platform.name}\nWorkload loaded: {sc.workload.name}\nSimulation completed successfully."
+                )
+                LogStore.for_experiment(exp.id, "scheduler").append_text(
+                    f"Pybatsim started at {i+1}:00:05\nStrategy loaded: {st.name}\nScheduler initialized\nAll jobs processed."
+                )
 
         # --- Results ---
         experiments = db.query(Experiment).all()
         if not db.query(Result).first() and experiments:
+            demo_results = []
             for i, exp in enumerate(experiments):
                 res = Result(
                     experiment_id=exp.id,
@@ -128,12 +137,14 @@ def seed_demo_data():
                     resource_utilization=0.85 - i * 0.05,
                     config="{}",
                     metrics="{}",
-                    logs="Demo log data...",
                     result_file_path=f"/storage/results/result_{i+1}.json",
                     log_file_path=f"/storage/results/log_{i+1}.txt",
                 )
                 db.add(res)
+                demo_results.append(res)
             db.commit()
+            for res in demo_results:
+                LogStore.for_result(res.id).append_text("Demo log data...")
         print("[INFO] Demo data seeded.")
     finally:
         db.close()
@@ -0,0 +1,519 @@
+"""
+Resource-aware experiment queue
+
+Started experiments go to the QUEUED status; the queue itself is the
+experiments table (status, priority, queued_at), so it survives restarts.
+A dispatcher thread starts queued experiments while a slot is free and
+the host has CPU, memory and disk headroom.
+
+Dispatch order: higher priority first; within a priority level, users
+(`created_by`) are served round-robin and each user's experiments in
+FIFO order, so one user queueing hundreds of runs cannot starve others.
+
+Worker processes (app/worker.py) run the same dispatcher against the
+shared database. Their claims carry a lease, and every dispatcher puts
+experiments whose lease expired back in the queue.
+
+Runs outlive the process that started them: on startup the dispatcher
+re-attaches to its experiments still RUNNING or PAUSED before it starts
+anything new.
+
+Long portal-side jobs (strategy benchmark suites) are submitted as
+tasks: they wait in memory, in FIFO order and ahead of queued
+experiments, and hold an experiment slot while they run.
+"""
+
+import heapq
+import math
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import psutil
+from sqlalchemy import func, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.worker import Worker
+from app.services.duration_estimator import refine_remaining
+from app.services.executors import ExecutionHandle, ExecutorError, get_executor
+from app.services.experiment_runner import (
+    REQUEUED_VALUES,
+    execution_spec_for,
+    log_error,
+    prepare_simulation,
+    requeue,
+    resource_limits,
+    run_seconds,
+    supervisor,
+)
+
+# (experiment id, user id, priority) in queued_at order
+QueueEntry = Tuple[int, Optional[int], int]
+
+# Completed runs used to estimate durations when an experiment has none
+DURATION_SAMPLE_SIZE = 50
+
+
+@dataclass(eq=False)
+class DispatcherTask:
+    """A portal-side job run in a thread while it holds a slot"""
+
+    name: str
+    target: Callable
+    args: tuple = field(default_factory=tuple)
+
+
+def fair_share_order(
+    entries: Sequence[QueueEntry], last_user: Optional[int] = None
+) -> List[int]:
+    """
+    Experiment ids in dispatch order
+
+    `entries` must be sorted by queued_at. Users are visited in order of
+    their oldest queued experiment, starting just after `last_user`, the
+    user served by the previous dispatch.
+    """
+    by_priority: Dict[int, "OrderedDict[Optional[int], List[int]]"] = {}
+    for experiment_id, user_id, priority in entries:
+        users = by_priority.setdefault(priority or 0, OrderedDict())
+        users.setdefault(user_id, []).append(experiment_id)
+
+    order = []
+    for priority in sorted(by_priority, reverse=True):
+        users = list(by_priority[priority].items())
+        ids = [user_id for user_id, _ in users]
+        if last_user in ids:
+            # Rotate so the user after the last one served goes first
+            start = ids.index(last_user) + 1
+            users = users[start:] + users[:start]
+        queues = [iter(queue) for _, queue in users]
+        while queues:
+            remaining = []
+            for queue in queues:
+                experiment_id = next(queue, None)
+                if experiment_id is not None:
+                    order.append(experiment_id)
+                    remaining.append(queue)
+            queues = remaining
+    return order
+
+
+def host_headroom() -> Tuple[bool, str]:
+    """Whether the host can take one more experiment, and why not"""
+    cpu = psutil.cpu_percent(interval=None)
+    if cpu >= settings.QUEUE_MAX_CPU_PERCENT:
+        return False, f"CPU at {cpu:.0f}%"
+    memory = psutil.virtual_memory()
+    if memory.available < settings.QUEUE_MIN_FREE_MEMORY_MB * 1024 * 1024:
+        return False, f"{memory.available // (1024 * 1024)} MB memory free"
+    storage = settings.STORAGE_PATH if os.path.exists(settings.STORAGE_PATH) else "."
+    disk = psutil.disk_usage(storage)
+    if disk.free < settings.QUEUE_MIN_FREE_DISK_MB * 1024 * 1024:
+        return False, f"{disk.free // (1024 * 1024)} MB disk free"
+    return True, ""
+
+
+def requeue_expired_leases(db) -> List[int]:
+    """Put the runs of workers that stopped heartbeating back in the queue"""
+    now = datetime.now()
+    leased = (ExperimentStatus.RUNNING, ExperimentStatus.PAUSED)
+    workers = {
+        row.id: row.worker_id
+        for row in db.query(Experiment.id, Experiment.worker_id).filter(
+            Experiment.status.in_(leased),
+            Experiment.lease_expires_at < now,
+        )
+    }
+    if not workers:
+        return []
+    # One conditional UPDATE, like the claim: a heartbeat renewing a lease
+    # meanwhile keeps its run, which is then not in the returned ids
+    requeued = [
+        row.id
+        for row in db.execute(
+            update(Experiment)
+            .where(Experiment.id.in_(list(workers)))
+            .where(Experiment.status.in_(leased))
+            .where(Experiment.lease_expires_at < now)
+            .values(**REQUEUED_VALUES)
+            .returning(Experiment.id)
+            .execution_options(synchronize_session=False)
+        )
+    ]
+    db.commit()
+    for experiment_id in requeued:
+        log_error(
+            experiment_id,
+            f"Lease of worker {workers[experiment_id]} expired; re-queued",
+        )
+    return requeued
+
+
+def reconcile_in_flight(db, worker_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Take over the running and paused experiments a previous process of
+    this portal (worker_id None) or worker left behind. Live runs are
+    re-attached, runs that ended meanwhile are finalized from their
+    outputs, and runs that never recorded their processes are re-queued.
+    """
+    rows = (
+        db.query(Experiment)
+        .filter(Experiment.status.in_((ExperimentStatus.RUNNING, ExperimentStatus.PAUSED)))
+        .filter(
+            Experiment.worker_id.is_(None)
+            if worker_id is None
+            else Experiment.worker_id == worker_id
+        )
+        .order_by(Experiment.id)
+        .all()
+    )
+    counts = {"adopted": 0, "requeued": 0}
+    for exp in rows:
+        if supervisor.is_running(exp.id):
+            continue
+        if worker_id is not None:
+            # Renew the lease first, unless another dispatcher re-queued it
+            renewed = db.execute(
+                update(Experiment)
+                .where(Experiment.id == exp.id)
+                .where(Experiment.worker_id == worker_id)
+                .where(Experiment.status == exp.status)
+                .values(
+                    lease_expires_at=datetime.now()
+                    + timedelta(seconds=settings.WORKER_LEASE_SECONDS),
+                    revision=Experiment.revision,
+                )
+            ).rowcount
+            db.commit()
+            if not renewed:
+                continue
+        if not exp.batsim_container_id or not exp.simulation_dir:
+            # Interrupted while launching
+            requeue(exp)
+            db.commit()
+            log_error(exp.id, "Interrupted while starting; re-queued")
+            counts["requeued"] += 1
+            continue
+        handle = ExecutionHandle(
+            experiment_id=exp.id,
+            batsim_id=exp.batsim_container_id,
+            scheduler_id=exp.pybatsim_container_id,
+        )
+        try:
+            limits = resource_limits(exp.config)
+        except ValueError:
+            limits = resource_limits(None)
+        # Local handles are PIDs, docker ones container ids
+        executor = get_executor("local" if handle.batsim_id.isdigit() else "docker")
+        supervisor.adopt(
+            execution_spec_for(exp.id, exp.simulation_dir, limits),
+            executor,
+            handle,
+            paused=exp.status == ExperimentStatus.PAUSED,
+            run_seconds=run_seconds(exp) or 0.0,
+        )
+        counts["adopted"] += 1
+    return counts
+
+
+def cluster_slots(db) -> int:
+    """Experiment slots of the portal and of every live worker"""
+    slots = settings.EXPERIMENT_SLOTS if settings.EMBEDDED_WORKER else 0
+    alive_since = datetime.now() - timedelta(seconds=settings.WORKER_LEASE_SECONDS)
+    slots += (
+        db.query(func.sum(Worker.slots))
+        .filter(Worker.status == "active", Worker.heartbeat_at >= alive_since)
+        .scalar()
+        or 0
+    )
+    return max(slots, 1)
+
+
+class ExperimentDispatcher:
+    """
+    Background thread draining the experiment queue
+
+    The portal's dispatcher has no worker id; a worker's claims are leased
+    to it and run with its own executor.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        slots: Optional[int] = None,
+        executor_name: Optional[str] = None,
+    ):
+        self.worker_id = worker_id
+        # False when app.worker processes run the experiment queue
+        self.runs_experiments = True
+        self._tasks: deque = deque()
+        self._running_tasks = set()
+        self._slots = slots
+        self.executor_name = executor_name
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.last_user: Optional[int] = None
+        self.blocked_reason = ""
+        # A finished run frees a slot
+        supervisor.add_finished_listener(lambda experiment_id: self.wake())
+
+    def start(self, experiments: bool = True):
+        with self._lock:
+            self.runs_experiments = experiments
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            # Prime psutil's CPU sampling so the first reading is meaningful
+            psutil.cpu_percent(interval=None)
+            try:
+                # Created now so that its warm pool fills before the first run
+                get_executor(self.executor_name)
+            except ExecutorError as e:
+                print(f"[ERROR] Experiment dispatcher: {e}")
+            self._thread = threading.Thread(
+                target=self._loop, name="experiment-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Re-check the queue now, e.g. after an enqueue or a completion"""
+        self._wake.set()
+
+    @property
+    def slots(self) -> int:
+        return self._slots or settings.EXPERIMENT_SLOTS
+
+    def busy(self) -> int:
+        """Slots taken by running experiments and tasks"""
+        with self._lock:
+            tasks = len(self._running_tasks)
+        return supervisor.running_count() + tasks
+
+    def submit_task(self, name: str, target: Callable, *args) -> DispatcherTask:
+        """Queue `target(*args)` to run once a slot is free"""
+        task = DispatcherTask(name, target, args)
+        with self._lock:
+            self._tasks.append(task)
+        self.wake()
+        return task
+
+    def _run_task(self, task: DispatcherTask):
+        try:
+            task.target(*task.args)
+        except Exception as e:
+            print(f"[ERROR] {task.name}: {e}")
+        finally:
+            with self._lock:
+                self._running_tasks.discard(task)
+            self.wake()
+
+    def _start_tasks(self) -> bool:
+        """Start queued tasks while slots allow; False if some must wait"""
+        while True:
+            with self._lock:
+                if not self._tasks:
+                    return True
+            if self.busy() >= self.slots:
+                self.blocked_reason = "All experiment slots are busy"
+                return False
+            ok, reason = host_headroom()
+            if not ok:
+                self.blocked_reason = reason
+                return False
+            with self._lock:
+                task = self._tasks.popleft()
+                self._running_tasks.add(task)
+            threading.Thread(
+                target=self._run_task, args=(task,), name=task.name, daemon=True
+            ).start()
+
+    def reconcile(self):
+        """Take over the runs this dispatcher's previous process left behind"""
+        db = SessionLocal()
+        try:
+            counts = reconcile_in_flight(db, self.worker_id)
+        except Exception as e:
+            print(f"[ERROR] Reconciling in-flight experiments: {e}")
+            return
+        finally:
+            db.close()
+        if any(counts.values()):
+            print(
+                f"[INFO] Reconciled in-flight experiments: {counts['adopted']} "
+                f"taken over, {counts['requeued']} re-queued"
+            )
+
+    def _loop(self):
+        # Before any dispatch, so taken-over runs keep their slots
+        self.reconcile()
+        while not self._stop.is_set():
+            try:
+                self.dispatch()
+            except Exception as e:
+                print(f"[ERROR] Experiment dispatcher: {e}")
+            self._wake.wait(settings.QUEUE_DISPATCH_INTERVAL)
+            self._wake.clear()
+
+    def queued_entries(self, db) -> List[QueueEntry]:
+        rows = (
+            db.query(Experiment.id, Experiment.created_by, Experiment.priority)
+            .filter(Experiment.status == ExperimentStatus.QUEUED)
+            .order_by(Experiment.queued_at, Experiment.id)
+            .all()
+        )
+        return [(row.id, row.created_by, row.priority or 0) for row in rows]
+
+    def dispatch(self) -> int:
+        """Start as many queued experiments as slots and headroom allow"""
+        started = 0
+        if not self._start_tasks() or not self.runs_experiments:
+            return started
+        db = SessionLocal()
+        try:
+            requeue_expired_leases(db)
+            entries = self.queued_entries(db)
+            users = {experiment_id: user_id for experiment_id, user_id, _ in entries}
+            for experiment_id in fair_share_order(entries, self.last_user):
+                if self.busy() >= self.slots:
+                    self.blocked_reason = "All experiment slots are busy"
+                    break
+                ok, reason = host_headroom()
+                if not ok:
+                    self.blocked_reason = reason
+                    break
+                if self._start(db, experiment_id):
+                    self.last_user = users[experiment_id]
+                    started += 1
+            else:
+                self.blocked_reason = ""
+        finally:
+            db.close()
+        return started
+
+    def _claim_values(self) -> dict:
+        now = datetime.now()
+        values = {"status": ExperimentStatus.RUNNING, "start_time": now}
+        if self.worker_id is not None:
+            values["worker_id"] = self.worker_id
+            values["lease_expires_at"] = now + timedelta(
+                seconds=settings.WORKER_LEASE_SECONDS
+            )
+        return values
+
+    def _start(self, db, experiment_id: int) -> bool:
+        # Claim the experiment; loses cleanly if it was cancelled or another
+        # worker claimed it meanwhile
+        claimed = db.execute(
+            update(Experiment)
+            .where(Experiment.id == experiment_id)
+            .where(Experiment.status == ExperimentStatus.QUEUED)
+            .values(**self._claim_values())
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return False
+        exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+        try:
+            if exp.simulation_dir:
+                spec = execution_spec_for(
+                    experiment_id, exp.simulation_dir, resource_limits(exp.config)
+                )
+            else:
+                # Bulk-inserted (sweep) experiments are prepared on dispatch
+                spec = prepare_simulation(exp)
+                exp.simulation_dir = spec.simulation_dir
+                db.commit()
+            executor = get_executor(self.executor_name) if self.executor_name else None
+            supervisor.submit(spec, executor)
+        except (ExecutorError, ValueError) as e:
+            exp.status = ExperimentStatus.FAILED
+            exp.end_time = datetime.now()
+            exp.lease_expires_at = None
+            db.commit()
+            log_error(experiment_id, str(e))
+            return False
+        return True
+
+    def queue_estimates(self, db) -> Dict[int, dict]:
+        """
+        Queue position and ETA (seconds until start) of every queued
+        experiment, simulating slots freeing up in dispatch order
+        """
+        entries = self.queued_entries(db)
+        if not entries:
+            return {}
+        default_duration = mean_duration(db)
+        now = datetime.now()
+
+        # Seconds until each slot frees up
+        slots = []
+        running = (
+            db.query(Experiment)
+            .filter(Experiment.status == ExperimentStatus.RUNNING)
+            .all()
+        )
+        for exp in running:
+            remaining = refine_remaining(
+                exp.estimated_duration or default_duration,
+                run_seconds(exp, now) or 0.0,
+                exp.completed_jobs / exp.total_jobs if exp.total_jobs else None,
+            )
+            slots.append(remaining)
+        nb_slots = cluster_slots(db)
+        slots = sorted(slots)[:nb_slots]
+        slots += [0.0] * (nb_slots - len(slots))
+        heapq.heapify(slots)
+
+        durations = {
+            row.id: row.estimated_duration
+            for row in db.query(Experiment.id, Experiment.estimated_duration).filter(
+                Experiment.status == ExperimentStatus.QUEUED
+            )
+        }
+        estimates = {}
+        for position, experiment_id in enumerate(
+            fair_share_order(entries, self.last_user), start=1
+        ):
+            start_in = heapq.heappop(slots)
+            duration = durations.get(experiment_id) or default_duration
+            heapq.heappush(slots, start_in + duration)
+            estimates[experiment_id] = {
+                "queue_position": position,
+                "queue_length": len(entries),
+                "eta_seconds": math.ceil(start_in),
+            }
+        return estimates
+
+
+def mean_duration(db) -> float:
+    """Mean run time (pauses excluded) of recently completed experiments"""
+    rows = (
+        db.query(Experiment.start_time, Experiment.end_time, Experiment.paused_seconds)
+        .filter(Experiment.status == ExperimentStatus.COMPLETED)
+        .filter(Experiment.start_time.isnot(None), Experiment.end_time.isnot(None))
+        .order_by(Experiment.end_time.desc())
+        .limit(DURATION_SAMPLE_SIZE)
+        .all()
+    )
+    durations = [
+        (row.end_time - row.start_time).total_seconds() - (row.paused_seconds or 0)
+        for row in rows
+        if row.end_time >= row.start_time
+    ]
+    if not durations:
+        return settings.QUEUE_DEFAULT_DURATION
+    return sum(durations) / len(durations)
+
+
+dispatcher = ExperimentDispatcher()
@@ -0,0 +1,389 @@
+"""
+Experiment duration estimator
+
+Predicts an experiment's run time (wall clock, pauses excluded) from its
+inputs with a ridge-regularized linear model of the log duration:
+
+    log(seconds) ~ log jobs + log submission span + log requested work
+                   + log platform hosts
+                   + log scheduling / simulation time the strategy
+                     needed for that many jobs in earlier runs
+                   + one indicator per strategy
+
+Only the normal equations (X'X, X'y) are kept, so each finished
+experiment is folded in with a rank-one update and a prediction solves
+one small linear system. The model is trained from the most recent
+completed experiments on first use. Runs of this process are folded in as
+they finish; runs of standalone workers are picked up from the database,
+at most every ESTIMATOR_REFRESH_INTERVAL seconds, when estimating.
+"""
+
+import csv
+import json
+import math
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.scenario import Scenario
+from app.services.executors.base import EXPORT_PREFIX
+from app.services.experiment_runner import run_seconds, supervisor
+from app.services.replay import count_platform_hosts
+
+NUMERIC_FEATURES = (
+    "bias",
+    "log_jobs",
+    "log_span",
+    "log_work",
+    "log_hosts",
+    "log_scheduling_time",
+    "log_simulation_time",
+)
+
+# (jobs, submission span, requested core-seconds, hosts)
+Inputs = Tuple[int, float, float, int]
+
+_FILE_CACHE_SIZE = 256
+_file_cache: Dict[tuple, object] = {}
+
+
+def _cached_by_stat(path: Optional[str], compute):
+    """compute(path), cached until the file's size or mtime changes"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    key = (compute.__name__, path, stat.st_size, stat.st_mtime_ns)
+    if key not in _file_cache:
+        if len(_file_cache) >= _FILE_CACHE_SIZE:
+            _file_cache.clear()
+        try:
+            _file_cache[key] = compute(path)
+        except (OSError, ValueError, KeyError, TypeError, ET.ParseError):
+            _file_cache[key] = None
+    return _file_cache[key]
+
+
+def _workload_summary(path: str) -> Tuple[int, float, float]:
+    with open(path) as f:
+        jobs = json.load(f).get("jobs") or []
+    if not jobs:
+        return 0, 0.0, 0.0
+    subtime = np.fromiter((float(job.get("subtime", 0)) for job in jobs), float)
+    res = np.fromiter((float(job.get("res", 1)) for job in jobs), float)
+    walltime = np.fromiter((float(job.get("walltime") or 0) for job in jobs), float)
+    work = float(np.dot(res, np.clip(walltime, 0, None)))
+    return len(jobs), float(subtime.max() - subtime.min()), work
+
+
+def scenario_inputs(scenario: Optional[Scenario]) -> Optional[Inputs]:
+    """Workload and platform features of a scenario; None if unreadable"""
+    if scenario is None or scenario.workload is None or scenario.platform is None:
+        return None
+    workload = _cached_by_stat(scenario.workload.file_path, _workload_summary)
+    if workload is None:
+        return None
+    hosts = scenario.platform.nb_hosts or _cached_by_stat(
+        scenario.platform.file_path, count_platform_hosts
+    )
+    return (*workload, hosts or 0)
+
+
+def schedule_times(simulation_dir: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Per-job scheduling and simulation time from a run's out_schedule.csv"""
+    if not simulation_dir:
+        return None
+    path = os.path.join(simulation_dir, f"{EXPORT_PREFIX}_schedule.csv")
+    try:
+        with open(path, newline="") as f:
+            row = next(csv.DictReader(f), None)
+        if row is None:
+            return None
+        nb_jobs = int(float(row.get("nb_jobs") or 0))
+        if nb_jobs <= 0:
+            return None
+        return (
+            float(row.get("scheduling_time") or 0) / nb_jobs,
+            float(row.get("simulation_time") or 0) / nb_jobs,
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def refine_remaining(
+    estimate: Optional[float], elapsed: float, fraction: Optional[float]
+) -> Optional[float]:
+    """
+    Seconds left for a running experiment. The estimate is blended with
+    the progress extrapolation, trusting the latter as more jobs finish.
+    """
+    if fraction is not None and 0 < fraction <= 1 and elapsed > 0:
+        projected = elapsed / fraction
+        total = projected if estimate is None else (
+            (1 - fraction) * estimate + fraction * projected
+        )
+    elif estimate is not None:
+        total = estimate
+    else:
+        return None
+    return max(total - elapsed, 0.0)
+
+
+class DurationEstimator:
+    """Incrementally trained least-squares model of experiment durations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._trained = False
+        # strategy id -> column of its indicator
+        self._strategies: Dict[int, int] = {}
+        size = len(NUMERIC_FEATURES)
+        self._xtx = np.zeros((size, size))
+        self._xty = np.zeros(size)
+        self._weights: Optional[np.ndarray] = None
+        self.samples = 0
+        # strategy id -> [sum of per-job scheduling time, of simulation time, runs]
+        self._strategy_times: Dict[int, List[float]] = {}
+        self._observed = set()
+        # Latest end time read from the database, and when it was read
+        self._last_end = None
+        self._refreshed_at = 0.0
+        # Every finished run is a new sample
+        supervisor.add_finished_listener(self.observe)
+
+    # -- features -----------------------------------------------------------
+
+    def _time_per_job(self, strategy_id: int) -> Tuple[float, float]:
+        times = self._strategy_times.get(strategy_id)
+        if times is None:
+            # Unknown strategy: the average over all of them
+            runs = sum(t[2] for t in self._strategy_times.values())
+            if not runs:
+                return 0.0, 0.0
+            return (
+                sum(t[0] for t in self._strategy_times.values()) / runs,
+                sum(t[1] for t in self._strategy_times.values()) / runs,
+            )
+        return times[0] / times[2], times[1] / times[2]
+
+    def _row(self, inputs: Inputs, strategy_id: int) -> np.ndarray:
+        jobs, span, work, hosts = inputs
+        scheduling, simulation = self._time_per_job(strategy_id)
+        row = np.zeros(len(NUMERIC_FEATURES) + len(self._strategies))
+        row[: len(NUMERIC_FEATURES)] = (
+            1.0,
+            math.log1p(jobs),
+            math.log1p(span),
+            math.log1p(work),
+            math.log1p(hosts),
+            math.log1p(scheduling * jobs),
+            math.log1p(simulation * jobs),
+        )
+        column = self._strategies.get(strategy_id)
+        if column is not None:
+            row[column] = 1.0
+        return row
+
+    def _add_strategy(self, strategy_id: int):
+        if strategy_id in self._strategies:
+            return
+        self._strategies[strategy_id] = self._xty.size
+        self._xtx = np.pad(self._xtx, ((0, 1), (0, 1)))
+        self._xty = np.pad(self._xty, (0, 1))
+
+    def _record_times(self, strategy_id: int, times: Optional[Tuple[float, float]]):
+        if times is not None:
+            totals = self._strategy_times.setdefault(strategy_id, [0.0, 0.0, 0])
+            totals[0] += times[0]
+            totals[1] += times[1]
+            totals[2] += 1
+
+    # -- training -----------------------------------------------------------
+
+    def _fit_rows(self, rows: List[np.ndarray], targets: List[float]):
+        """Fold samples into the normal equations in one matrix product"""
+        if not rows:
+            return
+        X = np.zeros((len(rows), self._xty.size))
+        for i, row in enumerate(rows):
+            X[i, : row.size] = row
+        y = np.asarray(targets)
+        self._xtx += X.T @ X
+        self._xty += X.T @ y
+        self.samples += len(rows)
+        self._weights = None
+
+    def _sample(self, exp: Experiment) -> Optional[Tuple[Inputs, float]]:
+        if exp.status != ExperimentStatus.COMPLETED or exp.cached_result_id:
+            return None
+        seconds = run_seconds(exp)
+        inputs = scenario_inputs(exp.scenario)
+        if not seconds or seconds <= 0 or inputs is None:
+            return None
+        return inputs, seconds
+
+    def _history(self, since=None) -> list:
+        """
+        (experiment, sample) of completed runs, oldest first: the most
+        recent ones, or the first ones to end at or after `since`
+        """
+        db = SessionLocal()
+        try:
+            query = (
+                db.query(Experiment)
+                .options(
+                    joinedload(Experiment.scenario).joinedload(Scenario.workload),
+                    joinedload(Experiment.scenario).joinedload(Scenario.platform),
+                )
+                .filter(Experiment.status == ExperimentStatus.COMPLETED)
+                .filter(Experiment.cached_result_id.is_(None))
+                .filter(Experiment.start_time.isnot(None))
+                .filter(Experiment.end_time.isnot(None))
+            )
+            if since is None:
+                history = (
+                    query.order_by(Experiment.end_time.desc())
+                    .limit(settings.ESTIMATOR_HISTORY)
+                    .all()
+                )
+                history.reverse()
+            else:
+                history = (
+                    query.filter(Experiment.end_time >= since)
+                    .order_by(Experiment.end_time)
+                    .limit(settings.ESTIMATOR_HISTORY)
+                    .all()
+                )
+            return [(exp, self._sample(exp)) for exp in history]
+        finally:
+            db.close()
+
+    def _fold(self, samples: list):
+        """Fold (experiment, sample) pairs into the model, under self._lock"""
+        rows, targets = [], []
+        # Oldest first, so each row only sees earlier strategy times
+        for exp, sample in samples:
+            if self._last_end is None or exp.end_time > self._last_end:
+                self._last_end = exp.end_time
+            if sample is None or exp.id in self._observed:
+                continue
+            inputs, seconds = sample
+            self._add_strategy(exp.strategy_id)
+            rows.append(self._row(inputs, exp.strategy_id))
+            targets.append(math.log(seconds))
+            self._record_times(exp.strategy_id, schedule_times(exp.simulation_dir))
+            self._observed.add(exp.id)
+        self._fit_rows(rows, targets)
+
+    def ensure_trained(self):
+        """Train from recent completed experiments, once"""
+        if self._trained:
+            return
+        with self._train_lock:
+            if self._trained:
+                return
+            samples = self._history()
+            with self._lock:
+                self._fold(samples)
+                self._trained = True
+            self._refreshed_at = time.monotonic()
+
+    def _refresh_due(self) -> bool:
+        elapsed = time.monotonic() - self._refreshed_at
+        return elapsed >= settings.ESTIMATOR_REFRESH_INTERVAL
+
+    def refresh(self):
+        """Fold in runs completed since the last look, wherever they ran"""
+        if not self._refresh_due():
+            return
+        with self._train_lock:
+            if not self._refresh_due():
+                return
+            try:
+                samples = self._history(since=self._last_end)
+                with self._lock:
+                    self._fold(samples)
+            except Exception as e:
+                print(f"[ERROR] Duration estimator: {e}")
+            self._refreshed_at = time.monotonic()
+
+    def observe(self, experiment_id: int):
+        """Fold a finished experiment into the model"""
+        if not self._trained or experiment_id in self._observed:
+            # Training reads it from the database
+            return
+        db = SessionLocal()
+        try:
+            exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+            sample = self._sample(exp) if exp is not None else None
+            if sample is None:
+                return
+            times = schedule_times(exp.simulation_dir)
+            inputs, seconds = sample
+            with self._lock:
+                self._add_strategy(exp.strategy_id)
+                self._fit_rows([self._row(inputs, exp.strategy_id)], [math.log(seconds)])
+                self._record_times(exp.strategy_id, times)
+                self._observed.add(experiment_id)
+        except Exception as e:
+            print(f"[ERROR] Duration estimator: {e}")
+        finally:
+            db.close()
+
+    # -- prediction ---------------------------------------------------------
+
+    def _solve(self) -> Optional[np.ndarray]:
+        if self.samples < settings.ESTIMATOR_MIN_SAMPLES:
+            return None
+        if self._weights is None or self._weights.size != self._xty.size:
+            ridge = settings.ESTIMATOR_RIDGE * np.eye(self._xty.size)
+            ridge[0, 0] = 0.0  # The intercept is not shrunk
+            try:
+                self._weights = np.linalg.solve(self._xtx + ridge, self._xty)
+            except np.linalg.LinAlgError:
+                self._weights = np.linalg.lstsq(
+                    self._xtx + ridge, self._xty, rcond=None
+                )[0]
+        return self._weights
+
+    def estimate(self, scenario: Scenario, strategy_id: int) -> Optional[int]:
+        """Predicted run time in seconds; None until there is enough history"""
+        self.ensure_trained()
+        self.refresh()
+        inputs = scenario_inputs(scenario)
+        if inputs is None:
+            return None
+        with self._lock:
+            weights = self._solve()
+            if weights is None:
+                return None
+            log_seconds = float(self._row(inputs, strategy_id) @ weights)
+        seconds = math.exp(min(log_seconds, math.log(settings.ESTIMATOR_MAX_SECONDS)))
+        return max(int(round(seconds)), 1)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            weights = self._solve()
+            return {
+                "trained": self._trained,
+                "samples": self.samples,
+                "min_samples": settings.ESTIMATOR_MIN_SAMPLES,
+                "strategies": len(self._strategies),
+                "weights": (
+                    dict(zip(NUMERIC_FEATURES, weights[: len(NUMERIC_FEATURES)].tolist()))
+                    if weights is not None
+                    else None
+                ),
+            }
+
+
+duration_estimator = DurationEstimator()
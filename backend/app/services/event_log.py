@@ -0,0 +1,135 @@
+"""Reader for the NDJSON scheduler event logs written by the sample strategies"""
+
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+# Written by EventLogger in samples/strategies/event_log.py
+EVENTS_FILENAME = "out_scheduler_events.ndjson"
+INDEX_SUFFIX = ".idx.json"
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+
+class EventLogReader:
+    """
+    Query a scheduler event log without loading it all in memory
+
+    Filters are applied while streaming the file. Per-job timelines use a
+    job id -> byte offsets index built in one pass and cached next to the
+    log, so later lookups only read that job's lines.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self._index = None
+
+    @classmethod
+    def for_directory(cls, directory: str) -> Optional["EventLogReader"]:
+        path = os.path.join(directory, EVENTS_FILENAME)
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def iter_events(
+        self,
+        event: Optional[str] = None,
+        job_id: Optional[str] = None,
+        min_level: Optional[str] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> Iterator[dict]:
+        """Stream the records that match every given filter"""
+        min_rank = LEVELS.get(min_level.upper(), 0) if min_level else 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                record = _parse(line)
+                if record is None:
+                    continue
+                if event and record.get("ev") != event:
+                    continue
+                if job_id is not None and str(record.get("job")) != str(job_id):
+                    continue
+                if min_rank and LEVELS.get(record.get("lvl"), 0) < min_rank:
+                    continue
+                timestamp = record.get("t")
+                if start_time is not None and (timestamp is None or timestamp < start_time):
+                    continue
+                if end_time is not None and (timestamp is None or timestamp > end_time):
+                    continue
+                yield record
+
+    def query(self, limit: int = 1000, offset: int = 0, **filters) -> List[dict]:
+        """Page through matching records"""
+        records = []
+        for position, record in enumerate(self.iter_events(**filters)):
+            if position < offset:
+                continue
+            if len(records) >= limit:
+                break
+            records.append(record)
+        return records
+
+    def timeline(self, job_id) -> List[dict]:
+        """All records of one job, ordered by simulation time"""
+        offsets = self._load_index().get(str(job_id), [])
+        records = []
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                record = _parse(f.readline())
+                if record is not None:
+                    records.append(record)
+        records.sort(key=lambda r: (r.get("t") is None, r.get("t") or 0))
+        return records
+
+    def timelines(self, job_ids=None) -> Dict[str, List[dict]]:
+        """Timelines of several jobs, or of every job in the log"""
+        if job_ids is None:
+            job_ids = self._load_index().keys()
+        return {str(job_id): self.timeline(job_id) for job_id in job_ids}
+
+    def _load_index(self) -> Dict[str, List[int]]:
+        if self._index is not None:
+            return self._index
+        stat = os.stat(self.path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    cached = json.load(f)
+                if cached.get("signature") == signature:
+                    self._index = cached["jobs"]
+                    return self._index
+            except (OSError, ValueError, KeyError):
+                pass
+        self._index = self._build_index()
+        try:
+            with open(self.index_path, "w") as f:
+                json.dump({"signature": signature, "jobs": self._index}, f)
+        except OSError:
+            pass  # Read-only storage: keep the index in memory only
+        return self._index
+
+    def _build_index(self) -> Dict[str, List[int]]:
+        index: Dict[str, List[int]] = {}
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                record = _parse(line)
+                if record is not None and record.get("job") is not None:
+                    index.setdefault(str(record["job"]), []).append(offset)
+                offset += len(line)
+        return index
+
+
+def _parse(line: bytes) -> Optional[dict]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
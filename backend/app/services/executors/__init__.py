@@ -0,0 +1,49 @@
+"""
+Experiment executors
+
+`get_executor()` returns the backend selected by EXECUTOR_BACKEND:
+"local" runs BatSim and the scheduler as subprocesses, "docker" runs them
+in BATSIM_IMAGE / PYBATSIM_IMAGE containers.
+"""
+
+from app.core.config import settings
+from app.services.executors.base import (
+    ExecutionHandle,
+    ExecutionOutcome,
+    ExecutionSpec,
+    Executor,
+    ExecutorError,
+    ResourceLimits,
+    ResourceUsage,
+)
+
+_executors = {}
+
+
+def get_executor(name: str = None) -> Executor:
+    """Shared executor instance for a backend name"""
+    name = name or settings.EXECUTOR_BACKEND
+    if name not in _executors:
+        if name == "local":
+            from app.services.executors.local_executor import LocalExecutor
+
+            _executors[name] = LocalExecutor()
+        elif name == "docker":
+            from app.services.executors.docker_executor import DockerExecutor
+
+            _executors[name] = DockerExecutor()
+        else:
+            raise ExecutorError(f"Unknown executor backend: {name}")
+    return _executors[name]
+
+
+__all__ = [
+    "ExecutionHandle",
+    "ExecutionOutcome",
+    "ExecutionSpec",
+    "Executor",
+    "ExecutorError",
+    "ResourceLimits",
+    "ResourceUsage",
+    "get_executor",
+]
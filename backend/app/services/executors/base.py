@@ -0,0 +1,174 @@
+"""Common interface of the experiment executors"""
+
+import os
+import shlex
+import socket
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# Where BatSim writes out_jobs.csv / out_schedule.csv, relative to the
+# simulation directory
+EXPORT_PREFIX = "out"
+
+# Every executor leaves the full output of both sides in these files of the
+# simulation directory; the supervisor archives them into the log store
+BATSIM_LOG = "batsim.log"
+SCHEDULER_LOG = "scheduler.log"
+
+# Exported to both processes; the sample strategies write their event log
+# and callback stats there
+SCHEDULER_OUTPUT_DIR_ENV = "SCHEDULER_OUTPUT_DIR"
+STRATEGY_ENV = "BATSIM_STRATEGY"
+
+# The experiment config (e.g. the parameters of a sweep point) is written to
+# this file of the simulation directory and its JSON exported to both sides
+EXPERIMENT_CONFIG = "config.json"
+EXPERIMENT_CONFIG_ENV = "BATSIM_EXPERIMENT_CONFIG"
+
+
+# Why a run exceeding its limits was killed (Experiment.failure_reason)
+CPU_TIME_LIMIT = "cpu_time_limit"
+MEMORY_LIMIT = "memory_limit"
+WALL_CLOCK_LIMIT = "wall_clock_limit"
+
+
+@dataclass
+class ResourceLimits:
+    """Per-run limits over both sides together; None is unlimited"""
+
+    cpu_seconds: Optional[float] = None
+    memory_mb: Optional[float] = None
+    # Pauses excluded
+    wall_clock_seconds: Optional[float] = None
+
+
+@dataclass
+class ResourceUsage:
+    """CPU time so far and current memory of both sides together"""
+
+    cpu_seconds: float
+    memory_mb: float
+
+
+@dataclass
+class ExecutionSpec:
+    """Everything an executor needs to run one experiment"""
+
+    experiment_id: int
+    simulation_dir: str
+    platform_file: str
+    workload_file: str
+    strategy_file: str
+    env: Dict[str, str] = field(default_factory=dict)
+    limits: ResourceLimits = field(default_factory=ResourceLimits)
+
+    @property
+    def export_prefix(self) -> str:
+        return os.path.join(self.simulation_dir, EXPORT_PREFIX)
+
+
+@dataclass
+class ExecutionHandle:
+    """Identifies the processes or containers of a launched experiment"""
+
+    experiment_id: int
+    batsim_id: str
+    scheduler_id: Optional[str] = None
+
+
+@dataclass
+class ExecutionOutcome:
+    """Exit codes of a finished experiment"""
+
+    batsim_exit_code: Optional[int]
+    scheduler_exit_code: Optional[int]
+    # Set when a side was killed by the executor's own limits
+    limit_exceeded: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return (
+            self.limit_exceeded is None
+            and self.batsim_exit_code == 0
+            and self.scheduler_exit_code in (0, None)
+        )
+
+
+def exported_outcome(simulation_dir: str) -> ExecutionOutcome:
+    """
+    Outcome of a run whose exit codes were lost (it finished while no
+    portal process was waiting on it): BatSim only writes the schedule
+    export once the simulation is over.
+    """
+    path = os.path.join(simulation_dir, f"{EXPORT_PREFIX}_schedule.csv")
+    try:
+        with open(path, "rb") as f:
+            exported = len(f.read(4096).splitlines()) > 1
+    except OSError:
+        exported = False
+    return ExecutionOutcome(
+        batsim_exit_code=0 if exported else None, scheduler_exit_code=None
+    )
+
+
+class ExecutorError(Exception):
+    """Raised when an experiment cannot be launched or controlled"""
+
+
+def find_free_port() -> int:
+    """A TCP port that is free right now, for the BatSim socket"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def format_command(template: str, **values) -> list:
+    """Split a command template such as "batsim -p {platform}" into argv"""
+    return [part.format(**values) for part in shlex.split(template)]
+
+
+class Executor(ABC):
+    """
+    Runs BatSim and the scheduler for an experiment
+
+    launch() must return quickly; wait() blocks until both sides have
+    exited and is called from the supervisor thread, never from a request.
+    Runs outlive the portal process, so a restarted portal attach()es to
+    the ones still in flight. Executors enforce spec.limits.cpu_seconds
+    (and memory_mb where they can) themselves; the supervisor samples
+    usage() for the rest.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def launch(self, spec: ExecutionSpec) -> ExecutionHandle:
+        """Start BatSim and the scheduler and return their ids"""
+
+    @abstractmethod
+    def attach(self, spec: ExecutionSpec, handle: ExecutionHandle) -> bool:
+        """
+        Take over a run launched by an earlier portal process so that
+        wait(), stop(), pause() and resume() work on it; False if it is gone
+        """
+
+    @abstractmethod
+    def wait(self, handle: ExecutionHandle) -> ExecutionOutcome:
+        """Block until the experiment has finished"""
+
+    @abstractmethod
+    def stop(self, handle: ExecutionHandle):
+        """Terminate the experiment, paused or not; wait() returns afterwards"""
+
+    @abstractmethod
+    def pause(self, handle: ExecutionHandle):
+        """Suspend both sides in place; wait() keeps blocking"""
+
+    @abstractmethod
+    def resume(self, handle: ExecutionHandle):
+        """Continue a paused experiment"""
+
+    @abstractmethod
+    def usage(self, handle: ExecutionHandle) -> Optional[ResourceUsage]:
+        """Current resource usage of a run; None once it has exited"""
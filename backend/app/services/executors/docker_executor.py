@@ -0,0 +1,317 @@
+"""Executor running BatSim and the scheduler in Docker containers"""
+
+import math
+import os
+import signal
+import threading
+from typing import Dict, Optional
+
+import docker
+from docker.errors import DockerException, NotFound
+from docker.types import Ulimit
+
+from app.core.config import settings
+from app.services.executors.base import (
+    BATSIM_LOG,
+    CPU_TIME_LIMIT,
+    EXPORT_PREFIX,
+    MEMORY_LIMIT,
+    SCHEDULER_LOG,
+    SCHEDULER_OUTPUT_DIR_ENV,
+    STRATEGY_ENV,
+    ExecutionHandle,
+    ExecutionOutcome,
+    ExecutionSpec,
+    Executor,
+    ExecutorError,
+    ResourceUsage,
+    format_command,
+)
+
+# Mount point of the simulation directory inside both containers
+CONTAINER_DATA_DIR = "/data"
+BATSIM_PORT = 28000
+
+# Seconds to wait for a log follower to drain after its container exited
+LOG_DRAIN_TIMEOUT = 30.0
+
+# CPU seconds between the SIGXCPU of the cpu ulimit and the SIGKILL
+CPU_LIMIT_GRACE = 5
+
+
+class DockerExecutor(Executor):
+    """
+    BATSIM_IMAGE and PYBATSIM_IMAGE containers sharing one network
+    namespace, with the simulation directory mounted at /data. Handles
+    carry the container ids. A thread per container follows its output
+    into the simulation directory's log files. Memory limits are container
+    limits (without swap) and the CPU time limit a cpu ulimit.
+    """
+
+    name = "docker"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+        # container id -> thread copying its output to a log file
+        self._followers: Dict[str, threading.Thread] = {}
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                try:
+                    self._client = docker.from_env()
+                except DockerException as e:
+                    raise ExecutorError(f"Docker is not available: {e}")
+            return self._client
+
+    def image_id(self, name: str) -> Optional[str]:
+        """Id (content digest) of a local image, None if it is not pulled"""
+        try:
+            return self.client.images.get(name).id
+        except (DockerException, ExecutorError):
+            return None
+
+    def _container_path(self, spec: ExecutionSpec, path: str) -> str:
+        relative = os.path.relpath(path, spec.simulation_dir)
+        return f"{CONTAINER_DATA_DIR}/{relative}"
+
+    def launch(self, spec: ExecutionSpec) -> ExecutionHandle:
+        values = {
+            "python": "python3",
+            "platform": self._container_path(spec, spec.platform_file),
+            "workload": self._container_path(spec, spec.workload_file),
+            "strategy": self._container_path(spec, spec.strategy_file),
+            "export_prefix": f"{CONTAINER_DATA_DIR}/{EXPORT_PREFIX}",
+            "simulation_dir": CONTAINER_DATA_DIR,
+            "port": BATSIM_PORT,
+            "socket": f"tcp://127.0.0.1:{BATSIM_PORT}",
+        }
+        environment = dict(spec.env)
+        environment[SCHEDULER_OUTPUT_DIR_ENV] = CONTAINER_DATA_DIR
+        environment[STRATEGY_ENV] = values["strategy"]
+        volumes = {
+            os.path.abspath(spec.simulation_dir): {
+                "bind": CONTAINER_DATA_DIR,
+                "mode": "rw",
+            }
+        }
+        labels = {"batsim-portal.experiment": str(spec.experiment_id)}
+        limits = {}
+        if spec.limits.memory_mb:
+            # Both containers share it: each gets the whole allowance and
+            # the supervisor checks their sum
+            memory = f"{int(spec.limits.memory_mb)}m"
+            limits.update(mem_limit=memory, memswap_limit=memory)
+        if spec.limits.cpu_seconds:
+            soft = max(math.ceil(spec.limits.cpu_seconds), 1)
+            limits["ulimits"] = [
+                Ulimit(name="cpu", soft=soft, hard=soft + CPU_LIMIT_GRACE)
+            ]
+
+        try:
+            batsim = self.client.containers.run(
+                settings.BATSIM_IMAGE,
+                # The image's entrypoint is batsim itself
+                format_command(settings.BATSIM_COMMAND, **values)[1:],
+                name=f"batsim_exp_{spec.experiment_id}",
+                detach=True,
+                volumes=volumes,
+                environment=environment,
+                working_dir=CONTAINER_DATA_DIR,
+                labels=labels,
+                **limits,
+            )
+        except DockerException as e:
+            raise ExecutorError(f"Cannot start BatSim container: {e}")
+        self._follow_logs(batsim, os.path.join(spec.simulation_dir, BATSIM_LOG))
+
+        scheduler = None
+        if settings.SCHEDULER_COMMAND:
+            try:
+                scheduler = self.client.containers.run(
+                    settings.PYBATSIM_IMAGE,
+                    format_command(settings.SCHEDULER_COMMAND, **values)[1:],
+                    name=f"pybatsim_exp_{spec.experiment_id}",
+                    detach=True,
+                    volumes=volumes,
+                    environment=environment,
+                    working_dir=CONTAINER_DATA_DIR,
+                    labels=labels,
+                    **limits,
+                    # Reach BatSim's socket on localhost
+                    network_mode=f"container:{batsim.id}",
+                )
+            except DockerException as e:
+                self._remove(batsim)
+                raise ExecutorError(f"Cannot start PyBatsim container: {e}")
+            self._follow_logs(
+                scheduler, os.path.join(spec.simulation_dir, SCHEDULER_LOG)
+            )
+
+        return ExecutionHandle(
+            experiment_id=spec.experiment_id,
+            batsim_id=batsim.id,
+            scheduler_id=scheduler.id if scheduler else None,
+        )
+
+    def attach(self, spec: ExecutionSpec, handle: ExecutionHandle) -> bool:
+        # Exited containers are kept until wait() removes them, so their
+        # exit codes and output survive the restart too
+        batsim = self._container(handle.batsim_id)
+        if batsim is None:
+            return False
+        for container, log_name in (
+            (batsim, BATSIM_LOG),
+            (self._container(handle.scheduler_id), SCHEDULER_LOG),
+        ):
+            if container is None:
+                continue
+            path = os.path.join(spec.simulation_dir, log_name)
+            try:
+                # Resume where the previous follower stopped writing
+                since = int(os.path.getmtime(path))
+            except OSError:
+                since = None
+            self._follow_logs(container, path, since=since)
+        return True
+
+    def _container(self, container_id: Optional[str]):
+        if not container_id:
+            return None
+        try:
+            return self.client.containers.get(container_id)
+        except NotFound:
+            return None
+
+    def _wait(self, container, timeout=None) -> Optional[int]:
+        if container is None:
+            return None
+        try:
+            return container.wait(timeout=timeout).get("StatusCode")
+        except Exception:
+            # Timed out: the scheduler did not notice BatSim went away
+            container.kill()
+            return container.wait().get("StatusCode")
+
+    def _follow_logs(self, container, path: str, since: Optional[int] = None):
+        def follow():
+            try:
+                with open(path, "ab") as f:
+                    for chunk in container.logs(stream=True, follow=True, since=since):
+                        f.write(chunk)
+                        f.flush()
+            except (DockerException, OSError):
+                pass
+
+        thread = threading.Thread(
+            target=follow, name=f"logs-{container.name}", daemon=True
+        )
+        with self._lock:
+            self._followers[container.id] = thread
+        thread.start()
+
+    def _drain_logs(self, container):
+        if container is None:
+            return
+        with self._lock:
+            thread = self._followers.pop(container.id, None)
+        if thread is not None:
+            thread.join(LOG_DRAIN_TIMEOUT)
+
+    def _remove(self, container):
+        try:
+            container.remove(force=True)
+        except DockerException:
+            pass
+
+    def wait(self, handle: ExecutionHandle) -> ExecutionOutcome:
+        batsim = self._container(handle.batsim_id)
+        scheduler = self._container(handle.scheduler_id)
+        if batsim is None:
+            raise ExecutorError(f"BatSim container {handle.batsim_id} not found")
+        batsim_code = self._wait(batsim)
+        scheduler_code = self._wait(scheduler, timeout=settings.SCHEDULER_EXIT_GRACE)
+        outcome = ExecutionOutcome(
+            batsim_exit_code=batsim_code,
+            scheduler_exit_code=scheduler_code,
+            limit_exceeded=self._limit_exceeded(
+                (batsim, batsim_code), (scheduler, scheduler_code)
+            ),
+        )
+        for container in (scheduler, batsim):
+            if container is not None:
+                self._drain_logs(container)
+                self._remove(container)
+        return outcome
+
+    def _limit_exceeded(self, *exits) -> Optional[str]:
+        for container, code in exits:
+            if container is None:
+                continue
+            try:
+                container.reload()
+                if container.attrs.get("State", {}).get("OOMKilled"):
+                    return MEMORY_LIMIT
+            except DockerException:
+                pass
+            if code == 128 + signal.SIGXCPU:
+                return CPU_TIME_LIMIT
+        return None
+
+    def usage(self, handle: ExecutionHandle) -> Optional[ResourceUsage]:
+        cpu_seconds = memory = 0.0
+        running = False
+        for container_id in (handle.batsim_id, handle.scheduler_id):
+            container = self._container(container_id)
+            if container is None:
+                continue
+            try:
+                stats = self.client.api.stats(container.id, stream=False, one_shot=True)
+            except DockerException:
+                continue
+            if not stats.get("pids_stats"):
+                continue  # Exited
+            running = True
+            cpu_seconds += (
+                stats.get("cpu_stats", {}).get("cpu_usage", {}).get("total_usage", 0)
+                / 1e9
+            )
+            memory += stats.get("memory_stats", {}).get("usage", 0)
+        if not running:
+            return None
+        return ResourceUsage(cpu_seconds=cpu_seconds, memory_mb=memory / (1024 * 1024))
+
+    def stop(self, handle: ExecutionHandle):
+        for container_id in (handle.scheduler_id, handle.batsim_id):
+            container = self._container(container_id)
+            if container is None:
+                continue
+            try:
+                if container.status == "paused":
+                    # A frozen container cannot handle the stop signal
+                    container.unpause()
+                container.stop(timeout=int(settings.SCHEDULER_EXIT_GRACE))
+            except DockerException:
+                pass
+
+    def pause(self, handle: ExecutionHandle):
+        for container_id in (handle.scheduler_id, handle.batsim_id):
+            container = self._container(container_id)
+            if container is None:
+                continue
+            try:
+                container.pause()
+            except DockerException as e:
+                raise ExecutorError(f"Cannot pause container {container.name}: {e}")
+
+    def resume(self, handle: ExecutionHandle):
+        for container_id in (handle.batsim_id, handle.scheduler_id):
+            container = self._container(container_id)
+            if container is None:
+                continue
+            try:
+                container.unpause()
+            except DockerException as e:
+                raise ExecutorError(f"Cannot resume container {container.name}: {e}")
@@ -0,0 +1,314 @@
+"""Executor running BatSim and the scheduler as local subprocesses"""
+
+import math
+import os
+import resource
+import signal
+import subprocess
+import sys
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import psutil
+
+from app.core.config import settings
+from app.services.executors.base import (
+    BATSIM_LOG,
+    CPU_TIME_LIMIT,
+    SCHEDULER_LOG,
+    SCHEDULER_OUTPUT_DIR_ENV,
+    STRATEGY_ENV,
+    ExecutionHandle,
+    ExecutionOutcome,
+    ExecutionSpec,
+    Executor,
+    ExecutorError,
+    ResourceUsage,
+    exported_outcome,
+    find_free_port,
+    format_command,
+)
+from app.services.executors.warm_pool import PooledProcess, WarmPool
+
+# Drives the strategy in-process, so no separate scheduler is started
+FAKE_BATSIM_COMMAND = (
+    "{python} -m app.services.fake_batsim -p {platform} -w {workload} "
+    "-e {export_prefix} -s {socket} --strategy {strategy}"
+)
+
+# CPU seconds between the SIGXCPU of RLIMIT_CPU and the SIGKILL
+CPU_LIMIT_GRACE = 5
+
+BACKEND_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+
+class AdoptedProcess:
+    """
+    Popen-like view of a process started by an earlier portal process.
+    It is not our child, so its exit code is lost: returncode stays None.
+    """
+
+    def __init__(self, process: psutil.Process):
+        self.pid = process.pid
+        self._process = process
+        self.returncode = None
+
+    @classmethod
+    def find(cls, pid: Optional[str], cwd: str) -> Optional["AdoptedProcess"]:
+        """The live process `pid` if it still runs in `cwd`, not a reused PID"""
+        try:
+            process = psutil.Process(int(pid))
+            if process.status() == psutil.STATUS_ZOMBIE:
+                return None
+            if os.path.realpath(process.cwd()) != os.path.realpath(cwd):
+                return None
+        except (TypeError, ValueError, psutil.Error):
+            return None
+        return cls(process)
+
+    def poll(self):
+        try:
+            if self._process.status() != psutil.STATUS_ZOMBIE:
+                return None
+        except psutil.Error:
+            pass
+        return self.returncode
+
+    def wait(self, timeout=None):
+        try:
+            self._process.wait(timeout)
+        except psutil.TimeoutExpired:
+            raise subprocess.TimeoutExpired(str(self.pid), timeout)
+        except psutil.Error:
+            pass
+        return self.returncode
+
+
+Process = Union[subprocess.Popen, AdoptedProcess, PooledProcess]
+
+
+class LocalExecutor(Executor):
+    """
+    One process group per side, with output redirected to log files in
+    the simulation directory. Handles carry the PIDs as strings. Both
+    sides run in their own session, so they survive a portal restart.
+    The CPU time limit is an RLIMIT_CPU on each side, which their
+    children inherit. With WARM_POOL_SIZE set, Python sides start in
+    pre-warmed pool workers instead of fresh interpreters.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        # experiment id -> (simulation dir, batsim process, scheduler process)
+        self._processes: Dict[int, Tuple[str, Process, Optional[Process]]] = {}
+        self._lock = threading.Lock()
+        self.pool: Optional[WarmPool] = None
+        if settings.WARM_POOL_SIZE > 0:
+            self.pool = WarmPool(
+                settings.WARM_POOL_SIZE, settings.WARM_POOL_PRELOAD, self._base_env()
+            )
+
+    def _base_env(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        # Lets the fake BatSim import the app package from any cwd
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [BACKEND_DIR, env.get("PYTHONPATH")])
+        )
+        return env
+
+    def _commands(self, spec: ExecutionSpec):
+        port = find_free_port()
+        values = {
+            "python": sys.executable,
+            "platform": spec.platform_file,
+            "workload": spec.workload_file,
+            "strategy": spec.strategy_file,
+            "export_prefix": spec.export_prefix,
+            "simulation_dir": spec.simulation_dir,
+            "port": port,
+            "socket": f"tcp://127.0.0.1:{port}",
+        }
+        if settings.FAKE_BATSIM:
+            return format_command(FAKE_BATSIM_COMMAND, **values), None
+        scheduler = (
+            format_command(settings.SCHEDULER_COMMAND, **values)
+            if settings.SCHEDULER_COMMAND
+            else None
+        )
+        return format_command(settings.BATSIM_COMMAND, **values), scheduler
+
+    def _spawn(self, argv, spec: ExecutionSpec, log_name: str, env) -> Process:
+        log_path = os.path.join(spec.simulation_dir, log_name)
+        if self.pool is not None:
+            process = self.pool.run(argv, spec.simulation_dir, env, log_path)
+            if process is not None:
+                return process
+        log_file = open(log_path, "ab")
+        try:
+            return subprocess.Popen(
+                argv,
+                cwd=spec.simulation_dir,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                # Own process group, so stop() also reaches children
+                start_new_session=True,
+            )
+        except OSError as e:
+            raise ExecutorError(f"Cannot start {argv[0]}: {e}")
+        finally:
+            log_file.close()
+
+    def _limit(self, process: subprocess.Popen, spec: ExecutionSpec):
+        if not spec.limits.cpu_seconds:
+            return
+        soft = max(math.ceil(spec.limits.cpu_seconds), 1)
+        try:
+            resource.prlimit(
+                process.pid, resource.RLIMIT_CPU, (soft, soft + CPU_LIMIT_GRACE)
+            )
+        except (AttributeError, OSError):
+            # No prlimit on this platform: the supervisor's sampling enforces it
+            pass
+
+    def launch(self, spec: ExecutionSpec) -> ExecutionHandle:
+        batsim_argv, scheduler_argv = self._commands(spec)
+        env = self._base_env()
+        env.update(spec.env)
+        env[SCHEDULER_OUTPUT_DIR_ENV] = spec.simulation_dir
+        env[STRATEGY_ENV] = spec.strategy_file
+
+        batsim = self._spawn(batsim_argv, spec, BATSIM_LOG, env)
+        self._limit(batsim, spec)
+        scheduler = None
+        if scheduler_argv:
+            try:
+                scheduler = self._spawn(scheduler_argv, spec, SCHEDULER_LOG, env)
+            except ExecutorError:
+                self._kill(batsim)
+                batsim.wait()
+                raise
+            self._limit(scheduler, spec)
+        with self._lock:
+            self._processes[spec.experiment_id] = (spec.simulation_dir, batsim, scheduler)
+        return ExecutionHandle(
+            experiment_id=spec.experiment_id,
+            batsim_id=str(batsim.pid),
+            scheduler_id=str(scheduler.pid) if scheduler else None,
+        )
+
+    def attach(self, spec: ExecutionSpec, handle: ExecutionHandle) -> bool:
+        batsim = AdoptedProcess.find(handle.batsim_id, spec.simulation_dir)
+        if batsim is None:
+            return False
+        scheduler = AdoptedProcess.find(handle.scheduler_id, spec.simulation_dir)
+        with self._lock:
+            self._processes[spec.experiment_id] = (spec.simulation_dir, batsim, scheduler)
+        return True
+
+    def _get(self, handle: ExecutionHandle):
+        with self._lock:
+            entry = self._processes.get(handle.experiment_id)
+        if entry is None:
+            raise ExecutorError(f"Experiment {handle.experiment_id} is not running here")
+        return entry
+
+    def wait(self, handle: ExecutionHandle) -> ExecutionOutcome:
+        simulation_dir, batsim, scheduler = self._get(handle)
+        batsim_code = batsim.wait()
+        if batsim_code is None:
+            # Adopted after a restart: judge by what BatSim exported
+            batsim_code = exported_outcome(simulation_dir).batsim_exit_code
+        scheduler_code = None
+        if scheduler is not None:
+            try:
+                # The scheduler exits once BatSim closes the socket
+                scheduler_code = scheduler.wait(timeout=settings.SCHEDULER_EXIT_GRACE)
+            except subprocess.TimeoutExpired:
+                self._kill(scheduler)
+                scheduler_code = scheduler.wait()
+        with self._lock:
+            self._processes.pop(handle.experiment_id, None)
+        return ExecutionOutcome(
+            batsim_exit_code=batsim_code,
+            scheduler_exit_code=scheduler_code,
+            limit_exceeded=(
+                CPU_TIME_LIMIT
+                if -signal.SIGXCPU in (batsim_code, scheduler_code)
+                else None
+            ),
+        )
+
+    def _kill(self, process: Process, sig=signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def stop(self, handle: ExecutionHandle):
+        with self._lock:
+            entry = self._processes.get(handle.experiment_id)
+        if entry is None:
+            return  # Already finished
+        processes = [p for p in entry[1:] if p is not None]
+        for process in processes:
+            if process.poll() is None:
+                self._kill(process, signal.SIGTERM)
+                # A stopped group only acts on SIGTERM once continued
+                self._kill(process, signal.SIGCONT)
+        # Escalate if either side ignores SIGTERM
+        for process in processes:
+            try:
+                process.wait(timeout=settings.SCHEDULER_EXIT_GRACE)
+            except subprocess.TimeoutExpired:
+                self._kill(process)
+
+    def _signal_all(self, handle: ExecutionHandle, sig):
+        _, batsim, scheduler = self._get(handle)
+        # Scheduler first on pause and BatSim first on resume, so neither
+        # side times out waiting for the other
+        processes = [scheduler, batsim]
+        if sig == signal.SIGCONT:
+            processes.reverse()
+        for process in processes:
+            if process is not None and process.poll() is None:
+                self._kill(process, sig)
+
+    def pause(self, handle: ExecutionHandle):
+        self._signal_all(handle, signal.SIGSTOP)
+
+    def resume(self, handle: ExecutionHandle):
+        self._signal_all(handle, signal.SIGCONT)
+
+    def usage(self, handle: ExecutionHandle) -> Optional[ResourceUsage]:
+        with self._lock:
+            entry = self._processes.get(handle.experiment_id)
+        if entry is None:
+            return None
+        cpu_seconds = memory = 0.0
+        for process in entry[1:]:
+            if process is None:
+                continue
+            try:
+                root = psutil.Process(process.pid)
+                tree = [root] + root.children(recursive=True)
+            except psutil.Error:
+                continue
+            for member in tree:
+                try:
+                    times = member.cpu_times()
+                    # Children it already reaped count through it
+                    cpu_seconds += (
+                        times.user
+                        + times.system
+                        + times.children_user
+                        + times.children_system
+                    )
+                    memory += member.memory_info().rss
+                except psutil.Error:
+                    continue
+        return ResourceUsage(cpu_seconds=cpu_seconds, memory_mb=memory / (1024 * 1024))
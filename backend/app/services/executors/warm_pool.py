@@ -0,0 +1,419 @@
+"""
+Pool of pre-warmed Python workers for the local executor
+
+Starting a simulation side costs an interpreter start plus importing
+pybatsim (or the replay engine) and their dependencies, which dominates
+runs of a few milliseconds. With the pool, the executor starts one
+zygote process that imports WARM_POOL_PRELOAD once and keeps
+WARM_POOL_SIZE idle workers forked from itself. Each run is handed to an
+idle worker, which moves to the run's directory, environment and log
+file, imports the strategy and runs the command in-process. A worker
+runs a single job and exits, so runs never share an interpreter; the
+zygote forks a replacement at once (a copy-on-write fork, not a new
+interpreter).
+
+Only Python commands can be run this way: `{python} -m module ...` and
+console scripts (such as `pybatsim`) of installed distributions. Anything
+else, or a pool that is not up, falls back to a regular process.
+
+Workers are children of the zygote, which relays their exit codes;
+they run in their own session, so process-group signals, rlimits and
+usage sampling work as for regular processes. Protocol, one line each:
+
+    portal -> zygote   {"id": ..., "module" | "entry_point": ..., "args": [...],
+                        "cwd": ..., "env": {...}, "log": ...}
+    zygote -> portal   started <id> <pid> | failed <id> <error> | exited <pid> <code>
+
+This file runs as a script in the zygote, so it imports only the
+standard library at the top level.
+"""
+
+import atexit
+import json
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Seconds to wait for the zygote to hand a job to a worker
+START_TIMEOUT = 10.0
+# How often a waiter re-checks a run whose zygote died
+ORPHAN_POLL_INTERVAL = 0.5
+
+
+def python_target(argv: List[str]) -> Optional[dict]:
+    """What a pool worker would run for `argv`; None if it cannot"""
+    if len(argv) >= 3 and argv[0] == sys.executable and argv[1] == "-m":
+        return {"module": argv[2], "args": argv[3:]}
+    name = os.path.basename(argv[0]) if argv else ""
+    for entry in entry_points(group="console_scripts", name=name):
+        return {"entry_point": entry.value, "args": argv[1:], "name": name}
+    return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class PooledProcess:
+    """Popen-like handle of a run in a pool worker"""
+
+    def __init__(self, pool: "WarmPool", pid: int):
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self._pool = pool
+        self._exited = threading.Event()
+
+    def _set_exited(self, returncode: Optional[int]):
+        self.returncode = returncode
+        self._exited.set()
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = ORPHAN_POLL_INTERVAL
+            if deadline is not None:
+                remaining = min(remaining, max(deadline - time.monotonic(), 0))
+            if self._exited.wait(remaining):
+                return self.returncode
+            if self._pool.lost(self) and not _pid_alive(self.pid):
+                # The zygote died first: the exit code is gone
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+
+
+class WarmPool:
+    """Portal side of the pool: talks to the zygote, restarting it if needed"""
+
+    def __init__(self, size: int, preload: List[str], env: Dict[str, str]):
+        self.size = size
+        self.preload = preload
+        # Environment of the zygote; a job brings its own
+        self._env = env
+        self._lock = threading.Lock()
+        self._zygote: Optional[subprocess.Popen] = None
+        self._next_id = 0
+        # job id -> (event, [process or error])
+        self._starting: Dict[int, Tuple[threading.Event, list]] = {}
+        # pid -> process, for runs of the current zygote
+        self._running: Dict[int, PooledProcess] = {}
+        self._orphans = set()
+        self.hits = 0
+        self.misses = 0
+        self._ensure_zygote()
+
+    def _ensure_zygote(self) -> Optional[subprocess.Popen]:
+        with self._lock:
+            if self._zygote is not None and self._zygote.poll() is None:
+                return self._zygote
+            try:
+                self._zygote = subprocess.Popen(
+                    [
+                        sys.executable,
+                        os.path.abspath(__file__),
+                        str(self.size),
+                        *self.preload,
+                    ],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    env=self._env,
+                    start_new_session=True,
+                )
+            except OSError as e:
+                print(f"[ERROR] Warm pool: {e}")
+                self._zygote = None
+                return None
+            zygote = self._zygote
+        threading.Thread(
+            target=self._read, args=(zygote,), name="warm-pool", daemon=True
+        ).start()
+        return zygote
+
+    def _read(self, zygote: subprocess.Popen):
+        for line in zygote.stdout:
+            kind, _, rest = line.decode(errors="replace").strip().partition(" ")
+            if kind == "started":
+                job_id, pid = (int(part) for part in rest.split())
+                process = PooledProcess(self, pid)
+                with self._lock:
+                    self._running[pid] = process
+                    waiter = self._starting.pop(job_id, None)
+                if waiter is not None:
+                    waiter[1].append(process)
+                    waiter[0].set()
+            elif kind == "failed":
+                job_id, _, error = rest.partition(" ")
+                with self._lock:
+                    waiter = self._starting.pop(int(job_id), None)
+                if waiter is not None:
+                    waiter[1].append(error)
+                    waiter[0].set()
+            elif kind == "exited":
+                pid, code = (int(part) for part in rest.split())
+                with self._lock:
+                    process = self._running.pop(pid, None)
+                if process is not None:
+                    process._set_exited(code)
+        # The zygote is gone: its running workers are orphans now
+        with self._lock:
+            self._orphans.update(self._running.values())
+            self._running.clear()
+            starting, self._starting = self._starting, {}
+        for event, result in starting.values():
+            result.append("Warm pool stopped")
+            event.set()
+
+    def lost(self, process: PooledProcess) -> bool:
+        with self._lock:
+            return process in self._orphans
+
+    def run(
+        self, argv: List[str], cwd: str, env: Dict[str, str], log_path: str
+    ) -> Optional[PooledProcess]:
+        """Hand `argv` to an idle worker; None if it cannot be pooled"""
+        target = python_target(argv)
+        zygote = self._ensure_zygote() if target is not None else None
+        if zygote is None:
+            self.misses += 1
+            return None
+        waiter = (threading.Event(), [])
+        with self._lock:
+            self._next_id += 1
+            job_id = self._next_id
+            self._starting[job_id] = waiter
+        job = {**target, "id": job_id, "cwd": cwd, "env": env, "log": log_path}
+        try:
+            zygote.stdin.write(json.dumps(job).encode() + b"\n")
+            zygote.stdin.flush()
+        except (OSError, ValueError):
+            pass  # Reported by the reader as the zygote goes away
+        if not waiter[0].wait(START_TIMEOUT) or not isinstance(
+            waiter[1][0], PooledProcess
+        ):
+            with self._lock:
+                self._starting.pop(job_id, None)
+            reason = waiter[1][0] if waiter[1] else "timed out"
+            print(f"[WARN] Warm pool could not start {argv[0]}: {reason}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return waiter[1][0]
+
+    def shutdown(self):
+        """Stop the zygote and its idle workers; running jobs carry on"""
+        with self._lock:
+            zygote, self._zygote = self._zygote, None
+        if zygote is not None:
+            try:
+                zygote.stdin.close()
+            except OSError:
+                pass
+            zygote.wait()
+
+
+# -- zygote and worker side --------------------------------------------------
+
+
+def _exit_code(code) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_job(job: dict) -> int:
+    os.chdir(job["cwd"])
+    os.environ.clear()
+    os.environ.update(job["env"])
+    # PYTHONPATH was read when the zygote started; apply the job's
+    for path in reversed(job["env"].get("PYTHONPATH", "").split(os.pathsep)):
+        if path and path not in sys.path:
+            sys.path.insert(0, path)
+    log = os.open(job["log"], os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    os.dup2(log, 1)
+    os.dup2(log, 2)
+    os.close(log)
+
+    if "module" in job:
+        import runpy
+
+        sys.argv = [job["module"], *job["args"]]
+        # Like `python -m`: the working directory comes first on the path
+        sys.path.insert(0, os.getcwd())
+        runpy.run_module(job["module"], run_name="__main__", alter_sys=True)
+        return 0
+    module, _, attribute = job["entry_point"].partition(":")
+    target = import_module(module.strip())
+    for part in attribute.strip().split("."):
+        target = getattr(target, part)
+    sys.argv = [job["name"], *job["args"]]
+    return _exit_code(target())
+
+
+def _worker(job_fd: int):
+    """In a freshly forked worker: wait for a job and run it, then exit"""
+    code = 0
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(job_fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        os.close(job_fd)
+        if chunks:
+            code = _run_job(json.loads(b"".join(chunks)))
+    except SystemExit as e:
+        code = _exit_code(e.code)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            # os._exit() skips interpreter shutdown: run the handlers the
+            # job registered (strategies write their logs from them)
+            atexit._run_exitfuncs()
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _fork_worker() -> Tuple[int, int]:
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            os.setsid()
+            # Drop the zygote's pipes so the portal sees it exit, and
+            # other workers' job pipes so they see their end of input
+            null = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(null, fd)
+            os.closerange(3, read_fd)
+            os.closerange(read_fd + 1, os.sysconf("SC_OPEN_MAX"))
+            sys.stdin = open(0, closefd=False)
+            sys.stdout = open(1, "w", closefd=False)
+            sys.stderr = open(2, "w", closefd=False)
+            # Only the job's own exit handlers run when the worker ends
+            atexit._clear()
+        except BaseException:
+            os._exit(1)
+        _worker(read_fd)
+    os.close(read_fd)
+    return pid, write_fd
+
+
+def serve(size: int, preload: List[str]):
+    """Zygote main loop"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [path for path in sys.path if os.path.abspath(path or ".") != here]
+    for module in preload:
+        try:
+            import_module(module)
+        except Exception:
+            pass  # Optional: pybatsim is absent in replay-only setups
+
+    out = os.fdopen(1, "wb", buffering=0)
+
+    def emit(line: str):
+        out.write(line.encode() + b"\n")
+
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    idle: Deque[Tuple[int, int]] = deque()
+    idle_pids = set()
+
+    def fill():
+        while len(idle) < size:
+            pid, write_fd = _fork_worker()
+            idle.append((pid, write_fd))
+            idle_pids.add(pid)
+
+    def reap():
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in idle_pids:
+                # Died while idle
+                idle_pids.discard(pid)
+                for entry in list(idle):
+                    if entry[0] == pid:
+                        idle.remove(entry)
+                        os.close(entry[1])
+                continue
+            emit(f"exited {pid} {os.waitstatus_to_exitcode(status)}")
+
+    def dispatch(line: bytes):
+        job = json.loads(line)
+        if not idle:
+            fill()
+        pid, write_fd = idle.popleft()
+        idle_pids.discard(pid)
+        try:
+            os.write(write_fd, line)
+        except OSError as e:
+            emit(f"failed {job['id']} {e}")
+            return
+        finally:
+            os.close(write_fd)
+        emit(f"started {job['id']} {pid}")
+
+    fill()
+    selector = selectors.DefaultSelector()
+    selector.register(0, selectors.EVENT_READ)
+    selector.register(wakeup_read, selectors.EVENT_READ)
+    pending = b""
+    while True:
+        for key, _ in selector.select():
+            if key.fd == wakeup_read:
+                os.read(wakeup_read, 4096)
+                reap()
+                continue
+            data = os.read(0, 65536)
+            if not data:
+                # The portal went away: idle workers exit on end of input
+                for _, write_fd in idle:
+                    os.close(write_fd)
+                return
+            pending += data
+            while b"\n" in pending:
+                line, pending = pending.split(b"\n", 1)
+                if line.strip():
+                    dispatch(line)
+        reap()
+        fill()
+
+
+if __name__ == "__main__":
+    serve(max(int(sys.argv[1]), 1), sys.argv[2:])
@@ -0,0 +1,513 @@
+"""
+Experiment preparation and supervision
+
+`prepare_simulation()` copies an experiment's inputs into its simulation
+directory. `supervisor.submit()` then launches it through the configured
+executor on a background thread, records the process or container ids,
+waits for both sides to exit, archives the logs into the log store and
+writes the final status and exit codes back to the database. A running
+experiment can be paused in place; it then gives up its slot. After a
+restart, `supervisor.adopt()` takes over the runs still in flight.
+
+Runs are bounded by the CPU, memory and wall-clock limits of
+`resource_limits()`. The executor enforces what it can natively; a
+watchdog thread samples every run's usage, kills the ones over a limit
+and keeps their peaks, which are written to the experiment.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.services.executors import (
+    ExecutionHandle,
+    ExecutionOutcome,
+    ExecutionSpec,
+    Executor,
+    ExecutorError,
+    ResourceLimits,
+    get_executor,
+)
+from app.services.executors.base import (
+    BATSIM_LOG,
+    CPU_TIME_LIMIT,
+    EXPERIMENT_CONFIG,
+    EXPERIMENT_CONFIG_ENV,
+    MEMORY_LIMIT,
+    SCHEDULER_LOG,
+    WALL_CLOCK_LIMIT,
+    exported_outcome,
+)
+from app.services.log_store import LogStore
+
+# Helper modules the sample strategies import from their own directory
+SAMPLE_STRATEGIES_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "samples", "strategies")
+)
+STRATEGY_HELPERS = ("event_log.py", "instrumentation.py", "utils.py")
+
+# Keys of the experiment config's "limits" object and their defaults
+LIMIT_SETTINGS = {
+    "cpu_seconds": "EXPERIMENT_CPU_SECONDS",
+    "memory_mb": "EXPERIMENT_MEMORY_MB",
+    "wall_clock_seconds": "EXPERIMENT_WALL_CLOCK_SECONDS",
+}
+
+
+def simulation_dir_for(experiment_id: int) -> str:
+    return os.path.join(settings.STORAGE_PATH, "experiments", f"exp_{experiment_id}")
+
+
+def copy_strategy_helpers(directory: str):
+    """Copy the helper modules of the sample strategies into `directory`"""
+    for helper in STRATEGY_HELPERS:
+        source = os.path.join(SAMPLE_STRATEGIES_DIR, helper)
+        if os.path.exists(source):
+            shutil.copyfile(source, os.path.join(directory, helper))
+
+
+def prepare_simulation(exp: Experiment) -> ExecutionSpec:
+    """
+    Copy the platform, workload and strategy of `exp` into its simulation
+    directory, write its config next to them and describe the run. Raises
+    ValueError on missing inputs.
+    """
+    if not exp.scenario or not exp.scenario.platform or not exp.scenario.workload:
+        raise ValueError("Invalid scenario configuration")
+    if not exp.strategy:
+        raise ValueError("Invalid strategy")
+
+    simulation_dir = os.path.abspath(simulation_dir_for(exp.id))
+    os.makedirs(simulation_dir, exist_ok=True)
+    inputs = {
+        "platform.xml": ("Platform", exp.scenario.platform.file_path),
+        "workload.json": ("Workload", exp.scenario.workload.file_path),
+        "strategy.py": ("Strategy", exp.strategy.file_path),
+    }
+    for filename, (kind, source) in inputs.items():
+        if not source or not os.path.exists(source):
+            raise ValueError(f"{kind} file not found")
+        shutil.copyfile(source, os.path.join(simulation_dir, filename))
+    copy_strategy_helpers(simulation_dir)
+    with open(os.path.join(simulation_dir, EXPERIMENT_CONFIG), "w") as f:
+        f.write(exp.config or "{}")
+
+    return execution_spec_for(exp.id, simulation_dir, resource_limits(exp.config))
+
+
+def resource_limits(config) -> ResourceLimits:
+    """
+    Limits of a run: the "limits" object of the experiment config (a dict
+    or its JSON) over the EXPERIMENT_* defaults; 0 is unlimited. Raises
+    ValueError if it is malformed.
+    """
+    if isinstance(config, str):
+        config = json.loads(config)
+    overrides = (config or {}).get("limits") or {}
+    if not isinstance(overrides, dict):
+        raise ValueError('"limits" must be an object')
+    unknown = sorted(set(overrides) - set(LIMIT_SETTINGS))
+    if unknown:
+        raise ValueError(f"Unknown limits: {', '.join(unknown)}")
+    values = {}
+    for name, setting in LIMIT_SETTINGS.items():
+        value = overrides.get(name)
+        if value is None:
+            value = getattr(settings, setting)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            raise ValueError(f"Limit {name} must be a non-negative number")
+        values[name] = float(value) or None
+    return ResourceLimits(**values)
+
+
+def archive_logs(experiment_id: int, simulation_dir: str):
+    """Move the plain batsim and scheduler logs into the log store"""
+    for stream, filename in (("batsim", BATSIM_LOG), ("scheduler", SCHEDULER_LOG)):
+        LogStore.for_experiment(experiment_id, stream).import_file(
+            os.path.join(simulation_dir, filename), remove=True
+        )
+
+
+def log_error(experiment_id: int, error: str):
+    """Record a portal-side failure at the end of the batsim log"""
+    LogStore.for_experiment(experiment_id, "batsim").append_text(f"[ERROR] {error}")
+
+
+def execution_spec_for(
+    experiment_id: int, simulation_dir: str, limits: Optional[ResourceLimits] = None
+) -> ExecutionSpec:
+    """Describe the run of an already prepared simulation directory"""
+    env = {}
+    config_file = os.path.join(simulation_dir, EXPERIMENT_CONFIG)
+    if os.path.exists(config_file):
+        with open(config_file) as f:
+            env[EXPERIMENT_CONFIG_ENV] = f.read()
+    return ExecutionSpec(
+        experiment_id=experiment_id,
+        simulation_dir=simulation_dir,
+        platform_file=os.path.join(simulation_dir, "platform.xml"),
+        workload_file=os.path.join(simulation_dir, "workload.json"),
+        strategy_file=os.path.join(simulation_dir, "strategy.py"),
+        env=env,
+        limits=limits or ResourceLimits(),
+    )
+
+
+def paused_duration(exp: Experiment, now: Optional[datetime] = None) -> float:
+    """Seconds of the current pause of `exp`, 0 if it is not paused"""
+    if exp.paused_at is None:
+        return 0.0
+    now = (now or exp.end_time or datetime.now()).replace(tzinfo=None)
+    return max((now - exp.paused_at.replace(tzinfo=None)).total_seconds(), 0.0)
+
+
+def run_seconds(exp: Experiment, now: Optional[datetime] = None) -> Optional[float]:
+    """Wall-clock time `exp` spent running, excluding pauses"""
+    if exp.start_time is None:
+        return None
+    end = (exp.end_time or now or datetime.now()).replace(tzinfo=None)
+    elapsed = (end - exp.start_time.replace(tzinfo=None)).total_seconds()
+    return max(elapsed - (exp.paused_seconds or 0) - paused_duration(exp, end), 0.0)
+
+
+# Column values of an experiment put back in the queue
+REQUEUED_VALUES = {
+    "status": ExperimentStatus.QUEUED,
+    "worker_id": None,
+    "lease_expires_at": None,
+    "start_time": None,
+    "end_time": None,
+    "paused_at": None,
+    "paused_seconds": 0,
+    "batsim_container_id": None,
+    "pybatsim_container_id": None,
+    "completed_jobs": 0,
+    "progress_percentage": 0,
+    "failure_reason": None,
+    "peak_memory_mb": None,
+    "cpu_time_seconds": None,
+}
+
+
+def requeue(exp: Experiment):
+    """Reset a started experiment to QUEUED, keeping its queue position"""
+    for name, value in REQUEUED_VALUES.items():
+        setattr(exp, name, value)
+
+
+@dataclass
+class SupervisedRun:
+    spec: ExecutionSpec
+    executor: Executor
+    handle: Optional[ExecutionHandle] = None
+    cancelled: bool = False
+    # Stopped to be re-queued rather than cancelled
+    released: bool = False
+    paused: bool = False
+    thread: Optional[threading.Thread] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Seconds spent running, pauses excluded, as of checked_at (monotonic)
+    run_seconds: float = 0.0
+    checked_at: Optional[float] = None
+    peak_memory_mb: float = 0.0
+    cpu_seconds: float = 0.0
+    # Set by the watchdog when it kills the run: (reason, message)
+    limit_exceeded: Optional[tuple] = None
+
+
+class ExperimentSupervisor:
+    """Owns one background thread per running experiment"""
+
+    def __init__(self):
+        self._runs: Dict[int, SupervisedRun] = {}
+        self._lock = threading.Lock()
+        # Set in worker processes: runs are only finalized while the
+        # experiment is still leased to this worker
+        self.worker_id: Optional[str] = None
+        # Called with the experiment id once a run has been finalized
+        self._finished_listeners: List[Callable[[int], None]] = []
+        self._watchdog: Optional[threading.Thread] = None
+
+    def add_finished_listener(self, listener: Callable[[int], None]):
+        self._finished_listeners.append(listener)
+
+    def running_count(self) -> int:
+        """Runs holding an experiment slot; paused runs give theirs up"""
+        with self._lock:
+            return sum(1 for run in self._runs.values() if not run.paused)
+
+    def running_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._runs)
+
+    def is_running(self, experiment_id: int) -> bool:
+        with self._lock:
+            return experiment_id in self._runs
+
+    def get_run(self, experiment_id: int) -> Optional[SupervisedRun]:
+        with self._lock:
+            return self._runs.get(experiment_id)
+
+    def submit(self, spec: ExecutionSpec, executor: Optional[Executor] = None):
+        """Launch and supervise `spec` without blocking the caller"""
+        return self._start(SupervisedRun(spec=spec, executor=executor or get_executor()))
+
+    def adopt(
+        self,
+        spec: ExecutionSpec,
+        executor: Executor,
+        handle: ExecutionHandle,
+        paused: bool = False,
+        run_seconds: float = 0.0,
+    ):
+        """
+        Supervise a run launched by an earlier portal process; one that
+        exited meanwhile is finalized from what it left on disk
+        """
+        return self._start(
+            SupervisedRun(
+                spec=spec,
+                executor=executor,
+                handle=handle,
+                paused=paused,
+                run_seconds=run_seconds,
+            )
+        )
+
+    def _start(self, run: SupervisedRun) -> SupervisedRun:
+        spec = run.spec
+        with self._lock:
+            if spec.experiment_id in self._runs:
+                raise ExecutorError(f"Experiment {spec.experiment_id} is already running")
+            self._runs[spec.experiment_id] = run
+            if self._watchdog is None or not self._watchdog.is_alive():
+                self._watchdog = threading.Thread(
+                    target=self._watch, name="experiment-watchdog", daemon=True
+                )
+                self._watchdog.start()
+        run.thread = threading.Thread(
+            target=self._supervise,
+            args=(run,),
+            name=f"experiment-{spec.experiment_id}",
+            daemon=True,
+        )
+        run.thread.start()
+        return run
+
+    def stop(self, experiment_id: int, release: bool = False) -> bool:
+        """
+        Ask a running experiment to terminate; False if it is not ours.
+        A released experiment goes back to the queue instead of being
+        cancelled.
+        """
+        run = self.get_run(experiment_id)
+        if run is None:
+            return False
+        with run.lock:
+            run.cancelled = True
+            run.released = release
+            handle = run.handle
+        if handle is not None:
+            run.executor.stop(handle)
+        return True
+
+    def pause(self, experiment_id: int) -> bool:
+        """Suspend a running experiment; False if it is not ours"""
+        return self._set_paused(experiment_id, True)
+
+    def resume(self, experiment_id: int) -> bool:
+        """Continue a paused experiment; False if it is not ours"""
+        return self._set_paused(experiment_id, False)
+
+    def _set_paused(self, experiment_id: int, paused: bool) -> bool:
+        run = self.get_run(experiment_id)
+        if run is None:
+            return False
+        with run.lock:
+            if run.handle is None:
+                raise ExecutorError("Experiment is still starting")
+            if run.cancelled:
+                raise ExecutorError("Experiment is being stopped")
+            if run.paused != paused:
+                if paused:
+                    run.executor.pause(run.handle)
+                else:
+                    run.executor.resume(run.handle)
+                run.paused = paused
+        return True
+
+    def _watch(self):
+        """Sample every run's usage and kill the ones over their limits"""
+        while True:
+            time.sleep(settings.EXPERIMENT_LIMIT_CHECK_INTERVAL)
+            with self._lock:
+                runs = list(self._runs.values())
+            for run in runs:
+                try:
+                    self._check(run)
+                except Exception as e:
+                    print(f"[ERROR] Experiment watchdog: {e}")
+
+    def _check(self, run: SupervisedRun):
+        now = time.monotonic()
+        with run.lock:
+            if run.handle is None or run.cancelled or run.limit_exceeded:
+                return
+            if run.checked_at is not None and not run.paused:
+                run.run_seconds += now - run.checked_at
+            run.checked_at = now
+            handle = run.handle
+        usage = run.executor.usage(handle)
+        if usage is not None:
+            run.cpu_seconds = max(run.cpu_seconds, usage.cpu_seconds)
+            run.peak_memory_mb = max(run.peak_memory_mb, usage.memory_mb)
+        limits = run.spec.limits
+        exceeded = None
+        if limits.memory_mb and usage is not None and usage.memory_mb > limits.memory_mb:
+            exceeded = (
+                MEMORY_LIMIT,
+                f"Memory limit exceeded: {usage.memory_mb:.0f} MB "
+                f"of {limits.memory_mb:.0f} MB",
+            )
+        elif limits.cpu_seconds and run.cpu_seconds > limits.cpu_seconds:
+            exceeded = (
+                CPU_TIME_LIMIT,
+                f"CPU time limit of {limits.cpu_seconds:.0f} s exceeded",
+            )
+        elif limits.wall_clock_seconds and run.run_seconds > limits.wall_clock_seconds:
+            exceeded = (
+                WALL_CLOCK_LIMIT,
+                f"Wall-clock limit of {limits.wall_clock_seconds:.0f} s exceeded",
+            )
+        if exceeded is None:
+            return
+        with run.lock:
+            if run.cancelled:
+                return
+            run.limit_exceeded = exceeded
+        print(f"[WARN] Experiment {run.spec.experiment_id}: {exceeded[1]}")
+        # stop() may wait for the grace period; keep sampling the others
+        threading.Thread(
+            target=run.executor.stop,
+            args=(handle,),
+            name=f"experiment-{run.spec.experiment_id}-limit",
+            daemon=True,
+        ).start()
+
+    def _supervise(self, run: SupervisedRun):
+        experiment_id = run.spec.experiment_id
+        try:
+            if run.handle is not None:
+                handle = run.handle
+                if not run.executor.attach(run.spec, handle):
+                    outcome = exported_outcome(run.spec.simulation_dir)
+                    error = None
+                    if not outcome.succeeded:
+                        error = "Experiment died while the portal was down"
+                    self._finish(experiment_id, run, outcome, error=error)
+                    return
+                print(f"[INFO] Re-attached to experiment {experiment_id}")
+            else:
+                try:
+                    handle = run.executor.launch(run.spec)
+                except ExecutorError as e:
+                    self._finish(experiment_id, run, None, error=str(e))
+                    return
+                with run.lock:
+                    run.handle = handle
+                    cancelled = run.cancelled
+                self._record_handle(experiment_id, handle)
+                if cancelled:
+                    # Stopped while launching
+                    run.executor.stop(handle)
+            outcome = run.executor.wait(handle)
+            self._finish(experiment_id, run, outcome)
+        except Exception as e:
+            self._finish(experiment_id, run, None, error=f"Supervisor error: {e}")
+        finally:
+            with self._lock:
+                self._runs.pop(experiment_id, None)
+            for listener in self._finished_listeners:
+                listener(experiment_id)
+
+    def _record_handle(self, experiment_id: int, handle: ExecutionHandle):
+        db = SessionLocal()
+        try:
+            exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+            if exp is not None:
+                exp.batsim_container_id = handle.batsim_id
+                exp.pybatsim_container_id = handle.scheduler_id
+                db.commit()
+        finally:
+            db.close()
+
+    def _finish(
+        self,
+        experiment_id: int,
+        run: SupervisedRun,
+        outcome: Optional[ExecutionOutcome],
+        error: Optional[str] = None,
+    ):
+        db = SessionLocal()
+        try:
+            exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+            if exp is None:
+                return
+            if self.worker_id is not None and exp.worker_id != self.worker_id:
+                # Our lease expired: the experiment was re-queued and its
+                # simulation directory may belong to another run by now
+                return
+            try:
+                archive_logs(experiment_id, run.spec.simulation_dir)
+            except OSError as e:
+                error = ((error or "") + f" Cannot archive logs: {e}").strip()
+            if run.released:
+                error = ((error or "") + " Experiment re-queued").strip()
+            if error:
+                log_error(experiment_id, error)
+            exp.lease_expires_at = None
+            if run.released:
+                requeue(exp)
+                db.commit()
+                return
+            limit_exceeded = run.limit_exceeded
+            if limit_exceeded is None and outcome is not None and outcome.limit_exceeded:
+                limit_exceeded = (
+                    outcome.limit_exceeded,
+                    f"Killed by its {outcome.limit_exceeded.replace('_', ' ')}",
+                )
+            if run.cancelled:
+                exp.status = ExperimentStatus.CANCELLED
+            elif limit_exceeded is not None:
+                exp.status = ExperimentStatus.FAILED
+                exp.failure_reason = limit_exceeded[0]
+                log_error(experiment_id, limit_exceeded[1])
+            elif outcome is not None and outcome.succeeded:
+                exp.status = ExperimentStatus.COMPLETED
+            else:
+                exp.status = ExperimentStatus.FAILED
+            if run.checked_at is not None:
+                exp.peak_memory_mb = round(run.peak_memory_mb, 1)
+                exp.cpu_time_seconds = round(run.cpu_seconds, 3)
+            exp.end_time = exp.end_time or datetime.now()
+            if exp.paused_at is not None:
+                # Stopped or killed while paused
+                exp.paused_seconds = (exp.paused_seconds or 0) + paused_duration(exp)
+                exp.paused_at = None
+            if outcome is not None:
+                exp.batsim_exit_code = outcome.batsim_exit_code
+                exp.pybatsim_exit_code = outcome.scheduler_exit_code
+            db.commit()
+        finally:
+            db.close()
+
+
+supervisor = ExperimentSupervisor()
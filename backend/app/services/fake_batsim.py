@@ -0,0 +1,65 @@
+"""
+Offline stand-in for the batsim binary
+
+Accepts BatSim's command-line flags, but instead of waiting for a
+scheduler on the socket it loads the strategy itself and runs it through
+the replay engine, writing the usual out_jobs.csv / out_schedule.csv.
+Used by the local executor when FAKE_BATSIM is set, so experiments can
+run end to end without BatSim, PyBatsim or Docker.
+
+Usage:
+    python -m app.services.fake_batsim -p platform.xml -w workload.json \\
+        -e out/out --strategy strategy.py
+
+--sleep and --exit-code make it linger or fail on purpose.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from app.services.replay import replay
+
+STRATEGY_ENV = "BATSIM_STRATEGY"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fake batsim backed by the replay engine")
+    parser.add_argument("-p", "--platform", required=True)
+    parser.add_argument("-w", "--workload", required=True)
+    parser.add_argument("-e", "--export", default="out")
+    parser.add_argument("-s", "--socket-endpoint", help="Ignored")
+    parser.add_argument(
+        "--strategy",
+        default=os.environ.get(STRATEGY_ENV),
+        help=f"Strategy .py file (default: ${STRATEGY_ENV})",
+    )
+    parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to linger")
+    parser.add_argument("--exit-code", type=int, default=0, help="Exit with this code")
+    args, unknown = parser.parse_known_args(argv)
+
+    if not args.strategy:
+        print("[fake-batsim] No strategy given", file=sys.stderr)
+        return 2
+    if unknown:
+        print(f"[fake-batsim] Ignoring options: {' '.join(unknown)}")
+
+    print(f"[fake-batsim] Platform: {args.platform}")
+    print(f"[fake-batsim] Workload: {args.workload}")
+    print(f"[fake-batsim] Strategy: {args.strategy}", flush=True)
+    started = time.perf_counter()
+    summary = replay(args.workload, args.strategy, args.export, args.platform)
+    print(
+        f"[fake-batsim] Simulation ended: {summary['nb_jobs_finished']}"
+        f"/{summary['nb_jobs']} jobs finished, makespan {summary['makespan']:.1f}"
+        f" in {time.perf_counter() - started:.2f}s",
+        flush=True,
+    )
+    if args.sleep:
+        time.sleep(args.sleep)
+    return args.exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
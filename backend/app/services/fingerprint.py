@@ -0,0 +1,216 @@
+"""
+Simulation result memoization
+
+BatSim with a deterministic strategy is reproducible, so an experiment
+whose inputs match an already completed one does not need to run again.
+`experiment_fingerprint()` hashes everything that determines the output:
+workload and platform bytes, the strategy file together with the helper
+modules shipped next to it, the experiment `config` and the simulator
+versions: the image ids in docker mode, the digests of the BatSim and
+scheduler executables (and the installed PyBatsim version) in local mode.
+When those cannot be resolved nothing is memoized. `find_cached_result()`
+returns the Result of a completed experiment with the same fingerprint.
+
+File digests are cached per (path, size, mtime), so fingerprinting a
+large sweep over the same inputs reads every file once.
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import sys
+import threading
+from importlib import metadata
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.result import Result
+from app.models.scenario import Scenario
+from app.models.strategy import Strategy
+from app.services.executors import get_executor
+from app.services.experiment_runner import SAMPLE_STRATEGIES_DIR, STRATEGY_HELPERS
+
+# Bump when the fingerprint layout changes, invalidating old entries
+FINGERPRINT_VERSION = 2
+
+REPLAY_ENGINE_FILE = os.path.join(os.path.dirname(__file__), "replay.py")
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    forced_reruns: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, hit: bool, forced: bool = False, count: int = 1):
+        with self.lock:
+            if forced:
+                self.forced_reruns += count
+            elif hit:
+                self.hits += count
+            else:
+                self.misses += count
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "forced_reruns": self.forced_reruns,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+cache_stats = CacheStats()
+
+_digests: Dict[str, Tuple[int, int, str]] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: Optional[str]) -> Optional[str]:
+    """sha256 of a file, or None if it does not exist"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    with _digests_lock:
+        cached = _digests.get(path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    with _digests_lock:
+        _digests[path] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+
+def executable_version(template: str) -> Optional[dict]:
+    """A command template with the digest of the program it starts"""
+    if not template:
+        return {"command": None}
+    program = shlex.split(template)[0].replace("{python}", sys.executable)
+    digest = file_digest(shutil.which(program))
+    if digest is None:
+        return None
+    return {"command": template, "executable": digest}
+
+
+def package_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def simulator_versions() -> Optional[dict]:
+    """
+    What runs the simulation, as far as it can change the output; None if
+    it cannot be determined (an image not pulled, a missing executable)
+    """
+    if settings.FAKE_BATSIM:
+        return {"batsim": "fake", "replay_engine": file_digest(REPLAY_ENGINE_FILE)}
+    if settings.EXECUTOR_BACKEND == "docker":
+        docker = get_executor("docker")
+        versions = {
+            "batsim": docker.image_id(settings.BATSIM_IMAGE),
+            "pybatsim": docker.image_id(settings.PYBATSIM_IMAGE),
+        }
+        required = list(versions.values())
+    else:
+        versions = {
+            "batsim": executable_version(settings.BATSIM_COMMAND),
+            "scheduler": executable_version(settings.SCHEDULER_COMMAND),
+            # Absent when the scheduler is not built on PyBatsim
+            "pybatsim": package_version("pybatsim"),
+        }
+        required = [versions["batsim"], versions["scheduler"]]
+    return None if None in required else versions
+
+
+def input_digests(scenario: Scenario, strategy: Strategy) -> Optional[dict]:
+    """Digests of the input files of a scenario/strategy pair, None if missing"""
+    if not scenario or not scenario.platform or not scenario.workload or not strategy:
+        return None
+    digests = {
+        "workload": file_digest(scenario.workload.file_path),
+        "platform": file_digest(scenario.platform.file_path),
+        "strategy": file_digest(strategy.file_path),
+    }
+    if None in digests.values():
+        return None
+    digests["strategy_helpers"] = {
+        helper: file_digest(os.path.join(SAMPLE_STRATEGIES_DIR, helper))
+        for helper in STRATEGY_HELPERS
+    }
+    return digests
+
+
+def fingerprint(digests: dict, config: Optional[str], simulator: dict) -> str:
+    """Combine input digests, the JSON `config` and simulator versions"""
+    try:
+        config_value = json.loads(config) if config else None
+    except ValueError:
+        config_value = config
+    payload = {
+        "version": FINGERPRINT_VERSION,
+        "inputs": digests,
+        "config": config_value or None,
+        "simulator": simulator,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def experiment_fingerprint(exp: Experiment) -> Optional[str]:
+    digests = input_digests(exp.scenario, exp.strategy)
+    if digests is None:
+        return None
+    simulator = simulator_versions()
+    if simulator is None:
+        return None
+    return fingerprint(digests, exp.config, simulator)
+
+
+def find_cached_result(db: Session, fingerprint_value: str) -> Optional[Result]:
+    """Latest Result of a completed experiment with this fingerprint"""
+    return (
+        db.query(Result)
+        .join(Experiment, Experiment.id == Result.experiment_id)
+        .filter(Result.fingerprint == fingerprint_value)
+        .filter(Experiment.status == ExperimentStatus.COMPLETED)
+        .order_by(Result.id.desc())
+        .first()
+    )
+
+
+def complete_from_cache(exp: Experiment, result: Result):
+    """Finish `exp` instantly by linking it to an existing result"""
+    now = datetime.now()
+    source = result.experiment
+    exp.status = ExperimentStatus.COMPLETED
+    exp.cached_result_id = result.id
+    exp.start_time = now
+    exp.end_time = now
+    exp.queued_at = None
+    exp.total_jobs = source.total_jobs if source else result.total_jobs
+    exp.completed_jobs = (
+        source.completed_jobs if source else result.completed_jobs
+    ) or 0
+    exp.progress_percentage = 100
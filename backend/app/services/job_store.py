@@ -0,0 +1,325 @@
+"""
+Columnar per-job result data
+
+The per-job rows of a result (BatSim's out_jobs.csv) are converted once,
+at ingest, into one typed columnar file:
+
+    results/result_<id>.jobs
+
+The file is MAGIC, the length of a JSON header, the header, then the
+arrays, each aligned on ALIGNMENT bytes (header offsets count from the
+first one). Columns keep their CSV order and are encoded by kind:
+
+- plain: fixed-width numbers, float64 times and energies, int32
+  resource counts, int8 flags (empty fields are NaN, or -1 for ints)
+- dictionary: final_state, workload_name and profile as codes into the
+  list of distinct values held in the header
+- intervals: allocated_resources as (first, last) int32 pairs, plus the
+  offset of each job's first pair
+- strings: job_id, metadata and unknown columns as UTF-8 bytes plus
+  offsets
+
+Reads memory-map the file, so loading a column only touches its own
+pages: the waiting times of a million jobs are a view over 8 MB.
+"""
+
+import csv
+import json
+import os
+import struct
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, IO, Iterable, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+MAGIC = b"BSJOBS1\n"
+ALIGNMENT = 64
+SUFFIX = ".jobs"
+# Converted by the pipeline, not yet attached to a Result
+PENDING_PREFIX = "pending_"
+
+FLOAT_COLUMNS = (
+    "submission_time",
+    "requested_time",
+    "starting_time",
+    "execution_time",
+    "finish_time",
+    "waiting_time",
+    "turnaround_time",
+    "stretch",
+    "consumed_energy",
+)
+INT_COLUMNS = {"requested_number_of_resources": "<i4", "success": "i1"}
+DICTIONARY_COLUMNS = ("final_state", "workload_name", "profile")
+INTERVAL_COLUMNS = ("allocated_resources",)
+
+_LENGTH = struct.Struct("<Q")
+
+
+def _aligned(size: int) -> int:
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def jobs_dir() -> str:
+    return os.path.join(settings.STORAGE_PATH, "results")
+
+
+def result_jobs_path(result_id: int) -> str:
+    return os.path.join(jobs_dir(), f"result_{result_id}{SUFFIX}")
+
+
+def pending_jobs_path() -> str:
+    return os.path.join(jobs_dir(), f"{PENDING_PREFIX}{uuid.uuid4().hex}{SUFFIX}")
+
+
+def delete_result_jobs(result_id: int):
+    try:
+        os.remove(result_jobs_path(result_id))
+    except FileNotFoundError:
+        pass
+
+
+@dataclass
+class Column:
+    name: str
+    encoding: str
+    arrays: Dict[str, np.ndarray]
+    # Distinct values of a dictionary column, indexed by code
+    values: List[str] = field(default_factory=list)
+
+
+def _floats(values: List[str]) -> np.ndarray:
+    try:
+        return np.array(values, dtype="<f8")
+    except ValueError:
+        return np.array([float(v) if v else np.nan for v in values], dtype="<f8")
+
+
+def _ints(values: List[str], dtype: str) -> np.ndarray:
+    return np.array([int(float(v)) if v else -1 for v in values], dtype=dtype)
+
+
+def _codes(count: int) -> str:
+    if count <= 1 << 8:
+        return "u1"
+    return "<u2" if count <= 1 << 16 else "<u4"
+
+
+def _dictionary(name: str, values: List[str]) -> Column:
+    index: Dict[str, int] = {}
+    codes = [index.setdefault(v, len(index)) for v in values]
+    return Column(
+        name,
+        "dictionary",
+        {"codes": np.array(codes, dtype=_codes(len(index)))},
+        list(index),
+    )
+
+
+def _intervals(name: str, values: List[str]) -> Column:
+    """BatSim interval sets ("0-3 5") as pairs"""
+    pairs: List[int] = []
+    offsets = [0]
+    for value in values:
+        for part in value.split():
+            first, _, last = part.partition("-")
+            pairs += (int(first), int(last or first))
+        offsets.append(len(pairs) // 2)
+    return Column(
+        name,
+        "intervals",
+        {
+            "offsets": np.array(offsets, dtype="<i8"),
+            "values": np.array(pairs, dtype="<i4").reshape(-1, 2),
+        },
+    )
+
+
+def _strings(name: str, values: List[str]) -> Column:
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(v) for v in encoded], out=offsets[1:])
+    return Column(
+        name,
+        "strings",
+        {"offsets": offsets, "values": np.frombuffer(b"".join(encoded), dtype="u1")},
+    )
+
+
+def _encode(name: str, values: List[str]) -> Column:
+    if name in FLOAT_COLUMNS:
+        return Column(name, "plain", {"data": _floats(values)})
+    if name in INT_COLUMNS:
+        return Column(name, "plain", {"data": _ints(values, INT_COLUMNS[name])})
+    if name in DICTIONARY_COLUMNS:
+        return _dictionary(name, values)
+    if name in INTERVAL_COLUMNS:
+        return _intervals(name, values)
+    return _strings(name, values)
+
+
+class JobTable:
+    """The per-job columns of one result, in memory or memory-mapped"""
+
+    def __init__(self, rows: int, columns: List[Column]):
+        self.rows = rows
+        self.columns = {column.name: column for column in columns}
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    @classmethod
+    def from_csv(cls, stream: IO[str]) -> "JobTable":
+        """Encode a jobs CSV; raises ValueError on malformed numbers"""
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return cls(0, [])
+        values: List[List[str]] = [[] for _ in header]
+        appends = [column.append for column in values]
+        width = len(header)
+        for row in reader:
+            if len(row) != width:
+                if not row:
+                    continue
+                raise ValueError(f"Jobs row of {len(row)} fields, expected {width}")
+            for append, value in zip(appends, row):
+                append(value)
+        rows = len(values[0]) if values else 0
+        return cls(rows, [_encode(name, v) for name, v in zip(header, values)])
+
+    @classmethod
+    def open(cls, path: str) -> "JobTable":
+        """Memory-map a file written by save()"""
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a jobs table")
+            (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            header = json.loads(f.read(length))
+        start = _aligned(len(MAGIC) + _LENGTH.size + length)
+        data = np.memmap(path, dtype="u1", mode="r")
+        columns = [
+            Column(
+                spec["name"],
+                spec["encoding"],
+                {
+                    key: np.ndarray(
+                        tuple(array["shape"]),
+                        dtype=array["dtype"],
+                        buffer=data,
+                        offset=start + array["offset"],
+                    )
+                    for key, array in spec["arrays"].items()
+                },
+                spec.get("values", []),
+            )
+            for spec in header["columns"]
+        ]
+        return cls(header["rows"], columns)
+
+    @classmethod
+    def for_result(cls, result_id: int) -> Optional["JobTable"]:
+        path = result_jobs_path(result_id)
+        return cls.open(path) if os.path.exists(path) else None
+
+    def save(self, path: str):
+        """Write atomically: to a temporary name, then renamed"""
+        specs, chunks = [], []
+        position = 0
+        for column in self.columns.values():
+            spec = {"name": column.name, "encoding": column.encoding, "arrays": {}}
+            if column.encoding == "dictionary":
+                spec["values"] = column.values
+            for key, array in column.arrays.items():
+                array = np.ascontiguousarray(array)
+                spec["arrays"][key] = {
+                    "dtype": array.dtype.str,
+                    "shape": list(array.shape),
+                    "offset": position,
+                }
+                chunks.append(array)
+                position += _aligned(array.nbytes)
+            specs.append(spec)
+        header = json.dumps({"rows": self.rows, "columns": specs}).encode("utf-8")
+        start = _aligned(len(MAGIC) + _LENGTH.size + len(header))
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(_LENGTH.pack(len(header)))
+            f.write(header)
+            f.write(b"\0" * (start - f.tell()))
+            for array in chunks:
+                f.write(array.tobytes())
+                f.write(b"\0" * (-array.nbytes % ALIGNMENT))
+        os.replace(temporary, path)
+
+    # -- reads --------------------------------------------------------------
+
+    def _column(self, name: str) -> Column:
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise KeyError(f"No column {name}") from None
+
+    def array(self, name: str) -> np.ndarray:
+        """A numeric column (or a dictionary's codes) without decoding"""
+        column = self._column(name)
+        if column.encoding == "plain":
+            return column.arrays["data"]
+        if column.encoding == "dictionary":
+            return column.arrays["codes"]
+        raise ValueError(f"{name} is not a numeric column")
+
+    def values(self, name: str, start: int = 0, stop: Optional[int] = None) -> list:
+        """Decoded values of rows [start, stop), NaN and -1 as None"""
+        column = self._column(name)
+        stop = self.rows if stop is None else min(stop, self.rows)
+        start = min(start, stop)
+        if column.encoding == "plain":
+            data = column.arrays["data"][start:stop]
+            if data.dtype.kind == "f":
+                return [None if v != v else v for v in data.tolist()]
+            return [None if v < 0 else v for v in data.tolist()]
+        if column.encoding == "dictionary":
+            names = column.values
+            return [names[code] for code in column.arrays["codes"][start:stop].tolist()]
+        offsets = column.arrays["offsets"][start : stop + 1].tolist()
+        if column.encoding == "intervals":
+            pairs = column.arrays["values"][offsets[0] : offsets[-1]].tolist()
+            base = offsets[0]
+            return [
+                " ".join(
+                    str(first) if first == last else f"{first}-{last}"
+                    for first, last in pairs[begin - base : end - base]
+                )
+                for begin, end in zip(offsets, offsets[1:])
+            ]
+        raw = column.arrays["values"][offsets[0] : offsets[-1]].tobytes()
+        base = offsets[0]
+        return [
+            raw[begin - base : end - base].decode("utf-8")
+            for begin, end in zip(offsets, offsets[1:])
+        ]
+
+    def write_csv(
+        self,
+        stream: IO[str],
+        columns: Optional[Iterable[str]] = None,
+        start: int = 0,
+        stop: Optional[int] = None,
+        header: bool = True,
+    ):
+        columns = list(columns or self.names)
+        writer = csv.writer(stream, lineterminator="\n")
+        if header:
+            writer.writerow(columns)
+        decoded = [self.values(name, start, stop) for name in columns]
+        writer.writerows(
+            ["" if v is None else v for v in row] for row in zip(*decoded)
+        )
@@ -0,0 +1,377 @@
+"""
+Compressed, range-addressable log storage
+
+Each log stream (an experiment's batsim or scheduler output, a result's
+log) is a directory of gzip segments plus an index.json:
+
+    logs/experiments/exp_<id>/batsim/00000.log.gz
+                                     00001.log.gz
+                                     index.json
+
+Segments hold at most LOG_SEGMENT_BYTES of uncompressed output and are
+never rewritten. Every LOG_INDEX_INTERVAL lines a segment starts a new
+gzip member (the file stays one valid .gz), and the index records, per
+segment, its first line and byte and a checkpoint (line, uncompressed
+offset, compressed offset) per member. A tail, a line range or a byte
+range seeks the file to the nearest member and decompresses from there,
+at most LOG_INDEX_INTERVAL lines more than it returns.
+
+Logs of a running experiment are still plain files in its simulation
+directory; RawLog serves the same queries from them.
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+INDEX_FILENAME = "index.json"
+SEGMENT_SUFFIX = ".log.gz"
+
+EXPERIMENT_STREAMS = ("batsim", "scheduler")
+RESULT_STREAM = "logs"
+
+_COPY_CHUNK = 1024 * 1024
+
+
+def experiment_log_dir(experiment_id: int) -> str:
+    return os.path.join(
+        settings.STORAGE_PATH, "logs", "experiments", f"exp_{experiment_id}"
+    )
+
+
+def result_log_dir(result_id: int) -> str:
+    return os.path.join(
+        settings.STORAGE_PATH, "logs", "results", f"result_{result_id}"
+    )
+
+
+def delete_experiment_logs(experiment_id: int):
+    shutil.rmtree(experiment_log_dir(experiment_id), ignore_errors=True)
+
+
+def _decode(line: bytes) -> str:
+    return line.rstrip(b"\n").decode("utf-8", errors="replace")
+
+
+class LogStore:
+    """One log stream stored as compressed segments"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self._index = None
+
+    @classmethod
+    def for_experiment(cls, experiment_id: int, stream: str) -> "LogStore":
+        return cls(os.path.join(experiment_log_dir(experiment_id), stream))
+
+    @classmethod
+    def for_result(cls, result_id: int) -> "LogStore":
+        return cls(os.path.join(result_log_dir(result_id), RESULT_STREAM))
+
+    # -- index --------------------------------------------------------------
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            try:
+                with open(self.index_path) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {"segments": [], "total_lines": 0, "total_bytes": 0}
+        return self._index
+
+    def exists(self) -> bool:
+        return bool(self.index["segments"])
+
+    @property
+    def total_lines(self) -> int:
+        return self.index["total_lines"]
+
+    @property
+    def total_bytes(self) -> int:
+        return self.index["total_bytes"]
+
+    def compressed_bytes(self) -> int:
+        return sum(
+            os.path.getsize(os.path.join(self.directory, segment["file"]))
+            for segment in self.index["segments"]
+            if os.path.exists(os.path.join(self.directory, segment["file"]))
+        )
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    # -- writing ------------------------------------------------------------
+
+    def append_lines(self, lines) -> int:
+        """Append byte lines as new segments; returns the bytes written"""
+        os.makedirs(self.directory, exist_ok=True)
+        index = self.index
+        segment_limit = settings.LOG_SEGMENT_BYTES
+        interval = settings.LOG_INDEX_INTERVAL
+        written = 0
+        segment = raw = out = None
+        try:
+            for line in lines:
+                if not line:
+                    continue
+                if not line.endswith(b"\n"):
+                    # Keeps line numbering intact across segments
+                    line += b"\n"
+                if segment is not None and segment["bytes"] >= segment_limit:
+                    out.close()
+                    raw.close()
+                    raw = out = segment = None
+                if segment is None:
+                    segment = {
+                        "file": f"{len(index['segments']):05d}{SEGMENT_SUFFIX}",
+                        "first_line": index["total_lines"],
+                        "first_byte": index["total_bytes"],
+                        "lines": 0,
+                        "bytes": 0,
+                        "checkpoints": [],
+                    }
+                    index["segments"].append(segment)
+                    raw = open(os.path.join(self.directory, segment["file"]), "wb")
+                if segment["lines"] % interval == 0:
+                    # A new member, so readers can start decompressing here
+                    if out is not None:
+                        out.close()
+                    segment["checkpoints"].append(
+                        [segment["lines"], segment["bytes"], raw.tell()]
+                    )
+                    out = gzip.GzipFile(
+                        fileobj=raw,
+                        mode="wb",
+                        compresslevel=settings.LOG_COMPRESSION_LEVEL,
+                    )
+                out.write(line)
+                segment["lines"] += 1
+                segment["bytes"] += len(line)
+                index["total_lines"] += 1
+                index["total_bytes"] += len(line)
+                written += len(line)
+        finally:
+            if out is not None:
+                out.close()
+            if raw is not None:
+                raw.close()
+            if written:
+                self._save_index()
+        return written
+
+    def append_text(self, text: str) -> int:
+        if not text.endswith("\n"):
+            text += "\n"
+        return self.append_lines(_split_lines(text.encode("utf-8")))
+
+    def import_file(self, path: str, remove: bool = False) -> int:
+        """Compress a plain log file into the store, streaming it"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as f:
+            written = self.append_lines(f)
+        if remove:
+            os.remove(path)
+        return written
+
+    def delete(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._index = None
+
+    # -- reading ------------------------------------------------------------
+
+    def _segments_from_line(self, start_line: int):
+        for segment in self.index["segments"]:
+            if segment["first_line"] + segment["lines"] > start_line:
+                yield segment
+
+    def _open_at(self, segment: dict, position: int, field: int):
+        """
+        The segment decompressed from the last checkpoint whose line
+        (field 0) or uncompressed offset (field 1) is at most `position`,
+        with that checkpoint's line and offset
+        """
+        checkpoint = [0, 0, 0]
+        for candidate in segment["checkpoints"]:
+            # Older indexes have no compressed offsets: read from the start
+            if len(candidate) < 3 or candidate[field] > position:
+                break
+            checkpoint = candidate
+        raw = open(os.path.join(self.directory, segment["file"]), "rb")
+        raw.seek(checkpoint[2])
+        return gzip.GzipFile(fileobj=raw, mode="rb"), raw, checkpoint[0], checkpoint[1]
+
+    def iter_lines(self, start_line: int = 0) -> Iterator[Tuple[int, bytes]]:
+        """(line number, line) from `start_line` to the end"""
+        for segment in self._segments_from_line(start_line):
+            local = max(start_line - segment["first_line"], 0)
+            f, raw, line_no, _ = self._open_at(segment, local, 0)
+            with raw, f:
+                for line in f:
+                    if line_no >= local:
+                        yield segment["first_line"] + line_no, line
+                    line_no += 1
+
+    def read_bytes(self, start: int, end: int) -> bytes:
+        """Uncompressed bytes [start, end)"""
+        chunks = []
+        for segment in self.index["segments"]:
+            segment_start = segment["first_byte"]
+            segment_end = segment_start + segment["bytes"]
+            if segment_end <= start or segment_start >= end:
+                continue
+            local = max(start - segment_start, 0)
+            f, raw, _, offset = self._open_at(segment, local, 1)
+            with raw, f:
+                # Forward seeks within the member decompress, nothing more
+                f.seek(local - offset)
+                chunks.append(f.read(min(end, segment_end) - max(start, segment_start)))
+        return b"".join(chunks)
+
+
+class RawLog:
+    """The same queries over a plain, possibly growing, log file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    total_lines = None
+
+    @property
+    def total_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def compressed_bytes(self) -> Optional[int]:
+        return None
+
+    def iter_lines(self, start_line: int = 0) -> Iterator[Tuple[int, bytes]]:
+        with open(self.path, "rb") as f:
+            for line_no, line in enumerate(f):
+                if line_no >= start_line:
+                    yield line_no, line
+
+    def read_bytes(self, start: int, end: int) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(max(end - start, 0))
+
+    def tail_lines(self, count: int) -> List[bytes]:
+        """Last `count` lines, reading backwards in blocks"""
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= count:
+                step = min(_COPY_CHUNK, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        return _split_lines(data)[-count:] if count else []
+
+
+def _split_lines(data: bytes) -> List[bytes]:
+    lines = data.splitlines(keepends=True)
+    return [line for line in lines if line]
+
+
+def query_log(
+    log,
+    tail: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    start_byte: Optional[int] = None,
+    end_byte: Optional[int] = None,
+    grep: Optional[str] = None,
+    ignore_case: bool = False,
+    limit: Optional[int] = None,
+) -> dict:
+    """
+    Serve one query against a LogStore or RawLog. Exactly one of a tail,
+    a byte range or a line range (the default, from line 0) is used; grep
+    filters the line-based modes. Raises ValueError on bad arguments.
+    """
+    limit = min(limit or settings.LOG_MAX_LINES, settings.LOG_MAX_LINES)
+    response = {
+        "total_lines": log.total_lines,
+        "total_bytes": log.total_bytes,
+    }
+
+    if start_byte is not None or end_byte is not None:
+        if grep:
+            raise ValueError("grep cannot be combined with a byte range")
+        start = start_byte or 0
+        end = end_byte if end_byte is not None else start + settings.LOG_MAX_RANGE_BYTES
+        if start < 0 or end < start:
+            raise ValueError("Invalid byte range")
+        end = min(end, start + settings.LOG_MAX_RANGE_BYTES)
+        data = log.read_bytes(start, end)
+        response.update(
+            {
+                "start_byte": start,
+                "end_byte": start + len(data),
+                "text": data.decode("utf-8", errors="replace"),
+            }
+        )
+        return response
+
+    pattern = None
+    if grep:
+        try:
+            pattern = re.compile(grep.encode(), re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise ValueError(f"Invalid grep pattern: {e}")
+
+    if tail is not None and not pattern:
+        if tail < 0:
+            raise ValueError("tail must be positive")
+        count = min(tail, limit)
+        if isinstance(log, RawLog):
+            lines = log.tail_lines(count)
+            response.update({"start_line": None, "lines": [_decode(line) for line in lines]})
+            return response
+        start_line = max(log.total_lines - count, 0)
+        end_line = None
+
+    start = start_line or 0
+    if start < 0 or (end_line is not None and end_line < start):
+        raise ValueError("Invalid line range")
+    # grep with a tail keeps the last matches of the whole scan
+    matches = deque(maxlen=min(tail, limit)) if pattern and tail is not None else []
+    truncated = False
+    for line_no, line in log.iter_lines(start):
+        if end_line is not None and line_no >= end_line:
+            break
+        if pattern is not None and not pattern.search(line):
+            continue
+        if isinstance(matches, list) and len(matches) >= limit:
+            truncated = True
+            break
+        matches.append((line_no, line))
+
+    response.update(
+        {
+            "start_line": start,
+            "lines": [_decode(line) for _, line in matches],
+            "truncated": truncated,
+        }
+    )
+    if pattern is not None:
+        response["line_numbers"] = [line_no for line_no, _ in matches]
+    return response
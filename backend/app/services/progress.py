@@ -0,0 +1,363 @@
+"""
+Live experiment progress
+
+An asyncio task tails the outputs of every running experiment: the
+scheduler's NDJSON event log and the batsim / scheduler logs. Each file
+is read from the offset where the previous read stopped, so nothing is
+parsed twice. Job completions update an in-memory progress snapshot which
+is pushed to Server-Sent Events subscribers as soon as it changes.
+
+Database writes are coalesced: dirty snapshots are flushed together at
+most once per PROGRESS_FLUSH_INTERVAL, however many events arrive.
+"""
+
+import asyncio
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import bindparam, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.services.event_log import EVENTS_FILENAME
+from app.services.executors.base import BATSIM_LOG, SCHEDULER_LOG
+
+ACTIVE_STATUSES = (
+    ExperimentStatus.QUEUED,
+    ExperimentStatus.RUNNING,
+    ExperimentStatus.PAUSED,
+)
+FINISHED_STATUSES = (
+    ExperimentStatus.COMPLETED,
+    ExperimentStatus.FAILED,
+    ExperimentStatus.CANCELLED,
+)
+
+# Upper bound on what one tick reads from a single file
+MAX_READ_BYTES = 8 * 1024 * 1024
+
+# Events of the sample strategies' NDJSON log, matched without parsing JSON
+JOB_SUBMITTED = b'"ev":"job_submitted"'
+JOB_FINISHED = (b'"ev":"job_completed"', b'"ev":"job_killed"')
+
+# BatSim and PyBatsim job completion messages, for strategies that do not
+# write the event log
+LOG_JOB_FINISHED = re.compile(
+    rb"\bjob\b[^\n]*\b(?:completed|finished|killed)\b", re.IGNORECASE
+)
+
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class LogTail:
+    """Incremental reader returning the complete lines appended to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._partial = b""
+
+    def read_lines(self) -> List[bytes]:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            # Truncated or replaced: start over
+            self.offset = 0
+            self._partial = b""
+        if size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(min(size - self.offset, MAX_READ_BYTES))
+        self.offset += len(data)
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        return lines
+
+
+@dataclass
+class ExperimentProgress:
+    experiment_id: int
+    created_by: Optional[int]
+    status: str
+    total_jobs: Optional[int] = None
+    submitted_jobs: int = 0
+    completed_jobs: int = 0
+    progress_percentage: int = 0
+    simulation_dir: Optional[str] = None
+    # Job completions counted by the event log and by the plain logs; the
+    # larger one wins so a strategy writing both is not counted twice
+    event_log_finished: int = 0
+    log_finished: int = 0
+    tails: Dict[str, LogTail] = field(default_factory=dict)
+    dirty: bool = False
+
+    def snapshot(self) -> dict:
+        return {
+            "experiment_id": self.experiment_id,
+            "status": self.status,
+            "total_jobs": self.total_jobs,
+            "submitted_jobs": self.submitted_jobs,
+            "completed_jobs": self.completed_jobs,
+            "progress_percentage": self.progress_percentage,
+        }
+
+    def tail(self, filename: str) -> Optional[LogTail]:
+        if not self.simulation_dir:
+            return None
+        if filename not in self.tails:
+            self.tails[filename] = LogTail(os.path.join(self.simulation_dir, filename))
+        return self.tails[filename]
+
+    def read_outputs(self) -> bool:
+        """Consume newly appended output; True if the counts changed"""
+        before = (self.submitted_jobs, self.completed_jobs)
+        events = self.tail(EVENTS_FILENAME)
+        if events is not None:
+            for line in events.read_lines():
+                if JOB_SUBMITTED in line:
+                    self.submitted_jobs += 1
+                elif any(marker in line for marker in JOB_FINISHED):
+                    self.event_log_finished += 1
+        for filename in (BATSIM_LOG, SCHEDULER_LOG):
+            log = self.tail(filename)
+            if log is not None:
+                self.log_finished += sum(
+                    1 for line in log.read_lines() if LOG_JOB_FINISHED.search(line)
+                )
+        self.completed_jobs = max(
+            self.completed_jobs, self.event_log_finished, self.log_finished
+        )
+        self._update_percentage()
+        return (self.submitted_jobs, self.completed_jobs) != before
+
+    def _update_percentage(self):
+        if self.status == ExperimentStatus.COMPLETED.value:
+            self.progress_percentage = 100
+        elif self.total_jobs:
+            self.progress_percentage = min(
+                99, int(100 * self.completed_jobs / self.total_jobs)
+            )
+
+
+def count_workload_jobs(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            return len(json.load(f).get("jobs", []))
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Subscriber:
+    """One SSE stream: a set of experiment ids, or every experiment of a user"""
+
+    def __init__(
+        self,
+        experiment_ids: Optional[Set[int]] = None,
+        user_id: Optional[int] = None,
+    ):
+        self.experiment_ids = experiment_ids
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def wants(self, progress: ExperimentProgress) -> bool:
+        if self.experiment_ids is not None:
+            return progress.experiment_id in self.experiment_ids
+        return self.user_id is None or progress.created_by == self.user_id
+
+    def push(self, snapshot: dict):
+        if self.queue.full():
+            # A slow client only needs the latest state
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(snapshot)
+
+
+class ProgressMonitor:
+    """Tails running experiments and fans progress out to subscribers"""
+
+    def __init__(self):
+        self._progress: Dict[int, ExperimentProgress] = {}
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._last_flush = 0.0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._flush)
+
+    def subscribe(self, subscriber: Subscriber) -> List[dict]:
+        """Register `subscriber`; returns the snapshots it should start from"""
+        self._subscribers.add(subscriber)
+        return [
+            progress.snapshot()
+            for progress in list(self._progress.values())
+            if subscriber.wants(progress)
+        ]
+
+    def is_tracked(self, experiment_id: int) -> bool:
+        return experiment_id in self._progress
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                changed = await asyncio.to_thread(self._poll)
+                for progress in changed:
+                    snapshot = progress.snapshot()
+                    for subscriber in list(self._subscribers):
+                        if subscriber.wants(progress):
+                            subscriber.push(snapshot)
+                if loop.time() - self._last_flush >= settings.PROGRESS_FLUSH_INTERVAL:
+                    self._last_flush = loop.time()
+                    await asyncio.to_thread(self._flush)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[ERROR] Progress monitor: {e}")
+            await asyncio.sleep(settings.PROGRESS_POLL_INTERVAL)
+
+    def _poll(self) -> List[ExperimentProgress]:
+        """Refresh statuses and tail outputs; returns what changed"""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(
+                    Experiment.id,
+                    Experiment.created_by,
+                    Experiment.status,
+                    Experiment.total_jobs,
+                    Experiment.completed_jobs,
+                    Experiment.simulation_dir,
+                )
+                .filter(
+                    (Experiment.status.in_(ACTIVE_STATUSES))
+                    | (Experiment.id.in_(list(self._progress)))
+                )
+                .all()
+            )
+        finally:
+            db.close()
+
+        changed: Dict[int, ExperimentProgress] = {}
+        for row in rows:
+            status = row.status.value if row.status else None
+            progress = self._progress.get(row.id)
+            if progress is None:
+                progress = ExperimentProgress(
+                    experiment_id=row.id,
+                    created_by=row.created_by,
+                    status=status,
+                    total_jobs=row.total_jobs,
+                    completed_jobs=row.completed_jobs or 0,
+                )
+                self._progress[row.id] = progress
+                changed[row.id] = progress
+            progress.simulation_dir = row.simulation_dir
+            if progress.status != status:
+                progress.status = status
+                progress._update_percentage()
+                progress.dirty = True
+                changed[row.id] = progress
+            if status in (ExperimentStatus.QUEUED.value, None) or not row.simulation_dir:
+                continue
+            if progress.total_jobs is None:
+                progress.total_jobs = count_workload_jobs(
+                    os.path.join(row.simulation_dir, "workload.json")
+                )
+                progress.dirty = progress.dirty or progress.total_jobs is not None
+            # Finished runs get one last read of whatever they flushed at exit
+            if progress.read_outputs():
+                progress.dirty = True
+                changed[row.id] = progress
+
+        # Forget finished experiments once their final state is written, and
+        # deleted ones at once: SQLite may hand their id to a new experiment
+        finished = {status.value for status in FINISHED_STATUSES}
+        present = {row.id for row in rows}
+        for progress in list(self._progress.values()):
+            if progress.experiment_id not in present or (
+                progress.status in finished and not progress.dirty
+            ):
+                del self._progress[progress.experiment_id]
+        return list(changed.values())
+
+    def _flush(self):
+        """Write every dirty snapshot in a single executemany UPDATE"""
+        dirty = [progress for progress in self._progress.values() if progress.dirty]
+        if not dirty:
+            return
+        db = SessionLocal()
+        try:
+            db.connection().execute(
+                update(Experiment.__table__)
+                .where(Experiment.__table__.c.id == bindparam("experiment_id"))
+                .values(
+                    total_jobs=bindparam("total_jobs"),
+                    completed_jobs=bindparam("completed_jobs"),
+                    progress_percentage=bindparam("progress_percentage"),
+                    updated_at=bindparam("updated_at"),
+                ),
+                [
+                    {
+                        "experiment_id": progress.experiment_id,
+                        "total_jobs": progress.total_jobs,
+                        "completed_jobs": progress.completed_jobs,
+                        "progress_percentage": progress.progress_percentage,
+                        "updated_at": datetime.now(),
+                    }
+                    for progress in dirty
+                ],
+            )
+            db.commit()
+            for progress in dirty:
+                progress.dirty = False
+        finally:
+            db.close()
+
+
+def format_sse(snapshot: dict, event: str = "progress") -> str:
+    return f"event: {event}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+
+
+async def stream_progress(subscriber: Subscriber, request, initial: List[dict] = ()):
+    """SSE body: the current snapshots, then every change, with keepalives"""
+    try:
+        for snapshot in list(initial) + monitor.subscribe(subscriber):
+            yield format_sse(snapshot)
+        while not await request.is_disconnected():
+            try:
+                snapshot = await asyncio.wait_for(
+                    subscriber.queue.get(), settings.PROGRESS_KEEPALIVE_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(snapshot)
+    finally:
+        monitor.unsubscribe(subscriber)
+
+
+monitor = ProgressMonitor()
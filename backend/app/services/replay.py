@@ -0,0 +1,821 @@
+"""
+Local discrete-event replay of BatSim workloads
+
+A pure-Python stand-in for BatSim that drives strategies written against
+the BatsimScheduler callback interface used by the samples
+(onJobSubmission, onJobCompletion, get_available_resources, execute_job...)
+and writes out_jobs.csv / out_schedule.csv in BatSim's format.
+
+Only `delay` profiles are simulated exactly; any other profile type runs
+for its job's walltime. Jobs that outlive their walltime are stopped with
+the COMPLETED_WALLTIME_REACHED state, as BatSim does.
+
+Usage:
+    python -m app.services.replay -w workload.json -p platform.xml \\
+        -s strategy.py -e out/out
+"""
+
+import argparse
+import heapq
+import json
+import os
+import runpy
+import sys
+import time
+import types
+import xml.etree.ElementTree as ET
+from array import array
+from collections.abc import MutableSequence
+from typing import List, Optional
+
+BATSIM_VERSION = "replay-1.0"
+
+# Event kinds; at equal timestamps completions are delivered before calls,
+# and both before submissions, matching BatSim's message ordering
+COMPLETE = 0
+CALL = 1
+
+# Job states in the job table
+PENDING = 0
+SUBMITTED = 1
+RUNNING = 2
+COMPLETED = 3
+WALLTIME_REACHED = 4
+REJECTED = 5
+
+FINAL_STATES = {
+    PENDING: "NOT_SUBMITTED",
+    SUBMITTED: "NOT_STARTED",
+    RUNNING: "NOT_FINISHED",
+    COMPLETED: "COMPLETED_SUCCESSFULLY",
+    WALLTIME_REACHED: "COMPLETED_WALLTIME_REACHED",
+    REJECTED: "REJECTED",
+}
+
+JOBS_HEADER = [
+    "job_id",
+    "workload_name",
+    "profile",
+    "submission_time",
+    "requested_number_of_resources",
+    "requested_time",
+    "success",
+    "final_state",
+    "starting_time",
+    "execution_time",
+    "finish_time",
+    "waiting_time",
+    "turnaround_time",
+    "stretch",
+    "allocated_resources",
+    "consumed_energy",
+    "metadata",
+]
+
+SCHEDULE_HEADER = [
+    "batsim_version",
+    "consumed_joules",
+    "makespan",
+    "max_slowdown",
+    "max_turnaround_time",
+    "max_waiting_time",
+    "mean_slowdown",
+    "mean_turnaround_time",
+    "mean_waiting_time",
+    "nb_computing_machines",
+    "nb_grouped_switches",
+    "nb_jobs",
+    "nb_jobs_finished",
+    "nb_jobs_killed",
+    "nb_jobs_rejected",
+    "nb_jobs_success",
+    "nb_machine_switches",
+    "scheduling_time",
+    "simulation_time",
+    "success_rate",
+    "time_computing",
+    "time_idle",
+    "time_sleeping",
+    "time_switching_off",
+    "time_switching_on",
+    "time_unavailable",
+]
+
+# Host BatSim reserves for itself unless told otherwise
+MASTER_HOST = "master_host"
+
+# Where the sample strategies write their event logs and callback stats
+SCHEDULER_OUTPUT_DIR_ENV = "SCHEDULER_OUTPUT_DIR"
+
+_active_engine: Optional["ReplayEngine"] = None
+
+
+class Job:
+    """Job handed to strategies, with the attributes PyBatsim jobs expose"""
+
+    __slots__ = (
+        "id",
+        "workload_name",
+        "profile",
+        "submission_time",
+        "requested_resources",
+        "requested_time",
+        "job_state",
+        "index",
+    )
+
+    def __init__(self, index, id, workload_name, profile, submission_time, res, walltime):
+        self.index = index
+        self.id = id
+        self.workload_name = workload_name
+        self.profile = profile
+        self.submission_time = submission_time
+        self.requested_resources = res
+        self.requested_time = walltime
+        self.job_state = "SUBMITTED"
+
+    def __repr__(self):
+        return f"Job({self.id!r})"
+
+
+class BatsimScheduler:
+    """
+    Stand-in for pybatsim's BatsimScheduler bound to the running replay
+
+    Strategies assign callbacks on the instance and call start(), exactly
+    as in the samples' main().
+    """
+
+    def __init__(self, *args, **kwargs):
+        if _active_engine is None:
+            raise RuntimeError("BatsimScheduler created outside of a replay")
+        self._engine = _active_engine
+        self._engine.attach(self)
+
+    # Callbacks, replaced by the strategy
+    def onSimulationBegins(self):
+        pass
+
+    def onSimulationEnds(self):
+        pass
+
+    def onJobSubmission(self, job):
+        pass
+
+    def onJobCompletion(self, job):
+        pass
+
+    def onJobKilled(self, job):
+        pass
+
+    def onRequestedCall(self):
+        pass
+
+    # Requests
+    def time(self):
+        return self._engine.now
+
+    def get_available_resources(self):
+        return self._engine.available_resources()
+
+    def execute_job(self, job, resources):
+        self._engine.execute_job(job, resources)
+
+    def execute_jobs(self, allocations):
+        for job, resources in allocations:
+            self._engine.execute_job(job, resources)
+
+    def reject_job(self, job):
+        self._engine.reject_job(job)
+
+    def wake_me_up_at(self, at):
+        self._engine.wake_me_up_at(at)
+
+    def start(self):
+        self._engine.run()
+
+
+class ResourceView(MutableSequence):
+    """
+    Snapshot of the free hosts, as get_available_resources() returns them
+
+    Taking it costs O(1) whatever the platform size, and so do the usual
+    `available = available[n:]` after an allocation: slices that run to the
+    end are views as well, bounded slices plain lists. Strategies may edit
+    it like the list PyBatsim hands out; the first edit copies the hosts
+    into a list of its own.
+    """
+
+    __slots__ = ("_pool", "_low", "_high", "_own")
+
+    def __init__(self, pool, low, high):
+        self._pool = pool
+        self._low = low
+        self._high = high
+        self._own = None
+
+    def _list(self) -> list:
+        if self._own is None:
+            self._own = self._pool[self._low : self._high]
+        return self._own
+
+    def __len__(self):
+        if self._own is not None:
+            return len(self._own)
+        return self._high - self._low
+
+    def __getitem__(self, key):
+        if self._own is not None:
+            return self._own[key]
+        size = self._high - self._low
+        if isinstance(key, slice):
+            start, stop, step = key.indices(size)
+            if step != 1:
+                return self._pool[self._low : self._high][key]
+            if stop == size:
+                return ResourceView(self._pool, self._low + start, self._high)
+            return self._pool[self._low + start : self._low + max(start, stop)]
+        if key < 0:
+            key += size
+        if not 0 <= key < size:
+            raise IndexError("resource index out of range")
+        return self._pool[self._low + key]
+
+    def __setitem__(self, key, value):
+        self._list()[key] = value
+
+    def __delitem__(self, key):
+        del self._list()[key]
+
+    def insert(self, index, value):
+        self._list().insert(index, value)
+
+    # The list methods strategies use, at list speed
+    def append(self, value):
+        self._list().append(value)
+
+    def extend(self, values):
+        self._list().extend(values)
+
+    def pop(self, index=-1):
+        return self._list().pop(index)
+
+    def remove(self, value):
+        self._list().remove(value)
+
+    def clear(self):
+        self._own = []
+
+    def reverse(self):
+        self._list().reverse()
+
+    def sort(self, *, key=None, reverse=False):
+        self._list().sort(key=key, reverse=reverse)
+
+    def copy(self) -> list:
+        return list(self)
+
+    def __iter__(self):
+        if self._own is not None:
+            return iter(self._own)
+        return iter(self._pool[self._low : self._high])
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ResourceView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return f"ResourceView({list(self)!r})"
+
+
+class FreeHosts:
+    """
+    Free hosts as an append-only pool with a moving head
+
+    Allocating a prefix advances the head and released hosts are appended,
+    so the common allocation costs O(1), and entries below the tail are
+    never overwritten: views handed out by snapshot() stay valid. The pool
+    is rebuilt, as a new list, only when an allocation is not a prefix or
+    the consumed head grows large.
+    """
+
+    __slots__ = ("pool", "head")
+
+    def __init__(self, nb_resources):
+        self.pool = list(range(nb_resources))
+        self.head = 0
+
+    def __len__(self):
+        return len(self.pool) - self.head
+
+    def snapshot(self) -> ResourceView:
+        return ResourceView(self.pool, self.head, len(self.pool))
+
+    def take(self, resources: list) -> bool:
+        """Remove `resources` from the free hosts; False if any is busy"""
+        pool = self.pool
+        head = self.head
+        count = len(resources)
+        if pool[head : head + count] == resources:
+            # Strategies usually take a prefix of get_available_resources()
+            self.head = head + count
+            return True
+        taken = set(resources)
+        remaining = [rid for rid in pool[head:] if rid not in taken]
+        if len(taken) != count or len(pool) - head - len(remaining) != count:
+            return False
+        self.pool = remaining
+        self.head = 0
+        return True
+
+    def release(self, resources: list):
+        pool = self.pool
+        if self.head > len(pool) // 2:
+            self.pool = pool = pool[self.head :]
+            self.head = 0
+        pool.extend(resources)
+
+    def __iter__(self):
+        return iter(self.pool[self.head :])
+
+
+def format_intervals(resources) -> str:
+    """BatSim interval notation, e.g. [0, 1, 2, 5] -> "0-2 5" """
+    if not resources:
+        return ""
+    low, high = min(resources), max(resources)
+    if high - low + 1 == len(resources):
+        # Contiguous allocation, by far the common case
+        return f"{low}-{high}" if high != low else str(low)
+    ids = sorted(resources)
+    parts = []
+    start = prev = ids[0]
+    for rid in ids[1:]:
+        if rid == prev + 1:
+            prev = rid
+            continue
+        parts.append(f"{start}-{prev}" if prev != start else str(start))
+        start = prev = rid
+    parts.append(f"{start}-{prev}" if prev != start else str(start))
+    return " ".join(parts)
+
+
+def count_platform_hosts(platform_path: str, master_host: str = MASTER_HOST) -> int:
+    """Number of compute hosts in a SimGrid platform file"""
+    root = ET.parse(platform_path).getroot()
+    count = 0
+    for cluster in root.iter("cluster"):
+        for part in cluster.get("radical", "").split(","):
+            if "-" in part:
+                low, high = part.split("-", 1)
+                count += int(high) - int(low) + 1
+            elif part.strip():
+                count += 1
+    for host in root.iter("host"):
+        roles = {
+            prop.get("value")
+            for prop in host.iter("prop")
+            if prop.get("id") == "role"
+        }
+        if host.get("id") != master_host and "master" not in roles:
+            count += 1
+    return count
+
+
+class Workload:
+    """Batsim JSON workload held as parallel arrays"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.name = "w0"
+        if path is not None:
+            with open(path, "r") as f:
+                self._load(json.load(f))
+
+    @classmethod
+    def from_columns(cls, nb_res, ids, profiles, subtime, res, walltime, runtime):
+        """Build a workload straight from its columns, e.g. a generated one"""
+        workload = cls()
+        workload.nb_res = nb_res
+        workload.size = len(ids)
+        workload.ids = list(ids)
+        workload.profiles = list(profiles)
+        workload.subtime = array("d", subtime)
+        workload.res = array("l", res)
+        workload.walltime = array("d", walltime)
+        workload.runtime = array("d", runtime)
+        workload._sort()
+        return workload
+
+    def _load(self, data: dict):
+        self.nb_res = data.get("nb_res")
+        delays = {}
+        for name, profile in (data.get("profiles") or {}).items():
+            if isinstance(profile, dict) and profile.get("type") == "delay":
+                delays[str(name)] = float(profile.get("delay", 0))
+
+        jobs = data.get("jobs") or []
+        self.size = len(jobs)
+        self.ids = [job.get("id") for job in jobs]
+        self.profiles = [str(job.get("profile", "")) for job in jobs]
+        self.subtime = array("d", [float(job["subtime"]) for job in jobs])
+        self.res = array("l", [int(job["res"]) for job in jobs])
+        self.walltime = array("d", [float(job.get("walltime") or -1) for job in jobs])
+        del data, jobs
+        # Non-delay profiles fall back to the walltime (or zero without one)
+        self.runtime = array(
+            "d",
+            [
+                delays.get(profile, walltime if walltime > 0 else 0.0)
+                for profile, walltime in zip(self.profiles, self.walltime)
+            ],
+        )
+        self._sort()
+
+    def _sort(self):
+        subtime = self.subtime
+        if all(a <= b for a, b in zip(subtime, subtime[1:])):
+            self.order = range(self.size)
+        else:
+            self.order = array("l", sorted(range(self.size), key=subtime.__getitem__))
+
+
+class ReplayEngine:
+    """Heap-driven discrete-event loop over an array-backed job table"""
+
+    def __init__(self, workload: Workload, nb_resources: int):
+        self.workload = workload
+        self.nb_resources = nb_resources
+        self.now = 0.0
+        self.scheduler: Optional[BatsimScheduler] = None
+        self.started = False
+
+        n = workload.size
+        self.state = bytearray(n)
+        self.start = array("d", bytes(8 * n))
+        self.finish = array("d", bytes(8 * n))
+        self.allocated: List[Optional[list]] = [None] * n
+        self.live_jobs = {}  # job index -> (Job, resources) while running
+        self.free = FreeHosts(nb_resources)
+        self.events: list = []
+        self.sequence = 0
+
+        self.nb_decisions = 0
+        self.nb_callbacks = 0
+        self.scheduling_time = 0.0
+        self.simulation_time = 0.0
+
+    # Strategy side
+    def attach(self, scheduler: BatsimScheduler):
+        self.scheduler = scheduler
+
+    def available_resources(self) -> ResourceView:
+        return self.free.snapshot()
+
+    def execute_job(self, job: Job, resources):
+        index = job.index
+        if self.state[index] != SUBMITTED:
+            raise ValueError(f"Job {job.id} cannot be started in its current state")
+        resources = list(resources)
+        if len(resources) != job.requested_resources:
+            raise ValueError(
+                f"Job {job.id} requested {job.requested_resources} resources "
+                f"but got {len(resources)}"
+            )
+        if not self.free.take(resources):
+            raise ValueError(f"Job {job.id} was given resources that are not free")
+
+        workload = self.workload
+        runtime = workload.runtime[index]
+        walltime = workload.walltime[index]
+        state = COMPLETED
+        if 0 < walltime < runtime:
+            runtime, state = walltime, WALLTIME_REACHED
+        self.state[index] = RUNNING
+        self.start[index] = self.now
+        job.job_state = "RUNNING"
+        self.live_jobs[index] = (job, resources, state)
+        self._push(self.now + runtime, COMPLETE, index)
+        self.nb_decisions += 1
+
+    def reject_job(self, job: Job):
+        if self.state[job.index] != SUBMITTED:
+            raise ValueError(f"Job {job.id} cannot be rejected in its current state")
+        self.state[job.index] = REJECTED
+        job.job_state = "REJECTED"
+        self.nb_decisions += 1
+
+    def wake_me_up_at(self, at: float):
+        self._push(max(at, self.now), CALL, -1)
+
+    # Simulation loop
+    def _push(self, at, kind, index):
+        self.sequence += 1
+        heapq.heappush(self.events, (at, kind, self.sequence, index))
+
+    def _dispatch(self, callback, *args):
+        started = time.perf_counter()
+        callback(*args)
+        self.scheduling_time += time.perf_counter() - started
+        self.nb_callbacks += 1
+
+    def run(self):
+        """Replay the whole workload through the attached scheduler"""
+        if self.scheduler is None:
+            raise RuntimeError("No BatsimScheduler attached to the replay")
+        if self.started:
+            return
+        self.started = True
+        wall_start = time.perf_counter()
+        scheduler = self.scheduler
+        workload = self.workload
+        order = workload.order
+        subtime = workload.subtime
+        events = self.events
+        state = self.state
+        nb_jobs = workload.size
+        next_submission = 0
+        infinity = float("inf")
+
+        self._dispatch(scheduler.onSimulationBegins)
+        # Hot loop: dispatch is inlined, callbacks looked up once per event
+        clock = time.perf_counter
+        heappop = heapq.heappop
+        ids = workload.ids
+        profiles = workload.profiles
+        res = workload.res
+        walltime = workload.walltime
+        name = workload.name
+        scheduling_time = 0.0
+        nb_callbacks = 0
+        while True:
+            submit_at = (
+                subtime[order[next_submission]]
+                if next_submission < nb_jobs
+                else infinity
+            )
+            if events and events[0][0] <= submit_at:
+                at, kind, _, index = heappop(events)
+                self.now = at
+                if kind == COMPLETE:
+                    job = self._complete(index)
+                    started = clock()
+                    scheduler.onJobCompletion(job)
+                else:
+                    started = clock()
+                    scheduler.onRequestedCall()
+            elif next_submission < nb_jobs:
+                index = order[next_submission]
+                next_submission += 1
+                self.now = submit_at
+                state[index] = SUBMITTED
+                job = Job(
+                    index,
+                    f"{name}!{ids[index]}",
+                    name,
+                    profiles[index],
+                    submit_at,
+                    res[index],
+                    walltime[index],
+                )
+                started = clock()
+                scheduler.onJobSubmission(job)
+            else:
+                break
+            scheduling_time += clock() - started
+            nb_callbacks += 1
+        self.scheduling_time += scheduling_time
+        self.nb_callbacks += nb_callbacks
+        self._dispatch(scheduler.onSimulationEnds)
+        self.simulation_time = time.perf_counter() - wall_start
+
+    def _complete(self, index) -> Job:
+        job, resources, final_state = self.live_jobs.pop(index)
+        self.free.release(resources)
+        self.state[index] = final_state
+        self.finish[index] = self.now
+        self.allocated[index] = resources
+        job.job_state = FINAL_STATES[final_state]
+        return job
+
+    # Outputs
+    def write_outputs(self, export_prefix: str):
+        """Write {prefix}_jobs.csv and {prefix}_schedule.csv"""
+        directory = os.path.dirname(export_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        summary = self._write_jobs(f"{export_prefix}_jobs.csv")
+        self._write_schedule(f"{export_prefix}_schedule.csv", summary)
+        return summary
+
+    def _write_jobs(self, path):
+        workload = self.workload
+        state = self.state
+        nb_jobs = workload.size
+        finished_states = (COMPLETED, WALLTIME_REACHED)
+        finished = [i for i in range(nb_jobs) if state[i] in finished_states]
+        done = bytearray(nb_jobs)
+        for index in finished:
+            done[index] = 1
+
+        # Derived columns, with -1 for jobs that never ran
+        subtime = workload.subtime
+        starting = [
+            self.start[i] if done[i] else -1.0 for i in range(nb_jobs)
+        ]
+        finishing = [
+            self.finish[i] if done[i] else -1.0 for i in range(nb_jobs)
+        ]
+        execution = [
+            f - s if d else -1.0 for f, s, d in zip(finishing, starting, done)
+        ]
+        waiting = [
+            s - t if d else -1.0 for s, t, d in zip(starting, subtime, done)
+        ]
+        turnaround = [
+            f - t if d else -1.0 for f, t, d in zip(finishing, subtime, done)
+        ]
+        stretch = [
+            (r / e if e > 0 else 1.0) if d else -1.0
+            for r, e, d in zip(turnaround, execution, done)
+        ]
+        success = [1 if s == COMPLETED else 0 for s in state]
+        final_state = [FINAL_STATES[s] for s in state]
+        allocated = [format_intervals(a) if a else "" for a in self.allocated]
+
+        row = (
+            "%s," + workload.name + ",%s,%.6f,%d,%.6f,%d,%s,"
+            "%.6f,%.6f,%.6f,%.6f,%.6f,%.6f,%s,-1.000000,\"\"\n"
+        )
+        rows = zip(
+            workload.ids,
+            workload.profiles,
+            subtime,
+            workload.res,
+            workload.walltime,
+            success,
+            final_state,
+            starting,
+            execution,
+            finishing,
+            waiting,
+            turnaround,
+            stretch,
+            allocated,
+        )
+        with open(path, "w") as f:
+            f.write(",".join(JOBS_HEADER) + "\n")
+            f.writelines(map(row.__mod__, rows))
+
+        nb_finished = len(finished)
+        nb_success = sum(success)
+        res = workload.res
+        done_waiting = [waiting[i] for i in finished]
+        done_turnaround = [turnaround[i] for i in finished]
+        done_stretch = [stretch[i] for i in finished]
+        makespan = max((finishing[i] for i in finished), default=0.0)
+        time_computing = sum(execution[i] * res[i] for i in finished)
+        return {
+            "makespan": makespan,
+            "max_slowdown": max(done_stretch, default=0.0),
+            "max_turnaround_time": max(done_turnaround, default=0.0),
+            "max_waiting_time": max(done_waiting, default=0.0),
+            "mean_slowdown": sum(done_stretch) / nb_finished if nb_finished else 0.0,
+            "mean_turnaround_time": (
+                sum(done_turnaround) / nb_finished if nb_finished else 0.0
+            ),
+            "mean_waiting_time": sum(done_waiting) / nb_finished if nb_finished else 0.0,
+            "nb_jobs": nb_jobs,
+            "nb_jobs_finished": nb_finished,
+            "nb_jobs_killed": nb_finished - nb_success,
+            "nb_jobs_rejected": state.count(REJECTED),
+            "nb_jobs_success": nb_success,
+            "success_rate": nb_success / nb_jobs if nb_jobs else 0.0,
+            "time_computing": float(time_computing),
+            "time_idle": max(self.nb_resources * makespan - time_computing, 0.0),
+        }
+
+    def _write_schedule(self, path, summary):
+        row = {
+            "batsim_version": BATSIM_VERSION,
+            "consumed_joules": 0.0,
+            "nb_computing_machines": self.nb_resources,
+            "nb_grouped_switches": 0,
+            "nb_machine_switches": 0,
+            "scheduling_time": self.scheduling_time,
+            "simulation_time": self.simulation_time,
+            "time_sleeping": 0.0,
+            "time_switching_off": 0.0,
+            "time_switching_on": 0.0,
+            "time_unavailable": 0.0,
+            **summary,
+        }
+        values = [
+            f"{row[key]:.6f}" if isinstance(row[key], float) else str(row[key])
+            for key in SCHEDULE_HEADER
+        ]
+        with open(path, "w") as f:
+            f.write(",".join(SCHEDULE_HEADER) + "\n")
+            f.write(",".join(values) + "\n")
+
+
+def install_pybatsim_shim():
+    """Make `import pybatsim.batsim.*` resolve to this replay"""
+    batsim_module = types.ModuleType("pybatsim.batsim.batsim")
+    batsim_module.BatsimScheduler = BatsimScheduler
+    jobs_module = types.ModuleType("pybatsim.batsim.jobs")
+    jobs_module.Job = Job
+    modules = {
+        "pybatsim": types.ModuleType("pybatsim"),
+        "pybatsim.batsim": types.ModuleType("pybatsim.batsim"),
+        "pybatsim.batsim.batsim": batsim_module,
+        "pybatsim.batsim.jobs": jobs_module,
+        "pybatsim.batsim.profiles": types.ModuleType("pybatsim.batsim.profiles"),
+        "pybatsim.batsim.resources": types.ModuleType("pybatsim.batsim.resources"),
+    }
+    sys.modules.update(modules)
+
+
+def run_strategy(engine: ReplayEngine, strategy_path: str):
+    """Load a strategy file and let its main() drive the replay"""
+    global _active_engine
+    install_pybatsim_shim()
+    strategy_dir = os.path.dirname(os.path.abspath(strategy_path))
+    added_path = strategy_dir not in sys.path
+    if added_path:
+        sys.path.insert(0, strategy_dir)
+    loaded_modules = set(sys.modules)
+    _active_engine = engine
+    try:
+        namespace = runpy.run_path(strategy_path, run_name="__main__")
+        if not engine.started and callable(namespace.get("main")):
+            namespace["main"]()
+        if not engine.started:
+            raise RuntimeError(f"{strategy_path} never started the scheduler")
+    finally:
+        _active_engine = None
+        if added_path:
+            sys.path.remove(strategy_dir)
+        # Forget helper modules imported from the strategy directory so the
+        # next replay starts from fresh module-level state
+        for name in set(sys.modules) - loaded_modules:
+            module_file = getattr(sys.modules[name], "__file__", None) or ""
+            if os.path.abspath(module_file).startswith(strategy_dir + os.sep):
+                del sys.modules[name]
+
+
+def replay(
+    workload_path: str,
+    strategy_path: str,
+    export_prefix: str,
+    platform_path: Optional[str] = None,
+    nb_resources: Optional[int] = None,
+) -> dict:
+    """Replay a workload with a strategy and write BatSim-style outputs"""
+    workload = Workload(workload_path)
+    if nb_resources is None and platform_path:
+        nb_resources = count_platform_hosts(platform_path)
+    if nb_resources is None:
+        nb_resources = workload.nb_res
+    if not nb_resources:
+        raise ValueError("Unknown number of resources: pass a platform or nb_resources")
+
+    # Strategy logs and stats land next to the outputs
+    output_dir = os.path.dirname(os.path.abspath(export_prefix))
+    os.makedirs(output_dir, exist_ok=True)
+    previous_dir = os.environ.get(SCHEDULER_OUTPUT_DIR_ENV)
+    os.environ[SCHEDULER_OUTPUT_DIR_ENV] = output_dir
+    try:
+        engine = ReplayEngine(workload, nb_resources)
+        run_strategy(engine, strategy_path)
+    finally:
+        if previous_dir is None:
+            os.environ.pop(SCHEDULER_OUTPUT_DIR_ENV, None)
+        else:
+            os.environ[SCHEDULER_OUTPUT_DIR_ENV] = previous_dir
+    return engine.write_outputs(export_prefix)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a Batsim workload locally")
+    parser.add_argument("-w", "--workload", required=True, help="Batsim JSON workload")
+    parser.add_argument("-p", "--platform", help="SimGrid platform XML")
+    parser.add_argument("-s", "--strategy", required=True, help="Strategy .py file")
+    parser.add_argument("-e", "--export", default="out", help="Output prefix")
+    parser.add_argument("-n", "--nb-resources", type=int, help="Override host count")
+    args = parser.parse_args(argv)
+
+    summary = replay(
+        args.workload, args.strategy, args.export, args.platform, args.nb_resources
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Bulk import of existing BatSim outputs
+
+`import_results()` walks a directory tree for runs, i.e. directories
+holding a `<prefix>_schedule.csv` and its `<prefix>_jobs.csv`, parses
+them in a process pool with the result pipeline's parser and inserts a
+completed Experiment placeholder plus its Result (and jobs table) for
+each, BATCH_SIZE runs per transaction. Runs are attached to the shared
+"Imported runs" scenario and strategy. At most a few runs per process are in flight, so
+memory stays bounded however large the tree.
+
+Imports are resumable: directories that already are the
+`result_file_path` of a Result are skipped, so an interrupted import
+(or a later one over a grown tree) only adds the new runs.
+
+Used by `python -m app.import_results` and POST /api/results/import.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.platform import Platform
+from app.models.result import Result
+from app.models.scenario import Scenario
+from app.models.strategy import Strategy
+from app.models.workload import Workload
+from app.services.result_pipeline import (
+    ResultParseError,
+    attach_jobs_table,
+    parse_outputs,
+)
+
+BATCH_SIZE = 200
+# Runs queued per pool process
+IN_FLIGHT_PER_WORKER = 4
+PLACEHOLDER_NAME = "Imported runs"
+# Followed by the run's directory in placeholder experiment names
+PLACEHOLDER_PREFIX = "imported:"
+SCHEDULE_SUFFIX = "_schedule.csv"
+
+
+class ResultImportError(Exception):
+    """The import cannot start"""
+
+
+@dataclass
+class ImportProgress:
+    root: str
+    found: int = 0
+    skipped: int = 0
+    imported: int = 0
+    failed: int = 0
+    running: bool = True
+    error: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+def find_runs(root: str) -> Iterator[Tuple[str, str]]:
+    """(directory, export prefix) of every run under `root`"""
+    for directory, _, files in os.walk(root):
+        names = set(files)
+        for name in sorted(names):
+            if name.endswith(SCHEDULE_SUFFIX):
+                prefix = name[: -len(SCHEDULE_SUFFIX)]
+                if f"{prefix}_jobs.csv" in names:
+                    yield directory, prefix
+
+
+def _parse(run: Tuple[str, str], keep_jobs_data: bool) -> dict:
+    """In the pool: parse one run, with its finish time"""
+    directory, prefix = run
+    outputs = parse_outputs(directory, prefix, keep_jobs_data)
+    try:
+        outputs["finished_at"] = os.path.getmtime(
+            os.path.join(directory, f"{prefix}{SCHEDULE_SUFFIX}")
+        )
+    except OSError as e:
+        # Removed or made unreadable since it was parsed
+        raise ResultParseError(str(e)) from e
+    return outputs
+
+
+def placeholders(db, user_id: Optional[int]) -> Tuple[int, int]:
+    """Ids of the scenario and strategy imported runs belong to"""
+    scenario = db.query(Scenario).filter(Scenario.name == PLACEHOLDER_NAME).first()
+    if scenario is None:
+        description = "Placeholder for BatSim runs imported from disk"
+        workload = Workload(
+            name=PLACEHOLDER_NAME,
+            description=description,
+            file_path="",
+            file_size=0,
+            file_type="imported",
+            created_by=user_id,
+        )
+        platform = Platform(
+            name=PLACEHOLDER_NAME,
+            description=description,
+            file_path="",
+            file_size=0,
+            file_type="imported",
+            created_by=user_id,
+        )
+        scenario = Scenario(
+            name=PLACEHOLDER_NAME,
+            description=description,
+            workload=workload,
+            platform=platform,
+            created_by=user_id,
+        )
+        db.add(scenario)
+    strategy = db.query(Strategy).filter(Strategy.name == PLACEHOLDER_NAME).first()
+    if strategy is None:
+        strategy = Strategy(
+            name=PLACEHOLDER_NAME,
+            description="Placeholder for BatSim runs imported from disk",
+            file_path="",
+            file_size=0,
+            file_type="imported",
+            created_by=user_id,
+        )
+        db.add(strategy)
+    db.commit()
+    return scenario.id, strategy.id
+
+
+def _add_run(
+    db,
+    directory: str,
+    outputs: dict,
+    ids: Tuple[int, int],
+    user_id: Optional[int],
+    experiment_id: Optional[int] = None,
+) -> Result:
+    finished_at = datetime.fromtimestamp(outputs.pop("finished_at"))
+    outputs.pop("jobs_table", None)
+    result = Result(**outputs)
+    result.config = json.dumps({"imported_from": directory})
+    if experiment_id is not None:
+        # Placeholder left by a deleted Result
+        result.experiment_id = experiment_id
+        db.add(result)
+        return result
+    experiment = Experiment(
+        name=f"{PLACEHOLDER_PREFIX}{directory}",
+        description="Imported BatSim run",
+        scenario_id=ids[0],
+        strategy_id=ids[1],
+        status=ExperimentStatus.COMPLETED,
+        # No start time: not a sample for the duration estimator
+        end_time=finished_at,
+        total_jobs=outputs["total_jobs"],
+        completed_jobs=outputs["completed_jobs"],
+        progress_percentage=100,
+        config=result.config,
+        # Not a simulation_dir: deleting the experiment would delete the run
+        created_by=user_id,
+    )
+    result.experiment = experiment
+    db.add(experiment)
+    return result
+
+
+def import_results(
+    root: str,
+    user_id: Optional[int] = None,
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    keep_jobs_data: bool = True,
+    progress: Optional[ImportProgress] = None,
+    on_batch: Optional[Callable[[ImportProgress], None]] = None,
+) -> ImportProgress:
+    """Import every run under `root` not imported yet"""
+    root = os.path.abspath(root)
+    if not os.path.isdir(root):
+        raise ResultImportError(f"{root} is not a directory")
+    progress = progress or ImportProgress(root=root)
+    progress.started_at = progress.started_at or datetime.now().isoformat()
+    workers = max(workers or settings.RESULT_PIPELINE_WORKERS, 1)
+
+    db = SessionLocal()
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        ids = placeholders(db, user_id)
+        imported = {
+            path
+            for (path,) in db.query(Result.result_file_path).filter(
+                Result.result_file_path.isnot(None)
+            )
+        }
+        placeholders_by_dir = {
+            name[len(PLACEHOLDER_PREFIX) :]: experiment_id
+            for name, experiment_id in db.query(Experiment.name, Experiment.id).filter(
+                Experiment.name.startswith(PLACEHOLDER_PREFIX)
+            )
+        }
+        pending = {}
+        # Results of the batch and their pending jobs tables
+        batch = []
+
+        def commit():
+            db.flush()
+            for result, jobs_table in batch:
+                attach_jobs_table(result, jobs_table)
+            db.commit()
+            batch.clear()
+
+        def collect(done):
+            for future in done:
+                directory = pending.pop(future)
+                try:
+                    outputs = future.result()
+                except ResultParseError as e:
+                    print(f"[WARN] Not imported {directory}: {e}")
+                    progress.failed += 1
+                    continue
+                jobs_table = outputs.get("jobs_table")
+                result = _add_run(
+                    db,
+                    directory,
+                    outputs,
+                    ids,
+                    user_id,
+                    placeholders_by_dir.get(directory),
+                )
+                batch.append((result, jobs_table))
+                imported.add(directory)
+                progress.imported += 1
+            if len(batch) >= batch_size:
+                commit()
+                if on_batch is not None:
+                    on_batch(progress)
+
+        for directory, prefix in find_runs(root):
+            progress.found += 1
+            if directory in imported:
+                progress.skipped += 1
+                continue
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(_parse, (directory, prefix), keep_jobs_data)] = (
+                directory
+            )
+        collect(wait(pending).done)
+        commit()
+    except Exception as e:
+        db.rollback()
+        progress.error = str(e)
+        raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        db.close()
+        progress.running = False
+        progress.finished_at = datetime.now().isoformat()
+    return progress
+
+
+class ResultImports:
+    """The import started from the API, one at a time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current: Optional[ImportProgress] = None
+
+    def start(self, root: str, user_id: int) -> ImportProgress:
+        if not os.path.isdir(root):
+            raise ResultImportError(f"{root} is not a directory")
+        with self._lock:
+            if self.current is not None and self.current.running:
+                raise ResultImportError(f"An import of {self.current.root} is running")
+            self.current = ImportProgress(
+                root=os.path.abspath(root), started_at=datetime.now().isoformat()
+            )
+            progress = self.current
+        threading.Thread(
+            target=self._run, args=(progress, user_id), name="result-import", daemon=True
+        ).start()
+        return progress
+
+    def _run(self, progress: ImportProgress, user_id: int):
+        try:
+            import_results(progress.root, user_id=user_id, progress=progress)
+            print(
+                f"[INFO] Imported {progress.imported} runs from {progress.root} "
+                f"({progress.skipped} already there, {progress.failed} failed)"
+            )
+        except Exception as e:
+            print(f"[ERROR] Result import from {progress.root}: {e}")
+
+    def status(self) -> Optional[dict]:
+        with self._lock:
+            return asdict(self.current) if self.current is not None else None
+
+
+result_imports = ResultImports()
@@ -0,0 +1,317 @@
+"""
+Result finalization
+
+When an experiment completes, its BatSim outputs (out_jobs.csv and
+out_schedule.csv) are parsed in a process pool, away from the request
+and supervisor threads, and stored as the experiment's Result: the
+summary columns come from the files, `computed_metrics` adds metrics
+derived from the per-job rows, which are kept as the result's columnar
+jobs table (see job_store.py). Storing is an upsert on the experiment,
+so finalizing a run twice (or re-running the experiment) updates the
+same Result. On startup, completed experiments that have no Result yet
+(the portal stopped before they were finalized) are caught up.
+"""
+
+import csv
+import json
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.result import Result
+from app.services.executors.base import EXPORT_PREFIX
+from app.services.experiment_runner import simulation_dir_for, supervisor
+from app.services.job_store import JobTable, pending_jobs_path, result_jobs_path
+
+# Results stored here keep the analytics rollups current
+import app.services.result_rollups  # noqa: F401
+
+# Written by the samples' CallbackInstrumentation next to the BatSim outputs
+CALLBACK_STATS_FILENAME = "out_callbacks.json"
+# Bounded slowdown ignores the stretch of jobs shorter than this (seconds)
+SLOWDOWN_BOUND = 10.0
+# out_schedule.csv fields kept in computed_metrics as they are
+SCHEDULE_METRICS = {
+    "batsim_version": str,
+    "consumed_joules": float,
+    "nb_jobs": int,
+    "nb_jobs_finished": int,
+    "nb_jobs_success": int,
+    "nb_jobs_killed": int,
+    "nb_jobs_rejected": int,
+    "success_rate": float,
+    "scheduling_time": float,
+    "time_computing": float,
+    "time_idle": float,
+    "nb_computing_machines": int,
+    "max_slowdown": float,
+    "mean_slowdown": float,
+    "max_waiting_time": float,
+    "max_turnaround_time": float,
+}
+
+
+class ResultParseError(Exception):
+    """The outputs of a run are missing or unreadable"""
+
+
+def read_callback_stats(result_dir: str) -> Optional[dict]:
+    """Load the scheduler callback latency histograms of a run, if any"""
+    stats_file = os.path.join(result_dir, CALLBACK_STATS_FILENAME)
+    if not os.path.exists(stats_file):
+        return None
+    try:
+        with open(stats_file, "r") as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(stats, dict) or "callbacks" not in stats:
+        return None
+    return stats
+
+
+def _number(row: dict, name: str, cast=float, default=0):
+    value = row.get(name)
+    if value in (None, ""):
+        return default
+    return cast(float(value)) if cast is int else cast(value)
+
+
+def _percentile(values: np.ndarray, q: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted `values`"""
+    if not len(values):
+        return None
+    return float(values[max(math.ceil(q / 100 * len(values)) - 1, 0)])
+
+
+def _job_column(table: JobTable, name: str, default: float) -> np.ndarray:
+    if name not in table.columns:
+        return np.full(table.rows, default)
+    values = table.array(name).astype("f8")
+    values[np.isnan(values) | (values < 0)] = default
+    return values
+
+
+def _job_metrics(table: JobTable) -> dict:
+    started = _job_column(table, "starting_time", -1) >= 0  # Else rejected
+    waiting = _job_column(table, "waiting_time", 0)[started]
+    execution = _job_column(table, "execution_time", 0)[started]
+    resources = _job_column(table, "requested_number_of_resources", 1)[started]
+    slowdowns = np.maximum(
+        (waiting + execution) / np.maximum(execution, SLOWDOWN_BOUND), 1.0
+    )
+    waiting.sort()
+    return {
+        "median_waiting_time": _percentile(waiting, 50),
+        "p95_waiting_time": _percentile(waiting, 95),
+        "mean_bounded_slowdown": (
+            float(slowdowns.mean()) if len(slowdowns) else None
+        ),
+        "max_bounded_slowdown": float(slowdowns.max()) if len(slowdowns) else None,
+        "core_seconds": float(np.sum(execution * resources)),
+    }
+
+
+def parse_outputs(
+    result_dir: str, prefix: str = EXPORT_PREFIX, keep_jobs_data: bool = True
+) -> dict:
+    """
+    Result columns of a run from its BatSim outputs. Runs in the pool, so
+    it only returns plain data: the jobs table is written to a pending
+    file, for store_result() to attach once the Result has an id.
+    """
+    schedule_file = os.path.join(result_dir, f"{prefix}_schedule.csv")
+    jobs_file = os.path.join(result_dir, f"{prefix}_jobs.csv")
+    try:
+        with open(schedule_file, newline="") as f:
+            row = next(csv.DictReader(f), None)
+        if row is None:
+            raise ResultParseError(f"{schedule_file} has no summary row")
+        with open(jobs_file, newline="") as f:
+            jobs = JobTable.from_csv(f)
+        computed = {
+            name: _number(row, name, cast, None if cast is str else 0)
+            for name, cast in SCHEDULE_METRICS.items()
+        }
+        computed.update(_job_metrics(jobs))
+        # The whole summary row, as out_schedule.csv has it
+        computed["schedule"] = row
+        jobs_table = None
+        if keep_jobs_data:
+            jobs_table = pending_jobs_path()
+            jobs.save(jobs_table)
+    except (OSError, ValueError) as e:
+        raise ResultParseError(str(e)) from e
+
+    makespan = _number(row, "makespan")
+    machines = computed["nb_computing_machines"]
+    nb_jobs = computed["nb_jobs"]
+    success = computed["nb_jobs_success"]
+    utilization = None
+    if makespan > 0 and machines > 0:
+        utilization = min(computed["time_computing"] / (makespan * machines), 1.0)
+    if makespan > 0:
+        computed["throughput_jobs_per_hour"] = (
+            computed["nb_jobs_finished"] / makespan * 3600
+        )
+    if success and computed["consumed_joules"]:
+        computed["joules_per_job"] = computed["consumed_joules"] / success
+
+    callback_stats = read_callback_stats(result_dir)
+    return {
+        "simulation_time": _number(row, "simulation_time"),
+        "total_jobs": nb_jobs,
+        "completed_jobs": success,
+        "failed_jobs": nb_jobs - success,
+        "makespan": makespan,
+        "average_waiting_time": _number(row, "mean_waiting_time"),
+        "average_turnaround_time": _number(row, "mean_turnaround_time"),
+        "resource_utilization": utilization,
+        "result_file_path": result_dir,
+        "jobs_table": jobs_table,
+        "computed_metrics": json.dumps(computed),
+        "callback_stats": json.dumps(callback_stats) if callback_stats else None,
+    }
+
+
+def attach_jobs_table(result: Result, jobs_table: Optional[str]):
+    """Move a pending jobs table to a flushed Result's, replacing any"""
+    if jobs_table is not None:
+        os.replace(jobs_table, result_jobs_path(result.id))
+
+
+def store_result(db, exp: Experiment, outputs: dict) -> Result:
+    """Upsert the Result of `exp` from parse_outputs(); the caller commits"""
+    outputs = dict(outputs)
+    jobs_table = outputs.pop("jobs_table", None)
+    result = (
+        db.query(Result)
+        .filter(Result.experiment_id == exp.id)
+        .order_by(Result.id.desc())
+        .first()
+    )
+    if result is None:
+        result = Result(experiment_id=exp.id)
+        db.add(result)
+    else:
+        # Re-finalized: the raw outputs are new, and so is their age
+        result.created_at = func.now()
+    for name, value in outputs.items():
+        setattr(result, name, value)
+    result.fingerprint = exp.fingerprint
+    if exp.config:
+        result.config = exp.config
+    db.flush()
+    attach_jobs_table(result, jobs_table)
+    return result
+
+
+class ResultPipeline:
+    """Finalizes completed experiments into Results in the background"""
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Experiments being parsed, so a burst of triggers parses once
+        self._pending = set()
+        self._listening = False
+
+    def start(self, catch_up: bool = True):
+        with self._lock:
+            if self._pool is not None:
+                return
+            # Spawned, not forked: the portal is multi-threaded
+            self._pool = ProcessPoolExecutor(
+                max_workers=max(settings.RESULT_PIPELINE_WORKERS, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            listening, self._listening = self._listening, True
+        if not listening:
+            supervisor.add_finished_listener(self.submit)
+        if catch_up:
+            threading.Thread(
+                target=self.catch_up, name="result-pipeline", daemon=True
+            ).start()
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def catch_up(self):
+        db = SessionLocal()
+        try:
+            missing = [
+                row.id
+                for row in db.query(Experiment.id)
+                .outerjoin(Result, Result.experiment_id == Experiment.id)
+                .filter(Experiment.status == ExperimentStatus.COMPLETED)
+                .filter(Experiment.cached_result_id.is_(None))
+                .filter(Result.id.is_(None))
+                .all()
+            ]
+        finally:
+            db.close()
+        for experiment_id in missing:
+            self.submit(experiment_id)
+        if missing:
+            print(f"[INFO] Finalizing the results of {len(missing)} experiments")
+
+    def submit(self, experiment_id: int) -> Optional[Future]:
+        """Parse and store the outputs of `experiment_id` if it completed"""
+        db = SessionLocal()
+        try:
+            exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+            if exp is None or exp.status != ExperimentStatus.COMPLETED:
+                return None
+            if exp.cached_result_id:
+                # Finished from the cache: there are no outputs of its own
+                return None
+            result_dir = exp.simulation_dir or simulation_dir_for(experiment_id)
+        finally:
+            db.close()
+        with self._lock:
+            if self._pool is None or experiment_id in self._pending:
+                return None
+            self._pending.add(experiment_id)
+            future = self._pool.submit(parse_outputs, result_dir)
+        future.add_done_callback(lambda done: self._store(experiment_id, done))
+        return future
+
+    def _store(self, experiment_id: int, future: Future):
+        try:
+            outputs = future.result()
+        except ResultParseError as e:
+            print(f"[WARN] No result for experiment {experiment_id}: {e}")
+            return
+        except Exception as e:
+            print(f"[ERROR] Result pipeline, experiment {experiment_id}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._pending.discard(experiment_id)
+        db = SessionLocal()
+        try:
+            exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+            if exp is None:
+                return
+            store_result(db, exp, outputs)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[ERROR] Result pipeline, experiment {experiment_id}: {e}")
+        finally:
+            db.close()
+
+
+result_pipeline = ResultPipeline()
@@ -0,0 +1,153 @@
+"""
+Analytics rollups
+
+`result_rollups` holds, per day, strategy and scenario, the number of
+results, the count, sum and sum of squares of each ROLLUP_METRICS column
+and the sums of the job counts. Analytics over any date range then read
+a few rows per day instead of every result.
+
+Rows follow the results through session events. Before a flush, the
+results about to change or go are subtracted as the database has them
+(and so are all the results of an experiment moved to another strategy
+or scenario). After the flush, the new and changed ones are added back.
+Each step groups the affected rows in SQL, so the day is always the
+database's own date(created_at), server default included. Writes that
+bypass the ORM (Core bulk inserts, manual SQL) need a
+`python -m app.rebuild_rollups`.
+"""
+
+from typing import Iterable
+
+from sqlalchemy import String, cast, delete, event, func, insert, or_, select, update
+from sqlalchemy import inspect as inspect_state
+from sqlalchemy.orm import Session
+
+from app.models.experiment import Experiment
+from app.models.result import Result
+from app.models.result_rollup import ROLLUP_METRICS, ROLLUP_SUMS, ResultRollup
+
+ROLLUP_KEY = ("day", "strategy_id", "scenario_id")
+# session.info key: result and experiment ids to add back after the flush
+_PENDING = "result_rollups_pending"
+
+day_of = cast(func.date(Result.created_at), String)
+
+
+def _aggregates():
+    columns = [
+        day_of.label("day"),
+        Experiment.strategy_id.label("strategy_id"),
+        Experiment.scenario_id.label("scenario_id"),
+        func.count(Result.id).label("results"),
+    ]
+    for name in ROLLUP_METRICS:
+        column = getattr(Result, name)
+        columns += [
+            func.count(column).label(f"{name}_count"),
+            func.coalesce(func.sum(column), 0).label(f"{name}_sum"),
+            func.coalesce(func.sum(column * column), 0).label(f"{name}_sumsq"),
+        ]
+    for name in ROLLUP_SUMS:
+        columns.append(func.coalesce(func.sum(getattr(Result, name)), 0).label(name))
+    return columns
+
+
+def _grouped(*conditions):
+    return (
+        select(*_aggregates())
+        .select_from(Result)
+        .join(Experiment, Experiment.id == Result.experiment_id)
+        .where(*conditions)
+        .group_by(day_of, Experiment.strategy_id, Experiment.scenario_id)
+    )
+
+
+def _apply(conn, result_ids: Iterable[int], experiment_ids: Iterable[int], sign: int):
+    """Add (sign 1) or subtract (-1) the given results' current rows"""
+    conditions = []
+    if result_ids:
+        conditions.append(Result.id.in_(list(result_ids)))
+    if experiment_ids:
+        conditions.append(Result.experiment_id.in_(list(experiment_ids)))
+    if not conditions:
+        return
+    for row in conn.execute(_grouped(or_(*conditions))).mappings().all():
+        key = {name: row[name] for name in ROLLUP_KEY}
+        key["day"] = str(key["day"])
+        deltas = {name: sign * value for name, value in row.items() if name not in key}
+        updated = conn.execute(
+            update(ResultRollup)
+            .where(*(getattr(ResultRollup, name) == value for name, value in key.items()))
+            .values(
+                {
+                    name: getattr(ResultRollup, name) + delta
+                    for name, delta in deltas.items()
+                }
+            )
+        )
+        if updated.rowcount == 0:
+            conn.execute(insert(ResultRollup).values(**key, **deltas))
+
+
+def _moved(experiment: Experiment) -> bool:
+    state = inspect_state(experiment)
+    return (
+        state.attrs.strategy_id.history.has_changes()
+        or state.attrs.scenario_id.history.has_changes()
+    )
+
+
+def _identity(obj):
+    identity = inspect_state(obj).identity
+    return identity[0] if identity else None
+
+
+@event.listens_for(Session, "before_flush")
+def _subtract_changed(session, flush_context, instances):
+    result_ids, experiment_ids = set(), set()
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Result):
+            result_ids.add(_identity(obj))
+        elif (
+            isinstance(obj, Experiment)
+            and obj not in session.deleted
+            and _moved(obj)
+        ):
+            experiment_ids.add(_identity(obj))
+    result_ids.discard(None)
+    experiment_ids.discard(None)
+    if result_ids or experiment_ids:
+        _apply(session.connection(), result_ids, experiment_ids, -1)
+    deleted = {_identity(obj) for obj in session.deleted if isinstance(obj, Result)}
+    session.info[_PENDING] = (result_ids - deleted, experiment_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _add_changed(session, flush_context):
+    result_ids, experiment_ids = session.info.pop(_PENDING, (set(), set()))
+    result_ids = result_ids | {obj.id for obj in session.new if isinstance(obj, Result)}
+    if result_ids or experiment_ids:
+        conn = session.connection()
+        _apply(conn, result_ids, experiment_ids, 1)
+        conn.execute(delete(ResultRollup).where(ResultRollup.results <= 0))
+
+
+def rebuild(conn) -> int:
+    """Recompute every rollup row from the results; returns the row count"""
+    conn.execute(delete(ResultRollup))
+    query = _grouped()
+    conn.execute(
+        insert(ResultRollup).from_select([c.name for c in query.selected_columns], query)
+    )
+    return conn.execute(select(func.count(ResultRollup.id))).scalar()
+
+
+def ensure_built(engine):
+    """Build the rollups of a database whose results predate them"""
+    with engine.begin() as conn:
+        if conn.execute(select(ResultRollup.id).limit(1)).first() is not None:
+            return
+        if conn.execute(select(Result.id).limit(1)).first() is None:
+            return
+        rows = rebuild(conn)
+    print(f"[INFO] Built {rows} analytics rollup rows")
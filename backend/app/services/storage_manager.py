@@ -0,0 +1,445 @@
+"""
+Storage accounting and garbage collection
+
+Everything the portal writes lives under STORAGE_PATH:
+
+    workloads/, platforms/, strategies/   uploaded files
+    experiments/exp_<id>/                 simulation directories (raw outputs)
+    logs/experiments/exp_<id>/            compressed experiment logs
+    logs/results/result_<id>/             compressed result logs
+    results/result_<id>.jobs              columnar per-job result data
+
+A background thread scans the tree every STORAGE_SCAN_INTERVAL, charges
+every artifact to a kind and to the user owning it, and marks what can
+be reclaimed:
+
+- orphaned: no database row refers to it any more (after a grace period,
+  so uploads in flight are not collected)
+- expired: raw outputs of a finished experiment, STORAGE_RAW_RETENTION_DAYS
+  after its result was ingested, or of a failed or cancelled one
+  STORAGE_FINISHED_RETENTION_DAYS after it ended
+- over_quota: the oldest raw outputs with an ingested result, beyond
+  STORAGE_RAW_QUOTA_MB
+
+Raw outputs of a completed experiment without a result are never
+collected: the result pipeline may still ingest them.
+
+With STORAGE_GC_ENABLED the scan deletes them too. Users above
+STORAGE_USER_QUOTA_MB cannot upload files or start experiments.
+"""
+
+import os
+import shutil
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.platform import Platform
+from app.models.result import Result
+from app.models.strategy import Strategy
+from app.models.user import User
+from app.models.workload import Workload
+from app.services.job_store import SUFFIX as JOBS_SUFFIX
+
+UPLOAD_KINDS = {
+    "workloads": Workload,
+    "platforms": Platform,
+    "strategies": Strategy,
+}
+KINDS = (
+    "workloads",
+    "platforms",
+    "strategies",
+    "experiments",
+    "logs",
+    "results",
+    "other",
+)
+
+# Experiments that will never get a result from their raw outputs
+UNSUCCESSFUL_STATUSES = (ExperimentStatus.FAILED, ExperimentStatus.CANCELLED)
+
+# Experiments whose simulation directory is in use or about to be
+ACTIVE_STATUSES = (
+    ExperimentStatus.QUEUED,
+    ExperimentStatus.RUNNING,
+    ExperimentStatus.PAUSED,
+)
+
+MB = 1024 * 1024
+
+
+class StorageQuotaError(Exception):
+    """Raised when a user is over their storage quota"""
+
+
+@dataclass
+class Artifact:
+    kind: str
+    path: str
+    size: int
+    owner: Optional[int]
+    # Why it can be deleted; None if it must be kept
+    reason: Optional[str] = None
+    # Set on raw outputs with an ingested result: sort key for quota eviction
+    finished_at: Optional[datetime] = None
+
+
+def tree_usage(path: str) -> Tuple[int, float]:
+    """Total size and latest mtime of a file or directory tree"""
+    try:
+        stat = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return 0, 0.0
+    if not os.path.isdir(path) or os.path.islink(path):
+        return stat.st_size, stat.st_mtime
+    size, latest = 0, stat.st_mtime
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            latest = max(latest, stat.st_mtime)
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            else:
+                size += stat.st_size
+    return size, latest
+
+
+def _entries(directory: str) -> List[os.DirEntry]:
+    try:
+        return list(os.scandir(directory))
+    except OSError:
+        return []
+
+
+def _suffix_id(name: str, prefix: str) -> Optional[int]:
+    if not name.startswith(prefix):
+        return None
+    try:
+        return int(name[len(prefix) :])
+    except ValueError:
+        return None
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+class StorageManager:
+    """Background scanner and collector of STORAGE_PATH"""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # One scan or collection at a time
+        self._scan_lock = threading.Lock()
+        self._artifacts: List[Artifact] = []
+        self._usage_by_user: Dict[Optional[int], int] = {}
+        self.scanned_at: Optional[datetime] = None
+        self.scan_seconds = 0.0
+        self.last_collection: Optional[dict] = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="storage-manager", daemon=True
+            )
+            self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if settings.STORAGE_GC_ENABLED:
+                    self.collect()
+                else:
+                    self.scan()
+            except Exception as e:
+                print(f"[ERROR] Storage manager: {e}")
+            self._wake.wait(settings.STORAGE_SCAN_INTERVAL)
+            self._wake.clear()
+
+    # -- scanning -----------------------------------------------------------
+
+    def scan(self) -> List[Artifact]:
+        with self._scan_lock:
+            return self._scan()
+
+    def _scan(self) -> List[Artifact]:
+        started = time.monotonic()
+        now = datetime.now()
+        orphan_cutoff = time.time() - settings.STORAGE_ORPHAN_GRACE_HOURS * 3600
+        raw_cutoff = now - timedelta(days=settings.STORAGE_RAW_RETENTION_DAYS)
+        finished_cutoff = now - timedelta(days=settings.STORAGE_FINISHED_RETENTION_DAYS)
+
+        db = SessionLocal()
+        try:
+            uploads = {
+                kind: {
+                    os.path.abspath(row.file_path): row.created_by
+                    for row in db.query(model.file_path, model.created_by)
+                    if row.file_path
+                }
+                for kind, model in UPLOAD_KINDS.items()
+            }
+            experiments = {
+                row.id: row
+                for row in db.query(
+                    Experiment.id,
+                    Experiment.created_by,
+                    Experiment.status,
+                    Experiment.end_time,
+                )
+            }
+            ingested = dict(
+                db.query(Result.experiment_id, func.max(Result.created_at)).group_by(
+                    Result.experiment_id
+                )
+            )
+            results = dict(db.query(Result.id, Result.experiment_id))
+        finally:
+            db.close()
+
+        def owner_of(experiment_id):
+            row = experiments.get(experiment_id)
+            return row.created_by if row is not None else None
+
+        root = settings.STORAGE_PATH
+        artifacts: List[Artifact] = []
+
+        def add(kind, path, owner, reason=None, finished_at=None):
+            size, mtime = tree_usage(path)
+            if reason == "orphaned" and mtime > orphan_cutoff:
+                reason = None  # Too recent: may not be committed yet
+            artifacts.append(Artifact(kind, path, size, owner, reason, finished_at))
+
+        known = set(UPLOAD_KINDS) | {"experiments", "logs", "results"}
+        for entry in _entries(root):
+            if entry.name not in known:
+                add("other", entry.path, None)
+
+        for kind in UPLOAD_KINDS:
+            for entry in _entries(os.path.join(root, kind)):
+                path = os.path.abspath(entry.path)
+                owner = uploads[kind].get(path)
+                add(kind, entry.path, owner, None if path in uploads[kind] else "orphaned")
+
+        for entry in _entries(os.path.join(root, "experiments")):
+            experiment_id = _suffix_id(entry.name, "exp_")
+            exp = experiments.get(experiment_id)
+            if exp is None:
+                add("experiments", entry.path, None, "orphaned")
+                continue
+            reason = finished_at = None
+            if exp.status not in ACTIVE_STATUSES and exp.status != ExperimentStatus.PENDING:
+                ended_at = _naive(exp.end_time)
+                ingested_at = _naive(ingested.get(exp.id))
+                if ingested_at is not None:
+                    finished_at = ended_at or ingested_at
+                    if ingested_at < raw_cutoff:
+                        reason = "expired"
+                elif (
+                    exp.status in UNSUCCESSFUL_STATUSES
+                    and ended_at is not None
+                    and ended_at < finished_cutoff
+                ):
+                    reason = "expired"
+            add("experiments", entry.path, exp.created_by, reason, finished_at)
+
+        logs = os.path.join(root, "logs")
+        for entry in _entries(os.path.join(logs, "experiments")):
+            experiment_id = _suffix_id(entry.name, "exp_")
+            orphaned = experiment_id not in experiments
+            add("logs", entry.path, owner_of(experiment_id), "orphaned" if orphaned else None)
+        for entry in _entries(os.path.join(logs, "results")):
+            result_id = _suffix_id(entry.name, "result_")
+            orphaned = result_id not in results
+            add(
+                "logs",
+                entry.path,
+                owner_of(results.get(result_id)),
+                "orphaned" if orphaned else None,
+            )
+
+        for entry in _entries(os.path.join(root, "results")):
+            # Pending tables of results never stored are orphans too
+            result_id = None
+            if entry.name.endswith(JOBS_SUFFIX):
+                result_id = _suffix_id(entry.name[: -len(JOBS_SUFFIX)], "result_")
+            orphaned = result_id not in results
+            add(
+                "results",
+                entry.path,
+                owner_of(results.get(result_id)),
+                "orphaned" if orphaned else None,
+            )
+
+        self._apply_raw_quota(artifacts)
+
+        usage: Dict[Optional[int], int] = defaultdict(int)
+        for artifact in artifacts:
+            usage[artifact.owner] += artifact.size
+        with self._lock:
+            self._artifacts = artifacts
+            self._usage_by_user = dict(usage)
+            self.scanned_at = now
+            self.scan_seconds = time.monotonic() - started
+        return artifacts
+
+    def _apply_raw_quota(self, artifacts: List[Artifact]):
+        """Mark the oldest ingested raw outputs beyond STORAGE_RAW_QUOTA_MB"""
+        if not settings.STORAGE_RAW_QUOTA_MB:
+            return
+        raw = [a for a in artifacts if a.kind == "experiments" and a.reason is None]
+        excess = sum(a.size for a in raw) - settings.STORAGE_RAW_QUOTA_MB * MB
+        evictable = sorted(
+            (a for a in raw if a.finished_at is not None), key=lambda a: a.finished_at
+        )
+        for artifact in evictable:
+            if excess <= 0:
+                break
+            artifact.reason = "over_quota"
+            excess -= artifact.size
+
+    # -- collection ---------------------------------------------------------
+
+    def collect(self, dry_run: bool = False) -> dict:
+        """Rescan and delete everything reclaimable"""
+        with self._scan_lock:
+            artifacts = self._scan()
+            reclaimable = [a for a in artifacts if a.reason is not None]
+            freed = deleted = 0
+            errors = []
+            for artifact in reclaimable:
+                if dry_run:
+                    continue
+                try:
+                    if os.path.isdir(artifact.path) and not os.path.islink(artifact.path):
+                        shutil.rmtree(artifact.path)
+                    else:
+                        os.remove(artifact.path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    errors.append(f"{artifact.path}: {e}")
+                    continue
+                freed += artifact.size
+                deleted += 1
+            summary = {
+                "dry_run": dry_run,
+                "items": len(reclaimable),
+                "bytes": sum(a.size for a in reclaimable),
+                "deleted_items": deleted,
+                "freed_bytes": freed,
+                "errors": errors,
+                "finished_at": datetime.now(),
+            }
+            if not dry_run:
+                self.last_collection = summary
+                if deleted:
+                    self._scan()
+            return summary
+
+    # -- quotas and reporting -----------------------------------------------
+
+    def usage_of(self, user_id: int) -> int:
+        with self._lock:
+            return self._usage_by_user.get(user_id, 0)
+
+    def check_quota(self, user_id: int):
+        """Raise StorageQuotaError if `user_id` is over its quota"""
+        quota = settings.STORAGE_USER_QUOTA_MB * MB
+        if quota and self.scanned_at is None:
+            self.scan()
+        if quota and self.usage_of(user_id) >= quota:
+            raise StorageQuotaError(
+                f"Storage quota exceeded: {self.usage_of(user_id) // MB} MB used "
+                f"of {settings.STORAGE_USER_QUOTA_MB} MB"
+            )
+
+    def report(self) -> dict:
+        with self._lock:
+            artifacts = list(self._artifacts)
+            usage = dict(self._usage_by_user)
+            scanned_at = self.scanned_at
+            scan_seconds = self.scan_seconds
+            last_collection = self.last_collection
+
+        by_kind = {kind: {"bytes": 0, "items": 0} for kind in KINDS}
+        reclaimable = defaultdict(lambda: {"bytes": 0, "items": 0})
+        reclaimable_by_user = defaultdict(int)
+        for artifact in artifacts:
+            by_kind[artifact.kind]["bytes"] += artifact.size
+            by_kind[artifact.kind]["items"] += 1
+            if artifact.reason is not None:
+                reclaimable[artifact.reason]["bytes"] += artifact.size
+                reclaimable[artifact.reason]["items"] += 1
+                reclaimable_by_user[artifact.owner] += artifact.size
+
+        db = SessionLocal()
+        try:
+            usernames = dict(db.query(User.id, User.username))
+        finally:
+            db.close()
+        quota = settings.STORAGE_USER_QUOTA_MB * MB
+        users = [
+            {
+                "user_id": user_id,
+                "username": usernames.get(user_id),
+                "bytes": size,
+                "reclaimable_bytes": reclaimable_by_user.get(user_id, 0),
+                "quota_bytes": quota or None,
+                "over_quota": bool(quota) and user_id is not None and size >= quota,
+            }
+            for user_id, size in sorted(usage.items(), key=lambda item: -item[1])
+        ]
+        return {
+            "storage_path": os.path.abspath(settings.STORAGE_PATH),
+            "scanned_at": scanned_at,
+            "scan_seconds": round(scan_seconds, 3),
+            "total_bytes": sum(a.size for a in artifacts),
+            "by_kind": by_kind,
+            "by_user": users,
+            "reclaimable": {
+                "bytes": sum(r["bytes"] for r in reclaimable.values()),
+                "items": sum(r["items"] for r in reclaimable.values()),
+                "by_reason": dict(reclaimable),
+            },
+            "policy": {
+                "gc_enabled": settings.STORAGE_GC_ENABLED,
+                "scan_interval_seconds": settings.STORAGE_SCAN_INTERVAL,
+                "raw_retention_days": settings.STORAGE_RAW_RETENTION_DAYS,
+                "finished_retention_days": settings.STORAGE_FINISHED_RETENTION_DAYS,
+                "orphan_grace_hours": settings.STORAGE_ORPHAN_GRACE_HOURS,
+                "raw_quota_mb": settings.STORAGE_RAW_QUOTA_MB or None,
+                "user_quota_mb": settings.STORAGE_USER_QUOTA_MB or None,
+            },
+            "last_collection": last_collection,
+        }
+
+
+storage_manager = StorageManager()
@@ -0,0 +1,374 @@
+"""
+Strategy throughput benchmarks
+
+Runs scheduling strategies through the replay engine against generated
+workloads and platforms of increasing size, and reports decisions per
+second, callback latency percentiles and peak memory for each case.
+
+Each case runs in a fresh interpreter so that peak RSS and module state
+belong to that case only. Results are a JSON document that the portal
+stores on the Strategy record to compare versions of the same file.
+
+Usage:
+    python -m app.services.strategy_benchmark -s my_strategy.py \\
+        --jobs 10000 --resources 288 -o benchmark.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import platform as host_platform
+import random
+import resource
+import tempfile
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from app.services.replay import (
+    SCHEDULER_OUTPUT_DIR_ENV,
+    ReplayEngine,
+    Workload,
+    run_strategy,
+)
+
+RESULTS_VERSION = 1
+
+JOB_COUNTS = (10_000, 100_000, 1_000_000)
+PLATFORM_SIZES = (288, 10_000, 100_000)
+
+SAMPLE_STRATEGIES_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "samples", "strategies")
+)
+SAMPLE_STRATEGIES = ("fcfs_scheduler.py", "backfill_scheduler.py")
+
+# Callbacks timed by the benchmark, on top of whatever the strategy records
+TIMED_CALLBACKS = ("onJobSubmission", "onJobCompletion", "onJobKilled", "onRequestedCall")
+
+# Default per-case limit; quadratic strategies on the largest cases are
+# reported as timed out instead of stalling the whole suite
+DEFAULT_TIMEOUT = 600.0
+
+# Number of benchmark runs kept per strategy
+HISTORY_SIZE = 20
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generate_workload(
+    nb_jobs: int, nb_resources: int, seed: int = 0, load: float = 0.9
+) -> Workload:
+    """
+    Synthetic delay-profile workload sized for a platform
+
+    Job sizes are powers of two up to an eighth of the platform, runtimes
+    are exponential around ten minutes and walltimes overestimate them by
+    up to 3x. Arrivals are Poisson, with a rate chosen so the offered load
+    is `load` times the platform capacity.
+    """
+    rng = random.Random(seed)
+    max_exponent = max(0, int(math.log2(nb_resources)) - 3)
+    res = [1 << rng.randint(0, max_exponent) for _ in range(nb_jobs)]
+    runtime = [float(max(1, min(86400, round(rng.expovariate(1 / 600))))) for _ in range(nb_jobs)]
+    walltime = [float(math.ceil(r * rng.uniform(1.0, 3.0))) for r in runtime]
+
+    total_work = sum(r * n for r, n in zip(runtime, res))
+    mean_interarrival = total_work / (nb_resources * load) / max(nb_jobs, 1)
+    subtime = []
+    now = 0.0
+    for _ in range(nb_jobs):
+        subtime.append(now)
+        now += round(rng.expovariate(1 / mean_interarrival), 3)
+
+    return Workload.from_columns(
+        nb_res=nb_resources,
+        ids=range(nb_jobs),
+        profiles=[f"delay_{int(r)}" for r in runtime],
+        subtime=subtime,
+        res=res,
+        walltime=walltime,
+        runtime=runtime,
+    )
+
+
+def percentile(sorted_values, q: float) -> int:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "mean_ns": sum(values) / len(values) if values else 0,
+        "p50_ns": percentile(values, 0.50),
+        "p99_ns": percentile(values, 0.99),
+        "max_ns": values[-1] if values else 0,
+    }
+
+
+class BenchmarkEngine(ReplayEngine):
+    """Replay engine that records the latency of every scheduler callback"""
+
+    def __init__(self, workload: Workload, nb_resources: int):
+        super().__init__(workload, nb_resources)
+        self.latencies: Dict[str, array] = {}
+
+    def _timed(self, name, callback):
+        samples = self.latencies.setdefault(name, array("q"))
+        record = samples.append
+        clock = time.perf_counter_ns
+
+        def timed(*args):
+            started = clock()
+            try:
+                return callback(*args)
+            finally:
+                record(clock() - started)
+
+        return timed
+
+    def run(self):
+        # Callbacks are final once the strategy calls start()
+        for name in TIMED_CALLBACKS:
+            callback = getattr(self.scheduler, name, None)
+            if callable(callback):
+                setattr(self.scheduler, name, self._timed(name, callback))
+        super().run()
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if host_platform.system() == "Darwin" else peak * 1024
+
+
+def _run_case(strategy_path: str, nb_jobs: int, nb_resources: int, seed: int) -> dict:
+    """One case, meant to run in its own process"""
+    workload = generate_workload(nb_jobs, nb_resources, seed)
+    engine = BenchmarkEngine(workload, nb_resources)
+    rss_before = _peak_rss_bytes()
+    with tempfile.TemporaryDirectory(prefix="strategy-benchmark-") as output_dir:
+        os.environ[SCHEDULER_OUTPUT_DIR_ENV] = output_dir
+        run_strategy(engine, strategy_path)
+    peak_rss = _peak_rss_bytes()
+
+    all_latencies = array("q")
+    callbacks = {}
+    for name, samples in sorted(engine.latencies.items()):
+        all_latencies.extend(samples)
+        callbacks[name] = latency_summary(samples)
+    overall = latency_summary(all_latencies)
+    return {
+        "status": "ok",
+        "decisions": engine.nb_decisions,
+        "callbacks": engine.nb_callbacks,
+        "scheduling_time": engine.scheduling_time,
+        "simulation_time": engine.simulation_time,
+        "decisions_per_second": (
+            engine.nb_decisions / engine.scheduling_time if engine.scheduling_time else 0.0
+        ),
+        "p50_callback_ns": overall["p50_ns"],
+        "p99_callback_ns": overall["p99_ns"],
+        "max_callback_ns": overall["max_ns"],
+        "per_callback": callbacks,
+        "peak_rss_bytes": peak_rss,
+        "run_rss_growth_bytes": max(0, peak_rss - rss_before),
+    }
+
+
+def _case_worker(connection, strategy_path, nb_jobs, nb_resources, seed):
+    try:
+        result = _run_case(strategy_path, nb_jobs, nb_resources, seed)
+    except BaseException as e:  # Reported per case, the suite carries on
+        result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    connection.send(result)
+    connection.close()
+
+
+def run_case(
+    strategy_path: str,
+    nb_jobs: int,
+    nb_resources: int,
+    seed: int = 0,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> dict:
+    """Run one case in a fresh interpreter and return its measurements"""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_case_worker,
+        args=(sender, os.path.abspath(strategy_path), nb_jobs, nb_resources, seed),
+        daemon=True,
+    )
+    started = time.perf_counter()
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            result = receiver.recv()
+        elif process.is_alive():
+            result = {"status": "timeout", "error": f"No result after {timeout}s"}
+        else:
+            result = {"status": "error", "error": f"Exited with code {process.exitcode}"}
+    except EOFError:
+        result = {"status": "error", "error": "Benchmark process died"}
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    result.update(
+        {
+            "nb_jobs": nb_jobs,
+            "nb_resources": nb_resources,
+            "seed": seed,
+            "wall_time": time.perf_counter() - started,
+        }
+    )
+    return result
+
+
+def benchmark_strategy(
+    strategy_path: str,
+    job_counts: Iterable[int] = JOB_COUNTS,
+    platform_sizes: Iterable[int] = PLATFORM_SIZES,
+    seed: int = 0,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    progress=None,
+) -> dict:
+    """Benchmark one strategy file over every (jobs, resources) case"""
+    cases = []
+    for nb_resources in platform_sizes:
+        for nb_jobs in job_counts:
+            case = run_case(strategy_path, nb_jobs, nb_resources, seed, timeout)
+            cases.append(case)
+            if progress:
+                progress(os.path.basename(strategy_path), case)
+    return {
+        "version": RESULTS_VERSION,
+        "strategy": os.path.basename(strategy_path),
+        "sha256": file_sha256(strategy_path),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": host_platform.python_version(),
+        "machine": host_platform.machine(),
+        "seed": seed,
+        "cases": cases,
+    }
+
+
+def _case_key(case: dict):
+    return case.get("nb_jobs"), case.get("nb_resources")
+
+
+def compare_results(baseline: dict, current: dict) -> List[dict]:
+    """
+    Per-case change from `baseline` to `current`
+
+    Ratios above 1 mean the current version makes more decisions per second,
+    or has slower callbacks for the latency ratios.
+    """
+    previous = {_case_key(case): case for case in baseline.get("cases", [])}
+    comparison = []
+    for case in current.get("cases", []):
+        before = previous.get(_case_key(case))
+        if before is None or before.get("status") != "ok" or case.get("status") != "ok":
+            continue
+        entry = {"nb_jobs": case["nb_jobs"], "nb_resources": case["nb_resources"]}
+        for field in ("decisions_per_second", "p50_callback_ns", "p99_callback_ns", "peak_rss_bytes"):
+            entry[f"{field}_ratio"] = (
+                case[field] / before[field] if before.get(field) else None
+            )
+        comparison.append(entry)
+    return comparison
+
+
+def append_history(history_json: Optional[str], results: dict) -> str:
+    """Add a run to a Strategy's stored history and return the new JSON"""
+    try:
+        history = json.loads(history_json) if history_json else []
+    except json.JSONDecodeError:
+        history = []
+    if not isinstance(history, list):
+        history = []
+    history.append(results)
+    return json.dumps(history[-HISTORY_SIZE:])
+
+
+def validate_results(results) -> dict:
+    """Check that an uploaded document looks like benchmark_strategy() output"""
+    if not isinstance(results, dict) or results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Expected benchmark results version {RESULTS_VERSION}")
+    if not isinstance(results.get("cases"), list):
+        raise ValueError("Benchmark results have no cases")
+    return results
+
+
+def _print_case(strategy, case):
+    if case.get("status") != "ok":
+        print(
+            f"{strategy:<36} {case['nb_jobs']:>9} jobs {case['nb_resources']:>7} res"
+            f"  {case['status']}: {case.get('error', '')}"
+        )
+        return
+    print(
+        f"{strategy:<36} {case['nb_jobs']:>9} jobs {case['nb_resources']:>7} res"
+        f"  {case['decisions_per_second']:>10.0f} dec/s"
+        f"  p50 {case['p50_callback_ns'] / 1000:>8.1f} us"
+        f"  p99 {case['p99_callback_ns'] / 1000:>8.1f} us"
+        f"  peak {case['peak_rss_bytes'] / (1 << 20):>7.1f} MiB"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scheduling strategies")
+    parser.add_argument(
+        "-s",
+        "--strategy",
+        action="append",
+        help="Strategy .py file (repeatable); defaults to the FCFS and backfill samples",
+    )
+    parser.add_argument("--jobs", type=int, action="append", help="Job count (repeatable)")
+    parser.add_argument(
+        "--resources", type=int, action="append", help="Platform size (repeatable)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per case")
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    strategies = args.strategy or [
+        os.path.join(SAMPLE_STRATEGIES_DIR, name) for name in SAMPLE_STRATEGIES
+    ]
+    results = [
+        benchmark_strategy(
+            path,
+            args.jobs or JOB_COUNTS,
+            args.resources or PLATFORM_SIZES,
+            args.seed,
+            args.timeout,
+            progress=_print_case,
+        )
+        for path in strategies
+    ]
+    document = results[0] if len(results) == 1 else {"version": RESULTS_VERSION, "runs": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Experiment worker
+
+Runs queued experiments on this machine, alongside or instead of the
+portal's embedded dispatcher:
+
+    python -m app.worker [--id NAME] [--slots N]
+
+A worker shares the portal's DATABASE_URL and STORAGE_PATH (a network
+filesystem when on another host). It claims queued experiments with the
+same conditional UPDATE as the portal, under a lease of
+WORKER_LEASE_SECONDS, and runs them with the local executor. Every
+WORKER_HEARTBEAT_INTERVAL it renews the leases of its runs, stops the
+ones cancelled from the portal and pauses or resumes the ones the portal
+set to PAUSED or back to RUNNING. Status, exit codes and logs are written
+back as each run finishes. If a worker dies, its leases expire and any
+other dispatcher re-queues the experiments.
+
+The first SIGINT / SIGTERM drains the worker: it claims nothing more and
+exits once its runs finish. A second one re-queues the remaining runs and
+exits.
+"""
+
+import argparse
+import os
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.schema import create_schema
+from app.models import Experiment, ExperimentStatus, Worker
+from app.services.dispatcher import ExperimentDispatcher
+from app.services.executors import ExecutorError
+from app.services.experiment_runner import supervisor
+from app.services.result_pipeline import result_pipeline
+
+
+class WorkerAgent:
+    """Claims, runs and heartbeats experiments for one worker process"""
+
+    def __init__(self, worker_id: str, slots: int):
+        self.worker_id = worker_id
+        self.slots = slots
+        self.dispatcher = ExperimentDispatcher(
+            worker_id=worker_id, slots=slots, executor_name="local"
+        )
+        supervisor.worker_id = worker_id
+        self.status = "active"
+        self._stop = threading.Event()
+
+    def _update_worker(self, db, **values):
+        worker = db.query(Worker).filter(Worker.id == self.worker_id).first()
+        if worker is None:
+            worker = Worker(id=self.worker_id)
+            db.add(worker)
+        for name, value in values.items():
+            setattr(worker, name, value)
+        db.commit()
+
+    def register(self):
+        db = SessionLocal()
+        try:
+            self._update_worker(
+                db,
+                hostname=socket.gethostname(),
+                pid=os.getpid(),
+                slots=self.slots,
+                running=0,
+                status=self.status,
+                started_at=datetime.now(),
+                heartbeat_at=datetime.now(),
+            )
+        finally:
+            db.close()
+
+    def heartbeat(self):
+        """Renew our leases and act on experiments stopped or paused elsewhere"""
+        running = supervisor.running_ids()
+        now = datetime.now()
+        db = SessionLocal()
+        try:
+            if running:
+                db.execute(
+                    update(Experiment)
+                    .where(Experiment.id.in_(running))
+                    .where(Experiment.worker_id == self.worker_id)
+                    .where(
+                        Experiment.status.in_(
+                            (ExperimentStatus.RUNNING, ExperimentStatus.PAUSED)
+                        )
+                    )
+                    .values(
+                        lease_expires_at=now
+                        + timedelta(seconds=settings.WORKER_LEASE_SECONDS),
+                        # A renewal is not a change dashboards need to see
+                        revision=Experiment.revision,
+                    )
+                )
+                db.commit()
+                rows = (
+                    db.query(Experiment.id, Experiment.status, Experiment.worker_id)
+                    .filter(Experiment.id.in_(running))
+                    .all()
+                )
+                for row in rows:
+                    if row.worker_id != self.worker_id:
+                        # Lease lost: someone else owns the experiment now
+                        print(f"[WARN] Lost the lease of experiment {row.id}")
+                        supervisor.stop(row.id)
+                    elif row.status == ExperimentStatus.CANCELLED:
+                        supervisor.stop(row.id)
+                    else:
+                        self._apply_pause(row.id, row.status == ExperimentStatus.PAUSED)
+            self._update_worker(
+                db, running=len(running), status=self.status, heartbeat_at=now
+            )
+        finally:
+            db.close()
+
+    def _apply_pause(self, experiment_id: int, paused: bool):
+        """Pause or resume a run as the portal recorded it in its row"""
+        run = supervisor.get_run(experiment_id)
+        if run is None or run.paused == paused:
+            return
+        try:
+            if paused:
+                supervisor.pause(experiment_id)
+                # Its slot is free for the next queued experiment
+                self.dispatcher.wake()
+            else:
+                supervisor.resume(experiment_id)
+        except ExecutorError as e:
+            # Still starting or being stopped: retried on the next heartbeat
+            print(f"[WARN] Cannot pause or resume experiment {experiment_id}: {e}")
+
+    def drain(self):
+        if self.status == "active":
+            print(f"[INFO] Worker {self.worker_id} draining")
+            self.status = "draining"
+            self.dispatcher.shutdown()
+        else:
+            print(f"[INFO] Worker {self.worker_id} re-queueing its runs")
+            for experiment_id in supervisor.running_ids():
+                supervisor.stop(experiment_id, release=True)
+        self._stop.set()
+
+    def run(self):
+        create_schema(engine)
+        self.register()
+        # The portal catches up on results missed while no one was running
+        result_pipeline.start(catch_up=False)
+        self.dispatcher.start()
+        print(
+            f"[INFO] Worker {self.worker_id} started with {self.slots} slots "
+            f"on {settings.DATABASE_URL}"
+        )
+        try:
+            while True:
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    print(f"[ERROR] Worker heartbeat: {e}")
+                if self.status != "active" and not supervisor.running_ids():
+                    break
+                self._stop.wait(settings.WORKER_HEARTBEAT_INTERVAL)
+                self._stop.clear()
+        finally:
+            result_pipeline.shutdown()
+            self.status = "stopped"
+            db = SessionLocal()
+            try:
+                self._update_worker(db, running=0, status=self.status)
+            finally:
+                db.close()
+            print(f"[INFO] Worker {self.worker_id} stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run queued experiments")
+    parser.add_argument(
+        "--id",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="Worker name (default: hostname-pid)",
+    )
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=settings.WORKER_SLOTS,
+        help="Concurrent experiments",
+    )
+    args = parser.parse_args(argv)
+
+    agent = WorkerAgent(args.id, max(args.slots, 1))
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, frame: agent.drain())
+    agent.run()
+
+
+if __name__ == "__main__":
+    main()
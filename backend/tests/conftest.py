@@ -0,0 +1,179 @@
+"""
+Test setup: a scratch database and storage tree, and the sample
+strategies importable against the PyBatsim stand-in of the benchmarks.
+
+The environment is set before anything imports app.core.config.
+Experiments run on the fake BatSim, in a portal served on a free port.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+BENCHMARKS_DIR = os.path.join(ROOT, "samples", "benchmarks")
+STRATEGIES_DIR = os.path.join(ROOT, "samples", "strategies")
+PLATFORM_FILE = os.path.join(
+    ROOT, "samples", "platforms", "cluster288-HCMUT-SuperNodeXP.xml"
+)
+
+SCRATCH = tempfile.mkdtemp(prefix="batsim-portal-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{SCRATCH}/test.db",
+    STORAGE_PATH=os.path.join(SCRATCH, "storage"),
+    SCHEDULER_OUTPUT_DIR=os.path.join(SCRATCH, "scheduler"),
+    FAKE_BATSIM="true",
+    # Admit queued runs whatever the load of the test machine
+    QUEUE_MAX_CPU_PERCENT="101",
+    EXPERIMENT_SLOTS="2",
+    PROGRESS_POLL_INTERVAL="0.1",
+    PROGRESS_FLUSH_INTERVAL="0.2",
+    BENCHMARK_JOB_COUNTS="[500]",
+    BENCHMARK_PLATFORM_SIZES="[288]",
+)
+
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+FINISHED = ("completed", "failed", "cancelled")
+
+
+def write_workload(path, nb_jobs, seed=0):
+    """A Batsim workload of `nb_jobs` delay jobs on the 288-host platform"""
+    rng = random.Random(seed)
+    submitted = 0.0
+    jobs = []
+    for i in range(nb_jobs):
+        submitted += rng.expovariate(1 / 20)
+        jobs.append(
+            {
+                "id": str(i),
+                "subtime": submitted,
+                "res": rng.choice((1, 2, 4, 8, 16)),
+                "walltime": 3600,
+                "profile": "delay",
+            }
+        )
+    with open(path, "w") as f:
+        profiles = {"delay": {"type": "delay", "delay": 600}}
+        json.dump({"nb_res": 288, "jobs": jobs, "profiles": profiles}, f)
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The scratch database with every table"""
+    from app.core.database import engine
+    from app.core.schema import create_schema
+
+    create_schema(engine)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def portal(database):
+    """An httpx client of the running portal, logged in as the admin"""
+    import httpx
+    import uvicorn
+
+    from app.main import app
+    from app.services.executors.base import find_free_port
+
+    port = find_free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, name="portal", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        assert thread.is_alive() and time.monotonic() < deadline, "portal did not start"
+        time.sleep(0.05)
+
+    client = httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30)
+    token = client.post(
+        "/api/auth/login", data={"username": "admin", "password": "admin@123"}
+    ).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    client.token = token
+    try:
+        yield client
+    finally:
+        client.close()
+        server.should_exit = True
+        thread.join(30)
+
+
+@pytest.fixture
+def make_experiment(portal, tmp_path):
+    """
+    Create an experiment through the API: `nb_jobs` jobs of a fresh
+    workload scheduled by a sample strategy. Returns its id.
+    """
+    from app.core.database import SessionLocal
+    from app.models.platform import Platform
+    from app.models.scenario import Scenario
+    from app.models.strategy import Strategy
+    from app.models.workload import Workload
+
+    def make(nb_jobs=100, strategy="fcfs_scheduler.py", start=False):
+        name = uuid.uuid4().hex[:12]
+        workload_file = str(tmp_path / f"{name}.json")
+        # A distinct workload each time, so runs never hit the result cache
+        write_workload(workload_file, nb_jobs, seed=name)
+        db = SessionLocal()
+        try:
+            workload = Workload(name=f"w-{name}", file_path=workload_file)
+            platform = Platform(name=f"p-{name}", file_path=PLATFORM_FILE)
+            strategy_row = Strategy(
+                name=f"s-{name}", file_path=os.path.join(STRATEGIES_DIR, strategy)
+            )
+            db.add_all([workload, platform, strategy_row])
+            db.flush()
+            scenario = Scenario(
+                name=f"sc-{name}", workload_id=workload.id, platform_id=platform.id
+            )
+            db.add(scenario)
+            db.commit()
+            scenario_id, strategy_id = scenario.id, strategy_row.id
+        finally:
+            db.close()
+
+        response = portal.post(
+            "/api/experiments/",
+            json={
+                "name": f"e-{name}",
+                "scenario_id": scenario_id,
+                "strategy_id": strategy_id,
+            },
+        )
+        assert response.status_code == 200, response.text
+        experiment_id = response.json()["id"]
+        if start:
+            response = portal.post(f"/api/experiments/{experiment_id}/start")
+            assert response.status_code == 200, response.text
+        return experiment_id
+
+    return make
+
+
+@pytest.fixture
+def wait_finished(portal):
+    """Wait for an experiment to leave the queue and finish running"""
+
+    def wait(experiment_id, timeout=60):
+        deadline = time.monotonic() + timeout
+        while True:
+            experiment = portal.get(f"/api/experiments/{experiment_id}").json()
+            if experiment["status"] in FINISHED:
+                return experiment
+            assert time.monotonic() < deadline, f"still {experiment['status']}"
+            time.sleep(0.1)
+
+    return wait
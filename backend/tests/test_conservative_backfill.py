@@ -0,0 +1,93 @@
+"""Conservative backfilling sample on a long queue"""
+
+import random
+
+import mock_batsim
+
+mock_batsim.install()
+
+from backfill_latency import random_job  # noqa: E402
+from conservative_backfill_scheduler import ConservativeBackfillScheduler  # noqa: E402
+
+NB_RESOURCES = 288
+
+
+def starts(strategy):
+    return {job_id: entry[0] for job_id, entry in strategy.reservations.items()}
+
+
+def test_reservations_never_move_later():
+    """The backfill_latency trace: a queue of 2000, then 500 events"""
+    rng = random.Random(0)
+    scheduler = mock_batsim.MockScheduler(NB_RESOURCES)
+    strategy = ConservativeBackfillScheduler(scheduler)
+    strategy.onSimulationBegins()
+    next_id = 0
+    while scheduler.free:
+        strategy.onJobSubmission(random_job(rng, next_id, 0.0, len(scheduler.free)))
+        next_id += 1
+    strategy.onJobSubmission(mock_batsim.Job(next_id, 0.0, NB_RESOURCES, 3_600.0))
+    next_id += 1
+    for _ in range(1_999):
+        strategy.onJobSubmission(random_job(rng, next_id, 0.0, NB_RESOURCES))
+        next_id += 1
+
+    later, earlier = [], 0
+
+    def check(before):
+        nonlocal earlier
+        for job_id, start in starts(strategy).items():
+            if job_id in before and start > before[job_id]:
+                later.append((job_id, before[job_id], start))
+            elif job_id in before and start < before[job_id]:
+                earlier += 1
+
+    for _ in range(500):
+        scheduler.now += rng.randint(1, 60)
+        running = scheduler.running_jobs()
+        if running:
+            job = rng.choice(running)
+            scheduler.finish_job(job)
+            before = starts(strategy)
+            strategy.onJobCompletion(job)
+            check(before)
+        before = starts(strategy)
+        strategy.onJobSubmission(random_job(rng, next_id, scheduler.now, NB_RESOURCES))
+        next_id += 1
+        check(before)
+
+    assert later == []
+    assert earlier > 0  # Compression did move reservations up
+
+
+def test_job_wider_than_platform_is_rejected():
+    scheduler = mock_batsim.MockScheduler(4)
+    strategy = ConservativeBackfillScheduler(scheduler)
+    strategy.onSimulationBegins()
+    job = mock_batsim.Job(0, 0.0, 5, 60.0)
+    strategy.onJobSubmission(job)
+    assert scheduler.rejected == [job]
+    assert job.id not in strategy.pending_jobs
+    assert job.id not in strategy.reservations
+
+
+def test_reservations_left_late_start_on_a_requested_call():
+    scheduler = mock_batsim.MockScheduler(4)
+    # Nothing revisited: the second job keeps its slot after the first ends early
+    strategy = ConservativeBackfillScheduler(scheduler, compress_depth=0)
+    strategy.onSimulationBegins()
+    first = mock_batsim.Job(0, 0.0, 4, 100.0)
+    second = mock_batsim.Job(1, 0.0, 4, 60.0)
+    strategy.onJobSubmission(first)
+    strategy.onJobSubmission(second)
+    assert scheduler.wakeups == [100.0]
+
+    scheduler.now = 10.0
+    scheduler.finish_job(first)
+    strategy.onJobCompletion(first)
+    assert second.id in strategy.pending_jobs
+    # No job event falls at 100: only the requested call starts it
+    scheduler.now = 100.0
+    strategy.onRequestedCall()
+    assert second.id in scheduler.allocations
+    assert strategy.wakeups == set()
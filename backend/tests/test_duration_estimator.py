@@ -0,0 +1,42 @@
+"""Duration estimates learning from runs of other processes"""
+
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.scenario import Scenario
+from app.services.duration_estimator import DurationEstimator
+
+
+def test_runs_completed_elsewhere_are_learned(portal, make_experiment, monkeypatch):
+    monkeypatch.setattr(settings, "ESTIMATOR_REFRESH_INTERVAL", 0)
+    template = portal.get(f"/api/experiments/{make_experiment()}").json()
+    estimator = DurationEstimator()
+    estimator.ensure_trained()
+    trained = estimator.samples
+
+    # As a standalone worker leaves them: only in the database
+    db = SessionLocal()
+    try:
+        ended = datetime.now()
+        for index in range(3):
+            db.add(
+                Experiment(
+                    name=f"{template['name']}-worker-{index}",
+                    scenario_id=template["scenario_id"],
+                    strategy_id=template["strategy_id"],
+                    status=ExperimentStatus.COMPLETED,
+                    start_time=ended - timedelta(seconds=30 + index),
+                    end_time=ended,
+                )
+            )
+        db.commit()
+        scenario = db.get(Scenario, template["scenario_id"])
+        estimator.estimate(scenario, template["strategy_id"])
+        assert estimator.samples == trained + 3
+        # Each run is folded in once
+        estimator.estimate(scenario, template["strategy_id"])
+        assert estimator.samples == trained + 3
+    finally:
+        db.close()
@@ -0,0 +1,41 @@
+"""When the sample strategies' event log reaches the disk"""
+
+import mock_batsim
+
+mock_batsim.install()
+
+from event_log import EVENTS_FILENAME, EventLogger  # noqa: E402
+from fcfs_scheduler import FCFSScheduler  # noqa: E402
+
+
+def written(directory):
+    path = directory / EVENTS_FILENAME
+    return path.read_text().splitlines() if path.exists() else []
+
+
+def test_flushes_every_flush_records(tmp_path):
+    log = EventLogger(output_dir=str(tmp_path), flush_records=3, flush_interval=3600)
+    for job_id in range(5):
+        log.info("job_submitted", job_id)
+    assert len(written(tmp_path)) == 3
+    log.close()
+    assert len(written(tmp_path)) == 5
+
+
+def test_flushes_records_older_than_flush_interval(tmp_path):
+    log = EventLogger(output_dir=str(tmp_path), flush_records=1000, flush_interval=0)
+    log.info("job_submitted", 1)
+    assert len(written(tmp_path)) == 1
+    log.close()
+
+
+def test_strategy_flushes_when_simulation_ends(tmp_path, monkeypatch):
+    log = EventLogger(output_dir=str(tmp_path), flush_records=1000, flush_interval=3600)
+    monkeypatch.setattr("fcfs_scheduler.get_event_logger", lambda: log)
+    strategy = FCFSScheduler(mock_batsim.MockScheduler(4))
+    strategy.onSimulationBegins()
+    strategy.onJobSubmission(mock_batsim.Job(1, 0.0, 2, 60.0))
+    assert written(tmp_path) == []
+    strategy.onSimulationEnds()
+    assert len(written(tmp_path)) == 4
+    log.close()
@@ -0,0 +1,68 @@
+"""An experiment from the queue through the fake BatSim to its Result"""
+
+import os
+import time
+
+from app.core.database import SessionLocal
+from app.models.result import Result
+from app.services.job_store import result_jobs_path
+from app.services.log_store import result_log_dir
+
+NB_JOBS = 300
+
+
+def wait_result_id(experiment_id, timeout=60):
+    """Id of the experiment's Result once the pipeline has stored it"""
+    deadline = time.monotonic() + timeout
+    while True:
+        db = SessionLocal()
+        try:
+            row = db.query(Result.id).filter(Result.experiment_id == experiment_id).first()
+        finally:
+            db.close()
+        if row is not None:
+            return row.id
+        assert time.monotonic() < deadline, "no result"
+        time.sleep(0.1)
+
+
+def test_queued_experiment_runs_and_is_ingested(portal, make_experiment, wait_finished):
+    experiment_id = make_experiment(NB_JOBS)
+    response = portal.post(f"/api/experiments/{experiment_id}/start")
+    assert response.status_code == 200, response.text
+    assert response.json()["executor"] == "local"
+
+    experiment = wait_finished(experiment_id)
+    assert experiment["status"] == "completed", experiment
+    assert experiment["batsim_exit_code"] == 0
+
+    result = portal.get(f"/api/results/{wait_result_id(experiment_id)}").json()
+    assert result["experiment_id"] == experiment_id
+    assert result["total_jobs"] == NB_JOBS
+    assert result["makespan"] > 0
+    assert 0 < result["resource_utilization"] <= 1
+    assert "p95_waiting_time" in result["computed_metrics"]
+
+    jobs = portal.get(
+        f"/api/results/{result['id']}/jobs",
+        params={"columns": "job_id,waiting_time", "limit": NB_JOBS},
+    ).json()
+    assert jobs["total"] == NB_JOBS
+    assert len(jobs["columns"]["waiting_time"]) == NB_JOBS
+    assert all(waiting >= 0 for waiting in jobs["columns"]["waiting_time"])
+
+
+def test_deleting_a_finalized_experiment_removes_its_result(
+    portal, make_experiment, wait_finished
+):
+    experiment_id = make_experiment(50, start=True)
+    assert wait_finished(experiment_id)["status"] == "completed"
+    result_id = wait_result_id(experiment_id)
+    jobs_file = result_jobs_path(result_id)
+    assert os.path.exists(jobs_file)
+
+    response = portal.delete(f"/api/experiments/{experiment_id}")
+    assert response.status_code == 200, response.text
+    assert portal.get(f"/api/results/{result_id}").status_code == 404
+    assert not os.path.exists(jobs_file)
+    assert not os.path.exists(result_log_dir(result_id))
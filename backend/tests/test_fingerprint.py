@@ -0,0 +1,53 @@
+"""Simulator versions in result fingerprints"""
+
+import os
+
+from app.core.config import settings
+from app.services import fingerprint as fingerprint_module
+from app.services.fingerprint import simulator_versions
+
+
+class Images:
+    """Stands in for the docker executor's view of the pulled images"""
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def image_id(self, name):
+        return self.ids.get(name)
+
+
+def test_docker_mode_hashes_the_pulled_images(monkeypatch):
+    monkeypatch.setattr(settings, "FAKE_BATSIM", False)
+    monkeypatch.setattr(settings, "EXECUTOR_BACKEND", "docker")
+    images = Images(
+        {settings.BATSIM_IMAGE: "sha256:aaa", settings.PYBATSIM_IMAGE: "sha256:bbb"}
+    )
+    monkeypatch.setattr(fingerprint_module, "get_executor", lambda name: images)
+
+    before = simulator_versions()
+    assert before == {"batsim": "sha256:aaa", "pybatsim": "sha256:bbb"}
+    # A newly pulled :latest is a different simulator
+    images.ids[settings.BATSIM_IMAGE] = "sha256:ccc"
+    assert simulator_versions() != before
+    del images.ids[settings.PYBATSIM_IMAGE]
+    assert simulator_versions() is None
+
+
+def test_local_mode_hashes_the_executables(monkeypatch, tmp_path):
+    batsim = tmp_path / "batsim"
+    batsim.write_text("#!/bin/sh\necho 4.0\n")
+    batsim.chmod(0o755)
+    monkeypatch.setattr(settings, "FAKE_BATSIM", False)
+    monkeypatch.setattr(settings, "EXECUTOR_BACKEND", "local")
+    monkeypatch.setattr(settings, "BATSIM_COMMAND", f"{batsim} -p {{platform}}")
+    monkeypatch.setattr(settings, "SCHEDULER_COMMAND", "{python} {strategy}")
+
+    before = simulator_versions()
+    assert before["batsim"]["executable"] and before["scheduler"]["executable"]
+    batsim.write_text("#!/bin/sh\necho 4.1\n")
+    # Same size: make sure the digest cache sees a new mtime
+    os.utime(batsim, ns=(0, 1))
+    assert simulator_versions()["batsim"] != before["batsim"]
+    batsim.unlink()
+    assert simulator_versions() is None
@@ -0,0 +1,36 @@
+"""Range reads from compressed log segments"""
+
+import gzip
+import os
+
+from app.core.config import settings
+from app.services.log_store import LogStore
+
+
+def test_ranges_are_read_from_the_nearest_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_INDEX_INTERVAL", 100)
+    monkeypatch.setattr(settings, "LOG_SEGMENT_BYTES", 64 * 1024)
+    lines = [f"[{i:06d}] event {i * 7919 % 1000}\n".encode() for i in range(10_000)]
+    content = b"".join(lines)
+    store = LogStore(str(tmp_path / "log"))
+    store.append_lines(lines)
+
+    segments = store.index["segments"]
+    assert len(segments) > 1
+    for segment in segments:
+        path = os.path.join(store.directory, segment["file"])
+        with open(path, "rb") as f:
+            data = f.read()
+        # Still one gzip file, and every checkpoint starts a member
+        assert len(gzip.decompress(data)) == segment["bytes"]
+        for line, offset, compressed in segment["checkpoints"]:
+            first = segment["first_line"] + line
+            assert offset == sum(map(len, lines[segment["first_line"] : first]))
+            with open(path, "rb") as raw:
+                raw.seek(compressed)
+                assert gzip.GzipFile(fileobj=raw).readline() == lines[first]
+
+    assert [line for _, line in store.iter_lines(4321)] == lines[4321:]
+    assert next(store.iter_lines(9999)) == (9999, lines[9999])
+    for start, end in ((0, 10), (12_345, 98_765), (len(content) - 5, len(content))):
+        assert store.read_bytes(start, end) == content[start:end]
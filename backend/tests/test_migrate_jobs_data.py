@@ -0,0 +1,47 @@
+"""Moving per-job CSV data out of the results table"""
+
+import os
+
+from sqlalchemy import create_engine, text
+
+from app import migrate_jobs_data
+from app.core.config import settings
+from app.core.schema import create_schema
+from app.services.job_store import JobTable, result_jobs_path
+
+JOBS_CSV = "job_id,waiting_time\n1,0\n2,3.5\n"
+SCHEDULE_CSV = "makespan,nb_jobs\n10,2\n"
+
+
+def test_rows_that_fail_to_convert_keep_their_data(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    create_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE results ADD COLUMN jobs_data TEXT"))
+        conn.execute(text("ALTER TABLE results ADD COLUMN schedule_data TEXT"))
+        for result_id, jobs in ((1, JOBS_CSV), (2, "job_id,waiting_time\n1\n")):
+            conn.execute(
+                text(
+                    "INSERT INTO results (id, experiment_id, jobs_data, schedule_data)"
+                    " VALUES (:id, :id, :jobs, :schedule)"
+                ),
+                {"id": result_id, "jobs": jobs, "schedule": SCHEDULE_CSV},
+            )
+    monkeypatch.setattr(migrate_jobs_data, "engine", engine)
+    # Away from the results of the other tests
+    monkeypatch.setattr(settings, "STORAGE_PATH", str(tmp_path / "storage"))
+
+    migrate_jobs_data.main(["--no-vacuum"])
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT id, jobs_data, schedule_data FROM results ORDER BY id")
+        ).all()
+    # The columns stay while a row still needs them
+    assert [tuple(row) for row in rows] == [
+        (1, None, None),
+        (2, "job_id,waiting_time\n1\n", SCHEDULE_CSV),
+    ]
+    assert JobTable.open(result_jobs_path(1)).values("waiting_time") == [0.0, 3.5]
+    assert not os.path.exists(result_jobs_path(2))
+    engine.dispose()
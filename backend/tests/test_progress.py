@@ -0,0 +1,60 @@
+"""Live progress of a fake BatSim run, over Server-Sent Events"""
+
+import json
+import threading
+import time
+
+NB_JOBS = 20_000
+
+
+def read_events(response, events, timeout=120):
+    """Collect progress snapshots until the run is over and fully counted"""
+    deadline = time.monotonic() + timeout
+    for line in response.iter_lines():
+        assert time.monotonic() < deadline, events[-1:]
+        if not line.startswith("data:"):
+            continue
+        snapshot = json.loads(line[len("data:") :])
+        events.append(snapshot)
+        if snapshot["status"] in ("completed", "failed"):
+            if snapshot["progress_percentage"] == 100 or snapshot["status"] == "failed":
+                return
+
+
+def test_progress_is_streamed_while_the_run_goes(portal, make_experiment):
+    experiment_id = make_experiment(NB_JOBS)
+    events = []
+    url = f"/api/experiments/{experiment_id}/progress/stream"
+    with portal.stream("GET", url, params={"access_token": portal.token}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        reader = threading.Thread(target=read_events, args=(response, events))
+        reader.start()
+        assert portal.post(f"/api/experiments/{experiment_id}/start").status_code == 200
+        reader.join(120)
+    assert not reader.is_alive()
+
+    final = events[-1]
+    assert final["status"] == "completed"
+    assert final["total_jobs"] == final["completed_jobs"] == NB_JOBS
+    # Counted from the strategy's event log before the run ended
+    running = [
+        event
+        for event in events
+        if event["status"] == "running" and 0 < event["completed_jobs"] < NB_JOBS
+    ]
+    assert running, events
+    assert all(event["total_jobs"] == NB_JOBS for event in running)
+    counts = [event["completed_jobs"] for event in events]
+    assert counts == sorted(counts)
+
+    # Written to the database at the next coalesced flush
+    deadline = time.monotonic() + 10
+    while True:
+        stored = portal.get(f"/api/experiments/{experiment_id}").json()
+        done = (stored["completed_jobs"], stored["progress_percentage"]) == (NB_JOBS, 100)
+        if done or time.monotonic() > deadline:
+            break
+        time.sleep(0.1)
+    assert stored["completed_jobs"] == NB_JOBS
+    assert stored["progress_percentage"] == 100
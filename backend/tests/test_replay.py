@@ -0,0 +1,74 @@
+"""Strategies driven by the replay engine"""
+
+from app.services.replay import FreeHosts, ReplayEngine, Workload, run_strategy
+
+NB_RESOURCES = 16
+
+# Picks hosts from the highest id down, editing the list it is given
+STRATEGY = '''
+import pybatsim.batsim.batsim as batsim
+
+
+def main():
+    scheduler = batsim.BatsimScheduler()
+    pending = []
+
+    def schedule():
+        while pending:
+            available = scheduler.get_available_resources()
+            job = pending[0]
+            if len(available) < job.requested_resources:
+                return
+            available.sort(reverse=True)
+            selected = [available.pop(0) for _ in range(job.requested_resources)]
+            if available:
+                available.remove(available[-1])
+            scheduler.execute_job(pending.pop(0), selected)
+
+    def on_submission(job):
+        pending.append(job)
+        schedule()
+
+    scheduler.onJobSubmission = on_submission
+    scheduler.onJobCompletion = lambda job: schedule()
+    scheduler.start()
+'''
+
+
+def test_strategies_may_modify_the_available_resources(tmp_path):
+    path = tmp_path / "descending.py"
+    path.write_text(STRATEGY)
+    nb_jobs = 200
+    workload = Workload.from_columns(
+        nb_res=NB_RESOURCES,
+        ids=range(nb_jobs),
+        profiles=["delay_60"] * nb_jobs,
+        subtime=[float(i) for i in range(nb_jobs)],
+        res=[1 + i % 8 for i in range(nb_jobs)],
+        walltime=[120.0] * nb_jobs,
+        runtime=[60.0] * nb_jobs,
+    )
+    engine = ReplayEngine(workload, NB_RESOURCES)
+    run_strategy(engine, str(path))
+
+    summary = engine.write_outputs(str(tmp_path / "out"))
+    assert summary["nb_jobs_success"] == nb_jobs
+    # Edits to a copy leave the engine's free hosts whole
+    assert sorted(engine.available_resources()) == list(range(NB_RESOURCES))
+
+
+def test_available_resources_are_a_stable_snapshot():
+    free = FreeHosts(8)
+    available = free.snapshot()
+    tail = available[2:]
+    assert free.take([0, 1])
+    free.release([0])
+    # Handed out before the allocation: still the hosts free back then
+    assert available == list(range(8))
+    assert tail == list(range(2, 8))
+    assert list(free.snapshot()) == [2, 3, 4, 5, 6, 7, 0]
+
+    tail.sort(reverse=True)
+    tail.pop()
+    assert tail == [7, 6, 5, 4, 3]
+    assert list(free.snapshot()) == [2, 3, 4, 5, 6, 7, 0]
@@ -0,0 +1,53 @@
+"""Bulk import of existing BatSim outputs"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import result_importer
+from app.services.replay import ReplayEngine, Workload, run_strategy
+
+NB_RESOURCES = 4
+FCFS = os.path.join(
+    os.path.dirname(__file__), "..", "..", "samples", "strategies", "fcfs_scheduler.py"
+)
+
+
+def write_run(directory, nb_jobs=20):
+    workload = Workload.from_columns(
+        nb_res=NB_RESOURCES,
+        ids=range(nb_jobs),
+        profiles=["delay_60"] * nb_jobs,
+        subtime=[float(i) for i in range(nb_jobs)],
+        res=[1 + i % NB_RESOURCES for i in range(nb_jobs)],
+        walltime=[120.0] * nb_jobs,
+        runtime=[60.0] * nb_jobs,
+    )
+    engine = ReplayEngine(workload, NB_RESOURCES)
+    run_strategy(engine, FCFS)
+    os.makedirs(directory)
+    engine.write_outputs(os.path.join(directory, "out"))
+
+
+def test_runs_that_vanish_during_the_import_are_failed(
+    database, tmp_path, monkeypatch
+):
+    write_run(str(tmp_path / "kept"))
+    write_run(str(tmp_path / "gone"))
+    getmtime = os.path.getmtime
+
+    def vanished(path):
+        if os.sep + "gone" + os.sep in path:
+            raise FileNotFoundError(path)
+        return getmtime(path)
+
+    # Parse in threads so that the patched os.path applies
+    monkeypatch.setattr(
+        result_importer,
+        "ProcessPoolExecutor",
+        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+    )
+    monkeypatch.setattr(result_importer.os.path, "getmtime", vanished)
+
+    progress = result_importer.import_results(str(tmp_path), workers=1)
+    assert progress.error is None
+    assert (progress.found, progress.imported, progress.failed) == (2, 1, 1)
@@ -0,0 +1,66 @@
+"""Conditional and long-polled requests to the batched status endpoint"""
+
+import threading
+import time
+
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment
+
+
+def rename(experiment_id, name):
+    db = SessionLocal()
+    try:
+        db.query(Experiment).filter(Experiment.id == experiment_id).one().name = name
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_unchanged_statuses_are_not_modified(portal, make_experiment):
+    experiment_id = make_experiment()
+    params = {"ids": str(experiment_id)}
+
+    response = portal.get("/api/experiments/status", params=params)
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+    assert response.json()["etag"] == etag
+    [row] = response.json()["experiments"]
+    assert row[0] == experiment_id
+
+    response = portal.get(
+        "/api/experiments/status", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not response.content
+
+    rename(experiment_id, f"renamed-{experiment_id}")
+    response = portal.get(
+        "/api/experiments/status", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_long_poll_returns_once_an_experiment_changes(portal, make_experiment):
+    experiment_id = make_experiment()
+    params = {"ids": str(experiment_id), "wait": 20}
+    etag = portal.get("/api/experiments/status", params=params).headers["ETag"]
+
+    timer = threading.Timer(0.5, rename, (experiment_id, f"polled-{experiment_id}"))
+    timer.start()
+    try:
+        started = time.monotonic()
+        response = portal.get(
+            "/api/experiments/status", params=params, headers={"If-None-Match": etag}
+        )
+        elapsed = time.monotonic() - started
+    finally:
+        timer.join()
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert 0.5 <= elapsed < 10
+
+
+def test_status_needs_a_selection(portal):
+    assert portal.get("/api/experiments/status").status_code == 400
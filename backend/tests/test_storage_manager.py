@@ -0,0 +1,77 @@
+"""Which raw experiment outputs the storage manager may delete"""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.experiment import Experiment, ExperimentStatus
+from app.models.result import Result
+from app.services.experiment_runner import simulation_dir_for
+from app.services.storage_manager import StorageManager
+
+MB = 1024 * 1024
+
+pytestmark = pytest.mark.usefixtures("database")
+
+
+def finished_experiment(status, days_ago, ingested=False):
+    """An experiment with 1 MB of raw outputs, ended `days_ago`"""
+    db = SessionLocal()
+    try:
+        ended = datetime.now() - timedelta(days=days_ago)
+        exp = Experiment(
+            name=f"gc-{uuid.uuid4().hex[:12]}",
+            scenario_id=1,
+            strategy_id=1,
+            status=status,
+            start_time=ended - timedelta(hours=1),
+            end_time=ended,
+        )
+        db.add(exp)
+        db.commit()
+        if ingested:
+            db.add(Result(experiment_id=exp.id, created_at=ended))
+            db.commit()
+        experiment_id = exp.id
+    finally:
+        db.close()
+    directory = simulation_dir_for(experiment_id)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "out_jobs.csv"), "wb") as f:
+        f.write(b"\0" * MB)
+    return os.path.abspath(directory)
+
+
+def reasons(artifacts):
+    return {
+        os.path.abspath(a.path): a.reason for a in artifacts if a.kind == "experiments"
+    }
+
+
+def test_only_ingested_outputs_are_evicted_over_quota(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_RAW_QUOTA_MB", 1)
+    not_ingested = finished_experiment(ExperimentStatus.COMPLETED, days_ago=3)
+    failed = finished_experiment(ExperimentStatus.FAILED, days_ago=2)
+    ingested = finished_experiment(ExperimentStatus.COMPLETED, days_ago=1, ingested=True)
+
+    found = reasons(StorageManager().scan())
+    assert found[ingested] == "over_quota"
+    assert found[not_ingested] is None
+    assert found[failed] is None
+
+
+def test_only_failed_or_cancelled_outputs_expire_without_a_result():
+    days_ago = settings.STORAGE_FINISHED_RETENTION_DAYS + 1
+    completed = finished_experiment(ExperimentStatus.COMPLETED, days_ago)
+    failed = finished_experiment(ExperimentStatus.FAILED, days_ago)
+    cancelled = finished_experiment(ExperimentStatus.CANCELLED, days_ago)
+    recent = finished_experiment(ExperimentStatus.FAILED, days_ago=1)
+
+    found = reasons(StorageManager().scan())
+    assert found[completed] is None
+    assert found[failed] == found[cancelled] == "expired"
+    assert found[recent] is None
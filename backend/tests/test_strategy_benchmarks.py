@@ -0,0 +1,67 @@
+"""Strategy benchmark suites started from the API"""
+
+import os
+import threading
+import time
+
+from app.services.dispatcher import ExperimentDispatcher
+
+STRATEGIES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "samples", "strategies"
+)
+
+
+def test_uploaded_strategy_is_benchmarked_with_its_helpers(portal):
+    with open(os.path.join(STRATEGIES_DIR, "fcfs_scheduler.py"), "rb") as f:
+        response = portal.post(
+            "/api/strategies/",
+            data={"name": f"bench-{time.monotonic_ns()}"},
+            files={"file": ("fcfs_scheduler.py", f, "text/x-python")},
+        )
+    assert response.status_code == 200, response.text
+    strategy_id = response.json()["id"]
+
+    response = portal.post(f"/api/strategies/{strategy_id}/benchmarks/run")
+    assert response.status_code == 200, response.text
+    deadline = time.monotonic() + 120
+    while True:
+        benchmarks = portal.get(f"/api/strategies/{strategy_id}/benchmarks").json()
+        if not benchmarks["running"]:
+            break
+        assert time.monotonic() < deadline
+        time.sleep(0.2)
+
+    [run] = benchmarks["runs"]
+    [case] = run["cases"]
+    assert case["status"] == "ok", case
+    assert (case["nb_jobs"], case["nb_resources"]) == (500, 288)
+    assert case["decisions"] > 0
+
+
+def test_tasks_wait_for_a_free_slot():
+    dispatcher = ExperimentDispatcher(slots=1)
+    dispatcher.runs_experiments = False
+    release = threading.Event()
+    ran = []
+
+    def task(name):
+        ran.append(name)
+        release.wait(10)
+
+    dispatcher.submit_task("first", task, "first")
+    dispatcher.submit_task("second", task, "second")
+    dispatcher.dispatch()
+    time.sleep(0.2)
+    assert ran == ["first"]
+    assert dispatcher.busy() == 1
+
+    release.set()
+    deadline = time.monotonic() + 10
+    while dispatcher.busy():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    dispatcher.dispatch()
+    deadline = time.monotonic() + 10
+    while ran != ["first", "second"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
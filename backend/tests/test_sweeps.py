@@ -0,0 +1,108 @@
+"""Parameter sweeps run end to end"""
+
+import json
+import os
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.strategy import Strategy
+from app.services.storage_manager import storage_manager
+
+# FCFS that records the experiment config it was started with
+STRATEGY = '''
+import json
+import os
+
+import pybatsim.batsim.batsim as batsim
+
+
+def main():
+    with open(os.path.join(os.environ["SCHEDULER_OUTPUT_DIR"], "seen.json"), "w") as f:
+        f.write(os.environ["BATSIM_EXPERIMENT_CONFIG"])
+    scheduler = batsim.BatsimScheduler()
+    pending = []
+
+    def schedule():
+        while pending:
+            available = scheduler.get_available_resources()
+            if len(available) < pending[0].requested_resources:
+                return
+            job = pending.pop(0)
+            scheduler.execute_job(job, list(available)[: job.requested_resources])
+
+    def on_submission(job):
+        pending.append(job)
+        schedule()
+
+    scheduler.onJobSubmission = on_submission
+    scheduler.onJobCompletion = lambda job: schedule()
+    scheduler.start()
+'''
+
+
+def test_each_sweep_point_runs_with_its_config(
+    portal, make_experiment, wait_finished, tmp_path
+):
+    scenario_id = portal.get(f"/api/experiments/{make_experiment(50)}").json()[
+        "scenario_id"
+    ]
+    path = tmp_path / "recording.py"
+    path.write_text(STRATEGY)
+    db = SessionLocal()
+    try:
+        strategy = Strategy(name=f"recording-{time.monotonic_ns()}", file_path=str(path))
+        db.add(strategy)
+        db.commit()
+        strategy_id = strategy.id
+    finally:
+        db.close()
+
+    response = portal.post(
+        "/api/sweeps/",
+        json={
+            "name": f"sweep-{time.monotonic_ns()}",
+            "scenario_ids": [scenario_id],
+            "strategy_ids": [strategy_id],
+            "parameters": {"queue_depth": [1, 4]},
+        },
+    )
+    assert response.status_code == 200, response.text
+    statuses = portal.get(
+        "/api/experiments/status", params={"sweep_id": response.json()["id"]}
+    ).json()["experiments"]
+    assert len(statuses) == 2
+
+    seen = []
+    for experiment_id, *_ in statuses:
+        experiment = wait_finished(experiment_id)
+        assert experiment["status"] == "completed", experiment
+        directory = experiment["simulation_dir"]
+        with open(os.path.join(directory, "config.json")) as f:
+            written = json.load(f)
+        with open(os.path.join(directory, "seen.json")) as f:
+            assert json.load(f) == written
+        seen.append(written)
+    assert sorted(seen, key=json.dumps) == [{"queue_depth": 1}, {"queue_depth": 4}]
+
+
+def test_sweeps_are_not_queued_over_quota(portal, make_experiment, monkeypatch):
+    experiment = portal.get(f"/api/experiments/{make_experiment()}").json()
+    monkeypatch.setattr(settings, "STORAGE_USER_QUOTA_MB", 1)
+    monkeypatch.setattr(storage_manager, "usage_of", lambda user_id: 2 * 1024 * 1024)
+    sweep = {
+        "scenario_ids": [experiment["scenario_id"]],
+        "strategy_ids": [experiment["strategy_id"]],
+        "parameters": {"queue_depth": [1, 4]},
+    }
+
+    response = portal.post(
+        "/api/sweeps/", json={**sweep, "name": f"over-{time.monotonic_ns()}"}
+    )
+    assert response.status_code == 507, response.text
+    # Creating it without queueing it is still allowed
+    response = portal.post(
+        "/api/sweeps/",
+        json={**sweep, "name": f"held-{time.monotonic_ns()}", "submit": False},
+    )
+    assert response.status_code == 200, response.text
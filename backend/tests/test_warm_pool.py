@@ -0,0 +1,35 @@
+"""Runs handed to warm pool workers"""
+
+import os
+import sys
+
+from app.services.executors.warm_pool import WarmPool
+
+JOB = """
+import atexit
+import sys
+
+def write():
+    with open("exit.txt", "w") as f:
+        f.write("atexit ran")
+
+atexit.register(write)
+sys.exit(int(sys.argv[1]))
+"""
+
+
+def test_exit_handlers_of_the_job_run(tmp_path):
+    (tmp_path / "exit_job.py").write_text(JOB)
+    pool = WarmPool(1, [], dict(os.environ))
+    try:
+        process = pool.run(
+            [sys.executable, "-m", "exit_job", "3"],
+            str(tmp_path),
+            dict(os.environ),
+            str(tmp_path / "job.log"),
+        )
+        assert process is not None
+        assert process.wait(30) == 3
+    finally:
+        pool.shutdown()
+    assert (tmp_path / "exit.txt").read_text() == "atexit ran"
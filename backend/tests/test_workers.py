@@ -0,0 +1,256 @@
+"""Two workers on one queue: the run of a worker that dies moves on"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.api.experiments import pause_experiment, resume_experiment
+from app.core.schema import create_schema
+from app.models import Experiment, ExperimentStatus
+from app.models.platform import Platform
+from app.models.scenario import Scenario
+from app.models.strategy import Strategy
+from app.models.workload import Workload
+from app.services.dispatcher import requeue_expired_leases
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SAMPLES_DIR = os.path.join(BACKEND_DIR, "..", "samples")
+LEASE_SECONDS = 2
+
+# A worker whose fake BatSim lingers `sleep` seconds after the replay
+WORKER = (
+    "import sys; from app.services.executors import local_executor; "
+    "local_executor.FAKE_BATSIM_COMMAND += ' --sleep {sleep}'; "
+    "from app.worker import main; main(sys.argv[1:])"
+)
+
+
+def queue_experiment(Session, tmp_path, **values):
+    workload_file = tmp_path / "workload.json"
+    jobs = [
+        {"id": str(i), "subtime": i, "res": 4, "walltime": 120, "profile": "delay"}
+        for i in range(50)
+    ]
+    profiles = {"delay": {"type": "delay", "delay": 60}}
+    workload_file.write_text(
+        json.dumps({"nb_res": 288, "jobs": jobs, "profiles": profiles})
+    )
+    name = uuid.uuid4().hex[:12]
+    db = Session()
+    try:
+        workload = Workload(name=f"w-{name}", file_path=str(workload_file))
+        platform = Platform(
+            name=f"p-{name}",
+            file_path=os.path.join(
+                SAMPLES_DIR, "platforms", "cluster288-HCMUT-SuperNodeXP.xml"
+            ),
+        )
+        strategy = Strategy(
+            name=f"s-{name}",
+            file_path=os.path.join(SAMPLES_DIR, "strategies", "fcfs_scheduler.py"),
+        )
+        db.add_all([workload, platform, strategy])
+        db.flush()
+        scenario = Scenario(
+            name=f"sc-{name}", workload_id=workload.id, platform_id=platform.id
+        )
+        db.add(scenario)
+        db.flush()
+        exp = Experiment(
+            name=f"e-{name}",
+            scenario_id=scenario.id,
+            strategy_id=strategy.id,
+            queued_at=datetime.now(),
+            **{"status": ExperimentStatus.QUEUED, **values},
+        )
+        db.add(exp)
+        db.commit()
+        return exp.id
+    finally:
+        db.close()
+
+
+def wait_for(Session, experiment_id, condition, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        db = Session()
+        try:
+            exp = db.query(Experiment).filter(Experiment.id == experiment_id).one()
+            if condition(exp):
+                return exp
+        finally:
+            db.close()
+        assert time.monotonic() < deadline, (exp.status, exp.worker_id)
+        time.sleep(0.1)
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    """A queue database of its own and a way to start workers on it"""
+    url = f"sqlite:///{tmp_path}/queue.db"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    create_schema(engine)
+    env = dict(
+        os.environ,
+        DATABASE_URL=url,
+        STORAGE_PATH=str(tmp_path / "storage"),
+        WORKER_LEASE_SECONDS=str(LEASE_SECONDS),
+        WORKER_HEARTBEAT_INTERVAL="0.2",
+        QUEUE_DISPATCH_INTERVAL="0.2",
+    )
+    workers = []
+
+    def start_worker(name, sleep):
+        worker = subprocess.Popen(
+            [sys.executable, "-c", WORKER.format(sleep=sleep), "--id", name],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=open(tmp_path / f"{name}.log", "w"),
+            stderr=subprocess.STDOUT,
+        )
+        workers.append(worker)
+        return worker
+
+    try:
+        yield sessionmaker(bind=engine), start_worker
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.send_signal(signal.SIGTERM)
+                try:
+                    worker.wait(30)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
+        engine.dispose()
+
+
+def process_state(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().rsplit(")", 1)[1].split()[0]
+
+
+def wait_state(pid, condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition(process_state(pid)):
+        assert time.monotonic() < deadline, process_state(pid)
+        time.sleep(0.1)
+
+
+def test_expired_lease_is_requeued_and_run_by_the_other_worker(cluster, tmp_path):
+    Session, start_worker = cluster
+    experiment_id = queue_experiment(Session, tmp_path)
+    a = start_worker("A", sleep=120)
+    exp = wait_for(
+        Session,
+        experiment_id,
+        lambda exp: exp.worker_id == "A" and exp.batsim_container_id,
+    )
+    batsim_pid = int(exp.batsim_container_id)
+
+    # A heartbeats: B leaves its run alone past the first lease
+    start_worker("B", sleep=0)
+    time.sleep(LEASE_SECONDS * 2)
+    exp = wait_for(Session, experiment_id, lambda exp: True)
+    assert (exp.status, exp.worker_id) == (ExperimentStatus.RUNNING, "A")
+
+    # A dies with its run; B re-queues it once the lease expires
+    a.kill()
+    a.wait()
+    os.killpg(batsim_pid, signal.SIGKILL)
+    exp = wait_for(
+        Session,
+        experiment_id,
+        lambda exp: exp.status == ExperimentStatus.COMPLETED,
+        timeout=LEASE_SECONDS + 60,
+    )
+    assert exp.worker_id == "B"
+    wait_for(Session, experiment_id, lambda exp: exp.results)
+
+
+def test_worker_pauses_and_resumes_its_run_from_the_portal(cluster, tmp_path):
+    Session, start_worker = cluster
+    experiment_id = queue_experiment(Session, tmp_path)
+    start_worker("A", sleep=120)
+    exp = wait_for(
+        Session,
+        experiment_id,
+        lambda exp: exp.worker_id == "A" and exp.batsim_container_id,
+    )
+    batsim_pid = int(exp.batsim_container_id)
+    try:
+        db = Session()
+        try:
+            pause_experiment(experiment_id, db=db, current_user=None)
+            wait_state(batsim_pid, lambda state: state == "T")
+            resume_experiment(experiment_id, db=db, current_user=None)
+            wait_state(batsim_pid, lambda state: state != "T")
+        finally:
+            db.close()
+        exp = wait_for(Session, experiment_id, lambda exp: True)
+        assert exp.status == ExperimentStatus.RUNNING
+        assert exp.paused_at is None and exp.paused_seconds > 0
+    finally:
+        os.killpg(batsim_pid, signal.SIGKILL)
+
+
+class RenewingSession:
+    """A session on which `renew` runs right after the expired leases are read"""
+
+    def __init__(self, db, renew):
+        self.db = db
+        self.renew = renew
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def query(self, *entities):
+        session = self
+
+        class Query:
+            def filter(self, *criteria):
+                rows = session.db.query(*entities).filter(*criteria).all()
+                session.renew()
+                return rows
+
+        return Query()
+
+
+def test_a_lease_renewed_while_requeueing_keeps_its_run(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/queue.db")
+    create_schema(engine)
+    Session = sessionmaker(bind=engine)
+    expired = datetime.now() - timedelta(seconds=1)
+    running = dict(status=ExperimentStatus.RUNNING, lease_expires_at=expired)
+    ids = [
+        queue_experiment(Session, tmp_path, worker_id=name, **running)
+        for name in ("A", "B")
+    ]
+
+    def renew():
+        # Worker A heartbeats between the read and the requeue
+        with engine.begin() as conn:
+            conn.execute(
+                update(Experiment)
+                .where(Experiment.id == ids[0])
+                .values(lease_expires_at=datetime.now() + timedelta(minutes=1))
+            )
+
+    db = Session()
+    try:
+        assert requeue_expired_leases(RenewingSession(db, renew)) == [ids[1]]
+    finally:
+        db.close()
+    renewed = wait_for(Session, ids[0], lambda exp: True)
+    assert (renewed.status, renewed.worker_id) == (ExperimentStatus.RUNNING, "A")
+    requeued = wait_for(Session, ids[1], lambda exp: True)
+    assert (requeued.status, requeued.worker_id) == (ExperimentStatus.QUEUED, None)
+    engine.dispose()
@@ -26,9 +26,10 @@ import {
   LinearProgress,
   Divider,
 } from "@mui/material";
-import { Science, PlayArrow, Stop, Add } from "@mui/icons-material";
+import { Science, PlayArrow, Pause, Stop, Add } from "@mui/icons-material";
 import {
   experimentsAPI,
+  progressAPI,
   Experiment,
   scenariosAPI,
   strategiesAPI,
@@ -57,6 +58,9 @@ function TabPanel(props: TabPanelProps) {
   );
 }
 
+// Lines of each log shown in the detail dialog
+const LOG_TAIL_LINES = 500;
+
 const ExperimentsPage: React.FC = () => {
   const [experiments, setExperiments] = useState<Experiment[]>([]);
   const [scenarios, setScenarios] = useState<Scenario[]>([]);
@@ -68,6 +72,9 @@ const ExperimentsPage: React.FC = () => {
   const [selectedExperiment, setSelectedExperiment] =
     useState<Experiment | null>(null);
   const [tabValue, setTabValue] = useState(0);
+  const [logs, setLogs] = useState<{ batsim?: string[]; scheduler?: string[] }>(
+    {}
+  );
   const [snackbar, setSnackbar] = useState<{
     open: boolean;
     message: string;
@@ -105,6 +112,26 @@ const ExperimentsPage: React.FC = () => {
     fetchExperiments();
   }, []);
 
+  // Live progress of the user's experiments
+  useEffect(
+    () =>
+      progressAPI.subscribe((progress) => {
+        const update = (e: Experiment): Experiment =>
+          e.id === progress.experiment_id
+            ? {
+                ...e,
+                status: progress.status,
+                total_jobs: progress.total_jobs ?? e.total_jobs,
+                completed_jobs: progress.completed_jobs,
+                progress_percentage: progress.progress_percentage,
+              }
+            : e;
+        setExperiments((prev) => prev.map(update));
+        setSelectedExperiment((prev) => (prev ? update(prev) : prev));
+      }),
+    []
+  );
+
   useEffect(() => {
     const fetchData = async () => {
       try {
@@ -202,18 +229,70 @@ const ExperimentsPage: React.FC = () => {
     }
   };
 
+  const handlePauseExperiment = async (experimentId: number, pause: boolean) => {
+    try {
+      if (pause) {
+        await experimentsAPI.pause(experimentId);
+      } else {
+        await experimentsAPI.resume(experimentId);
+      }
+      setSnackbar({
+        open: true,
+        message: pause
+          ? "Experiment paused successfully!"
+          : "Experiment resumed successfully!",
+        severity: "success",
+      });
+      // Refresh experiments list
+      const res = await experimentsAPI.getAll();
+      const data = Array.isArray(res.data)
+        ? res.data
+        : (res.data as any).items || [];
+      setExperiments(data);
+    } catch (err: any) {
+      setSnackbar({
+        open: true,
+        message: pause
+          ? "Failed to pause experiment"
+          : "Failed to resume experiment",
+        severity: "error",
+      });
+    }
+  };
+
   const handleExperimentClick = (experiment: Experiment) => {
     setSelectedExperiment(experiment);
     setDetailDialogOpen(true);
     setTabValue(0);
+    fetchLogs(experiment.id);
+  };
+
+  const fetchLogs = async (experimentId: number) => {
+    setLogs({});
+    const streams = ["batsim", "scheduler"] as const;
+    const responses = await Promise.all(
+      streams.map((stream) =>
+        experimentsAPI
+          .getLog(experimentId, stream, { tail: LOG_TAIL_LINES })
+          .catch(() => null)
+      )
+    );
+    setLogs({
+      batsim: responses[0]?.data.lines,
+      scheduler: responses[1]?.data.lines,
+    });
   };
 
   const getStatusColor = (status: string) => {
     switch (status) {
       case "pending":
         return "default";
+      case "queued":
+        return "info";
       case "running":
         return "primary";
+      case "paused":
+        return "secondary";
       case "completed":
         return "success";
       case "failed":
@@ -311,7 +390,7 @@ const ExperimentsPage: React.FC = () => {
                       color="secondary"
                     />
                   </Stack>
-                  {e.status === "running" && (
+                  {(e.status === "running" || e.status === "paused") && (
                     <Box sx={{ mb: 2 }}>
                       <LinearProgress
                         variant="determinate"
@@ -342,7 +421,23 @@ const ExperimentsPage: React.FC = () => {
                       Start
                     </Button>
                   )}
-                  {e.status === "running" && (
+                  {(e.status === "running" || e.status === "paused") && (
+                    <Button
+                      variant="outlined"
+                      size="small"
+                      startIcon={e.status === "paused" ? <PlayArrow /> : <Pause />}
+                      onClick={(event) => {
+                        event.stopPropagation();
+                        handlePauseExperiment(e.id, e.status === "running");
+                      }}
+                      sx={{ mr: 1 }}
+                    >
+                      {e.status === "paused" ? "Resume" : "Pause"}
+                    </Button>
+                  )}
+                  {(e.status === "running" ||
+                    e.status === "paused" ||
+                    e.status === "queued") && (
                     <Button
                       variant="contained"
                       color="error"
@@ -506,6 +601,12 @@ const ExperimentsPage: React.FC = () => {
                     ? new Date(selectedExperiment.created_at).toLocaleString()
                     : "N/A"}
                 </Typography>
+                {selectedExperiment?.estimated_duration != null && (
+                  <Typography variant="body2">
+                    Estimated duration:{" "}
+                    {Math.ceil(selectedExperiment.estimated_duration / 60)} min
+                  </Typography>
+                )}
                 {selectedExperiment?.start_time && (
                   <Typography variant="body2">
                     Started:{" "}
@@ -518,6 +619,19 @@ const ExperimentsPage: React.FC = () => {
                     {new Date(selectedExperiment.end_time).toLocaleString()}
                   </Typography>
                 )}
+                {selectedExperiment?.peak_memory_mb != null && (
+                  <Typography variant="body2">
+                    Peak memory: {Math.round(selectedExperiment.peak_memory_mb)}{" "}
+                    MB, CPU time:{" "}
+                    {Math.round(selectedExperiment.cpu_time_seconds || 0)} s
+                  </Typography>
+                )}
+                {selectedExperiment?.failure_reason && (
+                  <Typography variant="body2" color="error">
+                    Failed: {selectedExperiment.failure_reason.replace(/_/g, " ")}{" "}
+                    exceeded
+                  </Typography>
+                )}
               </Stack>
             </Stack>
           </TabPanel>
@@ -526,7 +640,8 @@ const ExperimentsPage: React.FC = () => {
             <Stack spacing={3}>
               <Typography variant="h6">Execution Status</Typography>
 
-              {selectedExperiment?.status === "running" && (
+              {(selectedExperiment?.status === "running" ||
+                selectedExperiment?.status === "paused") && (
                 <Box>
                   <LinearProgress
                     variant="determinate"
@@ -560,7 +675,32 @@ const ExperimentsPage: React.FC = () => {
                     Start Experiment
                   </Button>
                 )}
-                {selectedExperiment?.status === "running" && (
+                {(selectedExperiment?.status === "running" ||
+                  selectedExperiment?.status === "paused") && (
+                  <Button
+                    variant="outlined"
+                    startIcon={
+                      selectedExperiment.status === "paused" ? (
+                        <PlayArrow />
+                      ) : (
+                        <Pause />
+                      )
+                    }
+                    onClick={() => {
+                      handlePauseExperiment(
+                        selectedExperiment.id,
+                        selectedExperiment.status === "running"
+                      );
+                      setDetailDialogOpen(false);
+                    }}
+                  >
+                    {selectedExperiment.status === "paused"
+                      ? "Resume Experiment"
+                      : "Pause Experiment"}
+                  </Button>
+                )}
+                {(selectedExperiment?.status === "running" ||
+                  selectedExperiment?.status === "paused") && (
                   <Button
                     variant="contained"
                     color="error"
@@ -581,7 +721,7 @@ const ExperimentsPage: React.FC = () => {
             <Stack spacing={3}>
               <Typography variant="h6">Execution Logs</Typography>
 
-              {selectedExperiment?.batsim_logs && (
+              {!!logs.batsim?.length && (
                 <Box>
                   <Typography variant="subtitle1" fontWeight={600} gutterBottom>
                     Batsim Logs
@@ -599,13 +739,13 @@ const ExperimentsPage: React.FC = () => {
                       component="pre"
                       sx={{ fontFamily: "monospace", fontSize: "0.75rem" }}
                     >
-                      {selectedExperiment.batsim_logs}
+                      {logs.batsim?.join("\n")}
                     </Typography>
                   </Paper>
                 </Box>
               )}
 
-              {selectedExperiment?.pybatsim_logs && (
+              {!!logs.scheduler?.length && (
                 <Box>
                   <Typography variant="subtitle1" fontWeight={600} gutterBottom>
                     Pybatsim Logs
@@ -623,14 +763,14 @@ const ExperimentsPage: React.FC = () => {
                       component="pre"
                       sx={{ fontFamily: "monospace", fontSize: "0.75rem" }}
                     >
-                      {selectedExperiment.pybatsim_logs}
+                      {logs.scheduler?.join("\n")}
                     </Typography>
                   </Paper>
                 </Box>
               )}
 
-              {!selectedExperiment?.batsim_logs &&
-                !selectedExperiment?.pybatsim_logs && (
+              {!logs.batsim?.length &&
+                !logs.scheduler?.length && (
                   <Typography color="text.secondary">
                     No logs available yet.
                   </Typography>
@@ -37,6 +37,9 @@ import { resultsAPI, Result } from "../services/api";
 
 type PanelMode = "view";
 
+// Jobs previewed in the drawer (GET /results/{id}/jobs serves them all)
+const JOBS_PREVIEW_ROWS = 200;
+
 function getFileTypeIcon(fileType: string | undefined) {
   if (!fileType) return <Description sx={{ color: "#4a9eff" }} />;
   if (fileType.includes("csv")) return <CodeIcon sx={{ color: "#4a9eff" }} />;
@@ -58,6 +61,7 @@ const ResultsPage: React.FC = () => {
   }>({ open: false, message: "", severity: "success" });
   const [expandedJobs, setExpandedJobs] = useState(false);
   const [expandedSchedule, setExpandedSchedule] = useState(false);
+  const [jobsCsv, setJobsCsv] = useState<string | null>(null);
 
   useEffect(() => {
     const fetchResults = async () => {
@@ -78,7 +82,21 @@ const ResultsPage: React.FC = () => {
     fetchResults();
   }, []);
 
+  // Per-job rows come from the result's jobs table, on demand
+  useEffect(() => {
+    if (!expandedJobs || !selectedResult) return;
+    let cancelled = false;
+    resultsAPI
+      .getJobsCsv(selectedResult.id, { limit: JOBS_PREVIEW_ROWS })
+      .then((res) => !cancelled && setJobsCsv(res.data))
+      .catch(() => !cancelled && setJobsCsv(""));
+    return () => {
+      cancelled = true;
+    };
+  }, [expandedJobs, selectedResult]);
+
   const openDrawer = (result: Result) => {
+    setJobsCsv(null);
     setSelectedResult(result);
     setDrawerOpen(true);
   };
@@ -446,7 +464,9 @@ const ResultsPage: React.FC = () => {
               <AccordionDetails>
                 <Box sx={{ maxHeight: 180, overflow: "auto" }}>
                   <pre style={{ fontSize: 12, margin: 0 }}>
-                    {selectedResult.jobs_data || "No jobs data available"}
+                    {jobsCsv === null
+                      ? "Loading..."
+                      : jobsCsv || "No jobs data available"}
                   </pre>
                 </Box>
               </AccordionDetails>
@@ -461,8 +481,11 @@ const ResultsPage: React.FC = () => {
               <AccordionDetails>
                 <Box sx={{ maxHeight: 180, overflow: "auto" }}>
                   <pre style={{ fontSize: 12, margin: 0 }}>
-                    {selectedResult.schedule_data ||
-                      "No schedule data available"}
+                    {Object.entries(
+                      getComputedMetrics(selectedResult)?.schedule ?? {}
+                    )
+                      .map(([name, value]) => `${name}: ${value}`)
+                      .join("\n") || "No schedule data available"}
                   </pre>
                 </Box>
               </AccordionDetails>
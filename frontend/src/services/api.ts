@@ -73,6 +73,7 @@ export interface Strategy {
   nb_files?: number;
   main_entry?: string;
   strategy_files?: string; // JSON string
+  benchmark_results?: string; // JSON string
 }
 
 export interface Experiment {
@@ -83,34 +84,73 @@ export interface Experiment {
   strategy_id: number;
   status:
     | "pending"
+    | "queued"
     | "running"
     | "paused"
     | "completed"
     | "failed"
     | "cancelled";
+  priority?: number;
+  queued_at?: string;
   batsim_container_id?: string;
   pybatsim_container_id?: string;
+  batsim_exit_code?: number;
+  pybatsim_exit_code?: number;
+  failure_reason?: "cpu_time_limit" | "memory_limit" | "wall_clock_limit";
+  peak_memory_mb?: number;
+  cpu_time_seconds?: number;
   start_time?: string;
   end_time?: string;
   estimated_duration?: number;
+  paused_at?: string;
+  paused_seconds?: number;
   total_jobs?: number;
   completed_jobs: number;
   progress_percentage: number;
   config?: string;
   simulation_dir?: string;
-  batsim_logs?: string;
-  pybatsim_logs?: string;
+  fingerprint?: string;
+  cached_result_id?: number;
   created_by?: number;
   created_at: string;
   updated_at?: string;
   scenario_name?: string;
   strategy_name?: string;
   creator_username?: string;
+  sweep_id?: number;
+}
+
+export interface Sweep {
+  id: number;
+  name: string;
+  description?: string;
+  grid?: string; // JSON string
+  nb_experiments: number;
+  created_by?: number;
+  created_at: string;
+  creator_username?: string;
+}
+
+export interface SweepResultRow {
+  experiment_id: number;
+  experiment_name: string;
+  status: Experiment["status"];
+  scenario_name: string;
+  strategy_name: string;
+  config?: Record<string, any>;
+  cached_result_id?: number;
+  makespan?: number;
+  average_waiting_time?: number;
+  average_turnaround_time?: number;
+  resource_utilization?: number;
+  completed_jobs?: number;
+  failed_jobs?: number;
 }
 
 export interface Result {
   id: number;
   experiment_id: number;
+  fingerprint?: string;
   simulation_time?: number;
   total_jobs?: number;
   completed_jobs?: number;
@@ -121,16 +161,14 @@ export interface Result {
   resource_utilization?: number;
   config?: string;
   metrics?: string;
-  logs?: string;
   result_file_path?: string;
   log_file_path?: string;
   created_at: string;
   experiment_name?: string;
   scenario_name?: string;
   strategy_name?: string;
-  jobs_data?: string; // CSV string
-  schedule_data?: string; // CSV string
   computed_metrics?: string; // JSON string
+  callback_stats?: string; // JSON string
 }
 
 export interface LoginCredentials {
@@ -324,10 +362,40 @@ export const experimentsAPI = {
   ): Promise<AxiosResponse<Experiment>> => api.put(`/experiments/${id}`, data),
   delete: (id: number): Promise<AxiosResponse<{ message: string }>> =>
     api.delete(`/experiments/${id}`),
-  start: (id: number): Promise<AxiosResponse<{ message: string }>> =>
-    api.post(`/experiments/${id}/start`),
+  start: (
+    id: number,
+    forceRerun = false
+  ): Promise<
+    AxiosResponse<{ message: string; cache_hit: boolean; cached_result_id?: number }>
+  > =>
+    api.post(`/experiments/${id}/start`, null, {
+      params: forceRerun ? { force_rerun: true } : undefined,
+    }),
   stop: (id: number): Promise<AxiosResponse<{ message: string }>> =>
     api.post(`/experiments/${id}/stop`),
+  pause: (id: number): Promise<AxiosResponse<{ message: string }>> =>
+    api.post(`/experiments/${id}/pause`),
+  resume: (id: number): Promise<AxiosResponse<{ message: string }>> =>
+    api.post(`/experiments/${id}/resume`),
+  listLogs: (
+    id: number
+  ): Promise<
+    AxiosResponse<
+      {
+        stream: string;
+        live: boolean;
+        total_lines: number | null;
+        total_bytes: number;
+        compressed_bytes: number | null;
+      }[]
+    >
+  > => api.get(`/experiments/${id}/logs`),
+  getLog: (
+    id: number,
+    stream: "batsim" | "scheduler",
+    params?: LogQuery
+  ): Promise<AxiosResponse<LogChunk>> =>
+    api.get(`/experiments/${id}/logs/${stream}`, { params }),
   getStatus: (
     id: number
   ): Promise<
@@ -340,6 +408,136 @@ export const experimentsAPI = {
       end_time: string;
     }>
   > => api.get(`/experiments/${id}/status`),
+  // Resolves with status 304 (and no data) while nothing changed since `etag`
+  getStatuses: (
+    params: {
+      ids?: number[];
+      sweep_id?: number;
+      status?: string[];
+      wait?: number;
+    },
+    etag?: string
+  ): Promise<AxiosResponse<ExperimentStatusBatch>> =>
+    api.get("/experiments/status", {
+      params: { ...params, ids: params.ids?.join(",") },
+      paramsSerializer: { indexes: null },
+      headers: etag ? { "If-None-Match": etag } : undefined,
+      validateStatus: (status) => status === 200 || status === 304,
+    }),
+};
+
+// Sweeps API
+export const sweepsAPI = {
+  getAll: (params?: {
+    skip?: number;
+    limit?: number;
+  }): Promise<AxiosResponse<Sweep[]>> => api.get("/sweeps", { params }),
+  getById: (
+    id: number
+  ): Promise<
+    AxiosResponse<{
+      sweep: Sweep;
+      progress: {
+        total: number;
+        finished: number;
+        by_status: Record<string, number>;
+        progress_percentage: number;
+        mean_experiment_progress: number;
+      };
+      results: SweepResultRow[];
+    }>
+  > => api.get(`/sweeps/${id}`),
+  create: (data: {
+    name: string;
+    description?: string;
+    scenario_ids?: number[];
+    strategy_ids?: number[];
+    parameters?: Record<string, any[]>;
+    runs?: { scenario_id: number; strategy_id: number; config?: any }[];
+    priority?: number;
+    submit?: boolean;
+    force_rerun?: boolean;
+  }): Promise<AxiosResponse<Sweep>> => api.post("/sweeps", data),
+  submit: (
+    id: number
+  ): Promise<AxiosResponse<{ message: string; queued: number }>> =>
+    api.post(`/sweeps/${id}/submit`),
+};
+
+// Live progress (Server-Sent Events)
+export interface ExperimentStatusBatch {
+  etag: string;
+  fields: string[];
+  // One tuple per experiment, in the order of `fields`
+  experiments: (string | number | null)[][];
+}
+
+export interface LogQuery {
+  tail?: number;
+  start_line?: number;
+  end_line?: number;
+  start_byte?: number;
+  end_byte?: number;
+  grep?: string;
+  ignore_case?: boolean;
+  limit?: number;
+}
+
+export interface JobQuery {
+  columns?: string; // Comma-separated
+  offset?: number;
+  limit?: number;
+}
+
+export interface JobColumns {
+  total: number;
+  offset: number;
+  columns: Record<string, (string | number | null)[]>;
+}
+
+export interface LogChunk {
+  stream?: string;
+  live?: boolean;
+  total_lines: number | null;
+  total_bytes: number;
+  start_line?: number | null;
+  lines?: string[];
+  line_numbers?: number[];
+  truncated?: boolean;
+  start_byte?: number;
+  end_byte?: number;
+  text?: string;
+}
+
+export interface ExperimentProgress {
+  experiment_id: number;
+  status: Experiment["status"];
+  total_jobs?: number;
+  submitted_jobs?: number;
+  completed_jobs: number;
+  progress_percentage: number;
+}
+
+export const progressAPI = {
+  // Progress of one experiment, or of all the user's experiments when no
+  // id is given. Returns a function closing the stream.
+  subscribe: (
+    onProgress: (progress: ExperimentProgress) => void,
+    experimentId?: number
+  ): (() => void) => {
+    const token = localStorage.getItem("token") || "";
+    const path =
+      experimentId === undefined
+        ? "/experiments/progress/stream"
+        : `/experiments/${experimentId}/progress/stream`;
+    const source = new EventSource(
+      `${API_BASE_URL}${path}?access_token=${encodeURIComponent(token)}`
+    );
+    source.addEventListener("progress", (event) =>
+      onProgress(JSON.parse((event as MessageEvent).data))
+    );
+    return () => source.close();
+  },
 };
 
 // Results API
@@ -352,6 +550,15 @@ export const resultsAPI = {
     api.get(`/results/${id}`),
   getByExperiment: (experimentId: number): Promise<AxiosResponse<Result[]>> =>
     api.get(`/results/experiment/${experimentId}`),
+  getLogs: (id: number, params?: LogQuery): Promise<AxiosResponse<LogChunk>> =>
+    api.get(`/results/${id}/logs`, { params }),
+  getJobs: (id: number, params?: JobQuery): Promise<AxiosResponse<JobColumns>> =>
+    api.get(`/results/${id}/jobs`, { params }),
+  getJobsCsv: (id: number, params?: JobQuery): Promise<AxiosResponse<string>> =>
+    api.get(`/results/${id}/jobs`, {
+      params: { ...params, format: "csv" },
+      responseType: "text",
+    }),
   getAnalytics: (params?: {
     start_date?: string;
     end_date?: string;
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Time and memory of GET /api/results/analytics over many results
+
+Seeds a scratch SQLite database with `--results` results, spread over
+strategies, scenarios and days, and builds the analytics rollups from
+them. Then
+runs, each in a fresh process, the former in-Python aggregation, the
+former aggregate queries over `results` and the endpoint (which reads
+the rollups), and reports wall time and peak RSS. All must agree.
+
+Usage: python analytics_aggregation.py [--results 100000]
+                                       [--strategies 20] [--scenarios 10]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(HERE, "..", "..", "backend")
+CHUNK = 5000
+MODES = ("python", "scan", "rollup")
+
+
+def seed(args):
+    from app.core.database import Base, engine
+    from app.models import (
+        Experiment,
+        Platform,
+        Result,
+        Scenario,
+        Strategy,
+        User,
+        Workload,
+    )
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [{"id": 1, "username": "bench", "email": "b@x", "hashed_password": "-"}],
+        )
+        conn.execute(
+            Workload.__table__.insert(), [{"id": 1, "name": "w", "file_path": "w"}]
+        )
+        conn.execute(
+            Platform.__table__.insert(), [{"id": 1, "name": "p", "file_path": "p"}]
+        )
+        conn.execute(
+            Scenario.__table__.insert(),
+            [
+                {"id": i, "name": f"scenario {i}", "workload_id": 1, "platform_id": 1}
+                for i in range(1, args.scenarios + 1)
+            ],
+        )
+        conn.execute(
+            Strategy.__table__.insert(),
+            [
+                {"id": i, "name": f"strategy {i}", "file_path": f"s{i}.py"}
+                for i in range(1, args.strategies + 1)
+            ],
+        )
+    start = datetime(2026, 1, 1)
+    for offset in range(0, args.results, CHUNK):
+        ids = range(offset + 1, min(offset + CHUNK, args.results) + 1)
+        with engine.begin() as conn:
+            conn.execute(
+                Experiment.__table__.insert(),
+                [
+                    {
+                        "id": i,
+                        "name": f"experiment {i}",
+                        "scenario_id": rng.randint(1, args.scenarios),
+                        # Skewed, so the top 5 is well defined
+                        "strategy_id": min(
+                            int(rng.expovariate(0.3)) + 1, args.strategies
+                        ),
+                        "status": "COMPLETED",
+                        "revision": 0,
+                    }
+                    for i in ids
+                ],
+            )
+            conn.execute(
+                Result.__table__.insert(),
+                [
+                    {
+                        "id": i,
+                        "experiment_id": i,
+                        "total_jobs": 1000,
+                        "completed_jobs": rng.randint(900, 1000),
+                        "failed_jobs": rng.randint(0, 100),
+                        "makespan": rng.uniform(1e4, 1e6),
+                        "average_waiting_time": rng.uniform(0, 1e4),
+                        "average_turnaround_time": rng.uniform(1e3, 2e4),
+                        "resource_utilization": rng.random(),
+                        "created_at": start + timedelta(minutes=rng.randint(0, 525600)),
+                    }
+                    for i in ids
+                ],
+            )
+
+
+def legacy_analytics(db):
+    """The endpoint when it aggregated in Python"""
+    from sqlalchemy.orm import joinedload
+
+    from app.models import Experiment, Result
+
+    results = (
+        db.query(Result)
+        .options(
+            joinedload(Result.experiment).joinedload(Experiment.scenario),
+            joinedload(Result.experiment).joinedload(Experiment.strategy),
+        )
+        .all()
+    )
+
+    def avg(values):
+        values = [v for v in values if v is not None]
+        return round(sum(values) / len(values), 2) if values else 0
+
+    def top(names):
+        counts = {}
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+        ranked = sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:5]
+        return [{"name": name, "count": count} for name, count in ranked]
+
+    by_date = {}
+    for r in results:
+        date = r.created_at.strftime("%Y-%m-%d")
+        by_date[date] = by_date.get(date, 0) + 1
+    total_jobs = sum(r.total_jobs or 0 for r in results)
+    completed_jobs = sum(r.completed_jobs or 0 for r in results)
+    return {
+        "total_results": len(results),
+        "total_experiments": len(set(r.experiment_id for r in results)),
+        "avg_makespan": avg(r.makespan for r in results),
+        "avg_waiting_time": avg(r.average_waiting_time for r in results),
+        "avg_turnaround_time": avg(r.average_turnaround_time for r in results),
+        "avg_resource_utilization": avg(r.resource_utilization for r in results),
+        "total_jobs": total_jobs,
+        "completed_jobs": completed_jobs,
+        "failed_jobs": sum(r.failed_jobs or 0 for r in results),
+        "success_rate": round(completed_jobs / total_jobs * 100, 2)
+        if total_jobs
+        else 0,
+        "results_by_date": [
+            {"date": date, "count": count} for date, count in sorted(by_date.items())
+        ],
+        "top_strategies": top(r.experiment.strategy.name for r in results),
+        "top_scenarios": top(r.experiment.scenario.name for r in results),
+    }
+
+
+def scan_analytics(db):
+    """Aggregate queries over the whole results table"""
+    from sqlalchemy import distinct, func
+
+    from app.models import Experiment, Result, Scenario, Strategy
+
+    totals = db.query(
+        func.count(Result.id),
+        func.count(distinct(Result.experiment_id)),
+        func.avg(Result.makespan),
+        func.avg(Result.average_waiting_time),
+        func.avg(Result.average_turnaround_time),
+        func.avg(Result.resource_utilization),
+        func.sum(Result.total_jobs),
+        func.sum(Result.completed_jobs),
+        func.sum(Result.failed_jobs),
+    ).one()
+    day = func.date(Result.created_at)
+    by_date = db.query(day, func.count(Result.id)).group_by(day).order_by(day).all()
+
+    def top(model, column):
+        count = func.count(Result.id)
+        return [
+            {"name": name, "count": n}
+            for name, n in db.query(model.name, count)
+            .select_from(Result)
+            .join(Experiment, Experiment.id == Result.experiment_id)
+            .join(model, model.id == column)
+            .group_by(model.id, model.name)
+            .order_by(count.desc(), model.name)
+            .limit(5)
+        ]
+
+    return {
+        "total_results": totals[0],
+        "total_experiments": totals[1],
+        "avg_makespan": round(totals[2], 2),
+        "avg_waiting_time": round(totals[3], 2),
+        "avg_turnaround_time": round(totals[4], 2),
+        "avg_resource_utilization": round(totals[5], 2),
+        "total_jobs": totals[6],
+        "completed_jobs": totals[7],
+        "failed_jobs": totals[8],
+        "success_rate": round(totals[7] / totals[6] * 100, 2),
+        "results_by_date": [{"date": d, "count": n} for d, n in by_date],
+        "top_strategies": top(Strategy, Experiment.strategy_id),
+        "top_scenarios": top(Scenario, Experiment.scenario_id),
+    }
+
+
+def same(expected, actual):
+    """Equal up to the rounding of averages computed differently"""
+    for key, value in expected.items():
+        other = actual.get(key)
+        if isinstance(value, float):
+            if other is None or abs(value - other) > 0.011:
+                return False
+        elif value != other:
+            return False
+    return True
+
+
+def measure(mode):
+    """In the child process: run one implementation, print its timing"""
+    from app.api.results import get_analytics
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        if mode == "rollup":
+            analytics = get_analytics(start_date=None, end_date=None, db=db)
+        elif mode == "scan":
+            analytics = scan_analytics(db)
+        else:
+            analytics = legacy_analytics(db)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb, "analytics": analytics}))
+
+
+def run_child(mode, env):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", mode],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--results", type=int, default=100_000)
+    parser.add_argument("--strategies", type=int, default=20)
+    parser.add_argument("--scenarios", type=int, default=10)
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    if args.measure:
+        measure(args.measure)
+        return
+
+    directory = tempfile.mkdtemp(prefix="analytics_")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{directory}/bench.db",
+        STORAGE_PATH=directory,
+        PYTHONPATH=os.pathsep.join(filter(None, [BACKEND_DIR, os.environ.get("PYTHONPATH")])),
+    )
+    os.environ.update(env)
+    try:
+        started = time.perf_counter()
+        seed(args)
+        print(f"Seeded {args.results} results in {time.perf_counter() - started:.0f}s")
+        from app.core.database import engine
+        from app.services.result_rollups import rebuild
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            rows = rebuild(conn)
+        print(f"Built {rows} rollup rows in {time.perf_counter() - started:.1f}s")
+        runs = {mode: run_child(mode, env) for mode in MODES}
+        baseline = runs["python"]["seconds"]
+        for mode, run in runs.items():
+            print(
+                f"{mode:>7} {run['seconds']:8.3f}s {run['peak_mb']:8.0f} MB peak RSS"
+                f"  x{baseline / run['seconds']:.1f}"
+            )
+        for mode in MODES[1:]:
+            if not same(runs["python"]["analytics"], runs[mode]["analytics"]):
+                print(f"MISMATCH between python and {mode}")
+                sys.exit(1)
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Decision latency of the backfilling samples as the queue grows
+
+Fills a machine with running jobs, keeps a queue of the requested length
+behind a head job too large to start, then times job completion and
+submission callbacks. Flat median latency across queue lengths is the goal.
+
+Usage: python backfill_latency.py [--strategy easy|conservative]
+                                  [--resources 288] [--events 2000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import mock_batsim
+
+mock_batsim.install()
+
+from backfill_scheduler import BackfillScheduler  # noqa: E402
+from conservative_backfill_scheduler import ConservativeBackfillScheduler  # noqa: E402
+
+STRATEGIES = {
+    "easy": BackfillScheduler,
+    "conservative": ConservativeBackfillScheduler,
+}
+QUEUE_SIZES = [100, 1_000, 10_000, 100_000]
+
+
+def random_job(rng, job_id, now, nb_resources):
+    size = min(nb_resources, 2 ** rng.randint(0, 6))
+    return mock_batsim.Job(job_id, now, size, float(rng.randint(60, 36_000)))
+
+
+def run(strategy_class, queue_size, nb_resources, nb_events, seed=0):
+    """Return per-callback latencies in microseconds"""
+    rng = random.Random(seed)
+    scheduler = mock_batsim.MockScheduler(nb_resources)
+    strategy = strategy_class(scheduler)
+    strategy.onSimulationBegins()
+    next_id = 0
+
+    # Fill the machine, then queue a head job that has to wait
+    while scheduler.free:
+        strategy.onJobSubmission(random_job(rng, next_id, 0.0, len(scheduler.free)))
+        next_id += 1
+    strategy.onJobSubmission(mock_batsim.Job(next_id, 0.0, nb_resources, 3_600.0))
+    next_id += 1
+    for _ in range(queue_size - 1):
+        strategy.onJobSubmission(random_job(rng, next_id, 0.0, nb_resources))
+        next_id += 1
+
+    latencies = []
+    for _ in range(nb_events):
+        scheduler.now += rng.randint(1, 60)
+        running = scheduler.running_jobs()
+        if running:
+            job = rng.choice(running)
+            scheduler.finish_job(job)
+            started = time.perf_counter()
+            strategy.onJobCompletion(job)
+            latencies.append((time.perf_counter() - started) * 1e6)
+
+        job = random_job(rng, next_id, scheduler.now, nb_resources)
+        next_id += 1
+        started = time.perf_counter()
+        strategy.onJobSubmission(job)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), action="append")
+    parser.add_argument("--resources", type=int, default=288)
+    parser.add_argument("--events", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'strategy':>12} {'queue':>8} {'p50 (us)':>10} {'p99 (us)':>10} {'mean (us)':>10}"
+    )
+    for name in args.strategy or sorted(STRATEGIES):
+        for queue_size in QUEUE_SIZES:
+            latencies = run(STRATEGIES[name], queue_size, args.resources, args.events)
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[int(len(latencies) * 0.99)]
+            mean = statistics.fmean(latencies)
+            print(f"{name:>12} {queue_size:>8} {p50:>10.1f} {p99:>10.1f} {mean:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Loading per-job result data: CSV in the database vs columnar jobs table
+
+Writes a synthetic out_jobs.csv of `--jobs` jobs, stores it the former
+way (as text in a results.jobs_data column of a scratch SQLite database)
+and converts it into a jobs table (services/job_store.py). Then loads
+the waiting times of every job, each in a fresh process, both ways, and
+reports sizes, wall time and peak RSS. Both must agree.
+
+Usage: python job_columns.py [--jobs 1000000] [--hosts 1024]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(HERE, "..", "..", "backend")
+MODES = ("csv", "columns")
+
+HEADER = (
+    "job_id,workload_name,profile,submission_time,requested_number_of_resources,"
+    "requested_time,success,final_state,starting_time,execution_time,finish_time,"
+    "waiting_time,turnaround_time,stretch,allocated_resources,consumed_energy,"
+    "metadata"
+).split(",")
+
+
+def write_jobs_csv(path, nb_jobs, nb_hosts):
+    rng = random.Random(0)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, HEADER)
+        writer.writeheader()
+        submitted = 0.0
+        for i in range(nb_jobs):
+            submitted += rng.expovariate(0.1)
+            resources = rng.choice((1, 2, 4, 8, 16, 32))
+            job = {
+                "job_id": f"w0!{i}",
+                "workload_name": "w0",
+                "profile": f"p{i % 7}",
+                "submission_time": f"{submitted:.6f}",
+                "requested_number_of_resources": resources,
+                "requested_time": 3600,
+            }
+            if rng.random() < 0.02:
+                job.update(success=0, final_state="REJECTED_NOT_ENOUGH_RESOURCES")
+                for name in HEADER[8:14]:
+                    job[name] = -1
+                writer.writerow(job)
+                continue
+            waiting = rng.expovariate(1 / 600)
+            execution = rng.uniform(10, 3600)
+            first = rng.randrange(nb_hosts - resources + 1)
+            last = first + resources - 1
+            job.update(
+                success=1,
+                final_state="COMPLETED_SUCCESSFULLY",
+                starting_time=f"{submitted + waiting:.6f}",
+                execution_time=f"{execution:.6f}",
+                finish_time=f"{submitted + waiting + execution:.6f}",
+                waiting_time=f"{waiting:.6f}",
+                turnaround_time=f"{waiting + execution:.6f}",
+                stretch=f"{(waiting + execution) / execution:.6f}",
+                allocated_resources=f"{first}-{last}" if last > first else str(first),
+                consumed_energy=f"{execution * resources * 100:.3f}",
+            )
+            writer.writerow(job)
+
+
+def peak_mb():
+    """Peak RSS of this process; ru_maxrss would include the parent's"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, directory):
+    """In the child process: load the waiting times one way"""
+    from app.services.job_store import JobTable
+
+    started = time.perf_counter()
+    if mode == "csv":
+        db = sqlite3.connect(os.path.join(directory, "bench.db"))
+        (jobs_data,) = db.execute(
+            "SELECT jobs_data FROM results WHERE id = 1"
+        ).fetchone()
+        waiting = [
+            float(row["waiting_time"])
+            for row in csv.DictReader(jobs_data.splitlines())
+        ]
+        loaded = time.perf_counter() - started
+        total = sum(waiting)
+    else:
+        waiting = JobTable.open(os.path.join(directory, "result_1.jobs")).array(
+            "waiting_time"
+        )
+        loaded = time.perf_counter() - started
+        total = float(waiting.sum())
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {"loaded": loaded, "seconds": elapsed, "peak_mb": peak_mb(), "sum": total}
+        )
+    )
+
+
+def run_child(mode, directory, env):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", mode, directory],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--hosts", type=int, default=1024)
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    directory = tempfile.mkdtemp(prefix="job_columns_")
+    env = dict(
+        os.environ,
+        STORAGE_PATH=directory,
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [BACKEND_DIR, os.environ.get("PYTHONPATH")])
+        ),
+    )
+    os.environ.update(env)
+    try:
+        jobs_csv = os.path.join(directory, "out_jobs.csv")
+        write_jobs_csv(jobs_csv, args.jobs, args.hosts)
+        with open(jobs_csv, newline="") as f:
+            text = f.read()
+        db = sqlite3.connect(os.path.join(directory, "bench.db"))
+        db.execute("CREATE TABLE results (id INTEGER PRIMARY KEY, jobs_data TEXT)")
+        db.execute("INSERT INTO results VALUES (1, ?)", (text,))
+        db.commit()
+        db.close()
+        del text
+
+        from app.services.job_store import JobTable
+
+        started = time.perf_counter()
+        with open(jobs_csv, newline="") as f:
+            JobTable.from_csv(f).save(os.path.join(directory, "result_1.jobs"))
+        converted = time.perf_counter() - started
+        csv_mb = os.path.getsize(jobs_csv) / 2**20
+        table_mb = os.path.getsize(os.path.join(directory, "result_1.jobs")) / 2**20
+        print(
+            f"{args.jobs} jobs: CSV {csv_mb:.1f} MB, jobs table {table_mb:.1f} MB "
+            f"(converted in {converted:.1f}s)"
+        )
+
+        runs = {mode: run_child(mode, directory, env) for mode in MODES}
+        baseline = runs["csv"]["loaded"]
+        print(f"{'':>8} {'load':>10} {'load+sum':>10} {'peak RSS':>10}")
+        for mode, run in runs.items():
+            print(
+                f"{mode:>8} {run['loaded'] * 1e3:>8.1f}ms "
+                f"{run['seconds'] * 1e3:>8.1f}ms {run['peak_mb']:>7.0f} MB"
+                f"  x{baseline / run['loaded']:.0f}"
+            )
+        expected = runs["csv"]["sum"]
+        if abs(runs["columns"]["sum"] - expected) > 1e-9 * abs(expected):
+            print("MISMATCH between csv and columns")
+            sys.exit(1)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
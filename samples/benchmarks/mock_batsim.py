@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Minimal stand-in for the PyBatsim modules used by the sample strategies
+Lets benchmarks import and drive the samples without a BatSim instance.
+"""
+
+import os
+import sys
+import tempfile
+import types
+
+STRATEGIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "strategies")
+
+
+class Job:
+    """Just the job attributes the sample strategies read"""
+
+    __slots__ = ("id", "submission_time", "requested_resources", "requested_time")
+
+    def __init__(self, id, submission_time, requested_resources, requested_time):
+        self.id = id
+        self.submission_time = submission_time
+        self.requested_resources = requested_resources
+        self.requested_time = requested_time
+
+
+class MockScheduler:
+    """Tracks free resources and the clock; callbacks are driven by the caller"""
+
+    def __init__(self, nb_resources):
+        self.now = 0.0
+        self.free = list(range(nb_resources))
+        self.allocations = {}
+        self.rejected = []
+        self.wakeups = []
+
+    def time(self):
+        return self.now
+
+    def get_available_resources(self):
+        return list(self.free)
+
+    def execute_job(self, job, resources):
+        taken = set(resources)
+        self.free = [r for r in self.free if r not in taken]
+        self.allocations[job.id] = (job, resources)
+
+    def reject_job(self, job):
+        self.rejected.append(job)
+
+    def wake_me_up_at(self, at):
+        self.wakeups.append(at)
+
+    def running_jobs(self):
+        return [job for job, _ in self.allocations.values()]
+
+    def finish_job(self, job):
+        self.free.extend(self.allocations.pop(job.id)[1])
+        self.free.sort()
+
+
+def install():
+    """Register fake pybatsim modules and make the samples importable"""
+    batsim = types.ModuleType("pybatsim.batsim.batsim")
+    batsim.BatsimScheduler = MockScheduler
+    jobs = types.ModuleType("pybatsim.batsim.jobs")
+    jobs.Job = Job
+    modules = {
+        "pybatsim": types.ModuleType("pybatsim"),
+        "pybatsim.batsim": types.ModuleType("pybatsim.batsim"),
+        "pybatsim.batsim.batsim": batsim,
+        "pybatsim.batsim.jobs": jobs,
+        "pybatsim.batsim.profiles": types.ModuleType("pybatsim.batsim.profiles"),
+        "pybatsim.batsim.resources": types.ModuleType("pybatsim.batsim.resources"),
+    }
+    for name, module in modules.items():
+        sys.modules.setdefault(name, module)
+    # Keep the strategies' event logs and stats out of the working directory
+    os.environ.setdefault("SCHEDULER_OUTPUT_DIR", tempfile.mkdtemp(prefix="batsim-bench-"))
+    if STRATEGIES_DIR not in sys.path:
+        sys.path.insert(0, STRATEGIES_DIR)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Experiments per minute with the local executor's warm pool off and on
+
+Runs many tiny simulations (a few jobs on a few hosts) through the local
+executor with the built-in fake BatSim, `--slots` at a time, first with
+fresh processes and then with a pool of pre-warmed workers, and reports
+the throughput and launch latency of each mode. With BatSim and pybatsim
+installed, `--real` benchmarks BATSIM_COMMAND / SCHEDULER_COMMAND instead.
+
+Usage: python warm_pool_throughput.py [--runs 1000] [--slots 4]
+                                      [--pool-size 8] [--jobs 4] [--real]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "..", "backend"))
+
+from app.core.config import settings  # noqa: E402
+from app.services.executors.base import ExecutionSpec  # noqa: E402
+from app.services.executors.local_executor import LocalExecutor  # noqa: E402
+
+STRATEGIES_DIR = os.path.join(HERE, "..", "strategies")
+STRATEGY_HELPERS = ("event_log.py", "instrumentation.py", "utils.py")
+
+PLATFORM = """<?xml version='1.0'?>
+<!DOCTYPE platform SYSTEM "https://simgrid.org/simgrid.dtd">
+<platform version="4.1">
+  <zone id="AS0" routing="Full">
+    <cluster id="cluster" prefix="host" suffix="" radical="0-{last}"
+             speed="1Gf" bw="10Gbps" lat="1us" bb_bw="40Gbps" bb_lat="1us"/>
+    <host id="master_host" speed="1Gf"/>
+  </zone>
+</platform>
+"""
+
+
+def write_inputs(directory, nb_jobs, nb_hosts):
+    """Platform, workload and strategy shared by every run"""
+    with open(os.path.join(directory, "platform.xml"), "w") as f:
+        f.write(PLATFORM.format(last=nb_hosts - 1))
+    jobs = [
+        {"id": i, "subtime": float(i), "walltime": 100.0, "res": 1, "profile": "p"}
+        for i in range(nb_jobs)
+    ]
+    workload = {
+        "nb_res": nb_hosts,
+        "jobs": jobs,
+        "profiles": {"p": {"type": "delay", "delay": 10.0}},
+    }
+    with open(os.path.join(directory, "workload.json"), "w") as f:
+        json.dump(workload, f)
+    shutil.copyfile(
+        os.path.join(STRATEGIES_DIR, "backfill_scheduler.py"),
+        os.path.join(directory, "strategy.py"),
+    )
+    for helper in STRATEGY_HELPERS:
+        source = os.path.join(STRATEGIES_DIR, helper)
+        if os.path.exists(source):
+            shutil.copyfile(source, os.path.join(directory, helper))
+
+
+def run_once(executor, inputs_dir, root, index):
+    simulation_dir = os.path.join(root, f"exp_{index}")
+    shutil.copytree(inputs_dir, simulation_dir)
+    spec = ExecutionSpec(
+        experiment_id=index,
+        simulation_dir=simulation_dir,
+        platform_file=os.path.join(simulation_dir, "platform.xml"),
+        workload_file=os.path.join(simulation_dir, "workload.json"),
+        strategy_file=os.path.join(simulation_dir, "strategy.py"),
+    )
+    started = time.perf_counter()
+    handle = executor.launch(spec)
+    launched = time.perf_counter()
+    outcome = executor.wait(handle)
+    shutil.rmtree(simulation_dir, ignore_errors=True)
+    return outcome.succeeded, launched - started
+
+
+def benchmark(pool_size, runs, slots, inputs_dir):
+    settings.WARM_POOL_SIZE = pool_size
+    executor = LocalExecutor()
+    root = tempfile.mkdtemp(prefix="warm_pool_")
+    try:
+        # Steady state: the pool is up, as after the portal's startup
+        run_once(executor, inputs_dir, root, -1)
+        if executor.pool is not None:
+            executor.pool.hits = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=slots) as threads:
+            results = list(
+                threads.map(
+                    lambda i: run_once(executor, inputs_dir, root, i), range(runs)
+                )
+            )
+        elapsed = time.perf_counter() - started
+    finally:
+        if executor.pool is not None:
+            executor.pool.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+    launches = sorted(latency for _, latency in results)
+    return {
+        "pool_size": pool_size,
+        "runs": runs,
+        "failed": sum(1 for ok, _ in results if not ok),
+        "seconds": elapsed,
+        "per_minute": runs / elapsed * 60,
+        "launch_p50_ms": statistics.median(launches) * 1e3,
+        "launch_p95_ms": launches[int(0.95 * (len(launches) - 1))] * 1e3,
+        "pool_hits": executor.pool.hits if executor.pool else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--slots", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=4, help="Jobs per workload")
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument(
+        "--real", action="store_true", help="Use BATSIM_COMMAND and SCHEDULER_COMMAND"
+    )
+    args = parser.parse_args()
+
+    settings.FAKE_BATSIM = not args.real
+    inputs_dir = tempfile.mkdtemp(prefix="warm_pool_inputs_")
+    try:
+        write_inputs(inputs_dir, args.jobs, args.hosts)
+        print(
+            f"{args.runs} runs of {args.jobs} jobs, {args.slots} at a time "
+            f"({'BatSim' if args.real else 'fake BatSim'})"
+        )
+        print(f"{'pool':>6} {'failed':>7} {'runs/min':>10} {'launch p50':>11} {'p95':>9}")
+        baseline = None
+        for pool_size in (0, args.pool_size):
+            result = benchmark(pool_size, args.runs, args.slots, inputs_dir)
+            baseline = baseline or result["per_minute"]
+            print(
+                f"{pool_size or 'off':>6} {result['failed']:>7} "
+                f"{result['per_minute']:>10.0f} "
+                f"{result['launch_p50_ms']:>9.1f}ms {result['launch_p95_ms']:>7.1f}ms"
+                + (
+                    f"  x{result['per_minute'] / baseline:.2f}"
+                    if pool_size
+                    else ""
+                )
+            )
+    finally:
+        shutil.rmtree(inputs_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
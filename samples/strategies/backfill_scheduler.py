@@ -1,105 +1,166 @@
 #!/usr/bin/env python3
 """
 Backfill Scheduler for Batsim
-A scheduler that uses backfilling to improve resource utilization.
+An EASY backfilling scheduler: the job at the head of the queue gets a
+reservation, and later jobs may only jump ahead if they do not delay it.
+
+Requires utils.py, event_log.py and instrumentation.py from the same directory.
 """
 
+from collections import OrderedDict
+from itertools import islice
+
 import pybatsim.batsim.batsim as batsim
 import pybatsim.batsim.jobs as jobs
 import pybatsim.batsim.profiles as profiles
 import pybatsim.batsim.resources as resources
 
+from event_log import format_resources, get_event_logger
+from instrumentation import CallbackInstrumentation
+from utils import AvailabilityProfile
+
 
 class BackfillScheduler:
-    def __init__(self, scheduler: batsim.BatsimScheduler):
+    def __init__(self, scheduler: batsim.BatsimScheduler, backfill_depth=100):
         self.scheduler = scheduler
-        self.pending_jobs = []
-        self.running_jobs = []
-        self.reserved_jobs = []  # Jobs that have reserved resources
+        self.log = get_event_logger()
+        self.log.set_clock(scheduler.time)
+        self.pending_jobs = OrderedDict()  # job id -> job, in submission order
+        self.running_jobs = {}  # job id -> (start, expected end, nb resources)
+        self.profile = None
+        # Maximum number of queued jobs examined per backfilling pass, in the
+        # spirit of Slurm's bf_max_job_test. Keeps decisions flat in cost
+        # regardless of how long the queue grows.
+        self.backfill_depth = backfill_depth
 
     def onSimulationBegins(self):
         """Called when simulation starts"""
-        print("Backfill Scheduler: Simulation begins")
+        self.log.info("simulation_begins")
+        self._ensure_profile()
+
+    def onSimulationEnds(self):
+        """Called when simulation ends"""
+        self.log.info("simulation_ends")
+        self.log.flush()
 
     def onJobSubmission(self, job: jobs.Job):
         """Called when a job is submitted"""
-        print(f"Backfill Scheduler: Job {job.id} submitted")
-        self.pending_jobs.append(job)
+        self.log.info("job_submitted", job.id)
+        self.pending_jobs[job.id] = job
         self._try_schedule_jobs()
 
     def onJobCompletion(self, job: jobs.Job):
         """Called when a job completes"""
-        print(f"Backfill Scheduler: Job {job.id} completed")
-        if job in self.running_jobs:
-            self.running_jobs.remove(job)
-        if job in self.reserved_jobs:
-            self.reserved_jobs.remove(job)
+        self.log.info("job_completed", job.id)
+        self._release_job(job)
         self._try_schedule_jobs()
 
     def onJobKilled(self, job: jobs.Job):
         """Called when a job is killed"""
-        print(f"Backfill Scheduler: Job {job.id} killed")
-        if job in self.running_jobs:
-            self.running_jobs.remove(job)
-        if job in self.reserved_jobs:
-            self.reserved_jobs.remove(job)
-        if job in self.pending_jobs:
-            self.pending_jobs.remove(job)
+        self.log.warning("job_killed", job.id)
+        self._release_job(job)
+        self.pending_jobs.pop(job.id, None)
         self._try_schedule_jobs()
 
+    def _ensure_profile(self):
+        """Build the availability profile on first use"""
+        if self.profile is None:
+            total = len(self.scheduler.get_available_resources())
+            self.profile = AvailabilityProfile(total)
+
+    def _release_job(self, job: jobs.Job):
+        """Give the resources of a finished job back to the profile"""
+        entry = self.running_jobs.pop(job.id, None)
+        if entry is not None:
+            start, end, nb_resources = entry
+            self.profile.release(start, end, nb_resources)
+
     def _try_schedule_jobs(self):
-        """Try to schedule pending jobs using backfilling"""
+        """Start queued jobs in order, then backfill around the head job"""
+        self._ensure_profile()
+        now = self.scheduler.time()
         available_resources = self.scheduler.get_available_resources()
 
-        # First, try to schedule jobs that can fit immediately
-        jobs_to_remove = []
-        for job in self.pending_jobs:
-            if self._can_schedule_job(job, available_resources):
-                self._schedule_job(job)
-                jobs_to_remove.append(job)
-                available_resources = self.scheduler.get_available_resources()
-
-        # Remove scheduled jobs from pending list
-        for job in jobs_to_remove:
-            self.pending_jobs.remove(job)
-
-        # Try backfilling for remaining jobs
-        self._try_backfill()
-
-    def _try_backfill(self):
-        """Attempt to backfill smaller jobs"""
-        if not self.pending_jobs:
-            return
-
-        # Sort pending jobs by size (smallest first for backfilling)
-        sorted_jobs = sorted(self.pending_jobs, key=lambda j: j.requested_resources)
-
-        for job in sorted_jobs:
-            if self._can_backfill_job(job):
-                self._schedule_job(job)
-                self.pending_jobs.remove(job)
+        # Start jobs in FCFS order while the head of the queue fits
+        while self.pending_jobs:
+            head = next(iter(self.pending_jobs.values()))
+            if not self._can_schedule_job(head, available_resources):
                 break
+            self.pending_jobs.popitem(last=False)
+            available_resources = self._schedule_job(head, available_resources, now)
+
+        if self.pending_jobs and available_resources:
+            self._try_backfill(available_resources, now)
+
+    def _try_backfill(self, available_resources, now):
+        """Start later jobs that cannot delay the head job's reservation"""
+        head = next(iter(self.pending_jobs.values()))
+        shadow_time, extra_resources = self._compute_reservation(head, now)
+
+        backfilled = []
+        candidates = islice(self.pending_jobs.values(), 1, self.backfill_depth + 1)
+        for job in candidates:
+            if not available_resources:
+                break
+            if not self._can_backfill_job(
+                job, available_resources, now, shadow_time, extra_resources
+            ):
+                continue
+            if now + self._walltime(job) > shadow_time:
+                # Job outlives the reservation, so it eats into the extra nodes
+                extra_resources -= job.requested_resources
+            available_resources = self._schedule_job(job, available_resources, now)
+            backfilled.append(job.id)
+
+        for job_id in backfilled:
+            del self.pending_jobs[job_id]
+
+    def _compute_reservation(self, job: jobs.Job, now):
+        """
+        Shadow time and extra resources for the head job
+
+        The profile only holds running jobs, so free resources never decrease
+        after `now` and the shadow time is a single O(log n) profile lookup.
+        """
+        shadow_time = self.profile.earliest_time_with(job.requested_resources, now)
+        if shadow_time is None:
+            # The job asks for more than the machine has; nothing to protect
+            return float("inf"), self.profile.total_resources
+        extra_resources = self.profile.free_at(shadow_time) - job.requested_resources
+        return shadow_time, extra_resources
 
     def _can_schedule_job(self, job: jobs.Job, available_resources):
         """Check if a job can be scheduled immediately"""
         return len(available_resources) >= job.requested_resources
 
-    def _can_backfill_job(self, job: jobs.Job):
-        """Check if a job can be backfilled"""
-        # Simple backfilling: check if job can fit in available resources
-        available_resources = self.scheduler.get_available_resources()
-        return len(available_resources) >= job.requested_resources
-
-    def _schedule_job(self, job: jobs.Job):
-        """Schedule a job on available resources"""
-        available_resources = self.scheduler.get_available_resources()
+    def _can_backfill_job(
+        self, job: jobs.Job, available_resources, now, shadow_time, extra_resources
+    ):
+        """Check if a job fits now without delaying the head job"""
+        if not self._can_schedule_job(job, available_resources):
+            return False
+        if now + self._walltime(job) <= shadow_time:
+            return True
+        return job.requested_resources <= extra_resources
+
+    def _walltime(self, job: jobs.Job):
+        """Requested walltime, or infinity when the job did not give one"""
+        if job.requested_time is None or job.requested_time <= 0:
+            return float("inf")
+        return job.requested_time
+
+    def _schedule_job(self, job: jobs.Job, available_resources, now):
+        """Schedule a job and return the resources left available"""
         selected_resources = available_resources[: job.requested_resources]
 
-        print(
-            f"Backfill Scheduler: Scheduling job {job.id} on resources {selected_resources}"
+        self.log.info(
+            "job_scheduled", job.id, resources=format_resources(selected_resources)
         )
         self.scheduler.execute_job(job, selected_resources)
-        self.running_jobs.append(job)
+        end = now + self._walltime(job)
+        self.profile.reserve(now, end, job.requested_resources)
+        self.running_jobs[job.id] = (now, end, job.requested_resources)
+        return available_resources[job.requested_resources :]
 
 
 def main():
@@ -109,10 +170,14 @@ def main():
 
     # Register event handlers
     scheduler.onSimulationBegins = backfill.onSimulationBegins
+    scheduler.onSimulationEnds = backfill.onSimulationEnds
     scheduler.onJobSubmission = backfill.onJobSubmission
     scheduler.onJobCompletion = backfill.onJobCompletion
     scheduler.onJobKilled = backfill.onJobKilled
 
+    # Time every callback; histograms land in out_callbacks.json
+    CallbackInstrumentation().instrument(scheduler, backfill)
+
     # Start the scheduler
     scheduler.start()
 
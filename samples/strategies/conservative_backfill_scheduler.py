@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Conservative Backfill Scheduler for Batsim
+Every queued job holds a reservation in the availability profile, so a job
+may only jump ahead when it delays no earlier job at all.
+
+Requires utils.py, event_log.py and instrumentation.py from the same directory.
+"""
+
+import heapq
+from collections import OrderedDict
+from itertools import islice
+
+import pybatsim.batsim.batsim as batsim
+import pybatsim.batsim.jobs as jobs
+import pybatsim.batsim.profiles as profiles
+import pybatsim.batsim.resources as resources
+
+from event_log import format_resources, get_event_logger
+from instrumentation import CallbackInstrumentation
+from utils import AvailabilityProfile
+
+
+class ConservativeBackfillScheduler:
+    def __init__(
+        self, scheduler: batsim.BatsimScheduler, compress_depth=100, search_windows=16
+    ):
+        self.scheduler = scheduler
+        self.log = get_event_logger()
+        self.log.set_clock(scheduler.time)
+        self.pending_jobs = OrderedDict()  # job id -> job, in submission order
+        self.reservations = {}  # job id -> (start, end, nb resources)
+        self.running_jobs = {}  # job id -> (start, end, nb resources)
+        self.start_heap = []  # (reserved start, job id), stale entries skipped
+        self.wakeups = set()  # Times a requested call is pending for
+        self.wakeup_heap = []  # The same times, to drop them once passed
+        self.profile = None
+        # Maximum number of queued jobs whose reservation is revisited after
+        # an early completion. Reservations never move later, so jobs beyond
+        # this depth keep a valid (if pessimistic) slot until they get closer
+        # to the head of the queue.
+        self.compress_depth = compress_depth
+        # Candidate windows tried when looking for a job's earliest slot before
+        # falling back to the end of the planned schedule. Bounds the cost of
+        # placing a job behind a long, fragmented queue.
+        self.search_windows = search_windows
+
+    def onSimulationBegins(self):
+        """Called when simulation starts"""
+        self.log.info("simulation_begins")
+        self._ensure_profile()
+
+    def onSimulationEnds(self):
+        """Called when simulation ends"""
+        self.log.info("simulation_ends")
+        self.log.flush()
+
+    def onJobSubmission(self, job: jobs.Job):
+        """Called when a job is submitted"""
+        self.log.info("job_submitted", job.id)
+        self._ensure_profile()
+        now = self.scheduler.time()
+        self.pending_jobs[job.id] = job
+        self._reserve(job, now)
+        self._start_due_jobs(now)
+
+    def onJobCompletion(self, job: jobs.Job):
+        """Called when a job completes"""
+        self.log.info("job_completed", job.id)
+        now = self.scheduler.time()
+        entry = self.running_jobs.pop(job.id, None)
+        if entry is not None:
+            start, end, nb_resources = entry
+            self.profile.release(start, end, nb_resources)
+            if now < end:
+                # Finished before its walltime: the hole may let others move up
+                self._compress_reservations(now)
+        self._start_due_jobs(now)
+
+    def onJobKilled(self, job: jobs.Job):
+        """Called when a job is killed"""
+        self.log.warning("job_killed", job.id)
+        now = self.scheduler.time()
+        entry = self.running_jobs.pop(job.id, None)
+        if entry is None and self.pending_jobs.pop(job.id, None) is not None:
+            entry = self.reservations.pop(job.id, None)
+        if entry is not None:
+            start, end, nb_resources = entry
+            self.profile.release(start, end, nb_resources)
+            self._compress_reservations(now)
+        self._start_due_jobs(now)
+
+    def onRequestedCall(self):
+        """Called at a time asked for with wake_me_up_at"""
+        now = self.scheduler.time()
+        while self.wakeup_heap and self.wakeup_heap[0] <= now:
+            self.wakeups.discard(heapq.heappop(self.wakeup_heap))
+        self._start_due_jobs(now)
+
+    def _wake_at(self, at):
+        """Ask for a requested call at `at`, once per distinct time"""
+        if at not in self.wakeups:
+            self.wakeups.add(at)
+            heapq.heappush(self.wakeup_heap, at)
+            self.scheduler.wake_me_up_at(at)
+
+    def _ensure_profile(self):
+        """Build the availability profile on first use"""
+        if self.profile is None:
+            total = len(self.scheduler.get_available_resources())
+            self.profile = AvailabilityProfile(total)
+
+    def _reserve(self, job: jobs.Job, now):
+        """Give a queued job the earliest slot that delays nobody"""
+        walltime = self._walltime(job)
+        start = self.profile.earliest_start(
+            job.requested_resources, walltime, now, self.search_windows
+        )
+        if start is None:
+            self.log.warning(
+                "job_rejected", job.id, reason="requests more resources than the platform has"
+            )
+            del self.pending_jobs[job.id]
+            self.scheduler.reject_job(job)
+            return
+        self._book(job, start, start + walltime)
+
+    def _book(self, job: jobs.Job, start, end):
+        """Record a job's reservation in the profile and the start heap"""
+        self.profile.reserve(start, end, job.requested_resources)
+        self.reservations[job.id] = (start, end, job.requested_resources)
+        heapq.heappush(self.start_heap, (start, job.id))
+        if start > self.scheduler.time():
+            # No job event may fall on the start, e.g. once a reservation
+            # is left late beyond compress_depth
+            self._wake_at(start)
+
+    def _compress_reservations(self, now):
+        """
+        Move reservations near the head of the queue into freed holes
+
+        Each job is released and re-planned from `now`, and only takes the
+        new slot if it starts strictly earlier: a search capped at
+        `search_windows` may fall back to the horizon, later than the slot
+        the job already holds. Cost is bounded by `compress_depth` profile
+        lookups rather than the queue length.
+        """
+        for job in islice(self.pending_jobs.values(), self.compress_depth):
+            entry = self.reservations.get(job.id)
+            if entry is None or entry[0] <= now:
+                continue
+            start, end, nb_resources = entry
+            self.profile.release(start, end, nb_resources)
+            earlier = self.profile.earliest_start(
+                nb_resources, end - start, now, self.search_windows
+            )
+            if earlier is None or earlier >= start:
+                self.profile.reserve(start, end, nb_resources)
+                continue
+            self._book(job, earlier, earlier + (end - start))
+
+    def _start_due_jobs(self, now):
+        """Start every job whose reservation has come due"""
+        available_resources = self.scheduler.get_available_resources()
+        deferred = []
+        while self.start_heap and self.start_heap[0][0] <= now:
+            start, job_id = heapq.heappop(self.start_heap)
+            entry = self.reservations.get(job_id)
+            if entry is None or entry[0] != start:
+                continue  # Superseded by a compressed reservation
+            job = self.pending_jobs[job_id]
+            if len(available_resources) < job.requested_resources:
+                # Profile is ahead of the platform; retried below
+                deferred.append((start, job_id))
+                continue
+            available_resources = self._schedule_job(job, available_resources, now)
+        for item in deferred:
+            heapq.heappush(self.start_heap, item)
+        if deferred:
+            # Retry when the next running job is planned to end
+            ends = [end for _, end, _ in self.running_jobs.values() if now < end]
+            if ends and min(ends) != float("inf"):
+                self._wake_at(min(ends))
+
+    def _walltime(self, job: jobs.Job):
+        """Requested walltime, or infinity when the job did not give one"""
+        if job.requested_time is None or job.requested_time <= 0:
+            return float("inf")
+        return job.requested_time
+
+    def _schedule_job(self, job: jobs.Job, available_resources, now):
+        """Schedule a job and return the resources left available"""
+        start, end, nb_resources = self.reservations.pop(job.id)
+        del self.pending_jobs[job.id]
+        if start < now:
+            # Started late: keep the profile aligned with the actual run
+            self.profile.release(start, end, nb_resources)
+            start, end = now, now + self._walltime(job)
+            self.profile.reserve(start, end, nb_resources)
+        selected_resources = available_resources[:nb_resources]
+
+        self.log.info(
+            "job_scheduled", job.id, resources=format_resources(selected_resources)
+        )
+        self.scheduler.execute_job(job, selected_resources)
+        self.running_jobs[job.id] = (start, end, nb_resources)
+        return available_resources[nb_resources:]
+
+
+def main():
+    """Main entry point for the Conservative Backfill scheduler"""
+    scheduler = batsim.BatsimScheduler()
+    conservative = ConservativeBackfillScheduler(scheduler)
+
+    # Register event handlers
+    scheduler.onSimulationBegins = conservative.onSimulationBegins
+    scheduler.onSimulationEnds = conservative.onSimulationEnds
+    scheduler.onJobSubmission = conservative.onJobSubmission
+    scheduler.onJobCompletion = conservative.onJobCompletion
+    scheduler.onJobKilled = conservative.onJobKilled
+    scheduler.onRequestedCall = conservative.onRequestedCall
+
+    # Time every callback; histograms land in out_callbacks.json
+    CallbackInstrumentation().instrument(scheduler, conservative)
+
+    # Start the scheduler
+    scheduler.start()
+
+
+if __name__ == "__main__":
+    main()
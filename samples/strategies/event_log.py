@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Structured event log for Batsim schedulers
+Appends compact NDJSON records to a preallocated buffer and writes them out
+in batches, instead of one unbuffered print() per job event. Batches are
+small enough in count and age for the portal to follow a running
+simulation from the file.
+"""
+
+import atexit
+import json
+import os
+import time
+
+from instrumentation import OUTPUT_DIR_ENV
+
+# Read by the portal to build per-job event timelines
+EVENTS_FILENAME = "out_scheduler_events.ndjson"
+
+# Minimum level and per-event sampling, e.g. "job_submitted=10,job_scheduled=10"
+LEVEL_ENV = "SCHEDULER_LOG_LEVEL"
+SAMPLING_ENV = "SCHEDULER_LOG_SAMPLING"
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+DEFAULT_BUFFER_SIZE = 1 << 20  # 1 MiB
+# Write out once this many records are buffered, or the oldest is this old
+DEFAULT_FLUSH_RECORDS = 1000
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds of wall-clock time
+
+
+def parse_sampling(spec):
+    """Parse "event=N,..." into {event: N}, keeping one record in N"""
+    rates = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        event, rate = item.split("=", 1)
+        try:
+            rates[event.strip()] = max(1, int(rate))
+        except ValueError:
+            continue
+    return rates
+
+
+def format_resources(resources):
+    """Compact BatSim-style interval string, e.g. [0, 1, 2, 5] -> "0-2 5" """
+    if not resources:
+        return ""
+    ids = sorted(resources)
+    parts = []
+    start = prev = ids[0]
+    for rid in ids[1:]:
+        if rid == prev + 1:
+            prev = rid
+            continue
+        parts.append(f"{start}-{prev}" if prev != start else str(start))
+        start = prev = rid
+    parts.append(f"{start}-{prev}" if prev != start else str(start))
+    return " ".join(parts)
+
+
+class EventLogger:
+    """
+    Leveled, sampled scheduler event log
+
+    Each record is one JSON object per line with the simulation time ("t"),
+    level ("lvl"), event name ("ev"), job id ("job") and any extra fields.
+    Records accumulate in a fixed bytearray and are written to disk when
+    the buffer fills up, every `flush_records` records, when a record is
+    logged `flush_interval` seconds or more after the last write, on
+    flush() and at exit. Strategies flush when the simulation ends.
+    """
+
+    def __init__(
+        self,
+        output_dir=None,
+        level=None,
+        sampling=None,
+        clock=None,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+        flush_records=DEFAULT_FLUSH_RECORDS,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+    ):
+        self.output_dir = output_dir or os.environ.get(OUTPUT_DIR_ENV) or os.getcwd()
+        if level is None:
+            level = os.environ.get(LEVEL_ENV, "INFO")
+        self.level = LEVELS.get(str(level).upper(), level if isinstance(level, int) else INFO)
+        self.sampling = (
+            sampling if sampling is not None else parse_sampling(os.environ.get(SAMPLING_ENV))
+        )
+        self.clock = clock
+        self._seen = {}
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._used = 0
+        self._file = None
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self._records = 0
+        self._flush_at = time.monotonic() + flush_interval
+        self._encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+        atexit.register(self.close)
+
+    def set_clock(self, clock):
+        """Use `clock()` as the simulation timestamp of every record"""
+        self.clock = clock
+
+    def enabled_for(self, level):
+        return level >= self.level
+
+    def log(self, level, event, job_id=None, **fields):
+        """Append one record if it passes the level and sampling filters"""
+        if level < self.level:
+            return
+        rate = self.sampling.get(event)
+        if rate:
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+            if seen % rate:
+                return
+        record = {
+            "t": self.clock() if self.clock else None,
+            "lvl": LEVEL_NAMES.get(level, level),
+            "ev": event,
+        }
+        if job_id is not None:
+            record["job"] = job_id
+        if fields:
+            record.update(fields)
+        self._append((self._encode(record) + "\n").encode())
+        self._records += 1
+        if self._records >= self.flush_records or time.monotonic() >= self._flush_at:
+            self.flush()
+
+    def debug(self, event, job_id=None, **fields):
+        self.log(DEBUG, event, job_id, **fields)
+
+    def info(self, event, job_id=None, **fields):
+        self.log(INFO, event, job_id, **fields)
+
+    def warning(self, event, job_id=None, **fields):
+        self.log(WARNING, event, job_id, **fields)
+
+    def error(self, event, job_id=None, **fields):
+        self.log(ERROR, event, job_id, **fields)
+
+    def _append(self, data):
+        size = len(data)
+        if self._used + size > len(self._buffer):
+            self.flush()
+            if size > len(self._buffer):
+                self._write(data)
+                return
+        self._view[self._used : self._used + size] = data
+        self._used += size
+
+    def _write(self, data):
+        if self._file is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._file = open(os.path.join(self.output_dir, EVENTS_FILENAME), "ab")
+        self._file.write(data)
+
+    def flush(self):
+        """Write buffered records to disk"""
+        if self._used:
+            self._write(self._view[: self._used])
+            self._used = 0
+        self._records = 0
+        self._flush_at = time.monotonic() + self.flush_interval
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Flush and close the log file"""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_default_logger = None
+
+
+def get_event_logger():
+    """Process-wide logger configured from the environment"""
+    global _default_logger
+    if _default_logger is None:
+        _default_logger = EventLogger()
+    return _default_logger
@@ -2,6 +2,8 @@
 """
 First-Come-First-Serve (FCFS) Scheduler for Batsim
 A simple scheduler that processes jobs in the order they arrive.
+
+Requires event_log.py and instrumentation.py from the same directory.
 """
 
 import pybatsim.batsim.batsim as batsim
@@ -9,33 +11,43 @@ import pybatsim.batsim.jobs as jobs
 import pybatsim.batsim.profiles as profiles
 import pybatsim.batsim.resources as resources
 
+from event_log import format_resources, get_event_logger
+from instrumentation import CallbackInstrumentation
+
 
 class FCFSScheduler:
     def __init__(self, scheduler: batsim.BatsimScheduler):
         self.scheduler = scheduler
+        self.log = get_event_logger()
+        self.log.set_clock(scheduler.time)
         self.pending_jobs = []
         self.running_jobs = []
 
     def onSimulationBegins(self):
         """Called when simulation starts"""
-        print("FCFS Scheduler: Simulation begins")
+        self.log.info("simulation_begins")
+
+    def onSimulationEnds(self):
+        """Called when simulation ends"""
+        self.log.info("simulation_ends")
+        self.log.flush()
 
     def onJobSubmission(self, job: jobs.Job):
         """Called when a job is submitted"""
-        print(f"FCFS Scheduler: Job {job.id} submitted")
+        self.log.info("job_submitted", job.id)
         self.pending_jobs.append(job)
         self._try_schedule_jobs()
 
     def onJobCompletion(self, job: jobs.Job):
         """Called when a job completes"""
-        print(f"FCFS Scheduler: Job {job.id} completed")
+        self.log.info("job_completed", job.id)
         if job in self.running_jobs:
             self.running_jobs.remove(job)
         self._try_schedule_jobs()
 
     def onJobKilled(self, job: jobs.Job):
         """Called when a job is killed"""
-        print(f"FCFS Scheduler: Job {job.id} killed")
+        self.log.warning("job_killed", job.id)
         if job in self.running_jobs:
             self.running_jobs.remove(job)
         if job in self.pending_jobs:
@@ -68,8 +80,8 @@ class FCFSScheduler:
         available_resources = self.scheduler.get_available_resources()
         selected_resources = available_resources[: job.requested_resources]
 
-        print(
-            f"FCFS Scheduler: Scheduling job {job.id} on resources {selected_resources}"
+        self.log.info(
+            "job_scheduled", job.id, resources=format_resources(selected_resources)
         )
         self.scheduler.execute_job(job, selected_resources)
         self.running_jobs.append(job)
@@ -82,10 +94,14 @@ def main():
 
     # Register event handlers
     scheduler.onSimulationBegins = fcfs.onSimulationBegins
+    scheduler.onSimulationEnds = fcfs.onSimulationEnds
     scheduler.onJobSubmission = fcfs.onJobSubmission
     scheduler.onJobCompletion = fcfs.onJobCompletion
     scheduler.onJobKilled = fcfs.onJobKilled
 
+    # Time every callback; histograms land in out_callbacks.json
+    CallbackInstrumentation().instrument(scheduler, fcfs)
+
     # Start the scheduler
     scheduler.start()
 
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Callback instrumentation for Batsim schedulers
+Times every scheduler callback with a monotonic clock, keeps log2-bucketed
+latency histograms in memory and writes them next to the BatSim outputs
+when the simulation ends.
+"""
+
+import atexit
+import functools
+import json
+import os
+import time
+
+# Callbacks a strategy can register on the BatsimScheduler
+CALLBACKS = (
+    "onSimulationBegins",
+    "onSimulationEnds",
+    "onJobSubmission",
+    "onJobCompletion",
+    "onJobKilled",
+    "onRequestedCall",
+)
+
+# Strategy internals worth timing on their own when they exist
+INTERNAL_METHODS = ("_try_schedule_jobs", "_try_backfill", "_compress_reservations")
+
+# Read by the portal when results are ingested
+STATS_FILENAME = "out_callbacks.json"
+
+# Directory the file is written to; set by the portal for each experiment
+OUTPUT_DIR_ENV = "SCHEDULER_OUTPUT_DIR"
+
+NB_BUCKETS = 64
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in nanoseconds with power-of-two buckets
+
+    Bucket b holds latencies in [2^(b-1), 2^b), so recording is a
+    bit_length() and a list increment.
+    """
+
+    __slots__ = ("buckets", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = [0] * NB_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, elapsed_ns):
+        """Add one latency sample"""
+        self.buckets[min(elapsed_ns.bit_length(), NB_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self):
+        """Summary plus the non-empty buckets as [low_ns, high_ns, count]"""
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.count if self.count else 0,
+            "min_ns": self.min_ns or 0,
+            "max_ns": self.max_ns,
+            "p50_ns": self.quantile(0.5),
+            "p90_ns": self.quantile(0.9),
+            "p99_ns": self.quantile(0.99),
+            "buckets": [
+                [(1 << bucket) >> 1, 1 << bucket, count]
+                for bucket, count in enumerate(self.buckets)
+                if count
+            ],
+        }
+
+
+class CallbackInstrumentation:
+    """
+    Wraps the callbacks registered on a BatsimScheduler with timers
+
+    Usage, after the handlers are registered in main():
+
+        instrumentation = CallbackInstrumentation()
+        instrumentation.instrument(scheduler, strategy)
+        scheduler.start()
+    """
+
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir or os.environ.get(OUTPUT_DIR_ENV) or os.getcwd()
+        self.histograms = {}
+        self.written = False
+
+    def wrap(self, name, func):
+        """Return `func` timed into the histogram called `name`"""
+        histogram = self.histograms.setdefault(name, LatencyHistogram())
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(clock() - started)
+
+        return timed
+
+    def instrument(self, scheduler, strategy=None):
+        """Time the scheduler callbacks and the strategy's inner methods"""
+        for name in CALLBACKS:
+            callback = getattr(scheduler, name, None)
+            if callable(callback):
+                setattr(scheduler, name, self.wrap(name, callback))
+        if strategy is not None:
+            for name in INTERNAL_METHODS:
+                method = getattr(strategy, name, None)
+                if callable(method):
+                    # Instance attribute shadows the method for self.<name>()
+                    setattr(strategy, name, self.wrap(name, method))
+
+        simulation_ends = getattr(scheduler, "onSimulationEnds", None)
+
+        def on_simulation_ends(*args, **kwargs):
+            try:
+                if callable(simulation_ends):
+                    return simulation_ends(*args, **kwargs)
+            finally:
+                self.write()
+
+        scheduler.onSimulationEnds = on_simulation_ends
+        # Still write the stats if the scheduler exits without the end event
+        atexit.register(self.write)
+        return scheduler
+
+    def to_dict(self):
+        """Histograms of every instrumented callback"""
+        return {
+            "version": 1,
+            "clock": "perf_counter_ns",
+            "callbacks": {
+                name: histogram.to_dict()
+                for name, histogram in sorted(self.histograms.items())
+            },
+        }
+
+    def write(self):
+        """Write the histograms to STATS_FILENAME once"""
+        if self.written:
+            return
+        self.written = True
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, STATS_FILENAME)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
@@ -5,8 +5,11 @@ Common functions that can be used across different scheduling strategies.
 """
 
 import math
+import random
 from typing import List, Dict, Any
 
+from event_log import format_resources, get_event_logger
+
 
 def calculate_job_priority(job, priority_type="fifo"):
     """
@@ -92,20 +95,21 @@ def log_scheduling_event(event_type, job_id, resources=None, message=""):
     """
     Log scheduling events for debugging and analysis
 
+    Records go to the buffered NDJSON event log (see event_log.py) rather
+    than stdout, stamped with the simulation time once a clock is set.
+
     Args:
         event_type: Type of event ("job_submitted", "job_scheduled", "job_completed")
         job_id: ID of the job
         resources: Resources involved in the event
         message: Additional message
     """
-    log_entry = {
-        "event_type": event_type,
-        "job_id": job_id,
-        "resources": resources,
-        "message": message,
-        "timestamp": None,  # Would be set by the scheduler
-    }
-    print(f"SCHEDULER_LOG: {log_entry}")
+    fields = {}
+    if resources:
+        fields["resources"] = format_resources(resources)
+    if message:
+        fields["message"] = message
+    get_event_logger().info(event_type, job_id, **fields)
 
 
 class JobQueue:
@@ -148,3 +152,239 @@ class JobQueue:
 
     def __iter__(self):
         return iter(self.jobs)
+
+
+class _ProfileNode:
+    """Treap node holding the free-resource change at one point in time"""
+
+    __slots__ = (
+        "time",
+        "delta",
+        "priority",
+        "left",
+        "right",
+        "total",
+        "min_prefix",
+        "max_prefix",
+    )
+
+    def __init__(self, time, delta):
+        self.time = time
+        self.delta = delta
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.total = delta
+        self.min_prefix = delta
+        self.max_prefix = delta
+
+    def update(self):
+        """Recompute the subtree aggregates from the children"""
+        left, right = self.left, self.right
+        here = self.delta
+        low = high = here
+        if left is not None:
+            here += left.total
+            low = high = here
+            if left.min_prefix < low:
+                low = left.min_prefix
+            if left.max_prefix > high:
+                high = left.max_prefix
+        if right is not None:
+            if here + right.min_prefix < low:
+                low = here + right.min_prefix
+            if here + right.max_prefix > high:
+                high = here + right.max_prefix
+            here += right.total
+        self.total = here
+        self.min_prefix = low
+        self.max_prefix = high
+
+
+def _split(node, time, inclusive):
+    """Split a treap into keys before `time` and the rest
+
+    With `inclusive` set, keys equal to `time` go to the left part.
+    """
+    if node is None:
+        return None, None
+    if node.time < time or (inclusive and node.time == time):
+        node.right, right = _split(node.right, time, inclusive)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, time, inclusive)
+    node.update()
+    return left, node
+
+
+def _merge(left, right):
+    """Merge two treaps where every key of `left` precedes `right`"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+class AvailabilityProfile:
+    """
+    Time-indexed profile of free resources
+
+    The profile is stored as a sorted set of (time, delta) breakpoints: the
+    number of free resources at time t is the machine size plus the sum of
+    every delta at or before t. Breakpoints live in a treap augmented with
+    subtree sums and prefix minima/maxima, so updates and the queries used
+    by backfilling schedulers run in O(log n) for n breakpoints.
+    """
+
+    def __init__(self, total_resources):
+        self.total_resources = total_resources
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add_delta(self, time, delta):
+        """Add `delta` free resources from `time` onwards"""
+        if delta == 0:
+            return
+        left, rest = _split(self._root, time, inclusive=False)
+        node, right = _split(rest, time, inclusive=True)
+        if node is None:
+            node = _ProfileNode(time, delta)
+            self._size += 1
+        else:
+            node.delta += delta
+            node.update()
+            if node.delta == 0:
+                node = None
+                self._size -= 1
+        self._root = _merge(_merge(left, node), right)
+
+    def reserve(self, start, end, nb_resources):
+        """Mark `nb_resources` as busy over [start, end)"""
+        self.add_delta(start, -nb_resources)
+        self.add_delta(end, nb_resources)
+
+    def release(self, start, end, nb_resources):
+        """Undo a previous reservation over [start, end)"""
+        self.add_delta(start, nb_resources)
+        self.add_delta(end, -nb_resources)
+
+    def free_at(self, time):
+        """Number of free resources at `time`"""
+        acc = 0
+        node = self._root
+        while node is not None:
+            if node.time <= time:
+                acc += (node.left.total if node.left else 0) + node.delta
+                node = node.right
+            else:
+                node = node.left
+        return self.total_resources + acc
+
+    def earliest_time_with(self, nb_resources, after):
+        """
+        First time >= `after` at which at least `nb_resources` are free
+
+        Returns None when the profile never frees that many resources.
+        """
+        if self.free_at(after) >= nb_resources:
+            return after
+        found = self._first_reaching(
+            self._root, 0, nb_resources - self.total_resources, after
+        )
+        return found
+
+    def earliest_start(self, nb_resources, duration, after, max_windows=None):
+        """
+        First time >= `after` where `nb_resources` stay free for `duration`
+
+        Each iteration jumps past the last breakpoint that broke the previous
+        candidate window, so the cost is O(log n) per window tried. With
+        `max_windows` set, the search gives up after that many windows and
+        returns the horizon instead: the time after the last breakpoint, when
+        nothing else is planned. That slot is always valid, only later.
+        """
+        if nb_resources > self.total_resources:
+            return None
+        target = nb_resources - self.total_resources
+        start = self.earliest_time_with(nb_resources, after)
+        windows = 0
+        while start is not None:
+            end = start + duration
+            dip = self._last_below(self._root, 0, target, start, end)
+            if dip is None:
+                return start
+            windows += 1
+            if max_windows is not None and windows >= max_windows:
+                return self._horizon(nb_resources, after)
+            start = self._first_reaching(self._root, 0, target, dip)
+        return None
+
+    def _horizon(self, nb_resources, after):
+        """Time of the last breakpoint if `nb_resources` are free from then on"""
+        node = self._root
+        if node is None:
+            return after
+        while node.right is not None:
+            node = node.right
+        if self.total_resources + self._root.total < nb_resources:
+            return None
+        return max(node.time, after)
+
+    def breakpoints(self):
+        """List of (time, free resources) breakpoints in time order"""
+        points = []
+        stack = []
+        node = self._root
+        acc = self.total_resources
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            acc += node.delta
+            points.append((node.time, acc))
+            node = node.right
+        return points
+
+    def _first_reaching(self, node, acc, target, after):
+        """First key > `after` whose prefix sum reaches `target`"""
+        while node is not None:
+            if acc + node.max_prefix < target:
+                return None
+            left = node.left
+            before = acc + (left.total if left else 0)
+            if node.time > after:
+                found = self._first_reaching(left, acc, target, after)
+                if found is not None:
+                    return found
+                if before + node.delta >= target:
+                    return node.time
+            acc = before + node.delta
+            node = node.right
+        return None
+
+    def _last_below(self, node, acc, target, after, before_time):
+        """Last key in (`after`, `before_time`) whose prefix sum is below `target`"""
+        if node is None or acc + node.min_prefix >= target:
+            return None
+        left = node.left
+        here = acc + (left.total if left else 0) + node.delta
+        if node.time < before_time:
+            found = self._last_below(node.right, here, target, after, before_time)
+            if found is not None:
+                return found
+            if node.time <= after:
+                return None
+            if here < target:
+                return node.time
+        return self._last_below(left, acc, target, after, before_time)